@@ -46,12 +46,13 @@ It consists of submodules for:
 
 1. working with :term:`operators<operator>` (:mod:`robot_designer_plugin.core.operators`),
 2. simplify Gui development (:mod:`robot_designer_plugin.core.gui`),
-3. logging and debugging (:mod:`robot_designer_plugin.core.logfile`),
+3. logging, debugging and profiling (:mod:`robot_designer_plugin.core.logfile`,
+   :mod:`robot_designer_plugin.core.profiling`),
 4. configuration variables (:mod:`robot_designer_plugin.core.config`),
 5. automated plugin setup (registration to blender) (:mod:`robot_designer_plugin.core.pluginmanager`)
 '''
 
-from . import constants, config, operators, conditions, logfile, pluginmanager, resources, gui, property
+from . import constants, config, operators, conditions, logfile, profiling, pluginmanager, resources, gui, property
 from importlib import reload
 
 reload(constants)
@@ -59,6 +60,7 @@ reload(gui)
 reload(config)
 reload(conditions)
 reload(logfile)
+reload(profiling)
 reload(operators)
 reload(pluginmanager)  # Should be last imported .. depends on gui and operators
 reload(property)  # Has to be imported after pluginmanager
@@ -39,12 +39,14 @@ This submodule provides the base class and decorators, and some functions for de
 register automatically.
 """
 import inspect
+import os
 
 import bpy
 from .config import PLUGIN_PREFIX, EXCEPTION_MESSAGE
 from .logfile import log_callstack, log_callstack_last, operator_logger as logger
 from .conditions import Condition
 from .gui import InfoBox
+from .profiling import profiler, profiling_requested, profile_directory, PROFILE_SUFFIX
 
 
 def get_registered_operator(operator):
@@ -123,6 +125,17 @@ class RDOperator(bpy.types.Operator):
     logger = logger
     """For convenience, every the operators share a logging instance."""
 
+    executing = 0
+    """Number of operators being executed (including operators called by other operators)."""
+
+    profiling = False
+    """Set to True by import and export operators. If profiling is switched on in the global properties, their
+    execution is recorded by :data:`.profiling.profiler` (see :meth:`OperatorLogger`)."""
+
+    exporting = False
+    """Set to True by operators writing to their ``filepath`` (or ``directory``). Their profiles are written next to
+    the written file (see :func:`.profiling.profile_directory`)."""
+
     @classmethod
     def poll(cls, context):
         """
@@ -271,12 +284,26 @@ class RDOperator(bpy.types.Operator):
             id = self.__class__.bl_idname
 
             # Execute the Operator
+            RDOperator.executing += 1
             try:
                 # self.logger.debug("Entering {}() from {}({}):\n{}".format(
                 #                    func.__name__, id, class_name,
                 #                    log_callstack()))
 
-                result = func(self, context)
+                if getattr(self, "profiling", False) and profiling_requested(context):
+                    if profiler.active:
+                        # operator called by another profiled operator
+                        with profiler.phase(id):
+                            return func(self, context)
+                    # before execution, package exports replace the file path by the path of the main file
+                    file_path = getattr(self, "filepath", "") or getattr(self, "directory", "")
+                    profiler.start(id)
+                    try:
+                        result = func(self, context)
+                    finally:
+                        RDOperator.report_profile(self, profiler.stop(), file_path)
+                else:
+                    result = func(self, context)
                 # self.logger.debug("Leaving {}() {}({})".format(id, class_name, result))
 
                 return result
@@ -294,9 +321,41 @@ class RDOperator(bpy.types.Operator):
                 else:
                     # Menu has no report and must return None
                     return
+            finally:
+                RDOperator.executing -= 1
 
         return op_logger
 
+    @staticmethod
+    def report_profile(operator, report, file_path=""):
+        """
+        Logs and reports the profile of an operator execution and appends it to a JSON lines file in the profile
+        directory (see :func:`.profiling.profile_directory`). The file is named after the operator and the imported or
+        exported file (if the operator has a ``filepath`` property), so repeated runs are collected in one file.
+
+        :param operator: The profiled operator
+        :param report: The report returned by :meth:`.profiling.Profiler.stop`
+        :param file_path: The ``filepath`` (or ``directory``) of the operator when it was invoked
+        """
+        lines = profiler.format_report(report)
+        operator.logger.info("Profile:\n" + "\n".join(lines))
+        if isinstance(operator, RDOperator):
+            operator.report({'INFO'}, lines[0])
+
+        name = operator.bl_idname.replace(".", "_")
+        if file_path:
+            name += "_" + os.path.splitext(os.path.basename(os.path.normpath(file_path)))[0]
+        target = bpy.path.abspath(file_path) if getattr(operator, "exporting", False) else ""
+        directory = bpy.path.abspath(profile_directory(bpy.context, target))
+        json_path = os.path.join(directory, name + PROFILE_SUFFIX)
+        try:
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+            profiler.append_json(report, json_path)
+            operator.logger.info("Profile written to {}".format(json_path))
+        except (IOError, OSError) as e:
+            operator.logger.warning("Could not write profile to {}: {}".format(json_path, e))
+
     @staticmethod
     def Preconditions(*conditions):
         """
@@ -0,0 +1,201 @@
+# #####
+# This file is part of the RobotDesigner of the Neurorobotics subproject (SP10)
+# in the Human Brain Project (HBP).
+# It has been forked from the RobotEditor (https://gitlab.com/h2t/roboteditor)
+# developed at the Karlsruhe Institute of Technology in the
+# High Performance Humanoid Technologies Laboratory (H2T).
+# #####
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Opt-in profiling of :term:`operators<operator>`.
+
+Code sections are marked as *phases* with :meth:`Profiler.phase` (or the :meth:`Profiler.profiled` decorator).
+Outside of a profiling session, marking a phase costs a single attribute lookup. Sessions are started by
+:meth:`.operators.RDOperator.OperatorLogger` for operators with ``profiling = True`` if the switch
+``profile_operators`` of the global properties is set; reports are appended to :func:`profile_directory`. For every
+phase the wall time, the number of calls and the memory allocated (net, measured with :mod:`tracemalloc`) are
+recorded. Phases are identified by their path of enclosing phases (e.g., ``create_sdf/export_mesh``) and times
+include nested phases.
+"""
+
+# System imports
+import json
+import os
+import time
+import tempfile
+import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+
+PROFILE_SUFFIX = ".profile.jsonl"
+
+
+def profiling_requested(context):
+    """
+    :param context: The blender context
+    :return: Whether the user switched on profiling (global property ``profile_operators``; resolved by name since
+        the core must not depend on the property definitions).
+    """
+    settings = getattr(context.scene, "RobotDesigner", None)
+    return bool(getattr(settings, "profile_operators", False))
+
+
+def profile_directory(context, target=""):
+    """
+    :param context: The blender context
+    :param target: The file or directory written by the profiled operator (empty for operators without output)
+    :return: The directory reports are written to: the global property ``profile_directory`` if set, otherwise the
+        directory containing the target (the parent of package directories, such that reports do not end up in
+        exported packages) and the temporary directory for operators without target.
+    """
+    settings = getattr(context.scene, "RobotDesigner", None)
+    directory = getattr(settings, "profile_directory", "")
+    if directory:
+        return directory
+    if target:
+        return os.path.dirname(os.path.normpath(target))
+    return tempfile.gettempdir()
+
+
+class Profiler(object):
+    """
+    Collects timing and memory statistics of phases during a session.
+    """
+
+    def __init__(self):
+        self.active = False
+        self.name = None
+        self.phases = OrderedDict()
+        self.stack = []
+        self.started_tracemalloc = False
+        self.start_time = 0.0
+        self.started = None
+        self.last_report = None
+
+    def start(self, name):
+        """
+        Starts a session.
+
+        :param name: Name of the session (e.g., the operator id)
+        """
+        self.active = True
+        self.name = name
+        self.phases = OrderedDict()
+        self.stack = []
+        self.started_tracemalloc = not tracemalloc.is_tracing()
+        if self.started_tracemalloc:
+            tracemalloc.start()
+        self.started = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self.start_time = time.perf_counter()
+
+    def stop(self):
+        """
+        Ends the session.
+
+        :return: The report (see :meth:`report`)
+        """
+        total = time.perf_counter() - self.start_time
+        peak = tracemalloc.get_traced_memory()[1]
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+        self.active = False
+        self.last_report = self.report(total, peak)
+        return self.last_report
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Context manager recording a phase (does nothing if no session is active).
+
+        :param name: Name of the phase
+        """
+        if not self.active:
+            yield
+            return
+
+        self.stack.append(name)
+        path = "/".join(self.stack)
+        # created on entry such that phases are listed in the order they were entered
+        entry = self.phases.setdefault(path, {"wall_time": 0.0, "calls": 0, "allocated": 0})
+        memory = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry["wall_time"] += time.perf_counter() - start
+            entry["calls"] += 1
+            entry["allocated"] += tracemalloc.get_traced_memory()[0] - memory
+            self.stack.pop()
+
+    def profiled(self, name=None):
+        """
+        Decorator recording every call of a function as phase.
+
+        :param name: Name of the phase (default: the function name)
+        """
+
+        def decorator(func):
+            phase_name = name or func.__name__
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.active:
+                    return func(*args, **kwargs)
+                with self.phase(phase_name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def report(self, total, peak):
+        """
+        :param total: wall time of the session
+        :param peak: peak of traced memory
+        :return: dictionary with the session statistics (serializable)
+        """
+        return {"name": self.name, "started": self.started, "wall_time": total, "peak_memory": peak,
+                "phases": [dict(phase=path, **entry) for path, entry in self.phases.items()]}
+
+    @staticmethod
+    def format_report(report):
+        """
+        :return: list of lines for displaying a report
+        """
+        lines = ["{}: {:.3f} s (peak memory {:.1f} MB)".format(report["name"], report["wall_time"],
+                                                               report["peak_memory"] / 2 ** 20)]
+        for phase in report["phases"]:
+            lines.append("{}{}: {:.3f} s, {} calls, {:.1f} MB".format(
+                "  " * phase["phase"].count("/"), phase["phase"].rsplit("/", 1)[-1], phase["wall_time"],
+                phase["calls"], phase["allocated"] / 2 ** 20))
+        return lines
+
+    @staticmethod
+    def append_json(report, file_path):
+        """
+        Appends a report as line to a JSON lines file (one line per session, earlier sessions are kept).
+        """
+        with open(file_path, "a") as f:
+            f.write(json.dumps(report) + "\n")
+
+
+profiler = Profiler()
@@ -41,11 +41,43 @@ This module includes import and export functions for different file formats for
 from importlib import reload
 from ..core import PluginManager
 
+from . import mesh_cache
+from . import muscle_paths
+from . import robot_ir
+from . import muscle_tables
+from . import xml_stream
+from . import fast_parser
+from . import collada_writer
+from . import mesh_export_pool
+from . import mesh_import_cache
+from . import stl_codec
+from . import mesh_decoder
+from . import mesh_decode_pool
+from . import package_archive
+from . import package_manifest
+from . import package_reader
+from . import robot_cache
 from . import urdf
 from . import sdf
 from . import osim
 from . import generic_tools
 
+reload(mesh_cache)
+reload(muscle_paths)
+reload(robot_ir)
+reload(muscle_tables)
+reload(xml_stream)
+reload(fast_parser)
+reload(collada_writer)
+reload(mesh_export_pool)
+reload(mesh_import_cache)
+reload(stl_codec)
+reload(mesh_decoder)
+reload(mesh_decode_pool)
+reload(package_archive)
+reload(package_manifest)
+reload(package_reader)
+reload(robot_cache)
 reload(urdf)
 reload(sdf)
 reload(osim)
@@ -60,6 +92,7 @@ PluginManager.register_plugin(
         sdf.ExportZippedPackage,
     ],
 )
+PluginManager.register_plugin("Robot Cache", [robot_cache.LoadRobotCache, robot_cache.SaveRobotCache])
 # PluginManager.register_plugin("URDF", [urdf.ImportPlain, urdf.ImportPackage, urdf.ImportZippedPackage, urdf.ExportPlain,
 #                                       urdf.ExportPackage, urdf.ExportZippedPackage])
 
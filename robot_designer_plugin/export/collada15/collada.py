@@ -33,9 +33,18 @@
 
 import xml.etree.cElementTree as etree
 import logging
+import re
 
 logging.basicConfig(format='[%(levelname)s|%(name)s:%(lineno)03d] %(message)s')
 
+# Attributes that are looked up with descendant queries (e.g., ``//*[@sid="{sid}"]``). They are indexed per scope.
+INDEXED_ATTRIBUTES = ('sid', 'symbol', 'ref', 'axis', 'target', 'node')
+# Elements whose text holds references (looked up with :meth:`COLLADA.findByText`)
+REFERENCE_TAGS = ('SIDREF', 'param')
+
+_STEP = re.compile(r'^(\*|\.|(?:\{ns\})?\w+)((?:\[[^\]]*\])*)$')
+_PREDICATE = re.compile(r'\[@(\w+)="([^"]*)"\]|\[((?:\{ns\})?\w+)\]')
+
 
 class COLLADA(object):
     def __init__(self, doc=None):
@@ -55,19 +64,249 @@ class COLLADA(object):
         self.physics_model = None
         self.instance_physics_model = None
 
+        # Compiled query templates (see compile())
+        self.plans = {}
+        # Queries that had to be answered by ElementTree (reported once)
+        self.fallbacks = set()
+        self.index()
+
+    # Indexes of the document. Queries on large (kinematics-heavy) documents would otherwise search the whole
+    # tree for every cross reference.
+    #   parents: element -> parent element
+    #   ids:     id -> element
+    #   scoped:  (scope, attribute, value) -> elements below the scope (in document order); scopes are the root
+    #            and all elements with an id or sid. The text of reference elements is stored as attribute None.
+    # The indexes are kept up to date by SubElement(), remove() and insert(). Elements added with plain
+    # etree.SubElement (or moved with the methods of etree) after loading are not indexed, neither is the .text of
+    # reference elements that is set after SubElement(); call index() afterwards.
+    def index(self):
+        self.parents = {}
+        self.ids = {}
+        self.scopes = set()
+        self.scoped = {}
+        if self.root is None:
+            return
+
+        self.scopes.add(self.root)
+        stack = [(self.root, ())]
+        while stack:
+            element, scopes = stack.pop()
+            if element is not self.root:
+                self.register(element, scopes)
+            if element in self.scopes:
+                scopes = scopes + (element,)
+            for child in reversed(list(element)):
+                self.parents[child] = element
+                stack.append((child, scopes))
+
+    def isScope(self, element):
+        return element.get('id') is not None or element.get('sid') is not None
+
+    def register(self, element, scopes):
+        id_ = element.get('id')
+        if id_ is not None:
+            self.ids.setdefault(id_, element)
+        if self.isScope(element):
+            self.scopes.add(element)
+
+        keys = self.keys(element)
+        for scope in scopes:
+            for attribute, value in keys:
+                self.scoped.setdefault((scope, attribute, value), []).append(element)
+
+    def keys(self, element):
+        keys = [(attribute, element.get(attribute)) for attribute in INDEXED_ATTRIBUTES
+                if element.get(attribute) is not None]
+        if element.text and element.tag.replace(self.ns, '') in REFERENCE_TAGS:
+            keys.append((None, element.text))
+        return keys
+
+    def scopesOf(self, element):
+        """Scopes above `element' (innermost first)."""
+        scopes = []
+        element = self.parents.get(element)
+        while element is not None:
+            if element in self.scopes:
+                scopes.append(element)
+            element = self.parents.get(element)
+        return scopes
+
+    def position(self, element):
+        """Path of child indexes from the root (orders elements in document order)."""
+        path = []
+        parent = self.parents.get(element)
+        while parent is not None:
+            path.append(next(i for i, child in enumerate(parent) if child is element))
+            element, parent = parent, self.parents.get(parent)
+        return path[::-1]
+
+    def remove(self, parent, element):
+        """Removes `element' from `parent' and its subtree from the indexes."""
+        scopes = self.scopesOf(element)
+        parent.remove(element)
+        stack = [(element, scopes)]
+        while stack:
+            element, scopes = stack.pop()
+            for attribute, value in self.keys(element):
+                for scope in scopes:
+                    elements = self.scoped[(scope, attribute, value)]
+                    elements.remove(element)
+                    if not elements:
+                        del self.scoped[(scope, attribute, value)]
+            if self.ids.get(element.get('id')) is element:
+                del self.ids[element.get('id')]
+            if element in self.scopes:
+                self.scopes.discard(element)
+                scopes = scopes + [element]
+            del self.parents[element]
+            stack.extend((child, scopes) for child in element)
+
+    def insert(self, parent, index, element):
+        """Inserts `element' (with its subtree) at `index' of `parent' and adds it to the indexes in document
+        order."""
+        parent.insert(index, element)
+        self.parents[element] = parent
+        stack = [(element, self.scopesOf(element))]
+        while stack:
+            element, scopes = stack.pop()
+            id_ = element.get('id')
+            if id_ is not None:
+                self.ids.setdefault(id_, element)
+            keys = self.keys(element)
+            if keys:
+                position = self.position(element)
+            for attribute, value in keys:
+                for scope in scopes:
+                    elements = self.scoped.setdefault((scope, attribute, value), [])
+                    # binary search for the first element after `element' in document order
+                    low, high = 0, len(elements)
+                    while low < high:
+                        middle = (low + high) // 2
+                        if self.position(elements[middle]) < position:
+                            low = middle + 1
+                        else:
+                            high = middle
+                    elements.insert(low, element)
+            if self.isScope(element):
+                self.scopes.add(element)
+                scopes = scopes + [element]
+            for child in reversed(list(element)):
+                self.parents[child] = element
+                stack.append((child, scopes))
+
+    def contains(self, ancestor, element):
+        element = self.parents.get(element)
+        while element is not None and element is not ancestor:
+            element = self.parents.get(element)
+        return element is not None
+
+    def lookup(self, element, attribute, value):
+        """Elements below `element' with the attribute value (or text if `attribute' is None)."""
+        scope = element
+        while scope not in self.scopes:
+            scope = self.parents[scope]
+        result = self.scoped.get((scope, attribute, value), [])
+        if scope is not element:
+            result = [i for i in result if self.contains(element, i)]
+        return result
+
+    # Translates a query template (ElementPath with format fields such as {id}) into a list of steps
+    # (descendant, tag, attributes, children). Templates are compiled once and resolved with the indexes.
+    # Supported is the subset used by the query strings below:
+    #   - steps separated by / or // (optionally starting with . or .//)
+    #   - tags ({ns}name or plain name) or *
+    #   - predicates [@attribute="value"] (value may be a format field) and [{ns}child]
+    # Returns None for other syntax, which is left to ElementTree (see fallback()).
+    def compile(self, s):
+        if s in self.plans:
+            return self.plans[s]
+
+        plan = []
+        separator = '/'
+        for token in re.split(r'(//|/)', s):
+            if token in ('/', '//'):
+                separator = token
+                continue
+            match = _STEP.match(token)
+            if match is None or _PREDICATE.sub('', match.group(2)):
+                plan = None
+                break
+            tag, predicates = match.groups()
+            if tag == '.':
+                continue
+            attributes = []
+            children = []
+            for attribute, value, child in _PREDICATE.findall(predicates):
+                if child:
+                    children.append(child.replace('{ns}', self.ns))
+                else:
+                    attributes.append((attribute, value))
+            tag = None if tag == '*' else tag.replace('{ns}', self.ns)
+            plan.append((separator == '//', tag, attributes, children))
+            separator = '/'
+
+        self.plans[s] = plan
+        return plan
+
+    # Evaluates one step of a plan. Candidates are taken from the indexes (id, indexed attribute or reference text)
+    # and only the children or the subtree are scanned if the step has none of these.
+    def step(self, element, descendant, tag, attributes, kw, text=None):
+        values = [(attribute, value.format(**kw)) for attribute, value in attributes]
+        if text is not None:
+            values.append((None, text))
+
+        key = next(((attribute, value) for attribute, value in values if attribute in INDEXED_ATTRIBUTES or
+                    (attribute is None and tag is not None and tag.replace(self.ns, '') in REFERENCE_TAGS)), None)
+        id_ = dict(values).get('id')
+        if id_ is not None:
+            candidate = self.ids.get(id_)
+            candidates = [candidate] if candidate is not None else []
+        elif key is not None:
+            candidates = self.lookup(element, *key)
+        elif descendant:
+            candidates = (i for i in element.iter() if i is not element)
+        else:
+            candidates = element
+        if (id_ is not None or key is not None) and not descendant:
+            candidates = [i for i in candidates if self.parents.get(i) is element]
+        elif id_ is not None:
+            candidates = [i for i in candidates if self.contains(element, i)]
+
+        return [i for i in candidates if (tag is None or i.tag == tag) and
+                all((i.text if attribute is None else i.get(attribute)) == value for attribute, value in values)]
+
+    # Reports (once per query) that a lookup searches the tree instead of using the indexes.
+    def fallback(self, reason, s):
+        if (reason, s) not in self.fallbacks:
+            self.fallbacks.add((reason, s))
+            self.logger.warning('Unindexed lookup ({}), searching the whole tree: {}'.format(reason, s))
+
+    def query(self, s, root, kw, text=None):
+        if root is None:
+            root = self.root
+        plan = self.compile(s)
+        if plan is None or (root is not self.root and root not in self.parents):
+            self.fallback('unsupported query' if plan is None else 'element not indexed', s)
+            result = root.findall(s.format(**kw))
+            return result if text is None else [i for i in result if i.text == text]
+
+        context = [root]
+        for number, (descendant, tag, attributes, children) in enumerate(plan):
+            last = number == len(plan) - 1
+            context = [i for element in context
+                       for i in self.step(element, descendant, tag, attributes, kw, text if last else None)
+                       if all(any(child == j.tag for j in i) for child in children)]
+        return context
+
     # searches the root node and replaces {ns} by the namespace prefix.
     # Additional replacements are given as keywordarguments.
     def iterfind(self, s, root=None, **kw):
         kw.update({'ns': self.ns})
-        if root is None:
-            root = self.root
-        return root.iterfind(s.format(**kw))
+        return iter(self.query(s, root, kw))
 
     def findall(self, s, root=None, warning=True, **kw):
         kw.update({'ns': self.ns})
-        if root is None:
-            root = self.root
-        result = root.findall(s.format(**kw))
+        result = self.query(s, root, kw)
         if len(result) == 0 and warning:
             self.logger.warning('No results for query: {}\nKW:{}\nroot:{}'.format(s, kw, root))
             raise Exception('XML element found')
@@ -75,15 +314,18 @@ class COLLADA(object):
 
     def find(self, s, root=None, warning=True, **kw):
         kw.update({'ns': self.ns})
-        if root is None:
-            root = self.root
-        result = root.find(s.format(**kw))
+        result = next(iter(self.query(s, root, kw)), None)
         if result is None and warning:
             self.logger.warning('No results for query: {}\nKW:{}\nroot:{}'.format(s, kw, root))
             raise Exception('XML element found')
         return result
 
     def getParent(self, element, root=None):
+        if (root is None or root is self.root) and element in self.parents:
+            return self.parents[element]
+        if element is not self.root:
+            self.fallback('parent of an element not indexed' if root is None else 'parent below another root',
+                          element.tag)
         if root is None:
             root = self.root
         it = (i for i in root.iter() if element in i)
@@ -109,7 +351,8 @@ class COLLADA(object):
             raise e
 
     def findByText(self, s, text, root=None, **kw):
-        return next((i for i in self.findall(s, root, **kw) if i.text == text))  # ,None)
+        kw.update({'ns': self.ns})
+        return next(iter(self.query(s, root, kw, text)))  # ,None)
         # return next((i for i in self.iterfind(s,root,**kw) if i.text==text))#,None)
 
     def read(self, filename):
@@ -168,10 +411,15 @@ class COLLADA(object):
     LIBRARY_PHYSICS_SCENES = '{ns}library_physics_scenes'
     LIBRARY_PHYSICS_MODELS = '{ns}library_physics_models'
 
-    def SubElement(self, parent, tag, attrib=None):
+    def SubElement(self, parent, tag, attrib=None, text=None):
         if not attrib:
             attrib = {}
-        return etree.SubElement(parent, tag.format(ns=self.ns), attrib)
+        element = etree.SubElement(parent, tag.format(ns=self.ns), attrib)
+        element.text = text
+        # keep the indexes up to date
+        self.parents[element] = parent
+        self.register(element, self.scopesOf(element))
+        return element
 
     def SubInstance(self, parent, element):
         tag = element.tag.replace(self.ns, '{ns}instance_')
@@ -186,6 +434,7 @@ class COLLADA(object):
         self.root.set('version', '1.5.0')
         for i in self.root.iter():
             i.tag = i.tag.replace('{%s}' % old_namespace, self.ns)
+        self.index()
 
     def export14(self, filename):
         """Warning modifies the whole tree!!!"""
@@ -196,11 +445,13 @@ class COLLADA(object):
 
         for joint in (i for i in self.root.iter() if i.get('type') == "JOINT"):
             joint.set('type', "NODE")
+        self.index()
         self.write(filename)
 
     def read(self, filename):
         self.doc = etree.parse(filename)
         self.root = self.doc.getroot()
+        self.index()
 
     def write(self, filename):
         # Output does not look nice. Use `xmllint --format <input> > <output>'
@@ -232,7 +483,7 @@ class COLLADA(object):
         instance_kinematics_model = self.SubInstance(kinematics, kinematics_model)
         newparam = self.SubElement(instance_kinematics_model, '{ns}newparam',
                                    {'sid': self.makeSID(AS_kinematics, instance_kinematics_model)})
-        self.SubElement(newparam, '{ns}SIDREF').text = self.makeSIDREF(AS_kinematics, instance_kinematics_model)
+        self.SubElement(newparam, '{ns}SIDREF', text=self.makeSIDREF(AS_kinematics, instance_kinematics_model))
         AS_kinematics_technique = self.SubElement(kinematics, '{ns}technique_common')
 
         AS_motion = self.SubElement(library_articulated_systems,
@@ -241,7 +492,7 @@ class COLLADA(object):
         instance_AS_kinematics = self.SubInstance(motion, AS_kinematics)
         newparam2 = self.SubElement(instance_AS_kinematics, '{ns}newparam',
                                     {'sid': self.makeSID(AS_motion, newparam)})
-        self.SubElement(newparam2, '{ns}SIDREF').text = self.makeSIDREF(AS_kinematics, newparam)
+        self.SubElement(newparam2, '{ns}SIDREF', text=self.makeSIDREF(AS_kinematics, newparam))
         AS_motion_technique = self.SubElement(motion, '{ns}technique_common')
 
         kinematics_scene = self.SubElement(library_kinematics_scenes,
@@ -269,8 +520,8 @@ class COLLADA(object):
         # TODO make a method that creates a referenceable node (adding the #)
 
         # scene gotta be the last element!
-        self.root.remove(scene)
-        self.root.append(scene)
+        self.remove(self.root, scene)
+        self.insert(self.root, len(self.root), scene)
 
         instance_visual_scene = self.find(COLLADA.SCENE_INSTANCE_VISUAL_SCENE)
         # visual_scene = self.find(COLLADA.VISUAL_SCENE_ID,id=self.getID(instance_visual_scene))
@@ -288,7 +539,7 @@ class COLLADA(object):
         bind_kinematics_model = self.SubElement(instance_kinematics_scene,
                                                 '{ns}bind_kinematics_model',
                                                 {'node': armature.name})  # as soon as we can.
-        self.SubElement(bind_kinematics_model, '{ns}param').text = bind.get('symbol')
+        self.SubElement(bind_kinematics_model, '{ns}param', text=bind.get('symbol'))
 
         def parseArmature(armatureJoint, parent, depth=0):
 
@@ -298,18 +549,18 @@ class COLLADA(object):
             self.SubElement(axis_type, '{ns}axis').text = " ".join(str(i) for i in armatureJoint.axis)
             instance_joint = self.SubInstance(kinematics_model_technique, joint)
             # Preserve order of elements. Insert Joints from above.
-            kinematics_model_technique.remove(instance_joint)
-            kinematics_model_technique.insert(0, instance_joint)
+            self.remove(kinematics_model_technique, instance_joint)
+            self.insert(kinematics_model_technique, 0, instance_joint)
 
             # Axis
             newparam = self.SubElement(instance_kinematics_model, '{ns}newparam',
                                        {'sid': self.makeSID(AS_kinematics, instance_kinematics_model, instance_joint,
                                                             axis_type)})
-            self.SubElement(newparam, '{ns}SIDREF').text = \
-                self.makeSIDREF(AS_kinematics, instance_kinematics_model, instance_joint, axis_type)
+            self.SubElement(newparam, '{ns}SIDREF',
+                            text=self.makeSIDREF(AS_kinematics, instance_kinematics_model, instance_joint, axis_type))
             newparam2 = self.SubElement(instance_AS_kinematics, '{ns}newparam',
                                         {'sid': self.makeSID(AS_motion, newparam)})
-            self.SubElement(newparam2, '{ns}SIDREF').text = self.makeSIDREF(AS_kinematics, newparam)
+            self.SubElement(newparam2, '{ns}SIDREF', text=self.makeSIDREF(AS_kinematics, newparam))
 
             bind = self.SubElement(instance_AS_motion, '{ns}bind',
                                    {'symbol': self.makeSID(kinematics_scene, newparam2)})
@@ -329,7 +580,7 @@ class COLLADA(object):
                                               {'target': armatureJoint.name + '/transform'})  # As soon as we can ...
 
             axis = self.SubElement(bind_joint_axis, '{ns}axis')
-            self.SubElement(axis, '{ns}param').text = bind.get('symbol')
+            self.SubElement(axis, '{ns}param', text=bind.get('symbol'))
 
             # Initial Values
             newparam = self.SubElement(instance_kinematics_model, '{ns}newparam',
@@ -339,14 +590,14 @@ class COLLADA(object):
 
             newparam2 = self.SubElement(instance_AS_kinematics, '{ns}newparam',
                                         {'sid': self.makeSID(AS_motion, newparam)})
-            self.SubElement(newparam2, '{ns}SIDREF').text = self.makeSIDREF(AS_kinematics, newparam)
+            self.SubElement(newparam2, '{ns}SIDREF', text=self.makeSIDREF(AS_kinematics, newparam))
 
             bind = self.SubElement(instance_AS_motion, '{ns}bind',
                                    {'symbol': self.makeSID(kinematics_scene, newparam2)})
             self.SubElement(bind, '{ns}param', {'ref': self.makeSIDREF(AS_motion, newparam2)})
 
             value = self.SubElement(bind_joint_axis, '{ns}value')
-            self.SubElement(value, '{ns}param').text = bind.get('symbol')
+            self.SubElement(value, '{ns}param', text=bind.get('symbol'))
 
             # Axis information in <kinematics>
             axis_info_kinematics = self.SubElement(AS_kinematics_technique,
@@ -0,0 +1,192 @@
+# #####
+#  This file is part of the RobotDesigner developed in the Neurorobotics
+#  subproject of the Human Brain Project (https://www.humanbrainproject.eu).
+#
+#  The Human Brain Project is a European Commission funded project
+#  in the frame of the Horizon2020 FET Flagship plan.
+#  (http://ec.europa.eu/programmes/horizon2020/en/h2020-section/fet-flagships)
+#
+#  The Robot Designer has initially been forked from the RobotEditor
+#  (https://gitlab.com/h2t/roboteditor) developed at the Karlsruhe Institute
+#  of Technology in the High Performance Humanoid Technologies Laboratory (H2T).
+# #####
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# System imports
+import io
+import unittest
+import xml.etree.cElementTree as etree
+
+from collada import COLLADA, Tree
+
+NS = "{http://www.collada.org/2008/03/COLLADASchema}"
+
+
+def make_tree(depth=3, branches=2):
+    """
+    :return: armature with ``branches`` revolute joints per level (a kinematics-heavy document once attached)
+    """
+    armature = Tree("robot")
+
+    def add(parent, prefix, level):
+        for branch in range(branches):
+            joint = parent.addChild(Tree("{}{}".format(prefix, branch)))
+            joint.axis_type = "revolute"
+            joint.axis = [0, 0, 1]
+            joint.min = -1.0
+            joint.max = 1.0 + level
+            joint.initialValue = "0.0"
+            joint.markers = []
+            joint.addTrafo([0.0, 0.1 * branch, 0.5])
+            joint.addTrafo([0.0, 0.0, 1.0, 45.0])
+            if level < depth:
+                add(joint, joint.name + "_", level + 1)
+
+    add(armature, "j", 1)
+    return armature
+
+
+def make_document(armature):
+    """
+    :return: COLLADA document with a visual scene holding a joint node for every joint of the armature
+    """
+    root = etree.Element(NS + "COLLADA", {"version": "1.5.0"})
+    visual_scene = etree.SubElement(etree.SubElement(root, NS + "library_visual_scenes"), NS + "visual_scene",
+                                    {"id": "visual_scene"})
+
+    def add(parent, joint):
+        for child in joint.children:
+            node = etree.SubElement(parent, NS + "node", {"sid": child.name, "type": "JOINT"})
+            etree.SubElement(node, NS + "matrix", {"sid": "transform"}).text = "1 0 0 0 0 1 0 0 0 0 1 0 0 0 0 1"
+            etree.SubElement(node, NS + "instance_geometry", {"url": "#" + child.name + "_mesh"})
+            add(node, child)
+
+    add(visual_scene, armature)
+    scene = etree.SubElement(root, NS + "scene")
+    etree.SubElement(scene, NS + "instance_visual_scene", {"url": "#visual_scene"})
+    collada = COLLADA(etree.ElementTree(root))
+    collada.attach(armature)
+    return collada
+
+
+def snapshot(collada):
+    return (dict(collada.parents), dict(collada.ids), set(collada.scopes),
+            {key: list(elements) for key, elements in collada.scoped.items()})
+
+
+def joints(tree):
+    """
+    :return: the joints of an extracted armature in depth first order
+    """
+    result = []
+    for child in tree.children:
+        result.append((child.name, child.axis_type, child.axis, child.min, child.max, child.transformations))
+        result.extend(joints(child))
+    return result
+
+
+class IncrementalIndex(unittest.TestCase):
+    def runTest(self):
+        collada = make_document(make_tree())
+        incremental = snapshot(collada)
+        collada.index()
+        rebuilt = snapshot(collada)
+        self.assertEqual(incremental[0], rebuilt[0])
+        self.assertEqual(incremental[1], rebuilt[1])
+        self.assertEqual(incremental[2], rebuilt[2])
+        self.assertEqual(set(incremental[3]), set(rebuilt[3]))
+        for key, elements in rebuilt[3].items():
+            # the same elements in document order
+            self.assertEqual([id(i) for i in incremental[3][key]], [id(i) for i in elements])
+
+
+class MoveKeepsDocumentOrder(unittest.TestCase):
+    def runTest(self):
+        collada = make_document(make_tree())
+        library_joints = collada.find("{ns}library_joints")
+        joint = library_joints[-1]
+        # all joints share the sid of their axis, the moved one has to be listed first afterwards
+        collada.remove(library_joints, joint)
+        self.assertNotIn(joint, collada.parents)
+        self.assertNotIn(joint.get("id"), collada.ids)
+        collada.insert(library_joints, 0, joint)
+        self.assertIs(collada.findall(COLLADA.JOINT + '//*[@sid="axis0"]')[0], joint[0])
+
+        incremental = snapshot(collada)
+        collada.index()
+        rebuilt = snapshot(collada)
+        self.assertEqual(incremental[:3], rebuilt[:3])
+        self.assertEqual({key: [id(i) for i in elements] for key, elements in incremental[3].items()},
+                         {key: [id(i) for i in elements] for key, elements in rebuilt[3].items()})
+
+
+class QueriesMatchFindall(unittest.TestCase):
+    def runTest(self):
+        collada = make_document(make_tree())
+        root = collada.root
+        self.assertEqual(root[-1].tag, NS + "scene")
+
+        kinematics_model = collada.find(COLLADA.KINEMATICS_MODEL)
+        technique = kinematics_model.find(NS + "technique_common")
+        # joint instances are inserted in front of the links
+        self.assertTrue(all(i.tag == NS + "instance_joint" for i in technique[:len(technique) - 1]))
+
+        queries = []
+        for element in root.iter():
+            sid = element.get("sid")
+            if sid is not None and collada.contains(kinematics_model, element):
+                queries.append((COLLADA.KINEMATICS_MODEL_SID, {"id": kinematics_model.get("id"), "sid": sid}))
+            symbol = element.get("symbol")
+            if symbol is not None:
+                queries.append((COLLADA.KINEMATICS_SCENES_SYMBOL, {"id": "robot_kinematics_scene", "symbol": symbol}))
+            if element.get("type") == "JOINT":
+                queries.append((COLLADA.VISUAL_SCENE_TYPE_SID, {"id": "visual_scene", "sid": sid, "type": "JOINT"}))
+        self.assertGreater(len(queries), 50)
+
+        for query, kw in queries:
+            expected = root.findall(query.format(ns=NS, **kw))
+            self.assertEqual([id(i) for i in collada.findall(query, **kw)], [id(i) for i in expected], query)
+
+        query = COLLADA.ARTICULATED_SYSTEMS_KINEMATICS + "//{ns}SIDREF"
+        references = root.findall(query.format(ns=NS))
+        self.assertTrue(references)
+        for reference in references:
+            expected = next(i for i in references if i.text == reference.text)
+            self.assertIs(collada.findByText(query, reference.text), expected)
+        self.assertEqual(collada.fallbacks, set())
+
+
+class ExtractRoundTrip(unittest.TestCase):
+    def runTest(self):
+        armature = make_tree()
+        collada = make_document(armature)
+        extracted, _ = collada.extract()
+
+        f = io.BytesIO()
+        collada.doc.write(f, encoding="UTF-8")
+        f.seek(0)
+        baseline, _ = COLLADA(etree.parse(f)).extract()
+
+        self.assertEqual(joints(extracted), joints(baseline))
+        self.assertEqual([i[0] for i in joints(extracted)], [i[0] for i in joints(armature)])
+
+
+if __name__ == "__main__":
+    unittest.main()
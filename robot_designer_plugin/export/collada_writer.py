@@ -0,0 +1,357 @@
+# #####
+#  This file is part of the RobotDesigner developed in the Neurorobotics
+#  subproject of the Human Brain Project (https://www.humanbrainproject.eu).
+#
+#  The Human Brain Project is a European Commission funded project
+#  in the frame of the Horizon2020 FET Flagship plan.
+#  (http://ec.europa.eu/programmes/horizon2020/en/h2020-section/fet-flagships)
+#
+#  The Robot Designer has initially been forked from the RobotEditor
+#  (https://gitlab.com/h2t/roboteditor) developed at the Karlsruhe Institute
+#  of Technology in the High Performance Humanoid Technologies Laboratory (H2T).
+# #####
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Direct COLLADA writer for mesh objects.
+
+The geometry of the evaluated mesh (i.e., with modifiers applied) is read with ``foreach_get`` into numpy arrays and
+written as a minimal COLLADA 1.4.1 document (triangles with normals, one UV map and a diffuse color per material).
+Vertices are written in the coordinate frame of the mesh data, i.e., without the object transformation. This is the
+same result as the former :func:`bpy.ops.wm.collada_export` call with stripped ``matrix`` lines, but no operator is
+called and neither selection, visibility nor parenting of the object are touched.
+
+Meshes whose materials use image textures are not supported (see :func:`can_write`). The same arrays can be written
+as binary STL (:func:`write_stl_object`, without materials).
+
+The module only depends on blender and numpy such that it can be loaded by the mesh export workers
+(see :mod:`.mesh_export_pool`).
+"""
+
+# System imports
+import os
+import re
+import datetime
+from xml.sax.saxutils import quoteattr
+import numpy as np
+
+# Blender imports
+import bpy
+
+# RobotDesigner imports
+from .stl_codec import write_stl
+
+COLLADA_NAMESPACE = "http://www.collada.org/2005/11/COLLADASchema"
+
+FIXED_TIMESTAMP = "1970-01-01T00:00:00+00:00"
+"""
+``<created>`` and ``<modified>`` date of written documents such that exporting an unchanged mesh gives identical
+files (for the mesh cache, the package manifest and diffs of exported packages).
+"""
+
+
+def document_timestamp():
+    """
+    :return: :data:`FIXED_TIMESTAMP` or the time given by the ``SOURCE_DATE_EPOCH`` environment variable (seconds
+        since the epoch, the convention of reproducible builds)
+    """
+    epoch = os.environ.get("SOURCE_DATE_EPOCH", "")
+    if epoch.isdigit():
+        return datetime.datetime.fromtimestamp(int(epoch), datetime.timezone.utc).isoformat()
+    return FIXED_TIMESTAMP
+
+
+class MeshArrays(object):
+    """
+    Triangulated geometry of a mesh. Normals and texture coordinates are indexed per triangle corner.
+    """
+
+    _FIELDS = ("positions", "triangles", "normals", "normal_indices", "uvs", "uv_indices", "material_indices")
+
+    def __init__(self, positions, triangles, normals, normal_indices, uvs=None, uv_indices=None,
+                 material_indices=None):
+        """
+        :param positions: (V, 3) vertex coordinates
+        :param triangles: (T, 3) vertex indices
+        :param normals: (N, 3) unique normals
+        :param normal_indices: (T, 3) normal index per corner
+        :param uvs: (U, 2) unique texture coordinates or None
+        :param uv_indices: (T, 3) texture coordinate index per corner or None
+        :param material_indices: (T,) material slot per triangle or None
+        """
+        self.positions = positions
+        self.triangles = triangles
+        self.normals = normals
+        self.normal_indices = normal_indices
+        self.uvs = uvs
+        self.uv_indices = uv_indices
+        if material_indices is None:
+            material_indices = np.zeros(len(triangles), dtype=np.int32)
+        self.material_indices = material_indices
+
+    def save(self, file_path):
+        """
+        Stores the arrays in an (uncompressed) ``.npz`` file.
+        """
+        arrays = {name: getattr(self, name) for name in self._FIELDS if getattr(self, name) is not None}
+        np.savez(file_path, **arrays)
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Reads arrays stored by :meth:`save`.
+        """
+        with np.load(file_path) as data:
+            return cls(**{name: data[name] for name in cls._FIELDS if name in data.files})
+
+
+def _unique_rows(values, decimals=6):
+    """
+    Removes duplicate rows (e.g., the normals of a flat shaded face).
+
+    :param values: (N, k) array
+    :return: (unique rows, index of the unique row for every input row)
+    """
+    if len(values) == 0:
+        return values, np.zeros(0, dtype=np.int64)
+    unique, inverse = np.unique(np.round(values, decimals), axis=0, return_inverse=True)
+    return unique, inverse.reshape(-1)
+
+
+def _corner_normals(mesh, loop_count):
+    normals = np.empty(loop_count * 3, dtype=np.float32)
+    if hasattr(mesh, "corner_normals"):
+        # blender >= 4.1
+        mesh.corner_normals.foreach_get("vector", normals)
+    else:
+        mesh.calc_normals_split()
+        mesh.loops.foreach_get("normal", normals)
+    return normals.reshape(-1, 3)
+
+
+def mesh_arrays(obj, depsgraph=None):
+    """
+    Reads the evaluated geometry of a mesh object.
+
+    :param obj: The mesh object
+    :param depsgraph: The evaluated dependency graph. If None, the one of the current context is used.
+    :return: :class:`MeshArrays`
+    """
+    if depsgraph is None:
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+
+    evaluated = obj.evaluated_get(depsgraph)
+    mesh = evaluated.to_mesh()
+    try:
+        mesh.calc_loop_triangles()
+        vertex_count, loop_count, triangle_count = len(mesh.vertices), len(mesh.loops), len(mesh.loop_triangles)
+
+        positions = np.empty(vertex_count * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", positions)
+        triangles = np.empty(triangle_count * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("vertices", triangles)
+        corners = np.empty(triangle_count * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("loops", corners)
+        material_indices = np.empty(triangle_count, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("material_index", material_indices)
+
+        normals, normal_indices = _unique_rows(_corner_normals(mesh, loop_count)[corners])
+
+        uvs = uv_indices = None
+        if mesh.uv_layers.active is not None:
+            loop_uvs = np.empty(loop_count * 2, dtype=np.float32)
+            mesh.uv_layers.active.data.foreach_get("uv", loop_uvs)
+            uvs, uv_indices = _unique_rows(loop_uvs.reshape(-1, 2)[corners])
+            uv_indices = uv_indices.reshape(-1, 3)
+    finally:
+        evaluated.to_mesh_clear()
+
+    return MeshArrays(positions.reshape(-1, 3), triangles.reshape(-1, 3), normals, normal_indices.reshape(-1, 3),
+                      uvs, uv_indices, material_indices)
+
+
+def material_color(material):
+    """
+    :param material: A blender material (or None)
+    :return: RGBA diffuse color (base color of a Principled BSDF if available)
+    """
+    if material is None:
+        return (0.8, 0.8, 0.8, 1.0)
+    if material.use_nodes and material.node_tree is not None:
+        for node in material.node_tree.nodes:
+            if node.type == "BSDF_PRINCIPLED":
+                return tuple(node.inputs["Base Color"].default_value)
+    return tuple(material.diffuse_color)
+
+
+def _floats(values):
+    values = np.asarray(values, dtype=np.float64).reshape(-1)
+    return " ".join(["%.7g"] * len(values)) % tuple(values.tolist())
+
+
+def _ints(values):
+    return " ".join(map(str, np.asarray(values).reshape(-1).tolist()))
+
+
+def _identifier(name):
+    """
+    :return: name usable as xml id (NCName)
+    """
+    name = re.sub(r"[^\w.-]", "_", name)
+    return name if re.match(r"[A-Za-z_]", name) else "_" + name
+
+
+def _source(source_id, values, parameters):
+    count = len(values)
+    stride = len(parameters)
+    params = "".join('<param name="{}" type="float"/>'.format(p) for p in parameters)
+    return ('<source id="{id}"><float_array id="{id}-array" count="{n}">{data}</float_array>'
+            '<technique_common><accessor source="#{id}-array" count="{count}" stride="{stride}">{params}</accessor>'
+            '</technique_common></source>\n').format(id=source_id, n=count * stride, data=_floats(values),
+                                                      count=count, stride=stride, params=params)
+
+
+def write_collada_arrays(file_path, name, arrays, materials=()):
+    """
+    Writes a COLLADA document containing a single mesh.
+
+    :param file_path: The ``.dae`` file
+    :param name: Name of the geometry and of the node in the visual scene
+    :param arrays: :class:`MeshArrays`
+    :param materials: list of (name, RGBA color) tuples indexed by the material indices of the triangles
+    """
+    identifier = _identifier(name)
+    mesh_id = identifier + "-mesh"
+    material_ids = [_identifier(material_name) + "-material" for material_name, _ in materials]
+    now = document_timestamp()
+
+    with open(file_path, "w") as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n')
+        f.write('<COLLADA xmlns="{}" version="1.4.1">\n'.format(COLLADA_NAMESPACE))
+        f.write('<asset><contributor><authoring_tool>Blender {} (RobotDesigner)</authoring_tool></contributor>'
+                '<created>{now}</created><modified>{now}</modified><unit name="meter" meter="1"/>'
+                '<up_axis>Z_UP</up_axis></asset>\n'.format(bpy.app.version_string, now=now))
+
+        # several slots may reference the same material
+        unique_materials = {}
+        for material_id, material in zip(material_ids, materials):
+            unique_materials.setdefault(material_id, material)
+
+        if materials:
+            f.write("<library_effects>\n")
+            for material_id, (_, color) in unique_materials.items():
+                f.write('<effect id="{}-effect"><profile_COMMON><technique sid="common"><lambert><diffuse>'
+                        '<color sid="diffuse">{}</color></diffuse></lambert></technique></profile_COMMON>'
+                        '</effect>\n'.format(material_id, _floats(color)))
+            f.write("</library_effects>\n<library_materials>\n")
+            for material_id, (material_name, _) in unique_materials.items():
+                f.write('<material id="{id}" name={name}><instance_effect url="#{id}-effect"/></material>\n'.format(
+                    id=material_id, name=quoteattr(material_name)))
+            f.write("</library_materials>\n")
+
+        f.write('<library_geometries>\n<geometry id="{}" name={}><mesh>\n'.format(mesh_id, quoteattr(name)))
+        f.write(_source(mesh_id + "-positions", arrays.positions, "XYZ"))
+        f.write(_source(mesh_id + "-normals", arrays.normals, "XYZ"))
+        columns = [arrays.triangles, arrays.normal_indices]
+        if arrays.uvs is not None:
+            f.write(_source(mesh_id + "-map-0", arrays.uvs, "ST"))
+            columns.append(arrays.uv_indices)
+        f.write('<vertices id="{id}-vertices"><input semantic="POSITION" source="#{id}-positions"/></vertices>\n'
+                .format(id=mesh_id))
+
+        inputs = '<input semantic="VERTEX" source="#{id}-vertices" offset="0"/>' \
+                 '<input semantic="NORMAL" source="#{id}-normals" offset="1"/>'.format(id=mesh_id)
+        if arrays.uvs is not None:
+            inputs += '<input semantic="TEXCOORD" source="#{}-map-0" offset="2" set="0"/>'.format(mesh_id)
+        # (T, 3, inputs): vertex, normal and uv index of every corner
+        corners = np.stack(columns, axis=2)
+
+        for index in np.unique(arrays.material_indices).tolist():
+            selected = corners[arrays.material_indices == index]
+            material = ' material="{}"'.format(material_ids[index]) if index < len(material_ids) else ""
+            f.write('<triangles{} count="{}">{}<p>{}</p></triangles>\n'.format(material, len(selected), inputs,
+                                                                             _ints(selected)))
+        f.write("</mesh></geometry>\n</library_geometries>\n")
+
+        bindings = "".join('<instance_material symbol="{id}" target="#{id}"/>'.format(id=material_id)
+                           for material_id in unique_materials)
+        if bindings:
+            bindings = "<bind_material><technique_common>{}</technique_common></bind_material>".format(bindings)
+        f.write('<library_visual_scenes><visual_scene id="Scene" name="Scene">'
+                '<node id="{id}" name={name} type="NODE"><instance_geometry url="#{mesh_id}" name={name}>{bindings}'
+                '</instance_geometry></node></visual_scene></library_visual_scenes>\n'
+                .format(id=identifier, name=quoteattr(name), mesh_id=mesh_id, bindings=bindings))
+        f.write('<scene><instance_visual_scene url="#Scene"/></scene>\n</COLLADA>\n')
+
+
+def uses_image_textures(obj):
+    """
+    Checks whether a material of an object references an image file.
+
+    :param obj: The mesh object
+    :return: True if textures would be copied by the COLLADA exporter
+    """
+    for slot in obj.material_slots:
+        material = slot.material
+        if material is None or not material.use_nodes or material.node_tree is None:
+            continue
+        if any(node.type == "TEX_IMAGE" and node.image is not None for node in material.node_tree.nodes):
+            return True
+    return False
+
+
+def can_write(obj):
+    """
+    :param obj: The mesh object
+    :return: Whether the object can be exported by :func:`write_collada` (image textures have to be copied by the
+        blender exporter)
+    """
+    return not uses_image_textures(obj)
+
+
+def collada_materials(obj):
+    """
+    :param obj: The mesh object
+    :return: list of (name, RGBA color) tuples for the material slots of the object
+    """
+    return [(slot.material.name if slot.material else slot.name or "default", material_color(slot.material))
+            for slot in obj.material_slots]
+
+
+def write_collada(obj, file_path, depsgraph=None):
+    """
+    Exports a mesh object to a COLLADA file without calling an operator.
+
+    :param obj: The mesh object
+    :param file_path: The ``.dae`` file
+    :param depsgraph: The evaluated dependency graph. If None, the one of the current context is used.
+    """
+    write_collada_arrays(file_path, obj.name, mesh_arrays(obj, depsgraph), collada_materials(obj))
+
+
+def write_stl_object(obj, file_path, depsgraph=None):
+    """
+    Exports a mesh object to a binary STL file (vertices in the coordinate frame of the mesh data).
+
+    :param obj: The mesh object
+    :param file_path: The ``.stl`` file
+    :param depsgraph: The evaluated dependency graph. If None, the one of the current context is used.
+    """
+    arrays = mesh_arrays(obj, depsgraph)
+    write_stl(file_path, arrays.positions, arrays.triangles, obj.name)
@@ -0,0 +1,210 @@
+# #####
+#  This file is part of the RobotDesigner developed in the Neurorobotics
+#  subproject of the Human Brain Project (https://www.humanbrainproject.eu).
+#
+#  The Human Brain Project is a European Commission funded project
+#  in the frame of the Horizon2020 FET Flagship plan.
+#  (http://ec.europa.eu/programmes/horizon2020/en/h2020-section/fet-flagships)
+#
+#  The Robot Designer has initially been forked from the RobotEditor
+#  (https://gitlab.com/h2t/roboteditor) developed at the Karlsruhe Institute
+#  of Technology in the High Performance Humanoid Technologies Laboratory (H2T).
+# #####
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Fast, non-validating reader for documents with PyXB bindings (SDF, URDF and SDF worlds).
+
+:func:`CreateFromDocument` of the generated bindings builds and validates a complete PyXB object graph, which is slow
+and memory-hungry for large files. :func:`parse` reads the document with :func:`xml.etree.ElementTree.iterparse`
+instead and creates light-weight :class:`FastBinding` objects. The binding classes only serve as schema description:
+they determine the python names of elements and attributes, whether an element is plural (a list) and the python
+type of simple values. Hence, the returned objects can be used like the PyXB objects by the importers (e.g.,
+``link.visual[0].geometry[0].mesh[0].uri[0]`` or ``link.pose[0].value()``).
+
+The document is not validated. Unknown elements and attributes are ignored and missing required ones are not
+reported. Files are only validated if the import option ``import_validate_schema`` is set, in which case the
+importers read them with the bindings instead.
+"""
+
+# System imports
+import xml.etree.ElementTree as ET
+import pyxb
+from pyxb.binding import basis, datatypes
+
+_XML_DECLARATION = b'<?xml version="1.0" encoding="utf-8"?>'
+
+
+class FastBinding(object):
+    """
+    Element of a document read by :func:`parse`. Child elements and attributes are stored as python attributes
+    named like the properties of the corresponding PyXB binding class.
+    """
+
+    def __init__(self, binding_class, element=None):
+        self._binding_class = binding_class
+        self._value = None
+        # source element (see :meth:`toxml`)
+        self._element = element
+
+    def value(self):
+        """
+        :return: The value of an element with simple content (e.g., a pose with a ``frame`` attribute)
+        """
+        return self._value
+
+    def toxml(self, encoding=None):
+        """
+        Serializes the element as written in the document. Only available for elements passed as ``keep`` to
+        :func:`parse` (e.g., URDF gazebo tags).
+        """
+        if self._element is None:
+            raise pyxb.PyXBException("Serialization of {} is not supported".format(self._binding_class.__name__))
+        xml = _XML_DECLARATION + ET.tostring(self._element, encoding="unicode").encode("utf-8")
+        return xml if encoding else xml.decode("utf-8")
+
+    def __repr__(self):
+        return "<FastBinding {}>".format(self._binding_class.__name__)
+
+
+def _converter(type_definition):
+    """
+    :return: function converting the text of an element or attribute to the value type of a simple type
+    """
+    if issubclass(type_definition, datatypes.boolean):
+        return lambda text: text.strip() in ("true", "1")
+    for builtin in (float, int, str):
+        if issubclass(type_definition, builtin):
+            if builtin is str:
+                return builtin
+            return lambda text, builtin=builtin: builtin(text.strip())
+    # list and union types
+    return type_definition.Factory
+
+
+class _Schema(object):
+    """
+    Information about a binding class required for reading its elements (computed once per class).
+    """
+
+    def __init__(self, binding_class):
+        self.binding_class = binding_class
+        self.simple = not issubclass(binding_class, basis.complexTypeDefinition)
+        self.convert = None
+        self.children = {}
+        self.attributes = {}
+        if self.simple:
+            self.convert = _converter(binding_class)
+            return
+
+        if binding_class._ContentTypeTag == basis.complexTypeDefinition._CT_SIMPLE:
+            self.convert = _converter(binding_class._TypeDefinition)
+        for name, declaration in binding_class._ElementMap.items():
+            self.children[name.localName()] = (declaration.id(), declaration.isPlural(),
+                                               declaration.elementBinding().typeDefinition())
+        for name, use in binding_class._AttributeMap.items():
+            self.attributes[name.localName()] = (use.id(), _converter(use.dataType()), use.defaultValue())
+
+
+_schemas = {}
+
+
+def _schema(binding_class):
+    schema = _schemas.get(binding_class)
+    if schema is None:
+        schema = _schemas[binding_class] = _Schema(binding_class)
+    return schema
+
+
+def _local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _new_instance(schema, element, keep):
+    instance = FastBinding(schema.binding_class, element if keep else None)
+    for child_id, plural, _ in schema.children.values():
+        setattr(instance, child_id, [] if plural else None)
+    for local_name, (attribute_id, convert, default) in schema.attributes.items():
+        text = element.get(local_name)
+        setattr(instance, attribute_id, convert(text) if text is not None else default)
+    return instance
+
+
+def parse(file_name, binding_module, keep=()):
+    """
+    Reads a document without validation.
+
+    :param file_name: The file to read
+    :param binding_module: The PyXB binding module of the schema (e.g., ``sdf_model_dom``)
+    :param keep: Names of elements whose source is retained such that they can be serialized with
+        :meth:`FastBinding.toxml`
+    :return: :class:`FastBinding` of the root element (corresponds to ``binding_module.CreateFromDocument``)
+    """
+    # open elements: (schema or None if unknown, declaration in the parent, values of completed children)
+    stack = []
+    # number of open elements that are kept
+    kept = 0
+    root = None
+    for event, element in ET.iterparse(file_name, events=("start", "end")):
+        if event == "start":
+            local_name = _local_name(element.tag)
+            if not stack:
+                root_binding = getattr(binding_module, local_name, None)
+                if not isinstance(root_binding, basis.element):
+                    raise pyxb.UnrecognizedDOMRootNodeError(element)
+                stack.append((_schema(root_binding.typeDefinition()), None, []))
+                continue
+            parent = stack[-1][0]
+            declaration = parent.children.get(local_name) if parent is not None else None
+            if declaration is None:
+                stack.append((None, None, None))
+            else:
+                stack.append((_schema(declaration[2]), declaration, []))
+            if local_name in keep:
+                kept += 1
+            continue
+
+        schema, declaration, children = stack.pop()
+        keep_element = _local_name(element.tag) in keep
+        if keep_element:
+            kept -= 1
+            element.tail = None
+        if schema is None:
+            continue
+
+        if schema.simple:
+            value = schema.convert(element.text or "")
+        else:
+            value = _new_instance(schema, element, keep_element)
+            if schema.convert is not None:
+                value._value = schema.convert(element.text or "")
+            for (child_id, plural, _), child in children:
+                if plural:
+                    getattr(value, child_id).append(child)
+                else:
+                    setattr(value, child_id, child)
+
+        if stack:
+            stack[-1][2].append((declaration, value))
+            # keep the parsed tree small
+            if not kept and not keep_element:
+                element.clear()
+        else:
+            root = value
+    return root
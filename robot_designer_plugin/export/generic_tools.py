@@ -37,9 +37,13 @@ import pathlib
 import bpy
 
 # Robot Designer imports
+from ..core.profiling import profiler
 from ..properties.globals import global_properties
+from .package_manifest import package_manifest
+from .package_archive import package_archive
 
 
+@profiler.profiled()
 def create_thumbnail(toplevel_directory):
     """
     Create a rendered thumbnail file and export it.
@@ -57,14 +61,21 @@ def create_thumbnail(toplevel_directory):
         ob.hide_render = ob.hide_get()
 
     # set storing parameters
-    bpy.data.scenes["Scene"].render.filepath = toplevel_directory + "/thumbnail.png"
+    thumbnail_path = toplevel_directory + "/thumbnail.png"
+    # incremental exports only replace the thumbnail if the rendering changed
+    render_path = thumbnail_path + ".part.png" if package_manifest.active else thumbnail_path
+    bpy.data.scenes["Scene"].render.filepath = render_path
     bpy.context.scene.render.resolution_x = 600
     bpy.context.scene.render.resolution_y = 600
 
     # render and save file
     bpy.ops.render.render(write_still=True, use_viewport=True)
+    if package_manifest.active:
+        package_manifest.replace(render_path, thumbnail_path)
+    package_archive.add(thumbnail_path)
 
 
+@profiler.profiled()
 def export_rqtez_publisher(
     topic_list,
     path_to_output_file,
@@ -86,7 +97,7 @@ def export_rqtez_publisher(
 
     pathlib.Path(os.path.dirname(path_to_output_file)).mkdir(exist_ok=True)
 
-    with open(path_to_output_file, "w+") as output_file:
+    with package_manifest.open(path_to_output_file) as output_file:
         string = "publish_interval: " + str(publish_interval_value) + "\n"
         output_file.write(string)
         string = "settings: \n"
@@ -242,6 +253,7 @@ class RQT_Multiplot_Diagram:
         self.num_of_curves_ = len(rostopics)
 
 
+@profiler.profiled()
 def export_rqt_multiplot(
     diagram_array, path_to_output_file, num_of_rows, num_of_columns, render_antialias
 ):
@@ -263,7 +275,7 @@ def export_rqt_multiplot(
     num_of_diagrams = len(diagram_array)
 
     # Write XML file
-    with open(path_to_output_file, "w+") as output_file:
+    with package_manifest.open(path_to_output_file) as output_file:
         # Start of file
         string = (
             '<?xml version="1.0" encoding="UTF-8"?>\n'
@@ -0,0 +1,300 @@
+# #####
+#  This file is part of the RobotDesigner developed in the Neurorobotics
+#  subproject of the Human Brain Project (https://www.humanbrainproject.eu).
+#
+#  The Human Brain Project is a European Commission funded project
+#  in the frame of the Horizon2020 FET Flagship plan.
+#  (http://ec.europa.eu/programmes/horizon2020/en/h2020-section/fet-flagships)
+#
+#  The Robot Designer has initially been forked from the RobotEditor
+#  (https://gitlab.com/h2t/roboteditor) developed at the Karlsruhe Institute
+#  of Technology in the High Performance Humanoid Technologies Laboratory (H2T).
+# #####
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Content-addressed cache for exported mesh files.
+
+Every exported mesh is identified by a hash over its evaluated geometry (i.e., with modifiers applied), its modifier
+stack, its materials and the writer. The exported file (``.dae`` or ``.stl``) is stored under this hash, with its
+extension, in a persistent cache directory such that subsequent exports of an unchanged mesh only have to copy the
+file instead of converting it again.
+
+Meshes whose materials reference image textures are never cached since the COLLADA exporter copies the textures next
+to the ``.dae`` file (``use_texture_copies``).
+"""
+
+# System imports
+import os
+import shutil
+import hashlib
+import numpy as np
+
+# Blender imports
+import bpy
+
+# RobotDesigner imports
+from ..core import config
+from ..core.logfile import export_logger
+from ..properties.globals import global_properties
+from .collada_writer import uses_image_textures
+
+CACHE_VERSION = 2
+"""
+Version of the hashed content. Increase it whenever the exported file content changes for the same mesh.
+"""
+
+_IGNORED_RNA_PROPERTIES = {"rna_type", "users", "tag", "is_evaluated", "session_uid", "original", "use_fake_user"}
+
+
+def _hash_array(hasher, collection, attribute, length, dtype):
+    """
+    Feeds an attribute of a bpy collection into the hasher without creating python objects for every element.
+
+    :param hasher: The hashlib object
+    :param collection: A bpy collection that supports ``foreach_get``
+    :param attribute: The attribute name
+    :param length: Number of values to read
+    :param dtype: numpy data type of the attribute
+    """
+    values = np.empty(length, dtype=dtype)
+    collection.foreach_get(attribute, values)
+    hasher.update(attribute.encode())
+    hasher.update(values.tobytes())
+
+
+def _hash_rna(hasher, struct):
+    """
+    Feeds the rna properties of a struct into the hasher. Pointers are represented by the name of their target.
+
+    :param hasher: The hashlib object
+    :param struct: A bpy struct (e.g., a modifier)
+    """
+    for prop in struct.bl_rna.properties:
+        if prop.identifier in _IGNORED_RNA_PROPERTIES or prop.type == "COLLECTION":
+            continue
+        value = getattr(struct, prop.identifier, None)
+        if prop.type == "POINTER":
+            value = getattr(value, "name", None)
+        elif getattr(prop, "is_array", False):
+            value = tuple(value)
+        hasher.update("{}={};".format(prop.identifier, value).encode())
+
+
+def geometry_hash(obj, depsgraph=None, writer=""):
+    """
+    Computes the hash of the exported content of a mesh object independent of the object and mesh names. Objects
+    with equal hashes result in identical mesh files (up to the names) and can share a single file. Image textures
+    are identified by their image and file such that meshes with different textures are never shared.
+
+    :param obj: The mesh object
+    :param depsgraph: The evaluated dependency graph. If None, the one of the current context is used.
+    :param writer: Identifies the exporter that creates the file (files of different exporters are cached separately)
+    :return: hex digest
+    """
+    if depsgraph is None:
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+
+    hasher = hashlib.sha1()
+    hasher.update("{}|{}|{}".format(CACHE_VERSION, bpy.app.version, writer).encode())
+
+    evaluated = obj.evaluated_get(depsgraph)
+    mesh = evaluated.to_mesh()
+    try:
+        _hash_array(hasher, mesh.vertices, "co", len(mesh.vertices) * 3, np.float32)
+        _hash_array(hasher, mesh.loops, "vertex_index", len(mesh.loops), np.int32)
+        _hash_array(hasher, mesh.polygons, "loop_start", len(mesh.polygons), np.int32)
+        _hash_array(hasher, mesh.polygons, "loop_total", len(mesh.polygons), np.int32)
+        _hash_array(hasher, mesh.polygons, "material_index", len(mesh.polygons), np.int32)
+        _hash_array(hasher, mesh.polygons, "use_smooth", len(mesh.polygons), bool)
+        for uv_layer in mesh.uv_layers:
+            hasher.update(uv_layer.name.encode())
+            _hash_array(hasher, uv_layer.data, "uv", len(uv_layer.data) * 2, np.float32)
+    finally:
+        evaluated.to_mesh_clear()
+
+    for modifier in obj.modifiers:
+        _hash_rna(hasher, modifier)
+
+    for slot in obj.material_slots:
+        if slot.material is None:
+            hasher.update(b"no material;")
+            continue
+        _hash_rna(hasher, slot.material)
+        if slot.material.use_nodes and slot.material.node_tree is not None:
+            for node in slot.material.node_tree.nodes:
+                hasher.update("{}:{};".format(node.name, node.type).encode())
+                image = getattr(node, "image", None)
+                if image is not None:
+                    # meshes are only shared if they reference the same image file
+                    hasher.update("image={}|{}|{};".format(image.name, image.source, bpy.path.abspath(
+                        image.filepath, library=image.library)).encode())
+                for socket in node.inputs:
+                    value = getattr(socket, "default_value", None)
+                    if hasattr(value, "__len__"):
+                        value = tuple(value)
+                    hasher.update("{}={};".format(socket.identifier, value).encode())
+
+    return hasher.hexdigest()
+
+
+def mesh_hash(obj, depsgraph=None, writer="", geometry=None):
+    """
+    Computes the content hash of a mesh object as it would be written by the COLLADA exporter.
+
+    :param obj: The mesh object
+    :param depsgraph: The evaluated dependency graph. If None, the one of the current context is used.
+    :param writer: Identifies the exporter that creates the file (files of different exporters are cached separately)
+    :param geometry: The :func:`geometry_hash` of the object if already known
+    :return: hex digest or None if the mesh can not be cached.
+    """
+    if uses_image_textures(obj):
+        return None
+
+    if geometry is None:
+        geometry = geometry_hash(obj, depsgraph, writer)
+    return hashlib.sha1("{}|{}|{}".format(geometry, obj.name, obj.data.name).encode()).hexdigest()
+
+
+class MeshExportCache(object):
+    """
+    Persistent cache of exported COLLADA files. Counts cache hits and misses until :meth:`reset_statistics` is
+    called (usually at the beginning of an export).
+
+    Additionally, the files written during the current export are registered by their :func:`geometry_hash` such that
+    links sharing a mesh (or identical geometry) reference a single file (see :meth:`shared_file`).
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.exported = {}
+
+    @staticmethod
+    def enabled():
+        """
+        :return: Whether the cache is switched on in the export options.
+        """
+        return global_properties.export_mesh_cache.get(bpy.context.scene)
+
+    @staticmethod
+    def directory():
+        """
+        :return: The cache directory. Defaults to ``mesh_cache`` in the user data files of blender.
+        """
+        directory = bpy.path.abspath(global_properties.mesh_cache_directory.get(bpy.context.scene))
+        if not directory:
+            directory = os.path.join(bpy.utils.user_resource("DATAFILES"), config.PLUGIN_PREFIX, "mesh_cache")
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        return directory
+
+    def reset_statistics(self):
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.exported = {}
+
+    def shared_file(self, directory, geometry):
+        """
+        Looks up a file with identical geometry that has been written during the current export.
+
+        :param directory: The mesh directory (visual and collision meshes are not shared)
+        :param geometry: The :func:`geometry_hash` of the mesh
+        :return: path of the file or None
+        """
+        file_path = self.exported.get((directory, geometry))
+        if file_path is not None:
+            self.shared += 1
+        return file_path
+
+    def register_export(self, directory, geometry, file_path):
+        """
+        Registers a file written during the current export for :meth:`shared_file`.
+        """
+        self.exported.setdefault((directory, geometry), file_path)
+
+    def entry(self, key, file_path):
+        """
+        :param key: The mesh hash (see :func:`mesh_hash`)
+        :param file_path: The exported mesh file
+        :return: Path of the cache entry (named after the key with the extension of the exported file)
+        """
+        return os.path.join(self.directory(), key + os.path.splitext(file_path)[1].lower())
+
+    @staticmethod
+    def is_entry(name):
+        """
+        :param name: A file name in the cache directory
+        :return: Whether the file is a cache entry (or a partially written one)
+        """
+        key = name.split(".", 1)[0]
+        return len(key) == 40 and all(c in "0123456789abcdef" for c in key)
+
+    def fetch(self, key, file_path):
+        """
+        Copies a cached file to its destination.
+
+        :param key: The mesh hash (see :func:`mesh_hash`)
+        :param file_path: Destination of the mesh file (its extension selects the cached format)
+        :return: True if the file was in the cache
+        """
+        if key is None:
+            self.misses += 1
+            return False
+
+        cached = self.entry(key, file_path)
+        if not os.path.isfile(cached):
+            self.misses += 1
+            return False
+
+        shutil.copyfile(cached, file_path)
+        self.hits += 1
+        export_logger.debug("Mesh cache hit: {} -> {}".format(cached, file_path))
+        return True
+
+    def store(self, key, file_path):
+        """
+        Adds an exported file to the cache.
+
+        :param key: The mesh hash (see :func:`mesh_hash`)
+        :param file_path: The exported mesh file
+        """
+        if key is None:
+            return
+        cached = self.entry(key, file_path)
+        # copy to a temporary name first so an interrupted export never leaves a truncated cache entry
+        shutil.copyfile(file_path, cached + ".part")
+        os.replace(cached + ".part", cached)
+
+    def clear(self):
+        """
+        Removes all cached files (of all formats).
+        """
+        directory = self.directory()
+        for name in os.listdir(directory):
+            if self.is_entry(name) and os.path.isfile(os.path.join(directory, name)):
+                os.remove(os.path.join(directory, name))
+
+    def summary(self):
+        return "Mesh cache: {} hits, {} misses, {} shared".format(self.hits, self.misses, self.shared)
+
+
+mesh_export_cache = MeshExportCache()
@@ -0,0 +1,241 @@
+# #####
+#  This file is part of the RobotDesigner developed in the Neurorobotics
+#  subproject of the Human Brain Project (https://www.humanbrainproject.eu).
+#
+#  The Human Brain Project is a European Commission funded project
+#  in the frame of the Horizon2020 FET Flagship plan.
+#  (http://ec.europa.eu/programmes/horizon2020/en/h2020-section/fet-flagships)
+#
+#  The Robot Designer has initially been forked from the RobotEditor
+#  (https://gitlab.com/h2t/roboteditor) developed at the Karlsruhe Institute
+#  of Technology in the High Performance Humanoid Technologies Laboratory (H2T).
+# #####
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Parallel decoding of the mesh files of an imported model.
+
+Parsing COLLADA and STL files dominates the import time of models with many meshes. During a
+:meth:`MeshDecodePool.session`, all mesh files referenced by the model are decoded up front by worker processes (one
+per core) running :mod:`.mesh_import_worker`. The workers store the geometry as numpy arrays
+(see :mod:`.mesh_decoder`) and the importer only has to create the blender meshes from the arrays
+(:meth:`MeshDecodePool.create_objects`). Files that could not be decoded are imported with the blender operators.
+"""
+
+# System imports
+import os
+import sys
+import json
+import shutil
+import tempfile
+import subprocess
+from contextlib import contextmanager
+import numpy as np
+
+# Blender imports
+import bpy
+from mathutils import Matrix
+
+# RobotDesigner imports
+from ..core.logfile import export_logger
+from ..core.profiling import profiler
+from ..properties.globals import global_properties
+from .mesh_decoder import load_parts
+from .mesh_export_pool import MeshExportPool
+from .mesh_import_cache import mesh_import_cache
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mesh_import_worker.py")
+SUPPORTED_EXTENSIONS = (".dae", ".stl")
+
+
+def _material(name, color, materials):
+    """
+    :param materials: dictionary of the materials created before (reused if name and color match)
+    """
+    key = (name, tuple(color))
+    if key not in materials:
+        material = bpy.data.materials.new(name)
+        material.diffuse_color = color
+        materials[key] = material
+    return materials[key]
+
+
+def build_objects(parts, materials=None):
+    """
+    Creates mesh objects from decoded parts in the active collection. Afterwards, the new objects are selected and
+    the last one is active (as after calling an import operator).
+
+    :param parts: list of :class:`.mesh_decoder.MeshPart`
+    :param materials: dictionary for sharing materials between calls
+    """
+    if materials is None:
+        materials = {}
+    for obj in bpy.context.selected_objects:
+        obj.select_set(False)
+
+    for part in parts:
+        mesh = bpy.data.meshes.new(part.name)
+        mesh.vertices.add(len(part.positions))
+        mesh.vertices.foreach_set("co", part.positions.ravel())
+        mesh.loops.add(len(part.indices))
+        mesh.loops.foreach_set("vertex_index", part.indices)
+        mesh.polygons.add(len(part.counts))
+        loop_starts = np.zeros(len(part.counts), dtype=np.int32)
+        loop_starts[1:] = np.cumsum(part.counts)[:-1]
+        mesh.polygons.foreach_set("loop_start", loop_starts)
+        try:
+            mesh.polygons.foreach_set("loop_total", part.counts)
+        except (AttributeError, TypeError, RuntimeError):
+            # read-only since blender 4.0 (derived from the loop starts)
+            pass
+        for name, color in part.materials:
+            mesh.materials.append(_material(name, color, materials))
+        if part.materials:
+            mesh.polygons.foreach_set("material_index", part.material_indices)
+        mesh.update(calc_edges=True)
+        mesh.validate()
+
+        obj = bpy.data.objects.new(part.name, mesh)
+        if part.matrix is not None:
+            obj.matrix_world = Matrix(part.matrix)
+        bpy.context.collection.objects.link(obj)
+        obj.select_set(True)
+        bpy.context.view_layer.objects.active = obj
+
+
+class MeshDecodePool(object):
+    """
+    Decodes the mesh files of a model with a pool of worker processes.
+    """
+
+    def __init__(self):
+        self.decoded = None
+        self.directory = None
+        self.materials = {}
+
+    @staticmethod
+    def enabled():
+        """
+        :return: Whether parallel mesh decoding is switched on in the import options.
+        """
+        return global_properties.import_parallel_meshes.get(bpy.context.scene)
+
+    @property
+    def active(self):
+        return self.decoded is not None
+
+    @contextmanager
+    def session(self, file_paths, enabled=True):
+        """
+        Decodes the mesh files when the context is entered. Within the context, :meth:`create_objects` uses the
+        decoded geometry.
+
+        :param file_paths: The mesh files referenced by the model (duplicates are ignored)
+        :param enabled: If False (or if only one core is available), the session does nothing
+        """
+        if not enabled or self.active or MeshExportPool.size() < 2:
+            yield self
+            return
+
+        files = sorted({os.path.realpath(path) for path in file_paths
+                        if os.path.splitext(path)[1].lower() in SUPPORTED_EXTENSIONS and os.path.isfile(path)
+                        and not mesh_import_cache.cached(path)})
+        if len(files) < 2:
+            yield self
+            return
+
+        self.directory = tempfile.mkdtemp(prefix="robot_designer_meshes_")
+        self.materials = {}
+        try:
+            with profiler.phase("decode_meshes"):
+                self.decoded = self._run(files)
+            yield self
+        finally:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.decoded = None
+            self.directory = None
+            self.materials = {}
+
+    @staticmethod
+    def _worker_command(job_file, result_file):
+        if os.path.basename(sys.executable).lower().startswith("python"):
+            # blender >= 2.91 ships a python interpreter
+            return [sys.executable, WORKER_SCRIPT, job_file, result_file]
+        return [bpy.app.binary_path, "-b", "--factory-startup", "--python-exit-code", "1",
+                "--python", WORKER_SCRIPT, "--", job_file, result_file]
+
+    def _run(self, files):
+        """
+        :return: dictionary mesh file -> ``.npz`` file of the decoded parts
+        """
+        jobs = [{"file_path": path, "arrays": os.path.join(self.directory, "{}.npz".format(index)),
+                 "size": os.path.getsize(path)} for index, path in enumerate(files)]
+
+        # balance the file sizes per worker (largest first)
+        count = min(MeshExportPool.size(), len(jobs))
+        batches = [[] for _ in range(count)]
+        loads = [0] * count
+        for job in sorted(jobs, key=lambda j: j["size"], reverse=True):
+            worker = loads.index(min(loads))
+            batches[worker].append(job)
+            loads[worker] += job["size"]
+
+        processes = []
+        for index, batch in enumerate(batches):
+            job_file = os.path.join(self.directory, "worker_{}.json".format(index))
+            result_file = os.path.join(self.directory, "worker_{}_result.json".format(index))
+            with open(job_file, "w") as f:
+                json.dump(batch, f)
+            processes.append((result_file, subprocess.Popen(
+                self._worker_command(job_file, result_file), stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                universal_newlines=True)))
+        export_logger.info("Decoding {} meshes with {} workers".format(len(jobs), len(processes)))
+
+        for result_file, process in processes:
+            output, _ = process.communicate()
+            if process.returncode != 0:
+                export_logger.warning("Mesh import worker failed ({}):\n{}".format(process.returncode, output))
+                continue
+            with open(result_file) as f:
+                for result in json.load(f):
+                    if result["error"]:
+                        # imported by blender in the main process
+                        export_logger.info("Skipped mesh {}: {}".format(result["file_path"], result["error"]))
+                    else:
+                        export_logger.debug("Mesh {}: {}".format(result["status"], result["file_path"]))
+
+        return {job["file_path"]: job["arrays"] for job in jobs if os.path.isfile(job["arrays"])}
+
+    def create_objects(self, mesh_path):
+        """
+        Creates the objects of a decoded mesh file.
+
+        :param mesh_path: The mesh file
+        :return: False if the file has not been decoded (it has to be imported by blender)
+        """
+        if not self.active:
+            return False
+        arrays = self.decoded.get(os.path.realpath(mesh_path))
+        if arrays is None:
+            return False
+        build_objects(load_parts(arrays), self.materials)
+        return True
+
+
+mesh_decode_pool = MeshDecodePool()
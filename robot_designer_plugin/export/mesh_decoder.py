@@ -0,0 +1,316 @@
+# #####
+#  This file is part of the RobotDesigner developed in the Neurorobotics
+#  subproject of the Human Brain Project (https://www.humanbrainproject.eu).
+#
+#  The Human Brain Project is a European Commission funded project
+#  in the frame of the Horizon2020 FET Flagship plan.
+#  (http://ec.europa.eu/programmes/horizon2020/en/h2020-section/fet-flagships)
+#
+#  The Robot Designer has initially been forked from the RobotEditor
+#  (https://gitlab.com/h2t/roboteditor) developed at the Karlsruhe Institute
+#  of Technology in the High Performance Humanoid Technologies Laboratory (H2T).
+# #####
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Decoding of mesh files (COLLADA and STL) into numpy arrays.
+
+The result of :func:`decode_mesh` is a list of :class:`MeshPart` objects, one for every object the blender importer
+would create. Parts are converted to blender meshes by :func:`.mesh_decode_pool.build_objects`.
+
+The module only depends on numpy, the standard library and :mod:`.stl_codec` such that it can be loaded by the mesh
+import workers (see :mod:`.mesh_decode_pool`). Files with features that are not supported (image textures) raise
+:class:`UnsupportedMesh` and have to be imported with the blender operators.
+"""
+
+# System imports
+import os
+import json
+import math
+import xml.etree.ElementTree as ET
+import numpy as np
+
+# RobotDesigner imports
+from .stl_codec import read_stl
+
+_UP_AXIS_ROTATIONS = {
+    # rotations to blender's Z up convention
+    "X_UP": ((0, 0, -1, 0), (0, 1, 0, 0), (1, 0, 0, 0), (0, 0, 0, 1)),
+    "Y_UP": ((1, 0, 0, 0), (0, 0, -1, 0), (0, 1, 0, 0), (0, 0, 0, 1)),
+}
+
+
+class UnsupportedMesh(Exception):
+    """
+    Raised for mesh files that have to be imported by blender.
+    """
+    pass
+
+
+class MeshPart(object):
+    """
+    Polygon mesh of one object. Polygons are stored as flat list of vertex indices and the number of vertices per
+    polygon.
+    """
+
+    def __init__(self, name, positions, indices, counts, material_indices=None, materials=(), matrix=None):
+        """
+        :param name: Object name
+        :param positions: (V, 3) vertex coordinates
+        :param indices: (L,) vertex index per polygon corner
+        :param counts: (P,) number of corners per polygon
+        :param material_indices: (P,) material slot per polygon or None
+        :param materials: list of ``(name, rgba)`` per material slot
+        :param matrix: 4x4 object matrix (nested lists) or None for identity
+        """
+        self.name = name
+        self.positions = np.asarray(positions, dtype=np.float32).reshape(-1, 3)
+        self.indices = np.asarray(indices, dtype=np.int32).reshape(-1)
+        self.counts = np.asarray(counts, dtype=np.int32).reshape(-1)
+        if material_indices is None:
+            material_indices = np.zeros(len(self.counts), dtype=np.int32)
+        self.material_indices = np.asarray(material_indices, dtype=np.int32)
+        self.materials = [(name, tuple(color)) for name, color in materials]
+        self.matrix = [list(row) for row in matrix] if matrix is not None else None
+
+
+def save_parts(file_path, parts):
+    """
+    Stores parts in an (uncompressed) ``.npz`` file.
+    """
+    arrays = {}
+    meta = []
+    for i, part in enumerate(parts):
+        for field in ("positions", "indices", "counts", "material_indices"):
+            arrays["{}_{}".format(field, i)] = getattr(part, field)
+        meta.append({"name": part.name, "materials": part.materials, "matrix": part.matrix})
+    arrays["meta"] = np.array(json.dumps(meta))
+    np.savez(file_path, **arrays)
+
+
+def load_parts(file_path):
+    """
+    Reads parts stored by :func:`save_parts`.
+    """
+    with np.load(file_path) as data:
+        meta = json.loads(str(data["meta"]))
+        return [MeshPart(m["name"], data["positions_{}".format(i)], data["indices_{}".format(i)],
+                         data["counts_{}".format(i)], data["material_indices_{}".format(i)], m["materials"],
+                         m["matrix"])
+                for i, m in enumerate(meta)]
+
+
+def decode_stl(file_path):
+    """
+    Decodes a binary or ASCII STL file. Coincident corners are merged.
+
+    :return: list with one :class:`MeshPart`
+    """
+    positions, triangles, name = read_stl(file_path)
+    return [MeshPart(name, positions, triangles, np.full(len(triangles), 3, dtype=np.int32))]
+
+
+def _floats(text):
+    return np.array(text.split(), dtype=np.float64) if text else np.zeros(0)
+
+
+def _node_matrix(node, ns):
+    """
+    :return: local 4x4 matrix of a COLLADA ``<node>`` (transformation elements are applied in document order)
+    """
+    matrix = np.identity(4)
+    for element in node:
+        tag = element.tag[len(ns):]
+        values = _floats(element.text)
+        if tag == "matrix":
+            local = values.reshape(4, 4)
+        elif tag == "translate":
+            local = np.identity(4)
+            local[:3, 3] = values
+        elif tag == "scale":
+            local = np.diag([values[0], values[1], values[2], 1.0])
+        elif tag == "rotate":
+            axis = values[:3] / (np.linalg.norm(values[:3]) or 1.0)
+            angle = math.radians(values[3])
+            x, y, z = axis
+            c, s, t = math.cos(angle), math.sin(angle), 1 - math.cos(angle)
+            local = np.array([[t * x * x + c, t * x * y - s * z, t * x * z + s * y, 0],
+                              [t * x * y + s * z, t * y * y + c, t * y * z - s * x, 0],
+                              [t * x * z - s * y, t * y * z + s * x, t * z * z + c, 0],
+                              [0, 0, 0, 1]])
+        else:
+            continue
+        matrix = matrix @ local
+    return matrix
+
+
+def _effect_colors(root, ns):
+    """
+    :return: dictionary material id -> rgba diffuse color
+    """
+    effects = {}
+    for effect in root.iter(ns + "effect"):
+        diffuse = effect.find(".//{0}diffuse".format(ns))
+        color = (0.8, 0.8, 0.8, 1.0)
+        if diffuse is not None:
+            if diffuse.find(ns + "texture") is not None:
+                raise UnsupportedMesh("image textures")
+            element = diffuse.find(ns + "color")
+            if element is not None:
+                color = tuple(float(value) for value in _floats(element.text)[:4])
+        effects[effect.get("id")] = color
+
+    colors = {}
+    for material in root.iter(ns + "material"):
+        instance = material.find(ns + "instance_effect")
+        url = instance.get("url", "")[1:] if instance is not None else ""
+        colors[material.get("id")] = effects.get(url, (0.8, 0.8, 0.8, 1.0))
+    return colors
+
+
+def _geometry(geometry, ns):
+    """
+    :return: positions, list of ``(material symbol, indices, counts)`` per primitive
+    """
+    mesh = geometry.find(ns + "mesh")
+    if mesh is None:
+        return None, []
+
+    sources = {}
+    for source in mesh.findall(ns + "source"):
+        array = source.find(ns + "float_array")
+        accessor = source.find(".//{0}accessor".format(ns))
+        stride = int(accessor.get("stride", 1)) if accessor is not None else 3
+        sources[source.get("id")] = _floats(array.text if array is not None else "").reshape(-1, stride)
+
+    vertices = mesh.find(ns + "vertices")
+    position_source = None
+    for element in vertices.findall(ns + "input"):
+        if element.get("semantic") == "POSITION":
+            position_source = element.get("source")[1:]
+    positions = sources[position_source][:, :3]
+
+    primitives = []
+    for primitive in mesh:
+        tag = primitive.tag[len(ns):]
+        if tag not in ("triangles", "polylist", "polygons"):
+            continue
+        inputs = primitive.findall(ns + "input")
+        stride = max(int(element.get("offset", 0)) for element in inputs) + 1
+        offset = [int(element.get("offset", 0)) for element in inputs if element.get("semantic") == "VERTEX"][0]
+
+        if tag == "polygons":
+            polygons = [np.array(p.text.split(), dtype=np.int64).reshape(-1, stride)[:, offset]
+                        for p in primitive.findall(ns + "p") if p.text]
+            indices = np.concatenate(polygons) if polygons else np.zeros(0, dtype=np.int64)
+            counts = np.array([len(p) for p in polygons], dtype=np.int64)
+        else:
+            p = primitive.find(ns + "p")
+            indices = np.array(p.text.split() if p is not None and p.text else [],
+                               dtype=np.int64).reshape(-1, stride)[:, offset]
+            vcount = primitive.find(ns + "vcount")
+            if tag == "triangles" or vcount is None:
+                # polylists without vcount are read as triangles
+                if len(indices) % 3:
+                    raise UnsupportedMesh("{} without vcount".format(tag))
+                counts = np.full(len(indices) // 3, 3, dtype=np.int64)
+            else:
+                counts = np.array(vcount.text.split() if vcount.text else [], dtype=np.int64)
+        if counts.sum() != len(indices):
+            raise UnsupportedMesh("{} with {} indices for {} corners".format(tag, len(indices), counts.sum()))
+        primitives.append((primitive.get("material"), indices, counts))
+    return positions, primitives
+
+
+def decode_collada(file_path):
+    """
+    Decodes the mesh geometry of a COLLADA file. Every geometry instance of the visual scene becomes a part with the
+    (world) matrix of its node.
+
+    :return: list of :class:`MeshPart`
+    """
+    root = ET.parse(file_path).getroot()
+    ns = root.tag[:root.tag.index("}") + 1] if root.tag.startswith("{") else ""
+
+    if root.find(".//{0}library_images/{0}image".format(ns)) is not None:
+        raise UnsupportedMesh("image textures")
+    colors = _effect_colors(root, ns)
+
+    geometries = {}
+    for geometry in root.iter(ns + "geometry"):
+        geometries[geometry.get("id")] = geometry
+
+    up_axis = root.find("{0}asset/{0}up_axis".format(ns))
+    up_matrix = np.array(_UP_AXIS_ROTATIONS.get(up_axis.text.strip() if up_axis is not None else "", np.identity(4)),
+                         dtype=np.float64)
+
+    instances = []
+
+    def walk(node, parent_matrix):
+        matrix = parent_matrix @ _node_matrix(node, ns)
+        for instance in node.findall(ns + "instance_geometry"):
+            bindings = {binding.get("symbol"): binding.get("target", "")[1:]
+                        for binding in instance.iter(ns + "instance_material")}
+            instances.append((node.get("name") or node.get("id"), instance.get("url", "")[1:], bindings, matrix))
+        for child in node.findall(ns + "node"):
+            walk(child, matrix)
+
+    for scene in root.iter(ns + "visual_scene"):
+        for node in scene.findall(ns + "node"):
+            walk(node, up_matrix)
+    if not instances:
+        instances = [(geometry_id, geometry_id, {}, up_matrix) for geometry_id in geometries]
+
+    parts = []
+    for name, geometry_id, bindings, matrix in instances:
+        geometry = geometries.get(geometry_id)
+        if geometry is None:
+            continue
+        positions, primitives = _geometry(geometry, ns)
+        if positions is None or not primitives:
+            continue
+
+        slots = []
+        material_indices = []
+        for symbol, _, counts in primitives:
+            target = bindings.get(symbol, symbol)
+            slot = (target, colors.get(target, (0.8, 0.8, 0.8, 1.0))) if target else None
+            if slot is not None and slot not in slots:
+                slots.append(slot)
+            material_indices.append(np.full(len(counts), slots.index(slot) if slot is not None else 0,
+                                            dtype=np.int32))
+        parts.append(MeshPart(name or geometry.get("name") or geometry_id, positions,
+                              np.concatenate([indices for _, indices, _ in primitives]),
+                              np.concatenate([counts for _, _, counts in primitives]),
+                              np.concatenate(material_indices), slots, matrix.tolist()))
+    return parts
+
+
+def decode_mesh(file_path):
+    """
+    Decodes a mesh file depending on its extension.
+
+    :return: list of :class:`MeshPart`
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == ".stl":
+        return decode_stl(file_path)
+    if extension == ".dae":
+        return decode_collada(file_path)
+    raise UnsupportedMesh("unknown extension {}".format(extension))
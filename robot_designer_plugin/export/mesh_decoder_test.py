@@ -0,0 +1,189 @@
+# #####
+#  This file is part of the RobotDesigner developed in the Neurorobotics
+#  subproject of the Human Brain Project (https://www.humanbrainproject.eu).
+#
+#  The Human Brain Project is a European Commission funded project
+#  in the frame of the Horizon2020 FET Flagship plan.
+#  (http://ec.europa.eu/programmes/horizon2020/en/h2020-section/fet-flagships)
+#
+#  The Robot Designer has initially been forked from the RobotEditor
+#  (https://gitlab.com/h2t/roboteditor) developed at the Karlsruhe Institute
+#  of Technology in the High Performance Humanoid Technologies Laboratory (H2T).
+# #####
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# System imports
+import os
+import sys
+import types
+import tempfile
+import unittest
+import numpy as np
+
+# load the modules of this directory without the blender dependent package
+sys.modules.setdefault("export", types.ModuleType("export")).__path__ = [os.path.dirname(os.path.abspath(__file__))]
+from export.mesh_decoder import decode_mesh, save_parts, load_parts, UnsupportedMesh, MeshPart
+from export.stl_codec import write_stl
+
+# unit square in the XY plane (Z up) as two triangles or one quad
+POSITIONS = "0 0 0 1 0 0 1 1 0 0 1 0"
+
+COLLADA = """<?xml version="1.0" encoding="utf-8"?>
+<COLLADA xmlns="http://www.collada.org/2005/11/COLLADASchema" version="1.4.1">
+  <asset><up_axis>{up_axis}</up_axis></asset>
+  <library_effects>
+    <effect id="red-effect"><profile_COMMON><technique sid="common"><lambert>
+      <diffuse><color>1 0 0 1</color></diffuse>
+    </lambert></technique></profile_COMMON></effect>
+  </library_effects>
+  <library_materials>
+    <material id="red"><instance_effect url="#red-effect"/></material>
+  </library_materials>
+  <library_geometries>
+    <geometry id="square" name="square">
+      <mesh>
+        <source id="positions">
+          <float_array id="positions-array" count="12">{positions}</float_array>
+          <technique_common><accessor source="#positions-array" count="4" stride="3"/></technique_common>
+        </source>
+        <source id="normals">
+          <float_array id="normals-array" count="3">0 0 1</float_array>
+          <technique_common><accessor source="#normals-array" count="1" stride="3"/></technique_common>
+        </source>
+        <vertices id="vertices"><input semantic="POSITION" source="#positions"/></vertices>
+        {primitive}
+      </mesh>
+    </geometry>
+  </library_geometries>
+  <library_visual_scenes>
+    <visual_scene id="scene">
+      <node id="node" name="part">
+        <translate>1 2 3</translate>
+        <instance_geometry url="#square">
+          <bind_material><technique_common>
+            <instance_material symbol="material" target="#red"/>
+          </technique_common></bind_material>
+        </instance_geometry>
+      </node>
+    </visual_scene>
+  </library_visual_scenes>
+</COLLADA>
+"""
+
+INPUTS = ('<input semantic="VERTEX" source="#vertices" offset="0"/>'
+          '<input semantic="NORMAL" source="#normals" offset="1"/>')
+TRIANGLES = '<triangles material="material" count="2">' + INPUTS + '<p>0 0 1 0 2 0 0 0 2 0 3 0</p></triangles>'
+POLYLIST = ('<polylist material="material" count="1">' + INPUTS +
+            '<vcount>4</vcount><p>0 0 1 0 2 0 3 0</p></polylist>')
+POLYLIST_WITHOUT_VCOUNT = ('<polylist material="material" count="2">' + INPUTS +
+                           '<p>0 0 1 0 2 0 0 0 2 0 3 0</p></polylist>')
+
+
+class DecoderTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def decode(self, primitive, up_axis="Z_UP", name="mesh.dae"):
+        file_path = os.path.join(self.directory.name, name)
+        with open(file_path, "w") as f:
+            f.write(COLLADA.format(up_axis=up_axis, positions=POSITIONS, primitive=primitive))
+        return decode_mesh(file_path)
+
+
+class ColladaTriangles(DecoderTestCase):
+    def runTest(self):
+        parts = self.decode(TRIANGLES)
+        self.assertEqual(len(parts), 1)
+        part = parts[0]
+        self.assertEqual(part.name, "part")
+        np.testing.assert_allclose(part.positions, np.array(POSITIONS.split(), dtype=float).reshape(-1, 3))
+        self.assertEqual(part.indices.tolist(), [0, 1, 2, 0, 2, 3])
+        self.assertEqual(part.counts.tolist(), [3, 3])
+        self.assertEqual(part.material_indices.tolist(), [0, 0])
+        self.assertEqual(part.materials, [("red", (1.0, 0.0, 0.0, 1.0))])
+        np.testing.assert_allclose(np.array(part.matrix)[:3, 3], [1, 2, 3])
+
+
+class ColladaPolylist(DecoderTestCase):
+    def runTest(self):
+        part = self.decode(POLYLIST)[0]
+        self.assertEqual(part.indices.tolist(), [0, 1, 2, 3])
+        self.assertEqual(part.counts.tolist(), [4])
+
+
+class ColladaPolylistWithoutVcount(DecoderTestCase):
+    def runTest(self):
+        part = self.decode(POLYLIST_WITHOUT_VCOUNT)[0]
+        self.assertEqual(part.indices.tolist(), [0, 1, 2, 0, 2, 3])
+        self.assertEqual(part.counts.tolist(), [3, 3])
+
+        with self.assertRaises(UnsupportedMesh):
+            self.decode(POLYLIST_WITHOUT_VCOUNT.replace(" 3 0</p>", "</p>"))
+        with self.assertRaises(UnsupportedMesh):
+            self.decode(POLYLIST.replace("<vcount>4</vcount>", "<vcount>3</vcount>"))
+
+
+class ColladaUpAxis(DecoderTestCase):
+    def runTest(self):
+        matrix = np.array(self.decode(TRIANGLES, up_axis="Y_UP")[0].matrix)
+        # Y up is rotated to Z up
+        np.testing.assert_allclose(matrix @ [0, 1, 0, 0], [0, 0, 1, 0], atol=1e-12)
+        np.testing.assert_allclose(matrix[:3, 3], [1, -3, 2])
+
+
+class UnsupportedFiles(DecoderTestCase):
+    def runTest(self):
+        file_path = os.path.join(self.directory.name, "textured.dae")
+        with open(file_path, "w") as f:
+            f.write(COLLADA.format(up_axis="Z_UP", positions=POSITIONS, primitive=TRIANGLES).replace(
+                "<color>1 0 0 1</color>", '<texture texture="image" texcoord="uv"/>'))
+        with self.assertRaises(UnsupportedMesh):
+            decode_mesh(file_path)
+        with self.assertRaises(UnsupportedMesh):
+            decode_mesh(os.path.join(self.directory.name, "mesh.obj"))
+
+
+class StlAndCache(DecoderTestCase):
+    def runTest(self):
+        file_path = os.path.join(self.directory.name, "mesh.stl")
+        positions = np.array(POSITIONS.split(), dtype=np.float32).reshape(-1, 3)
+        write_stl(file_path, positions, np.array([[0, 1, 2], [0, 2, 3]]), name="square")
+        parts = decode_mesh(file_path)
+        self.assertEqual(len(parts), 1)
+        self.assertEqual(parts[0].counts.tolist(), [3, 3])
+
+        parts.append(MeshPart("other", positions, [0, 1, 2, 3], [4], materials=[("red", (1, 0, 0, 1))],
+                              matrix=np.identity(4)))
+        cache_path = os.path.join(self.directory.name, "parts.npz")
+        save_parts(cache_path, parts)
+        loaded = load_parts(cache_path)
+        self.assertEqual([part.name for part in loaded], ["square", "other"])
+        for part, other in zip(parts, loaded):
+            for field in ("positions", "indices", "counts", "material_indices"):
+                np.testing.assert_array_equal(getattr(part, field), getattr(other, field))
+            self.assertEqual(part.materials, [tuple(i) for i in other.materials])
+            self.assertEqual(part.matrix, other.matrix)
+
+
+if __name__ == "__main__":
+    unittest.main()
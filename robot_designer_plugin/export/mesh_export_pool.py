@@ -0,0 +1,185 @@
+# #####
+#  This file is part of the RobotDesigner developed in the Neurorobotics
+#  subproject of the Human Brain Project (https://www.humanbrainproject.eu).
+#
+#  The Human Brain Project is a European Commission funded project
+#  in the frame of the Horizon2020 FET Flagship plan.
+#  (http://ec.europa.eu/programmes/horizon2020/en/h2020-section/fet-flagships)
+#
+#  The Robot Designer has initially been forked from the RobotEditor
+#  (https://gitlab.com/h2t/roboteditor) developed at the Karlsruhe Institute
+#  of Technology in the High Performance Humanoid Technologies Laboratory (H2T).
+# #####
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Pool of headless blender processes that write exported meshes in parallel.
+
+Reading the evaluated mesh data has to happen in the main thread of blender, but converting the arrays into COLLADA
+text dominates the export time of high-poly meshes. While a pool session is active, :meth:`MeshExportPool.submit`
+only stores the raw arrays of a mesh (see :class:`.collada_writer.MeshArrays`) in a temporary directory. At the end
+of the session the jobs are distributed over ``blender -b`` worker processes (one per core) running
+:mod:`.mesh_export_worker`. Jobs of failed workers are written in the main process.
+"""
+
+# System imports
+import os
+import json
+import shutil
+import tempfile
+import subprocess
+from contextlib import contextmanager
+
+# Blender imports
+import bpy
+
+# RobotDesigner imports
+from ..core.logfile import export_logger
+from ..core.profiling import profiler
+from ..properties.globals import global_properties
+from .collada_writer import MeshArrays, mesh_arrays, collada_materials, write_collada_arrays
+from .mesh_cache import mesh_export_cache
+from .package_archive import package_archive
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mesh_export_worker.py")
+
+
+class MeshExportPool(object):
+    """
+    Collects mesh export jobs during an export and writes them with a pool of worker processes.
+    """
+
+    def __init__(self):
+        self.jobs = None
+        self.directory = None
+
+    @staticmethod
+    def enabled():
+        """
+        :return: Whether parallel mesh export is switched on in the export options.
+        """
+        return global_properties.export_parallel_meshes.get(bpy.context.scene)
+
+    @staticmethod
+    def size():
+        """
+        :return: Number of worker processes (the number of available cores)
+        """
+        if hasattr(os, "sched_getaffinity"):
+            return max(1, len(os.sched_getaffinity(0)))
+        return max(1, os.cpu_count() or 1)
+
+    @property
+    def active(self):
+        return self.jobs is not None
+
+    @contextmanager
+    def session(self, enabled=True):
+        """
+        Context manager in which meshes passed to :meth:`submit` are collected. All files are written when the
+        context is left (i.e., before the SDF file is written). Pending jobs are discarded on errors.
+
+        :param enabled: If False (or if only one core is available), the session does nothing and :attr:`active`
+            stays False
+        """
+        if not enabled or self.size() < 2:
+            yield self
+            return
+
+        self.jobs = []
+        self.directory = tempfile.mkdtemp(prefix="robot_designer_meshes_")
+        try:
+            yield self
+            with profiler.phase("mesh_workers"):
+                self._run()
+        finally:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.jobs = None
+            self.directory = None
+
+    def submit(self, obj, file_path, cache_key=None, depsgraph=None):
+        """
+        Queues the export of a mesh object. Must be called within :meth:`session`.
+
+        :param obj: The mesh object
+        :param file_path: The ``.dae`` file
+        :param cache_key: Key under which the file is stored in the mesh cache when it has been written
+        :param depsgraph: The evaluated dependency graph. If None, the one of the current context is used.
+        """
+        arrays = mesh_arrays(obj, depsgraph)
+        arrays_path = os.path.join(self.directory, "{}.npz".format(len(self.jobs)))
+        arrays.save(arrays_path)
+        self.jobs.append({"name": obj.name, "arrays": arrays_path, "materials": collada_materials(obj),
+                          "file_path": file_path, "cache_key": cache_key, "size": len(arrays.triangles)})
+
+    def _distribute(self, count):
+        """
+        Assigns the jobs to workers such that the number of triangles per worker is balanced (largest first).
+
+        :param count: number of workers
+        :return: list of job lists
+        """
+        batches = [[] for _ in range(count)]
+        loads = [0] * count
+        for job in sorted(self.jobs, key=lambda j: j["size"], reverse=True):
+            worker = loads.index(min(loads))
+            batches[worker].append(job)
+            loads[worker] += job["size"]
+        return [batch for batch in batches if batch]
+
+    def _run(self):
+        if not self.jobs:
+            return
+
+        count = min(self.size(), len(self.jobs))
+        failed = self.jobs
+        if count > 1:
+            failed = []
+            processes = []
+            for index, batch in enumerate(self._distribute(count)):
+                job_file = os.path.join(self.directory, "worker_{}.json".format(index))
+                result_file = os.path.join(self.directory, "worker_{}_result.json".format(index))
+                with open(job_file, "w") as f:
+                    json.dump(batch, f)
+                command = [bpy.app.binary_path, "-b", "--factory-startup", "--python-exit-code", "1",
+                           "--python", WORKER_SCRIPT, "--", job_file, result_file]
+                processes.append((batch, result_file, subprocess.Popen(
+                    command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)))
+            export_logger.info("Exporting {} meshes with {} workers".format(len(self.jobs), len(processes)))
+
+            for batch, result_file, process in processes:
+                output, _ = process.communicate()
+                if process.returncode != 0:
+                    export_logger.warning("Mesh export worker failed ({}):\n{}".format(process.returncode, output))
+                    failed.extend(batch)
+                    continue
+                with open(result_file) as f:
+                    for result in json.load(f):
+                        export_logger.debug("Mesh {}: {}".format(result["status"], result["file_path"]))
+
+        # write remaining jobs in this process
+        for job in failed:
+            write_collada_arrays(job["file_path"], job["name"], MeshArrays.load(job["arrays"]), job["materials"])
+
+        for job in self.jobs:
+            mesh_export_cache.store(job["cache_key"], job["file_path"])
+            package_archive.add(job["file_path"])
+
+
+mesh_export_pool = MeshExportPool()
@@ -0,0 +1,79 @@
+# #####
+#  This file is part of the RobotDesigner developed in the Neurorobotics
+#  subproject of the Human Brain Project (https://www.humanbrainproject.eu).
+#
+#  The Human Brain Project is a European Commission funded project
+#  in the frame of the Horizon2020 FET Flagship plan.
+#  (http://ec.europa.eu/programmes/horizon2020/en/h2020-section/fet-flagships)
+#
+#  The Robot Designer has initially been forked from the RobotEditor
+#  (https://gitlab.com/h2t/roboteditor) developed at the Karlsruhe Institute
+#  of Technology in the High Performance Humanoid Technologies Laboratory (H2T).
+# #####
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Entry point of a mesh export worker. This file is not imported by the plugin but executed by a headless blender::
+
+    blender -b --factory-startup --python-exit-code 1 --python mesh_export_worker.py -- jobs.json results.json
+
+The job file contains a list of ``{"name", "arrays", "materials", "file_path"}`` entries where ``arrays`` is a
+``.npz`` file written by :meth:`.collada_writer.MeshArrays.save`. The worker reports the written files as a list of
+``{"file_path", "status"}`` entries in the result file (logged by :mod:`.mesh_export_pool`). Only
+:mod:`.collada_writer` (and :mod:`.stl_codec`) are loaded such that the worker starts without registering the plugin.
+"""
+
+# System imports
+import os
+import sys
+import json
+import types
+import importlib
+
+PACKAGE = "robot_designer_mesh_io"
+
+
+def load_collada_writer():
+    # stand-in package for this directory which does not run the plugin's __init__ (it needs the add-on)
+    package = types.ModuleType(PACKAGE)
+    package.__path__ = [os.path.dirname(os.path.abspath(__file__))]
+    sys.modules[PACKAGE] = package
+    return importlib.import_module(PACKAGE + ".collada_writer")
+
+
+def main(argv):
+    job_file, result_file = argv[argv.index("--") + 1:argv.index("--") + 3]
+    collada_writer = load_collada_writer()
+
+    with open(job_file) as f:
+        jobs = json.load(f)
+
+    results = []
+    for job in jobs:
+        arrays = collada_writer.MeshArrays.load(job["arrays"])
+        materials = [(name, tuple(color)) for name, color in job["materials"]]
+        collada_writer.write_collada_arrays(job["file_path"], job["name"], arrays, materials)
+        results.append({"file_path": job["file_path"], "status": "written"})
+
+    with open(result_file, "w") as f:
+        json.dump(results, f)
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,207 @@
+# #####
+#  This file is part of the RobotDesigner developed in the Neurorobotics
+#  subproject of the Human Brain Project (https://www.humanbrainproject.eu).
+#
+#  The Human Brain Project is a European Commission funded project
+#  in the frame of the Horizon2020 FET Flagship plan.
+#  (http://ec.europa.eu/programmes/horizon2020/en/h2020-section/fet-flagships)
+#
+#  The Robot Designer has initially been forked from the RobotEditor
+#  (https://gitlab.com/h2t/roboteditor) developed at the Karlsruhe Institute
+#  of Technology in the High Performance Humanoid Technologies Laboratory (H2T).
+# #####
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Cache for mesh files loaded by the SDF and URDF importers.
+
+Models often reference the same mesh file from many links (e.g., the fingers of a hand). During a
+:meth:`MeshImportCache.session`, a mesh file is only parsed once. Further references create *linked duplicates*:
+new objects sharing a copy of the mesh datablocks that were imported from the file. Entries are keyed by the resolved
+path and the modification time of the file.
+
+The shared datablocks keep a fake user. Therefore, transformations of linked duplicates must be applied with
+:func:`apply_transform` which leaves them in the object instead of modifying the shared mesh. With the
+``import_mesh_cache_persistent`` option, the cache is kept for subsequent imports (e.g., of several models of a world).
+"""
+
+# System imports
+import os
+from contextlib import contextmanager
+
+# Blender imports
+import bpy
+
+# RobotDesigner imports
+from ..core.logfile import export_logger
+from ..properties.globals import global_properties
+
+
+def apply_transform(location=True, rotation=True, scale=True):
+    """
+    Applies the transformation of the active object to its mesh (see :func:`bpy.ops.object.transform_apply`).
+    Meshes shared with other objects are not modified. The transformation is kept in the object instead such that
+    the vertices have the same world coordinates.
+    """
+    obj = bpy.context.active_object
+    if obj.data is not None and obj.data.users > 1:
+        return
+    bpy.ops.object.transform_apply(location=location, rotation=rotation, scale=scale)
+
+
+class MeshImportCache(object):
+    """
+    Maps mesh files to the mesh datablocks imported from them.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.depth = 0
+        self.loaded = 0
+        self.reused = 0
+
+    @staticmethod
+    def enabled():
+        """
+        :return: Whether the import cache is switched on in the import options.
+        """
+        return global_properties.import_mesh_cache.get(bpy.context.scene)
+
+    @staticmethod
+    def persistent():
+        """
+        :return: Whether the cache is kept after an import.
+        """
+        return global_properties.import_mesh_cache_persistent.get(bpy.context.scene)
+
+    @property
+    def active(self):
+        return self.depth > 0
+
+    @contextmanager
+    def session(self, enabled=True):
+        """
+        Context manager in which :meth:`import_mesh` reuses meshes. Sessions can be nested (e.g., importing the
+        models of a world).
+
+        :param enabled: If False, the session does nothing and all files are imported
+        """
+        if not enabled:
+            yield self
+            return
+
+        if not self.active:
+            self.loaded = 0
+            self.reused = 0
+        self.depth += 1
+        try:
+            yield self
+        finally:
+            self.depth -= 1
+            if not self.active:
+                export_logger.info(self.summary())
+                if not self.persistent():
+                    self.clear()
+
+    def cached(self, mesh_path):
+        """
+        :return: Whether the import of a mesh file would create linked duplicates
+        """
+        key = os.path.realpath(mesh_path)
+        entry = self.entries.get(key)
+        if not self.active or entry is None or not os.path.isfile(key):
+            return False
+        return entry[0] == os.stat(key).st_mtime_ns and all(self._valid(mesh) for _, mesh, _ in entry[1])
+
+    def import_mesh(self, mesh_path, load):
+        """
+        Imports a mesh file. Afterwards, the imported objects are selected and one of them is active.
+
+        :param mesh_path: The mesh file
+        :param load: Function importing the file with a blender operator (called if the file is not cached)
+        """
+        if not self.active:
+            load()
+            return
+
+        key = os.path.realpath(mesh_path)
+        entry = self.entries.get(key)
+        if self.cached(key):
+            self._instantiate(entry[1])
+            self.reused += 1
+            return
+
+        load()
+        self.loaded += 1
+        # keep unmodified copies, the importers apply transformations to the new objects
+        parts = []
+        for obj in bpy.context.selected_objects:
+            if obj.type != "MESH":
+                continue
+            mesh = obj.data.copy()
+            mesh.use_fake_user = True
+            parts.append((obj.name, mesh, obj.matrix_world.copy()))
+        if parts:
+            if entry is not None:
+                self._release(entry[1])
+            self.entries[key] = (os.stat(key).st_mtime_ns, parts)
+
+    @staticmethod
+    def _valid(mesh):
+        try:
+            return bpy.data.meshes.get(mesh.name) == mesh
+        except ReferenceError:
+            # removed (e.g., by loading another blend file)
+            return False
+
+    @staticmethod
+    def _instantiate(parts):
+        """
+        Creates linked duplicates of the cached meshes in the active collection.
+        """
+        for obj in bpy.context.selected_objects:
+            obj.select_set(False)
+        for name, mesh, matrix in parts:
+            obj = bpy.data.objects.new(name, mesh)
+            obj.matrix_world = matrix
+            bpy.context.collection.objects.link(obj)
+            obj.select_set(True)
+            bpy.context.view_layer.objects.active = obj
+
+    def _release(self, parts):
+        for _, mesh, _ in parts:
+            if not self._valid(mesh):
+                continue
+            mesh.use_fake_user = False
+            if mesh.users == 0:
+                bpy.data.meshes.remove(mesh)
+
+    def clear(self):
+        """
+        Releases all cached meshes. Meshes that are not used by any object are removed.
+        """
+        for _, parts in self.entries.values():
+            self._release(parts)
+        self.entries = {}
+
+    def summary(self):
+        return "Mesh import cache: {} files loaded, {} reused".format(self.loaded, self.reused)
+
+
+mesh_import_cache = MeshImportCache()
@@ -0,0 +1,85 @@
+# #####
+#  This file is part of the RobotDesigner developed in the Neurorobotics
+#  subproject of the Human Brain Project (https://www.humanbrainproject.eu).
+#
+#  The Human Brain Project is a European Commission funded project
+#  in the frame of the Horizon2020 FET Flagship plan.
+#  (http://ec.europa.eu/programmes/horizon2020/en/h2020-section/fet-flagships)
+#
+#  The Robot Designer has initially been forked from the RobotEditor
+#  (https://gitlab.com/h2t/roboteditor) developed at the Karlsruhe Institute
+#  of Technology in the High Performance Humanoid Technologies Laboratory (H2T).
+# #####
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Entry point of a mesh import worker. This file is not imported by the plugin but executed by the python interpreter
+of blender (or a headless blender)::
+
+    python mesh_import_worker.py jobs.json results.json
+    blender -b --factory-startup --python-exit-code 1 --python mesh_import_worker.py -- jobs.json results.json
+
+The job file contains a list of ``{"file_path", "arrays"}`` entries. Every mesh file is decoded with
+:func:`.mesh_decoder.decode_mesh` and stored with :func:`.mesh_decoder.save_parts`. Files that cannot be decoded are
+skipped (they are imported by blender in the main process). The worker reports the outcome of every job as a list of
+``{"file_path", "status", "error"}`` entries in the result file (logged by :mod:`.mesh_decode_pool`).
+"""
+
+# System imports
+import os
+import sys
+import json
+import types
+import importlib
+
+PACKAGE = "robot_designer_mesh_io"
+
+
+def load_mesh_decoder():
+    # stand-in package for this directory which does not run the plugin's __init__ (it needs the add-on)
+    package = types.ModuleType(PACKAGE)
+    package.__path__ = [os.path.dirname(os.path.abspath(__file__))]
+    sys.modules[PACKAGE] = package
+    return importlib.import_module(PACKAGE + ".mesh_decoder")
+
+
+def main(argv):
+    arguments = argv[argv.index("--") + 1:] if "--" in argv else argv[1:]
+    job_file, result_file = arguments[:2]
+    mesh_decoder = load_mesh_decoder()
+
+    with open(job_file) as f:
+        jobs = json.load(f)
+
+    results = []
+    for job in jobs:
+        try:
+            parts = mesh_decoder.decode_mesh(job["file_path"])
+        except Exception as e:
+            results.append({"file_path": job["file_path"], "status": "skipped", "error": str(e)})
+            continue
+        mesh_decoder.save_parts(job["arrays"], parts)
+        results.append({"file_path": job["file_path"], "status": "decoded", "error": None})
+
+    with open(result_file, "w") as f:
+        json.dump(results, f)
+
+
+if __name__ == "__main__":
+    main(sys.argv)
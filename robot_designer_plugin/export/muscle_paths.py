@@ -0,0 +1,326 @@
+# #####
+#  This file is part of the RobotDesigner developed in the Neurorobotics
+#  subproject of the Human Brain Project (https://www.humanbrainproject.eu).
+#
+#  The Human Brain Project is a European Commission funded project
+#  in the frame of the Horizon2020 FET Flagship plan.
+#  (http://ec.europa.eu/programmes/horizon2020/en/h2020-section/fet-flagships)
+#
+#  The Robot Designer has initially been forked from the RobotEditor
+#  (https://gitlab.com/h2t/roboteditor) developed at the Karlsruhe Institute
+#  of Technology in the High Performance Humanoid Technologies Laboratory (H2T).
+# #####
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Vectorized evaluation of muscle paths.
+
+The via points of all muscles are gathered into one ``(N, 3)`` array of world coordinates (:class:`MusclePaths`):
+the control points of each muscle curve are read with a single ``foreach_get`` and the hook modifiers, which attach
+them to the segments, are applied as matrices (instead of evaluating the curves). Path lengths of all muscles are
+then computed at once from the cumulative sum of the segment lengths (:func:`path_lengths`).
+
+Muscles connected to wrapping spheres and cylinders can be evaluated with their wrapped paths
+(:func:`wrapped_path_lengths`): a path segment obstructed by a wrapping object is replaced by the shortest path around
+it (two tangents and a great circle arc on spheres, a helix on cylinders), which is computed analytically for all
+pairs of segments and connected wrapping objects at once.
+
+Like :mod:`.robot_ir`, this module does not import :mod:`bpy`; the objects are passed in by the callers.
+"""
+
+# System imports
+import numpy as np
+
+
+class MusclePaths(object):
+    """
+    Via points of several muscles stacked into one array. The points of muscle ``i`` are
+    ``points[offsets[i]:offsets[i + 1]]`` and belong to the segments (bone names) listed in ``coord_frames``.
+    """
+
+    __slots__ = ("names", "points", "offsets", "coord_frames", "wraps")
+
+    def __init__(self, names, points, offsets, coord_frames, wraps):
+        self.names = names
+        self.points = points
+        self.offsets = offsets
+        self.coord_frames = coord_frames
+        self.wraps = wraps
+
+    def lengths(self):
+        """
+        :return: array with the path length of every muscle
+        """
+        return path_lengths(self.points, self.offsets)
+
+    def wrapped_lengths(self, obstacles):
+        """
+        :param obstacles: :class:`WrapObstacles` (the wrapping objects the muscles are connected to)
+        :return: array with the wrapped path length of every muscle
+        """
+        return wrapped_path_lengths(self.points, self.offsets, self.wraps, obstacles)
+
+    def muscle_points(self, index):
+        """
+        :return: the (n, 3) via points of a muscle
+        """
+        return self.points[self.offsets[index]:self.offsets[index + 1]]
+
+
+def path_lengths(points, offsets):
+    """
+    Computes the lengths of polylines stacked into one array.
+
+    :param points: (..., N, 3) array of all points (leading axes are batch dimensions, e.g., sampled poses)
+    :param offsets: (M + 1,) array with the index of the first point of each polyline (and N at the end)
+    :return: (..., M) array of the lengths (0 for polylines with less than two points)
+    """
+    points = np.asarray(points)
+    offsets = np.asarray(offsets)
+    if points.shape[-2] < 2:
+        return np.zeros(points.shape[:-2] + (len(offsets) - 1,))
+    # cumulative[k] is the length along the stacked points up to point k; the segments joining two polylines cancel
+    # out because only differences within a polyline are taken
+    segments = np.linalg.norm(np.diff(points, axis=-2), axis=-1)
+    cumulative = np.concatenate((np.zeros(segments.shape[:-1] + (1,)), np.cumsum(segments, axis=-1)), axis=-1)
+    # empty polylines at the end start behind the last point
+    starts = np.minimum(offsets[:-1], points.shape[-2] - 1)
+    ends = np.maximum(offsets[1:] - 1, starts)
+    return cumulative[..., ends] - cumulative[..., starts]
+
+
+class WrapObstacles(object):
+    """
+    Wrapping spheres and cylinders (unit meshes scaled to their radius). ``rotations`` are the orthonormal axes of
+    the objects (the cylinder axis is z).
+    """
+
+    __slots__ = ("names", "centers", "rotations", "radii", "cylinder")
+
+    def __init__(self, names, matrices, types):
+        """
+        :param names: names of the wrapping objects
+        :param matrices: world matrices of the objects
+        :param types: ``WrappingType`` of the objects
+        """
+        matrices = np.asarray(matrices, dtype=np.float64).reshape(-1, 4, 4)
+        scales = np.linalg.norm(matrices[:, :3, :3], axis=1)
+        self.names = list(names)
+        self.centers = matrices[:, :3, 3]
+        self.rotations = matrices[:, :3, :3] / scales[:, np.newaxis, :]
+        self.radii = scales[:, 0]
+        self.cylinder = np.array([t == "WRAPPING_CYLINDER" for t in types], dtype=bool)
+
+
+def capture_wrap_obstacles(objects):
+    """
+    :param objects: The wrapping objects
+    :return: :class:`WrapObstacles`
+    """
+    return WrapObstacles([obj.name for obj in objects], [np.array(obj.matrix_world) for obj in objects],
+                         [obj.RobotDesigner.wrap.WrappingType for obj in objects])
+
+
+def circle_wrap_lengths(p, s, radius):
+    """
+    Lengths of the shortest paths between pairs of points around spheres (or circles for 2D points) at the origin.
+    The path consists of the tangents from both points and the arc between the tangent points in the plane spanned
+    by the points and the center. Segments that do not touch the sphere, and points inside of it, are not wrapped.
+
+    :param p: (n, d) start points relative to the centers
+    :param s: (n, d) end points relative to the centers
+    :param radius: (n,) radii
+    :return: (n,) lengths
+    """
+    dp = np.linalg.norm(p, axis=-1)
+    ds = np.linalg.norm(s, axis=-1)
+    straight = np.linalg.norm(s - p, axis=-1)
+    outside = (dp > radius) & (ds > radius)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        theta = np.arccos(np.clip(np.sum(p * s, axis=-1) / (dp * ds), -1.0, 1.0))
+        arc = theta - np.arccos(np.clip(radius / dp, -1.0, 1.0)) - np.arccos(np.clip(radius / ds, -1.0, 1.0))
+        wrapped = np.sqrt(dp ** 2 - radius ** 2) + np.sqrt(ds ** 2 - radius ** 2) + radius * arc
+    return np.where(outside & (arc > 0), wrapped, straight)
+
+
+def cylinder_wrap_lengths(p, s, radius):
+    """
+    Lengths of the shortest paths between pairs of points around (infinite) cylinders along the z axis. Unrolled,
+    the path is a straight line, so its length combines the wrapped length in the xy plane with the distance along
+    the axis.
+
+    :param p: (n, 3) start points in cylinder coordinates
+    :param s: (n, 3) end points in cylinder coordinates
+    :param radius: (n,) radii
+    :return: (n,) lengths
+    """
+    planar = circle_wrap_lengths(p[:, :2], s[:, :2], radius)
+    return np.sqrt(planar ** 2 + (s[:, 2] - p[:, 2]) ** 2)
+
+
+def wrapped_path_lengths(points, offsets, wraps, obstacles):
+    """
+    Computes the lengths of muscle paths wrapping over spheres and cylinders. Every segment of a muscle is tested
+    against all wrapping objects the muscle is connected to; if several of them obstruct a segment, the longest
+    detour is taken.
+
+    :param points: (N, 3) array of all points
+    :param offsets: (M + 1,) array with the index of the first point of each muscle (and N at the end)
+    :param wraps: list with the names of the wrapping objects connected to each muscle
+    :param obstacles: :class:`WrapObstacles`
+    :return: (M,) array of the lengths
+    """
+    points = np.asarray(points)
+    offsets = np.asarray(offsets)
+    muscle_index = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    starts = np.nonzero(muscle_index[:-1] == muscle_index[1:])[0]
+    segment_muscle = muscle_index[starts]
+    segment_lengths = np.linalg.norm(points[starts + 1] - points[starts], axis=-1)
+
+    # pairs of segments and connected wrapping objects
+    index = {name: i for i, name in enumerate(obstacles.names)}
+    pair_segments = []
+    pair_obstacles = []
+    bounds = np.searchsorted(segment_muscle, np.arange(len(offsets)))
+    for m, names in enumerate(wraps):
+        ids = [index[name] for name in names if name in index]
+        segments = np.arange(bounds[m], bounds[m + 1])
+        if ids and len(segments):
+            pair_segments.append(np.repeat(segments, len(ids)))
+            pair_obstacles.append(np.tile(ids, len(segments)))
+
+    if pair_segments:
+        segments = np.concatenate(pair_segments)
+        ids = np.concatenate(pair_obstacles)
+        rotations = obstacles.rotations[ids]
+        centers = obstacles.centers[ids]
+        radii = obstacles.radii[ids]
+        # coordinates of the segment ends in the frames of the wrapping objects
+        p = np.einsum("nji,nj->ni", rotations, points[starts[segments]] - centers)
+        s = np.einsum("nji,nj->ni", rotations, points[starts[segments] + 1] - centers)
+        detours = np.where(obstacles.cylinder[ids], cylinder_wrap_lengths(p, s, radii),
+                           circle_wrap_lengths(p, s, radii))
+        np.maximum.at(segment_lengths, segments, detours)
+
+    return np.bincount(segment_muscle, weights=segment_lengths, minlength=len(offsets) - 1)
+
+
+def _hooked_points(obj, modifier, count):
+    """
+    :return: indices of the curve points a hook modifier is assigned to
+    """
+    indices = list(getattr(modifier, "vertex_indices", ()))
+    if not indices:
+        # hooks created by the RobotDesigner are named after the point (see CreateNewPathpoint)
+        index = modifier.name[len(obj.name) + 1:]
+        if modifier.name.startswith(obj.name + "_") and index.isdigit():
+            indices = [int(index)]
+    return [i for i in indices if i < count]
+
+
+def point_transforms(obj, count, target_matrices=None):
+    """
+    Computes the transformations from the local coordinates of the control points of a muscle curve into world
+    coordinates with the hook modifiers applied (hooks are assumed to have no falloff and full strength).
+
+    :param obj: The muscle object
+    :param count: Number of control points
+    :param target_matrices: dictionary caching the world matrices of hook targets (keys: object and bone name)
+    :return: (count, 4, 4) array
+    """
+    if target_matrices is None:
+        target_matrices = {}
+    transforms = np.tile(np.array(obj.matrix_world, dtype=np.float64), (count, 1, 1))
+    for modifier in obj.modifiers:
+        if modifier.type != "HOOK" or modifier.object is None:
+            continue
+        indices = _hooked_points(obj, modifier, count)
+        if not indices:
+            continue
+        key = (modifier.object.name, modifier.subtarget)
+        if key not in target_matrices:
+            target = np.array(modifier.object.matrix_world, dtype=np.float64)
+            pose = modifier.object.pose
+            if modifier.subtarget and pose is not None and modifier.subtarget in pose.bones:
+                target = target @ np.array(pose.bones[modifier.subtarget].matrix, dtype=np.float64)
+            target_matrices[key] = target
+        transforms[indices] = target_matrices[key] @ np.array(modifier.matrix_inverse, dtype=np.float64)
+    return transforms
+
+
+def capture_muscle_paths(muscles):
+    """
+    Reads the world coordinates of the via points of muscles.
+
+    :param muscles: The muscle objects (curves whose first spline holds the via points)
+    :return: :class:`MusclePaths`
+    """
+    names = []
+    blocks = []
+    offsets = [0]
+    coord_frames = []
+    wraps = []
+    target_matrices = {}
+    for obj in muscles:
+        splines = obj.data.splines
+        count = len(splines[0].points) if len(splines) else 0
+        co = np.empty(count * 4)
+        if count:
+            splines[0].points.foreach_get("co", co)
+        co = co.reshape(count, 4)
+        co[:, 3] = 1.0
+        transforms = point_transforms(obj, count, target_matrices)
+        blocks.append(np.einsum("nij,nj->ni", transforms, co)[:, :3])
+
+        names.append(obj.name)
+        offsets.append(offsets[-1] + count)
+        frames = [point.coordFrame for point in obj.RobotDesigner.muscles.pathPoints]
+        coord_frames.extend((frames + [""] * count)[:count])
+        wraps.append([wrap.wrappingName for wrap in obj.RobotDesigner.muscles.connectedWraps])
+
+    points = np.concatenate(blocks) if blocks else np.empty((0, 3))
+    return MusclePaths(names, points, np.array(offsets), coord_frames, wraps)
+
+
+def muscle_lengths(muscles, wrap_objects=()):
+    """
+    :param muscles: The muscle objects
+    :param wrap_objects: The wrapping objects (the paths are wrapped over those the muscles are connected to)
+    :return: dictionary mapping the muscle names to their path lengths
+    """
+    paths = capture_muscle_paths(muscles)
+    if wrap_objects:
+        lengths = paths.wrapped_lengths(capture_wrap_obstacles(wrap_objects))
+    else:
+        lengths = paths.lengths()
+    return dict(zip(paths.names, lengths.tolist()))
+
+
+def update_muscle_lengths(muscles, wrap_objects=()):
+    """
+    Stores the current path lengths in the ``length`` property of the muscles.
+
+    :param muscles: The muscle objects
+    :param wrap_objects: The wrapping objects (see :func:`muscle_lengths`)
+    :return: dictionary mapping the muscle names to their path lengths
+    """
+    lengths = muscle_lengths(muscles, wrap_objects)
+    for obj in muscles:
+        obj.RobotDesigner.muscles.length = lengths[obj.name]
+    return lengths
@@ -0,0 +1,132 @@
+# #####
+#  This file is part of the RobotDesigner developed in the Neurorobotics
+#  subproject of the Human Brain Project (https://www.humanbrainproject.eu).
+#
+#  The Human Brain Project is a European Commission funded project
+#  in the frame of the Horizon2020 FET Flagship plan.
+#  (http://ec.europa.eu/programmes/horizon2020/en/h2020-section/fet-flagships)
+#
+#  The Robot Designer has initially been forked from the RobotEditor
+#  (https://gitlab.com/h2t/roboteditor) developed at the Karlsruhe Institute
+#  of Technology in the High Performance Humanoid Technologies Laboratory (H2T).
+# #####
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# System imports
+import os
+import sys
+import math
+import types
+import unittest
+import numpy as np
+
+# load the modules of this directory without the blender dependent package
+sys.modules.setdefault("export", types.ModuleType("export")).__path__ = [os.path.dirname(os.path.abspath(__file__))]
+from export.muscle_paths import (MusclePaths, WrapObstacles, path_lengths, circle_wrap_lengths,
+                                 cylinder_wrap_lengths, wrapped_path_lengths)
+
+# shortest path from (2, 0) to (-2, 0) around the unit circle: two tangents of length sqrt(3) and an arc of pi / 3
+HALF_WRAP = 2 * math.sqrt(3) + math.pi / 3
+
+
+def obstacle_matrix(center, radius):
+    matrix = np.identity(4)
+    matrix[:3, :3] *= radius
+    matrix[:3, 3] = center
+    return matrix
+
+
+class PathLengths(unittest.TestCase):
+    def runTest(self):
+        points = np.array([[0, 0, 0], [1, 0, 0], [1, 2, 0], [5, 5, 5], [5, 5, 8]], dtype=float)
+        np.testing.assert_allclose(path_lengths(points, [0, 3, 5]), [3, 3])
+        # empty and single point polylines, also at the end
+        np.testing.assert_allclose(path_lengths(points, [0, 0, 3, 4, 5, 5]), [0, 3, 0, 0, 0])
+        np.testing.assert_allclose(path_lengths(points[:3], [0, 3, 3]), [3, 0])
+        np.testing.assert_allclose(path_lengths(np.zeros((0, 3)), [0, 0]), [0])
+        # batch dimensions
+        batch = np.stack((points, 2 * points))
+        np.testing.assert_allclose(path_lengths(batch, [0, 3, 5]), [[3, 3], [6, 6]])
+
+        paths = MusclePaths(["a", "b"], points, np.array([0, 3, 5]), [""] * 5, [[], []])
+        np.testing.assert_allclose(paths.lengths(), [3, 3])
+        np.testing.assert_array_equal(paths.muscle_points(1), points[3:])
+
+
+class CircleWrap(unittest.TestCase):
+    def runTest(self):
+        p = np.array([[2.0, 0.0], [2.0, 0.0], [2.0, 0.0], [0.5, 0.0], [4.0, 0.0]])
+        s = np.array([[-2.0, 0.0], [0.0, 2.0], [2.0, 1.0], [-2.0, 0.0], [-4.0, 0.0]])
+        radius = np.array([1.0, 1.0, 1.0, 1.0, 2.0])
+        lengths = circle_wrap_lengths(p, s, radius)
+        # opposite points: tangents and arc
+        self.assertAlmostEqual(lengths[0], HALF_WRAP)
+        # the segment passes the circle (distance sqrt(2) from the center): straight
+        self.assertAlmostEqual(lengths[1], math.sqrt(8))
+        self.assertAlmostEqual(lengths[2], 1.0)
+        # start point inside the circle: straight
+        self.assertAlmostEqual(lengths[3], 2.5)
+        # scaled by 2
+        self.assertAlmostEqual(lengths[4], 2 * HALF_WRAP)
+
+        # spheres: the plane of the path is spanned by the points and the center
+        rotation = np.array([[0, 0, 1], [1, 0, 0], [0, 1, 0]], dtype=float)
+        p3 = np.array([[2.0, 0.0, 0.0]]) @ rotation.T
+        s3 = np.array([[-2.0, 0.0, 0.0]]) @ rotation.T
+        self.assertAlmostEqual(circle_wrap_lengths(p3, s3, np.array([1.0]))[0], HALF_WRAP)
+
+
+class CylinderWrap(unittest.TestCase):
+    def runTest(self):
+        p = np.array([[2.0, 0.0, 0.0], [2.0, 0.0, 0.0], [2.0, 0.0, 1.0]])
+        s = np.array([[-2.0, 0.0, 3.0], [-2.0, 0.0, 0.0], [2.0, 0.0, 4.0]])
+        lengths = cylinder_wrap_lengths(p, s, np.ones(3))
+        # unrolled helix
+        self.assertAlmostEqual(lengths[0], math.hypot(HALF_WRAP, 3.0))
+        self.assertAlmostEqual(lengths[1], HALF_WRAP)
+        # parallel to the axis: straight
+        self.assertAlmostEqual(lengths[2], 3.0)
+
+
+class WrappedPathLengths(unittest.TestCase):
+    def runTest(self):
+        points = np.array([[3, 0, 0], [7, 0, 0], [3, 0, 0], [7, 0, 0], [7, 0, 2], [0, 0, 0]], dtype=float)
+        offsets = np.array([0, 2, 5, 6, 6])
+        obstacles = WrapObstacles(["sphere", "cylinder"],
+                                  [obstacle_matrix([5, 0, 0], 1), obstacle_matrix([5, 10, 0], 1)],
+                                  ["WRAPPING_SPHERE", "WRAPPING_CYLINDER"])
+        lengths = wrapped_path_lengths(points, offsets, [["sphere"], ["cylinder", "unknown"], ["sphere"], []],
+                                       obstacles)
+        # the second muscle is not obstructed by the cylinder, the last two have no segments
+        np.testing.assert_allclose(lengths, [HALF_WRAP, 6, 0, 0])
+        np.testing.assert_allclose(wrapped_path_lengths(points, offsets, [[]] * 4, obstacles),
+                                   path_lengths(points, offsets))
+
+        # cylinder along the y axis of the world
+        rotation = obstacle_matrix([5, 0, 0], 1)
+        rotation[:3, :3] = [[1, 0, 0], [0, 0, -1], [0, 1, 0]]
+        obstacles = WrapObstacles(["cylinder"], [rotation], ["WRAPPING_CYLINDER"])
+        points = np.array([[3, 0, 0], [7, 3, 0]], dtype=float)
+        lengths = wrapped_path_lengths(points, np.array([0, 2]), [["cylinder"]], obstacles)
+        np.testing.assert_allclose(lengths, [math.hypot(HALF_WRAP, 3.0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,205 @@
+# #####
+#  This file is part of the RobotDesigner developed in the Neurorobotics
+#  subproject of the Human Brain Project (https://www.humanbrainproject.eu).
+#
+#  The Human Brain Project is a European Commission funded project
+#  in the frame of the Horizon2020 FET Flagship plan.
+#  (http://ec.europa.eu/programmes/horizon2020/en/h2020-section/fet-flagships)
+#
+#  The Robot Designer has initially been forked from the RobotEditor
+#  (https://gitlab.com/h2t/roboteditor) developed at the Karlsruhe Institute
+#  of Technology in the High Performance Humanoid Technologies Laboratory (H2T).
+# #####
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Lookup tables of muscle lengths and moment arms over the joint ranges.
+
+For every degree of freedom (the coordinate of a revolute or prismatic joint), the joint is swept over a grid between
+its limits while all other joints keep their current values. The forward kinematics of the sweep is computed on the
+captured robot (:mod:`.robot_ir`) without posing the armature: moving a joint transforms all path points attached to
+the segments below it by the same matrix, so the points of all muscles are transformed for all samples at once and the
+lengths follow from :func:`.muscle_paths.wrapped_path_lengths`. Wrapping objects attached to the moved segments are
+swept along with the points. Moment arms are the negative derivatives of the lengths with
+respect to the coordinates (as defined by OpenSim), computed by finite differences.
+
+Lengths are given in the coordinates of the armature (i.e., world lengths for unscaled models), revolute coordinates
+in radians.
+"""
+
+# System imports
+import math
+import numpy as np
+
+# RobotDesigner imports
+from .muscle_paths import WrapObstacles, wrapped_path_lengths
+
+TABLES_NAME = "muscle_tables"
+
+
+class MuscleTables(object):
+    """
+    Tables of ``M`` muscles over ``K`` degrees of freedom with ``S`` samples each. ``coordinates`` is (K, S),
+    ``lengths`` and ``moment_arms`` are (M, K, S) and NaN if a muscle does not span a degree of freedom.
+    """
+
+    __slots__ = ("muscles", "dofs", "coordinates", "lengths", "moment_arms")
+
+    def __init__(self, muscles, dofs, coordinates, lengths, moment_arms):
+        self.muscles = muscles
+        self.dofs = dofs
+        self.coordinates = coordinates
+        self.lengths = lengths
+        self.moment_arms = moment_arms
+
+    def spanned(self):
+        """
+        :return: (M, K) boolean array telling which muscle spans which degree of freedom
+        """
+        return ~np.isnan(self.lengths[:, :, 0])
+
+    def save_npz(self, f):
+        """
+        :param f: file name or binary file object
+        """
+        np.savez(f, muscles=np.array(self.muscles), dofs=np.array(self.dofs), coordinates=self.coordinates,
+                 lengths=self.lengths, moment_arms=self.moment_arms)
+
+    def write_csv(self, f):
+        """
+        Writes one row per muscle, spanned degree of freedom and sample.
+
+        :param f: text file object
+        """
+        f.write("muscle,dof,coordinate,length,moment_arm\n")
+        for m, k in zip(*np.nonzero(self.spanned())):
+            for coordinate, length, moment_arm in zip(self.coordinates[k], self.lengths[m, k],
+                                                      self.moment_arms[m, k]):
+                f.write("{},{},{!r},{!r},{!r}\n".format(self.muscles[m], self.dofs[k], float(coordinate),
+                                                      float(length), float(moment_arm)))
+
+
+def joint_motion(joint, delta):
+    """
+    :param joint: :class:`.robot_ir.Joint` (revolute or prismatic)
+    :param delta: (S,) changes of the coordinate (radians or meters)
+    :return: (S, 4, 4) transformations of the joint frame (the rotation or translation part of
+        :meth:`RDSegment.getTransform`)
+    """
+    axis = "XYZ".index(joint.axis)
+    motion = np.tile(np.eye(4), (len(delta), 1, 1))
+    if joint.jointMode == "PRISMATIC":
+        motion[:, axis, 3] = delta * (-1.0 if joint.axis_revert else 1.0)
+        return motion
+    # the reverted axis is part of the parent transform for revolute joints
+    # (i, j, axis) is a cyclic permutation of (x, y, z)
+    i, j = (axis + 1) % 3, (axis + 2) % 3
+    cos, sin = np.cos(delta), np.sin(delta)
+    motion[:, i, i] = cos
+    motion[:, j, j] = cos
+    motion[:, i, j] = -sin
+    motion[:, j, i] = sin
+    return motion
+
+
+def degrees_of_freedom(robot, samples):
+    """
+    :param robot: :class:`.robot_ir.Robot`
+    :param samples: number of samples per degree of freedom
+    :return: list of ``(link, current coordinate, sampled coordinates)`` for all revolute and prismatic joints
+    """
+    dofs = []
+    for link in robot.walk():
+        joint = link.joint
+        if joint.jointMode == "REVOLUTE":
+            dofs.append((link, math.radians(joint.theta.value),
+                         np.radians(np.linspace(joint.theta.min, joint.theta.max, samples))))
+        elif joint.jointMode == "PRISMATIC":
+            dofs.append((link, joint.d.value, np.linspace(joint.d.min, joint.d.max, samples)))
+    return dofs
+
+
+def _subtree(link):
+    bones = set()
+    stack = [link]
+    while stack:
+        current = stack.pop()
+        bones.add(current.bone_name)
+        stack.extend(current.children)
+    return bones
+
+
+def compute_muscle_tables(robot, samples=21):
+    """
+    Samples the lengths and moment arms of all muscles of a robot.
+
+    :param robot: :class:`.robot_ir.Robot` (as captured by :func:`.robot_ir.capture_robot`)
+    :param samples: number of samples per degree of freedom (at least 2)
+    :return: :class:`MuscleTables`
+    """
+    pose_matrices = {link.bone_name: link.pose_matrix for link in robot.links.values()}
+
+    # path points of all muscles in armature coordinates
+    offsets = np.cumsum([0] + [len(muscle.points) for muscle in robot.muscles])
+    frames = [frame for muscle in robot.muscles for frame in muscle.coord_frames[:len(muscle.points)]]
+    local = np.concatenate([muscle.points for muscle in robot.muscles] + [np.empty((0, 3))])
+    matrices = np.array([pose_matrices[frame] for frame in frames]).reshape(-1, 4, 4)
+    points = np.einsum("nij,nj->ni", matrices, np.c_[local, np.ones(len(local))])
+    frames = np.array(frames)
+    muscle_index = np.repeat(np.arange(len(robot.muscles)), np.diff(offsets))
+    wraps = [muscle.wraps for muscle in robot.muscles]
+
+    # wrapping objects in armature coordinates
+    wrap_links = {wrap.name: link for link in robot.links.values() for wrap in link.wrapping_objects}
+    wrap_names = [wrap.name for wrap in robot.wrapping_objects]
+    wrap_types = [wrap.WrappingType for wrap in robot.wrapping_objects]
+    wrap_frames = np.array([wrap.parent_bone for wrap in robot.wrapping_objects])
+    wrap_matrices = np.array([wrap_links[wrap.name].pose_matrix @ wrap.pose
+                              for wrap in robot.wrapping_objects]).reshape(-1, 4, 4)
+
+    dofs = degrees_of_freedom(robot, samples)
+    lengths = np.full((len(robot.muscles), len(dofs), samples), np.nan)
+    moment_arms = np.full_like(lengths, np.nan)
+    for k, (link, current, coordinates) in enumerate(dofs):
+        bones = list(_subtree(link))
+        moved = np.isin(frames, bones)
+        # muscles moved partially (with some but not all of their points) span the degree of freedom
+        moved_count = np.bincount(muscle_index[moved], minlength=len(robot.muscles))
+        spanned = (moved_count > 0) & (moved_count < np.diff(offsets))
+        if not spanned.any():
+            continue
+
+        frame = link.pose_matrix
+        sweep = frame @ joint_motion(link.joint, coordinates - current) @ np.linalg.inv(frame)
+        batch = np.broadcast_to(points[:, :3], (samples,) + points[:, :3].shape).copy()
+        batch[:, moved] = np.einsum("sij,nj->sni", sweep, points[moved])[..., :3]
+        wraps_moved = np.isin(wrap_frames, bones)
+
+        sampled = np.empty((len(robot.muscles), samples))
+        for i in range(samples):
+            matrices = wrap_matrices.copy()
+            matrices[wraps_moved] = sweep[i] @ wrap_matrices[wraps_moved]
+            sampled[:, i] = wrapped_path_lengths(batch[i], offsets, wraps,
+                                                 WrapObstacles(wrap_names, matrices, wrap_types))
+        lengths[spanned, k] = sampled[spanned]
+        moment_arms[spanned, k] = -np.gradient(sampled[spanned], coordinates, axis=-1)
+
+    return MuscleTables([muscle.name for muscle in robot.muscles], [link.joint.name for link, _, _ in dofs],
+                        np.array([coordinates for _, _, coordinates in dofs]).reshape(len(dofs), samples),
+                        lengths, moment_arms)
@@ -33,45 +33,18 @@
 import pyxb
 import os.path
 
-# Blender imports
-import bpy
-import mathutils
-
 # RD imports
 from ..osim import osim_dom  # xsd bindings
+from ..xml_stream import write_binding
+from ..package_manifest import package_manifest
+from ..package_archive import package_archive
+from ..muscle_tables import TABLES_NAME, compute_muscle_tables
 from ...core import RDOperator
 from ...core.logfile import export_logger
+from ...core.profiling import profiler
 from ...properties.globals import global_properties
-
-
-def get_muscles(active_model_name, context):
-    """
-    Return objects that represent muscles. And only those associated with the given model.
-
-    :param active_model_name: The name of the robot for which to find associated muscles.
-    :return: A list of associated objects that represent muscles.
-    """
-    return list(
-        filter(
-            lambda obj: obj.RobotDesigner.muscles.robotName == active_model_name,
-            context.scene.objects,
-        )
-    )
-
-
-def get_wrapping_objects(active_model_name, context):
-    """
-    helper function to get all wrapping objects of current model
-    @param active_model_name: the active robot model name
-    @param context: blender active context
-    @return:
-    """
-    meshes = [
-        obj
-        for obj in context.scene.objects
-        if obj.RobotDesigner.tag == "WRAPPING" and obj.parent.name == active_model_name
-    ]
-    return meshes
+from ..robot_cache import capture
+from ..robot_ir import matrix_to_pose
 
 
 class OsimExporter(object):
@@ -79,7 +52,11 @@ class OsimExporter(object):
     OpenSim Exporter class
     """
 
-    def __init__(self):
+    def __init__(self, robot):
+        """
+        :param robot: Snapshot of the robot (see :func:`.robot_ir.capture_robot`)
+        """
+        self.robot = robot
         self.doc = osim_dom.OpenSimDocument()
         self.doc.Version = "30000"
         self.doc.Model = pyxb.BIND(
@@ -109,10 +86,8 @@ class OsimExporter(object):
         @return:
         """
         assert filename.endswith(".osim")
-        with open(filename, "w") as f:
-            output = self.doc.toDOM()
-            output = output.toprettyxml()
-            f.write(output)
+        with package_manifest.open(filename) as f:
+            write_binding(self.doc, f)
 
     def add_muscles(self, context, muscles, wrapping_objects):
         """
@@ -123,9 +98,7 @@ class OsimExporter(object):
         @return:
         """
         for m in muscles:
-            wrapping_list = [
-                w for w in wrapping_objects if w.RobotDesigner.muscles.name == m.name
-            ]
+            wrapping_list = [w for w in wrapping_objects if w.muscle == m.name]
             self._add_blender_muscle(m, wrapping_list, context)
 
     def _select_pyxb_muscle_class(self, obj):
@@ -141,7 +114,7 @@ class OsimExporter(object):
             "RIGID_TENDON": osim_dom.RigidTendonMuscle,
             "MYOROBOTICS": osim_dom.MyoroboticsMuscle,
         }
-        return muscle_type_to_pyxb_type[str(obj.RobotDesigner.muscles.muscleType)]
+        return muscle_type_to_pyxb_type[str(obj.muscleType)]
 
     def _add_blender_muscle(self, m, w, context):
         """
@@ -159,10 +132,7 @@ class OsimExporter(object):
                     (type(e).__name__, str(e)))
             )
             return
-        # calc muscle length
-        bpy.ops.robotdesigner.calc_muscle_length(muscle=m.name)
-
-        if m.RobotDesigner.muscles.muscleType in [
+        if m.muscleType in [
             "THELEN",
             "MILLARD_EQUIL",
             "MILLARD_ACCEL",
@@ -232,19 +202,16 @@ class OsimExporter(object):
 
         def body(body, objects):
             return osim_dom.Body(
-                name=body.name, WrapObjectSet=self._add_wrap_set(objects)
+                name=body.bone_name, WrapObjectSet=self._add_wrap_set(objects)
             )
 
         bodies = []
 
-        for bone in context.active_object.data.bones:
-            object_list = []
-            for object in wrapping:
-                if object.parent_bone == bone.name:
-                    object_list.append(object)
+        for link in self.robot.links.values():
+            object_list = [w for w in wrapping if w.parent_bone == link.bone_name]
 
             if len(object_list) != 0:
-                bodies.append(body(bone, object_list))
+                bodies.append(body(link, object_list))
 
         return bodies
 
@@ -257,12 +224,12 @@ class OsimExporter(object):
         cylinders = [
             cylinder
             for cylinder in wrapping
-            if cylinder.RobotDesigner.wrap.WrappingType == "WRAPPING_CYLINDER"
+            if cylinder.WrappingType == "WRAPPING_CYLINDER"
         ]
         spheres = [
             sphere
             for sphere in wrapping
-            if sphere.RobotDesigner.wrap.WrappingType == "WRAPPING_SPHERE"
+            if sphere.WrappingType == "WRAPPING_SPHERE"
         ]
 
         def wrap_set():
@@ -329,29 +296,12 @@ class OsimExporter(object):
         @param wrapping: wrapping object
         @return:
         """
-        blender_scale_factor = bpy.context.active_object.scale
-        blender_scale_factor = [
-            blender_scale_factor[0],
-            blender_scale_factor[2],
-            blender_scale_factor[1],
-        ]
-        segment = wrapping.parent_bone
-        pose_bone = bpy.context.active_object.pose.bones[segment]
-        pose = (
-            pose_bone.matrix.inverted()
-            @ bpy.context.active_object.matrix_world.inverted()
-            @ bpy.data.objects[wrapping.name].matrix_world
-        )
-
-        pose_xyz = [i * j for i, j in zip(pose.translation, blender_scale_factor)]
-        pose_rpy = pose.to_euler()
+        blender_scale_factor = self.robot.sdf_scale_factor()
+        pose_xyz, pose_rpy = matrix_to_pose(wrapping.pose, blender_scale_factor)
 
         name = wrapping.name
 
-        scale = [
-            i * j
-            for i, j in zip(bpy.data.objects[wrapping.name].scale, blender_scale_factor)
-        ]
+        scale = (wrapping.scale * blender_scale_factor).tolist()
         radius = scale[0]
         depth = scale[2]
 
@@ -366,15 +316,13 @@ class OsimExporter(object):
         @return:
         """
 
-        wrapping_objects = [
-            objects for objects in m.RobotDesigner.muscles.connectedWraps
-        ]
+        wrapping_objects = m.wraps
         length = len(wrapping_objects) + 1
 
         def path_wrap_to_pyxb(obj):
             i, object = obj
             return osim_dom.PathWrap(
-                wrap_object=object.wrappingName,
+                wrap_object=object,
                 method="midpoint",
                 name="PathWrap%i" % (length - i),
             )
@@ -391,9 +339,9 @@ class OsimExporter(object):
 
         def transform_to_pyxb(nd):
             name, parent, (x, y, z) = nd
-            x = x * bpy.data.objects[context.active_object.name].scale[0]
-            y = y * bpy.data.objects[context.active_object.name].scale[1]
-            z = z * bpy.data.objects[context.active_object.name].scale[2]
+            x = x * self.robot.scale[0]
+            y = y * self.robot.scale[1]
+            z = z * self.robot.scale[2]
             return osim_dom.PathPoint(
                 location=osim_dom.vector3("%f %f %f" % (x, y, z)),
                 body=parent,
@@ -412,35 +360,39 @@ class OsimExporter(object):
         @return:
         """
 
-        def transform_vertex(arg):
-            i, pt = arg
-            name = "{}_node{}".format(m.name, i)
-            parent = m.RobotDesigner.muscles.pathPoints[i].coordFrame
-            x, y, z = pt.co
-            active_model = global_properties.model_name.get(context.scene)
-            pose_bone = bpy.data.objects[active_model].pose.bones[parent]
-            pose = (
-                pose_bone.matrix.inverted()
-                @ bpy.data.objects[active_model].matrix_world.inverted()
-                @ bpy.data.objects[m.name].matrix_world
-            )
-            vec = mathutils.Vector((x, y, z, 1))
-            trans = mathutils.Matrix.Translation(vec)
-            pose_rel = pose @ trans
+        return [
+            ("{}_node{}".format(m.name, i), parent, tuple(point))
+            for i, (parent, point) in enumerate(zip(m.coord_frames, m.points.tolist()))
+        ]
 
-            # bpy.data.meshes.remove(muscle_mesh, True)
-            m.data.bevel_depth = global_properties.muscle_dim.get(context.scene)
-            return (name, parent, (pose_rel[0][3], pose_rel[1][3], pose_rel[2][3]))
+    def _add_pyxb_muscle(self, m, context):
+        self.muscle_type_to_pyxb_list[type(m).__name__].append(m)
 
-        m.data.bevel_depth = 0
-        muscle_mesh = m.to_mesh()
 
-        return map(transform_vertex, enumerate(muscle_mesh.vertices))
+def write_muscle_tables(robot, toplevel_directory, samples):
+    """
+    Writes the muscle length and moment arm tables (see :mod:`.muscle_tables`) as ``.npz`` and ``.csv`` file next
+    to ``muscles.osim``.
 
-    def _add_pyxb_muscle(self, m, context):
-        self.muscle_type_to_pyxb_list[type(m).__name__].append(m)
+    :param robot: Snapshot of the robot (see :func:`.robot_ir.capture_robot`)
+    :param toplevel_directory: The directory in which to export
+    :param samples: number of samples per degree of freedom
+    """
+    tables = compute_muscle_tables(robot, samples)
+    with package_manifest.open(os.path.join(toplevel_directory, TABLES_NAME + ".csv")) as f:
+        tables.write_csv(f)
+
+    npz_path = os.path.join(toplevel_directory, TABLES_NAME + ".npz")
+    # incremental exports only replace the file if the tables changed
+    part_path = npz_path + ".part" if package_manifest.active else npz_path
+    with open(part_path, "wb") as f:
+        tables.save_npz(f)
+    if package_manifest.active:
+        package_manifest.replace(part_path, npz_path)
+    package_archive.add(npz_path)
 
 
+@profiler.profiled()
 def create_osim(
     operator: RDOperator,
     context,
@@ -449,6 +401,7 @@ def create_osim(
     toplevel_directory: str,
     in_ros_package: bool,
     abs_filepaths=False,
+    robot=None,
 ):
     """
     Creates the .osim muscle definition file
@@ -460,15 +413,23 @@ def create_osim(
     :param toplevel_directory: The directory in which to export
     :param in_ros_package: Whether to export into a ros package or plain files
     :param abs_filepaths: If not intstalled into a ros package decides whether to use absolute file paths.
+    :param robot: Snapshot of the robot (see :func:`.robot_ir.capture_robot`). Captured if not given.
     :return:
     """
 
-    muscles = get_muscles(context.active_object.name, context)
-    wrapping_objects = get_wrapping_objects(context.active_object.name, context)
+    if robot is None:
+        robot = capture(context, context.active_object)
+    muscles = robot.muscles
+    wrapping_objects = robot.wrapping_objects
     if muscles:
         pyxb.utils.domutils.BindingDOMSupport.SetDefaultNamespace(None)
-        exporter = OsimExporter()
+        exporter = OsimExporter(robot)
         exporter.add_muscles(context, muscles, wrapping_objects)
         if wrapping_objects:
             exporter.add_body_set(context, wrapping_objects)
         exporter.write_osim_file(os.path.join(toplevel_directory, "muscles.osim"))
+        if global_properties.export_muscle_tables.get(context.scene):
+            with profiler.phase("muscle_tables"):
+                write_muscle_tables(
+                    robot, toplevel_directory, global_properties.muscle_table_samples.get(context.scene)
+                )
@@ -41,19 +41,65 @@ from mathutils import Matrix, Euler, Vector
 from ..osim import osim_dom  # xsd bindings
 from ...core import RDOperator
 from ...core.logfile import export_logger
+from ...core.profiling import profiler
 from ...properties.globals import global_properties
+from ..package_reader import package_reader
 
-from ...operators.muscles import CreateNewMuscle, CreateNewPathpoint
-from ...operators.segments import SelectSegment
 from ...operators.model import SelectModel
-from ...operators.rigid_bodies import SelectGeometry
-from ...operators.mesh_generation import AttachWrappingObject
 
 from ..sdf.generic.helpers import string_to_list
 
 
 __author__ = "Benedikt Feldotto(TUM)"
 
+MUSCLE_TYPES = [
+    ("Thelen2003Muscle", "THELEN"),
+    ("Millard2012EquilibriumMuscle", "MILLARD_EQUIL"),
+    ("Millard2012AccelerationMuscle", "MILLARD_ACCEL"),
+    ("RigidTendonMuscle", "RIGID_TENDON"),
+    ("MyoroboticsMuscle", "MYOROBOTICS"),
+]
+WRAPPING_TYPES = [
+    ("WrapSphere", "WRAPPING_SPHERE"),
+    ("WrapCylinder", "WRAPPING_CYLINDER"),
+]
+
+
+def _elements(node, *path):
+    """
+    :param node: .osim pyxb instance
+    :param path: names of the nested child elements
+    :return: list of the (plural) elements at the end of the path (empty if an element along the path is missing)
+    """
+    try:
+        for name in path:
+            node = getattr(node, name)
+    except AttributeError:
+        return []
+    return list(node) if node is not None else []
+
+
+def assign_hooks(muscle, hooks):
+    """
+    Assigns the n-th spline point of a muscle to the n-th hook modifier.
+    :param muscle: muscle object
+    :param hooks: list of hook modifiers
+    """
+    if hasattr(hooks[0], "vertex_indices_set"):
+        for index, hook in enumerate(hooks):
+            hook.vertex_indices_set([index])
+        return
+
+    # blender < 2.90: assign the selected point in edit mode
+    bpy.context.view_layer.objects.active = muscle
+    bpy.ops.object.mode_set(mode="EDIT")
+    points = muscle.data.splines[0].points
+    for index, hook in enumerate(hooks):
+        bpy.ops.curve.select_all(action="DESELECT")
+        points[index].select = True
+        bpy.ops.object.hook_assign(modifier=hook.name)
+    bpy.ops.object.mode_set(mode="OBJECT")
+
 
 class OsimImporter(object):
     """
@@ -66,6 +112,8 @@ class OsimImporter(object):
         self.logger = operator.logger
         self.operator = operator
         self.controllers = None
+        self.model = None
+        self.wrapping_objects = {}
 
         # create dom object from .osim file
         base_dir = os.path.dirname(file_path)
@@ -73,29 +121,45 @@ class OsimImporter(object):
         self.logger.debug(musclepath)
         export_logger.debug("mpath: {}".format(musclepath))
         muscles_osim = open(
-            base_dir + "/" + "/".join(musclepath.split("/", 3)[3:])[:-2]
+            package_reader.extract(base_dir + "/" + "/".join(musclepath.split("/", 3)[3:])[:-2])
         ).read()
         self.muscles = osim_dom.CreateFromDocument(muscles_osim)
 
-    def import_muscles(self, muscle, type):
+    def segment_world(self, segment_name):
+        """
+        :param segment_name: name of the segment (OpenSim body)
+        :return: world pose of the segment
+        """
+        return self.model.matrix_world @ self.model.pose.bones[segment_name].matrix
+
+    def import_muscle(self, muscle, type):
         """
         import a single muscle from the osim file
         :param muscle: .osim pyxb muscle instance
-        :return: type: string for muscle type
+        :param type: string for muscle type
         """
-        CreateNewMuscle.run(muscle.name)
-        RDmuscle = bpy.data.objects[muscle.name]
-
-        RDmuscle.RobotDesigner.muscles.muscleType = type
+        # basic muscle visualization data (as created by CreateNewMuscle)
+        muscleVis = bpy.data.curves.new(name=muscle.name, type="CURVE")
+        muscleVis.dimensions = "3D"
+        muscleVis.fill_mode = "FULL"
+        muscleVis.bevel_depth = global_properties.muscle_dim.get(bpy.context.scene)
+        RDmuscle = bpy.data.objects.new(muscle.name, muscleVis)
+        bpy.context.scene.collection.objects.link(RDmuscle)
+        lmat = bpy.data.materials.new(muscle.name + "_vis")
+        lmat.diffuse_color = (0.0, 0.0, 1.0, 1.0)
+        muscleVis.materials.append(lmat)
+
+        muscleData = RDmuscle.RobotDesigner.muscles
+        muscleData.name = muscle.name
+        muscleData.robotName = self.model.name
+
+        # the update of the muscle type colors the active muscle
+        global_properties.active_muscle.set(bpy.context.scene, RDmuscle.name)
+        muscleData.muscleType = type
 
         if type in ["THELEN", "MILLARD_EQUIL", "MILLARD_ACCEL", "RIGID_TENDON"]:
-
-            RDmuscle.RobotDesigner.muscles.length = muscle.optimal_fiber_length[0] / 0.9
-            RDmuscle.RobotDesigner.muscles.max_isometric_force = (
-                muscle.max_isometric_force[0]
-            )
-
-        global_properties.active_muscle.set(bpy.context.scene, muscle.name)
+            muscleData.length = muscle.optimal_fiber_length[0] / 0.9
+            muscleData.max_isometric_force = muscle.max_isometric_force[0]
 
         self.import_pathpoints(muscle, RDmuscle)
         self.connect_wrapping_objects(muscle, RDmuscle)
@@ -105,284 +169,170 @@ class OsimImporter(object):
         Create dependencies between muscle and corresponding wrapping objects
         :param muscle: .osim pyxb muscle instance
         :param RDmuscle: muscle object
-        :return:
         """
-
-        # iterate through all connected wrapping objects to the pyxb muscle instance
-        w = 0
-        while True:
-            try:
-                # add muscle to muscle list of all connected wrapping objects
-                path = muscle.GeometryPath.PathWrapSet.objects.PathWrap[w]
-                wrapping_object = bpy.context.scene.objects[path.wrap_object]
-                wrapping_object.RobotDesigner.wrap.muscleNames.add()
-                nr = len(wrapping_object.RobotDesigner.wrap.muscleNames)
-                wrapping_object.RobotDesigner.wrap.muscleNames[
-                    nr - 1
-                ].name = RDmuscle.name
-
-                # add wrapping object to wrapping objects list of muscle
-                wrapList = RDmuscle.RobotDesigner.muscles.connectedWraps
-                wrapList.add()
-                nrw = len(wrapList)
-                wrapList[nrw - 1].wrappingName = wrapping_object.name
-                w += 1
-            except:
-                break
+        for path in _elements(muscle, "GeometryPath", "PathWrapSet", "objects", "PathWrap"):
+            wrapping_object = self.wrapping_objects.get(path.wrap_object) or \
+                bpy.context.scene.objects.get(path.wrap_object)
+            if wrapping_object is None:
+                export_logger.warning(
+                    "Wrapping object {} of muscle {} not found".format(path.wrap_object, RDmuscle.name)
+                )
+                continue
+            # add muscle to muscle list of the wrapping object and vice versa
+            wrapping_object.RobotDesigner.wrap.muscleNames.add().name = RDmuscle.name
+            RDmuscle.RobotDesigner.muscles.connectedWraps.add().wrappingName = wrapping_object.name
 
     def import_pathpoints(self, muscle, RDmuscle):
         """
-        Import muscle pathpoints from the osim file
+        Import muscle pathpoints from the osim file. The spline points are created at once and hooked to their
+        segments without selecting them.
         :param muscle: .osim pyxb muscle instance
-        :return: RDmuscle: Robot Designer muscle instance
+        :param RDmuscle: Robot Designer muscle instance
         """
-        p = 0
-        while True:
-            try:
-                # current pathpoint
-                pathpoint = muscle.GeometryPath.PathPointSet.objects.PathPoint[p]
-
-                # get pathpoint parent world pose
-                model = bpy.data.objects[
-                    global_properties.model_name.get(bpy.context.scene)
-                ]
-                pose_bone = model.pose.bones[pathpoint.body]
-                segment_world = model.matrix_world @ pose_bone.matrix
-
-                # calculate pathpoint world pose
-                location_local = [float(x) for x in pathpoint.location.split()]
-                location_global = segment_world @ Matrix.Translation(
-                    (location_local[0], location_local[1], location_local[2], 1)
-                )
-
-                # create new pathpoint and set parameters of RD pathpoint object
-                CreateNewPathpoint.run()
-                location_global = location_global.to_translation()
-                RDmuscle.data.splines[0].points[p].co = (
-                    location_global[0],
-                    location_global[1],
-                    location_global[2],
-                    1,
-                )
-
-                #  hook pathpoints to segments
-                RDmuscle.RobotDesigner.muscles.pathPoints[p].coordFrame = pathpoint.body
-                bpy.ops.RobotDesigner.select_segment_muscle(
-                    segment_name=pathpoint.body, pathpoint_nr=p + 1
-                )
-
-                p += 1
-
-            except:
-                break
-
-    def import_wrapping_sphere(self, body, wrapping):
+        pathpoints = _elements(muscle, "GeometryPath", "PathPointSet", "objects", "PathPoint")
+        if not pathpoints:
+            return
+
+        segment_worlds = [self.segment_world(pathpoint.body) for pathpoint in pathpoints]
+        coordinates = []
+        for pathpoint, segment_world in zip(pathpoints, segment_worlds):
+            location_local = Vector([float(x) for x in pathpoint.location.split()])
+            coordinates.extend((segment_world @ location_local).to_tuple() + (1.0,))
+
+        spline = RDmuscle.data.splines.new("POLY")
+        spline.points.add(len(pathpoints) - 1)
+        spline.points.foreach_set("co", coordinates)
+
+        hooks = []
+        for p, (pathpoint, segment_world) in enumerate(zip(pathpoints, segment_worlds)):
+            RDmuscle.RobotDesigner.muscles.pathPoints.add().coordFrame = pathpoint.body
+
+            #  hook pathpoints to segments
+            hok = RDmuscle.modifiers.new(name=RDmuscle.name + "_" + str(p), type="HOOK")
+            hok.object = self.model
+            hok.subtarget = pathpoint.body
+            hok.falloff_type = "NONE"
+            # as bpy.ops.object.hook_reset: the point keeps its current location
+            hok.matrix_inverse = segment_world.inverted() @ RDmuscle.matrix_world
+            hooks.append(hok)
+
+        assign_hooks(RDmuscle, hooks)
+
+    @staticmethod
+    def create_template(type):
         """
-        Create wrapping sphere from osim file
-        :param body: parent segment
-        :param wrapping: .osim pyxb wrapping object instance
-        :return:
+        Creates the mesh wrapping objects of a type are copied from
+        :param type: ``"WRAPPING_SPHERE"`` or ``"WRAPPING_CYLINDER"``
+        :return: the mesh
         """
-        radius = wrapping.radius
-        bpy.ops.mesh.primitive_uv_sphere_add(
-            radius=1.0, calc_uvs=True, enter_editmode=False, location=(0, 0, 0)
-        )
-        sphere = bpy.context.active_object
-        sphere.name = wrapping.name
-
-        lmat = bpy.data.materials.new(sphere.name)
-        lmat.diffuse_color = (0.0, 0.135, 0.0, 1.0)
-        # lmat.use_shadeless = True
-        sphere.data.materials.append(lmat)
-
-        sphere.RobotDesigner.tag = "WRAPPING"
-        sphere.RobotDesigner.wrap.WrappingType = "WRAPPING_SPHERE"
-
-        model = bpy.data.objects[global_properties.model_name.get(bpy.context.scene)]
-        pose_bone = model.pose.bones[body.name]
-        segment_world = model.matrix_world @ pose_bone.matrix
-
-        model_posexyz = string_to_list(wrapping.translation[:])[0:3]
-        model_poserpy = [0, 0, 0]
-        trafo = (
-            Matrix.Translation(Vector(model_posexyz))
-            @ Euler(model_poserpy, "XYZ").to_matrix().to_4x4()
-        )
-
-        bpy.ops.object.transform_apply(location=True, rotation=True, scale=True)
-        bpy.context.active_object.matrix_world = (
-            segment_world @ trafo @ bpy.context.active_object.matrix_world
-        )
-
-        assigned_name = bpy.context.active_object.name
-
-        bpy.ops.object.transform_apply(location=False, rotation=False, scale=True)
-        SelectModel.run(model_name=model.name)
-        SelectSegment.run(segment_name=body.name)
-        SelectGeometry.run(geometry_name=assigned_name)
-
-        bpy.data.objects[sphere.name].RobotDesigner.wrap_scaling.scale_all = radius
-        # Model has to be selected and active in order to update scale
-        # Geometry has to be selected, else the update function itself will take a different object
-        bpy.data.objects[sphere.name].RobotDesigner.wrap_scaling.scale_all_update(
-            bpy.context
-        )
-
-        AttachWrappingObject.run()
+        if type == "WRAPPING_SPHERE":
+            bpy.ops.mesh.primitive_uv_sphere_add(
+                radius=1.0, calc_uvs=True, enter_editmode=False, location=(0, 0, 0)
+            )
+        else:
+            bpy.ops.mesh.primitive_cylinder_add(
+                radius=1.0, depth=1.0, enter_editmode=False, location=(0, 0, 0)
+            )
+        template = bpy.context.active_object
+        mesh = template.data
+        bpy.data.objects.remove(template)
+        return mesh
 
-    def import_wrapping_cylinder(self, body, wrapping):
+    def import_wrapping_object(self, body, wrapping, type, template):
         """
-        Create wrapping cylinder from osim file
+        Create wrapping sphere or cylinder from osim file
         :param body: parent segment
         :param wrapping: .osim pyxb wrapping object instance
-        :return:
+        :param type: ``"WRAPPING_SPHERE"`` or ``"WRAPPING_CYLINDER"``
+        :param template: unit mesh of the type (see :meth:`create_template`)
         """
-        radius = wrapping.radius
-        depth = wrapping.length
-        bpy.ops.mesh.primitive_cylinder_add(
-            radius=1.0, depth=1.0, enter_editmode=False, location=(0, 0, 0)
-        )
-        cylinder = bpy.context.active_object
-        cylinder.name = wrapping.name
+        wrapping_object = bpy.data.objects.new(wrapping.name, template.copy())
+        wrapping_object.data.name = wrapping_object.name
+        bpy.context.collection.objects.link(wrapping_object)
 
-        lmat = bpy.data.materials.new(cylinder.name)
+        lmat = bpy.data.materials.new(wrapping_object.name)
         lmat.diffuse_color = (0.0, 0.135, 0.0, 1.0)
-        # lmat.use_shadeless = True
-        cylinder.data.materials.append(lmat)
-
-        cylinder.RobotDesigner.tag = "WRAPPING"
-        cylinder.RobotDesigner.wrap.WrappingType = "WRAPPING_CYLINDER"
+        wrapping_object.data.materials.append(lmat)
 
-        model = bpy.data.objects[global_properties.model_name.get(bpy.context.scene)]
-        pose_bone = model.pose.bones[body.name]
-        segment_world = model.matrix_world @ pose_bone.matrix
+        wrapping_object.RobotDesigner.tag = "WRAPPING"
+        wrapping_object.RobotDesigner.wrap.WrappingType = type
 
-        model_posexyz = string_to_list(wrapping.translation[:])
-        model_poserpy = string_to_list(wrapping.xyz_body_rotation[:])
+        if type == "WRAPPING_SPHERE":
+            model_posexyz = string_to_list(wrapping.translation[:])[0:3]
+            model_poserpy = [0, 0, 0]
+        else:
+            model_posexyz = string_to_list(wrapping.translation[:])
+            model_poserpy = string_to_list(wrapping.xyz_body_rotation[:])
         trafo = (
             Matrix.Translation(Vector(model_posexyz))
             @ Euler(model_poserpy, "XYZ").to_matrix().to_4x4()
         )
 
-        bpy.ops.object.transform_apply(location=True, rotation=True, scale=True)
-        bpy.context.active_object.matrix_world = (
-            segment_world @ trafo @ bpy.context.active_object.matrix_world
-        )
-
-        assigned_name = bpy.context.active_object.name
-
-        bpy.ops.object.transform_apply(location=False, rotation=False, scale=True)
-        SelectModel.run(model_name=model.name)
-        SelectSegment.run(segment_name=body.name)
-        SelectGeometry.run(geometry_name=assigned_name)
-
-        bpy.data.objects[cylinder.name].RobotDesigner.wrap_scaling.scale_radius = radius
-        bpy.data.objects[cylinder.name].RobotDesigner.wrap_scaling.scale_depth = depth
-        # Model has to be selected and active in order to update scale
-        # Geometry has to be selected, else the update function itself will take a different object
-        bpy.data.objects[cylinder.name].RobotDesigner.wrap_scaling.scale_radius_update(
-            bpy.context
-        )
-        bpy.data.objects[cylinder.name].RobotDesigner.wrap_scaling.scale_depth_update(
-            bpy.context
-        )
-
-        AttachWrappingObject.run()
-
+        # parent to the segment as bpy.ops.object.parent_set(type="BONE", keep_transform=False) (bone parents are
+        # located at the tail)
+        pose_bone = self.model.pose.bones[body.name]
+        segment_world = self.segment_world(body.name)
+        wrapping_object.parent = self.model
+        wrapping_object.parent_type = "BONE"
+        wrapping_object.parent_bone = body.name
+        wrapping_object.matrix_parent_inverse = (
+            segment_world @ Matrix.Translation((0, pose_bone.length, 0))
+        ).inverted()
+        wrapping_object.matrix_basis = segment_world @ trafo
+
+        # the update callbacks of the scaling properties scale the wrapping object selected in the GUI
+        radius = float(wrapping.radius)
+        scaling = wrapping_object.RobotDesigner.wrap_scaling
+        if type == "WRAPPING_SPHERE":
+            scaling["scale_all"] = radius
+            wrapping_object.scale = (radius, radius, radius)
+        else:
+            depth = float(wrapping.length)
+            scaling["scale_radius"] = radius
+            scaling["scale_depth"] = depth
+            wrapping_object.scale = (radius, radius, depth)
+
+        self.wrapping_objects[wrapping.name] = wrapping_object
+
+    def import_wrapping_objects(self):
+        """
+        Imports the wrapping objects of all bodies. The meshes are copied from one template per type.
+        """
+        templates = {}
+        bodies = [body for body_set in _elements(self.muscles.Model, "BodySet")
+                  for body in _elements(body_set, "objects", "Body")]
+        for body in bodies:
+            export_logger.info("\nimporting for {}".format(body.name))
+            for wrap_set in _elements(body, "WrapObjectSet"):
+                for element, type in WRAPPING_TYPES:
+                    for wrapping in _elements(wrap_set, "objects", element):
+                        export_logger.info("importing {}: {}".format(element, wrapping.name))
+                        if type not in templates:
+                            templates[type] = self.create_template(type)
+                        self.import_wrapping_object(body, wrapping, type, templates[type])
+
+        for template in templates.values():
+            bpy.data.meshes.remove(template)
+
+    @profiler.profiled()
     def import_osim(self):
         """
         Imports all listed muscles and wrapping objects in .osim file
         """
-        # import wrapping objects
-        b = 0
-        while True:
-            try:
-                body = self.muscles.Model.BodySet[0].objects.Body[b]
-                export_logger.info("\nimporting for {}".format(body.name))
-                s = 0
-                while True:
-                    try:
-                        wrapping_sphere = body.WrapObjectSet[0].objects.WrapSphere[s]
-                        export_logger.info(
-                            "importing wrapping sphere: {}".format(wrapping_sphere.name)
-                        )
-                        self.import_wrapping_sphere(body, wrapping_sphere)
-                        s += 1
-                    except:
-                        break
-                c = 0
-                while True:
+        self.model = bpy.data.objects[global_properties.model_name.get(bpy.context.scene)]
+
+        with profiler.phase("wrapping_objects"):
+            self.import_wrapping_objects()
+
+        with profiler.phase("muscles"):
+            for element, type in MUSCLE_TYPES:
+                muscles = _elements(self.muscles.Model, "ForceSet", "objects", element)
+                for muscle in muscles:
                     try:
-                        wrapping_cylinder = body.WrapObjectSet[0].objects.WrapCylinder[
-                            c
-                        ]
-                        export_logger.info(
-                            "importing wrapping cylinder: {}".format(wrapping_cylinder.name)
-                        )
-                        self.import_wrapping_cylinder(body, wrapping_cylinder)
-                        c += 1
-                    except:
-                        break
-                b += 1
-            except:
-                break
-
-        # import Thelen2003 Muscles
-        m = 0
-        while True:
-            try:
-                muscle = self.muscles.Model.ForceSet.objects.Thelen2003Muscle[m]
-                type = "THELEN"
-                self.import_muscles(muscle, type)
-                m += 1
-                export_logger.info("import thelen")
-            except:
-                break
-
-        # import Millard2012 Equilibrium Muscles
-        m = 0
-        while True:
-            try:
-                muscle = (
-                    self.muscles.Model.ForceSet.objects.Millard2012EquilibriumMuscle[m]
-                )
-                type = "MILLARD_EQUIL"
-                self.import_muscles(muscle, type)
-                m += 1
-            except:
-                break
-
-        # import Millard2012 Acceleration Muscles
-        m = 0
-        while True:
-            try:
-                muscle = (
-                    self.muscles.Model.ForceSet.objects.Millard2012AccelerationMuscle[m]
-                )
-                type = "MILLARD_ACCEL"
-                self.import_muscles(muscle, type)
-                m += 1
-            except:
-                break
-
-        # import Rigid Tendon Muscles
-        m = 0
-        while True:
-            try:
-                muscle = self.muscles.Model.ForceSet.objects.RigidTendonMuscle[m]
-                type = "RIGID_TENDON"
-                self.import_muscles(muscle, type)
-                m += 1
-            except:
-                break
-
-        # import Myorobotics Muscles
-        m = 0
-        while True:
-            try:
-                muscle = self.muscles.Model.ForceSet.objects.MyoroboticsMuscle[m]
-                type = "MYOROBOTICS"
-                self.import_muscles(muscle, type)
-                m += 1
-            except:
-                break
+                        self.import_muscle(muscle, type)
+                    except (AttributeError, KeyError, TypeError, ValueError) as e:
+                        export_logger.warning("Could not import muscle {}: {}".format(muscle.name, e))
+                if muscles:
+                    export_logger.info("imported {} {}".format(len(muscles), element))
+
+        SelectModel.run(model_name=self.model.name)
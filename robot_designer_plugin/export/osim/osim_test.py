@@ -33,9 +33,13 @@
 import os
 import sys
 import unittest
+import io
 import pyxb
 import osim_dom
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import xml_stream
+
 
 class XmlBuildLearningTest(unittest.TestCase):
     def runTest(self):
@@ -103,5 +107,34 @@ class SchemaSanityCheckBindings(unittest.TestCase):
         osim_dom.CreateFromDocument(sample_xml)
 
 
+class StreamingRoundTrip(unittest.TestCase):
+    def write(self):
+        with open(
+            os.path.join(os.path.dirname(__file__), "test_sample_muscle_file.osim"), "r"
+        ) as f:
+            sample_xml = f.read()
+        expected = osim_dom.CreateFromDocument(sample_xml).toDOM().toprettyxml()
+        stream = io.StringIO()
+        xml_stream.write_binding(osim_dom.CreateFromDocument(sample_xml), stream)
+        self.assertEqual(stream.getvalue(), expected)
+        return stream.getvalue()
+
+    def runTest(self):
+        newdoc = osim_dom.CreateFromDocument(self.write())
+        self.assertTrue(newdoc.Model.ForceSet.objects.Millard2012EquilibriumMuscle)
+
+
+class StreamingNamespaceDeclarations(StreamingRoundTrip):
+    def runTest(self):
+        # pyxb declares the default namespace on the document element after its content has been written
+        bds = pyxb.utils.domutils.BindingDOMSupport
+        namespace = pyxb.namespace.NamespaceForURI("http://example.org/osim", create_if_missing=True)
+        bds.SetDefaultNamespace(namespace)
+        try:
+            self.assertIn('xmlns="http://example.org/osim"', self.write())
+        finally:
+            bds.SetDefaultNamespace(None)
+
+
 if __name__ == "__main__":
     unittest.main()
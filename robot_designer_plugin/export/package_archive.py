@@ -0,0 +1,201 @@
+# #####
+#  This file is part of the RobotDesigner developed in the Neurorobotics
+#  subproject of the Human Brain Project (https://www.humanbrainproject.eu).
+#
+#  The Human Brain Project is a European Commission funded project
+#  in the frame of the Horizon2020 FET Flagship plan.
+#  (http://ec.europa.eu/programmes/horizon2020/en/h2020-section/fet-flagships)
+#
+#  The Robot Designer has initially been forked from the RobotEditor
+#  (https://gitlab.com/h2t/roboteditor) developed at the Karlsruhe Institute
+#  of Technology in the High Performance Humanoid Technologies Laboratory (H2T).
+# #####
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Streaming export of zipped packages.
+
+During a :meth:`PackageArchive.session`, the package is written into a zip file instead of a directory:
+
+- Text files opened with :meth:`PackageArchive.open` (the SDF/URDF, ``model.config``, ``muscles.osim`` and rqt
+  files, see :meth:`.package_manifest.PackageManifest.open`) are written directly into a zip entry.
+- Files that have to be created on disk (meshes, the thumbnail) are moved into the archive with
+  :meth:`PackageArchive.add` right after they have been written, such that at most a few of them exist in the
+  temporary directory at the same time.
+- Any other file found in the temporary directory when the session ends is added as well.
+
+Files with one of the *store-only* extensions (e.g., ``.png``) are not compressed. With parallel compression, added
+files are compressed and written by a background thread while the export continues (zlib releases the GIL).
+"""
+
+# System imports
+import io
+import os
+import logging
+import zipfile
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+# the export logger of :mod:`..core.logfile` (this module does not depend on blender)
+export_logger = logging.getLogger("Export")
+
+# files waiting in the temporary directory for the background thread
+PENDING_LIMIT = 4
+
+
+def parse_extensions(extensions):
+    """
+    :param extensions: whitespace or comma separated extensions (e.g., ``".png .stl"``)
+    :return: set of lower case extensions with leading dot
+    """
+    result = set()
+    for extension in extensions.replace(",", " ").split():
+        extension = extension.lower()
+        result.add(extension if extension.startswith(".") else "." + extension)
+    return result
+
+
+class PackageArchive(object):
+    """
+    Writes the files of a package into a zip archive while they are exported.
+    """
+
+    def __init__(self):
+        self.archive = None
+        self.directory = None
+        self.compresslevel = 6
+        self.store_extensions = set()
+        self.executor = None
+        self.names = set()
+        self.pending = []
+
+    @property
+    def active(self):
+        return self.archive is not None
+
+    @contextmanager
+    def session(self, zip_path, directory, compresslevel=6, store_extensions=(), parallel=False):
+        """
+        Opens the archive. The entry names are the paths of the exported files relative to ``directory``.
+
+        :param zip_path: The zip file
+        :param directory: The (temporary) directory the package is exported to
+        :param compresslevel: deflate level (0-9)
+        :param store_extensions: extensions of files which are not compressed
+        :param parallel: compress and write added files in a background thread
+        """
+        self.directory = os.path.abspath(directory)
+        self.compresslevel = compresslevel
+        self.store_extensions = set(store_extensions)
+        self.archive = zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED, compresslevel=compresslevel)
+        if parallel:
+            self.executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            yield self
+            self._drain(0)
+            # files that were not passed to the archive by the exporters
+            for root, _, files in os.walk(self.directory):
+                for name in sorted(files):
+                    self.add(os.path.join(root, name))
+            self._drain(0)
+        except BaseException:
+            # do not leave an incomplete archive
+            self._shutdown()
+            self.archive.close()
+            os.remove(zip_path)
+            raise
+        finally:
+            self._shutdown()
+            self.archive.close()
+            self.archive = None
+            self.names = set()
+            self.pending = []
+
+    def _shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def _name(self, file_path):
+        return os.path.relpath(os.path.abspath(file_path), self.directory).replace(os.sep, "/")
+
+    def _compress_type(self, file_path):
+        stored = os.path.splitext(file_path)[1].lower() in self.store_extensions
+        return zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED
+
+    @contextmanager
+    def open(self, file_path):
+        """
+        Opens a text file of the package for writing. During a session, the text is written into the archive.
+
+        :param file_path: The path of the file in the (temporary) package directory
+        """
+        if not self.active:
+            with open(file_path, "w") as f:
+                yield f
+            return
+
+        self._drain(0)
+        name = self._name(file_path)
+        self.names.add(name)
+        if self._compress_type(file_path) == zipfile.ZIP_STORED:
+            info = zipfile.ZipInfo(name)
+            info.compress_type = zipfile.ZIP_STORED
+            name = info
+        # entries opened by name use the compression (and level) of the archive
+        with self.archive.open(name, "w") as entry:
+            with io.TextIOWrapper(entry, encoding="utf-8") as f:
+                yield f
+
+    def add(self, file_path):
+        """
+        Moves a file of the package into the archive (the file is deleted). Does nothing outside of a session.
+
+        :param file_path: The path of the file in the (temporary) package directory
+        """
+        if not self.active or not os.path.isfile(file_path):
+            return
+
+        name = self._name(file_path)
+        if name in self.names:
+            os.remove(file_path)
+            return
+        self.names.add(name)
+
+        if self.executor is None:
+            self._write(file_path, name)
+        else:
+            self.pending.append(self.executor.submit(self._write, file_path, name))
+            self._drain(PENDING_LIMIT)
+        export_logger.debug("Archived {}".format(name))
+
+    def _write(self, file_path, name):
+        self.archive.write(file_path, name, compress_type=self._compress_type(file_path),
+                           compresslevel=self.compresslevel)
+        os.remove(file_path)
+
+    def _drain(self, limit):
+        """
+        Waits until at most ``limit`` added files are pending.
+        """
+        while len(self.pending) > limit:
+            self.pending.pop(0).result()
+
+
+package_archive = PackageArchive()
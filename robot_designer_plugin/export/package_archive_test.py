@@ -0,0 +1,123 @@
+# #####
+#  This file is part of the RobotDesigner developed in the Neurorobotics
+#  subproject of the Human Brain Project (https://www.humanbrainproject.eu).
+#
+#  The Human Brain Project is a European Commission funded project
+#  in the frame of the Horizon2020 FET Flagship plan.
+#  (http://ec.europa.eu/programmes/horizon2020/en/h2020-section/fet-flagships)
+#
+#  The Robot Designer has initially been forked from the RobotEditor
+#  (https://gitlab.com/h2t/roboteditor) developed at the Karlsruhe Institute
+#  of Technology in the High Performance Humanoid Technologies Laboratory (H2T).
+# #####
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# System imports
+import os
+import sys
+import types
+import zipfile
+import tempfile
+import unittest
+
+# load the modules of this directory without the blender dependent package
+sys.modules.setdefault("export", types.ModuleType("export")).__path__ = [os.path.dirname(os.path.abspath(__file__))]
+from export.package_archive import PackageArchive, parse_extensions
+
+
+class ParseExtensions(unittest.TestCase):
+    def runTest(self):
+        self.assertEqual(parse_extensions(".PNG stl, .jpg"), {".png", ".stl", ".jpg"})
+        self.assertEqual(parse_extensions(""), set())
+
+
+class ArchiveTestCase(unittest.TestCase):
+    parallel = False
+
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.temp.name, "package")
+        self.zip_path = os.path.join(self.temp.name, "package.zip")
+        os.makedirs(os.path.join(self.directory, "meshes"))
+
+    def tearDown(self):
+        self.temp.cleanup()
+
+    def write(self, name, data):
+        file_path = os.path.join(self.directory, name)
+        with open(file_path, "wb") as f:
+            f.write(data)
+        return file_path
+
+    def runTest(self):
+        archive = PackageArchive()
+        mesh = b"vertex 0 0 0\n" * 1000
+        with archive.session(self.zip_path, self.directory, compresslevel=9, store_extensions={".png"},
+                             parallel=self.parallel):
+            with archive.open(os.path.join(self.directory, "model.sdf")) as f:
+                f.write("<sdf>ä</sdf>\n")
+            for i in range(10):
+                archive.add(self.write("meshes/mesh{}.dae".format(i), mesh))
+            archive.add(self.write("thumbnail.png", b"\x89PNG" * 100))
+            # added when the session ends
+            self.write("extra.txt", b"extra")
+
+        self.assertEqual(os.listdir(os.path.join(self.directory, "meshes")), [])
+        with zipfile.ZipFile(self.zip_path) as z:
+            self.assertIsNone(z.testzip())
+            names = z.namelist()
+            self.assertEqual(len(names), len(set(names)))
+            self.assertEqual(set(names), {"model.sdf", "thumbnail.png", "extra.txt"} |
+                             {"meshes/mesh{}.dae".format(i) for i in range(10)})
+            self.assertEqual(z.read("model.sdf").decode("utf-8"), "<sdf>ä</sdf>\n")
+            self.assertEqual(z.read("meshes/mesh3.dae"), mesh)
+            self.assertEqual(z.getinfo("meshes/mesh3.dae").compress_type, zipfile.ZIP_DEFLATED)
+            self.assertLess(z.getinfo("meshes/mesh3.dae").compress_size, len(mesh) // 10)
+            self.assertEqual(z.getinfo("thumbnail.png").compress_type, zipfile.ZIP_STORED)
+
+
+class ParallelArchive(ArchiveTestCase):
+    parallel = True
+
+
+class FailedSession(ArchiveTestCase):
+    def runTest(self):
+        archive = PackageArchive()
+        with self.assertRaises(RuntimeError):
+            with archive.session(self.zip_path, self.directory, parallel=True):
+                archive.add(self.write("meshes/mesh.dae", b"data"))
+                raise RuntimeError()
+        self.assertFalse(os.path.exists(self.zip_path))
+        self.assertFalse(archive.active)
+
+
+class Inactive(ArchiveTestCase):
+    def runTest(self):
+        archive = PackageArchive()
+        file_path = os.path.join(self.directory, "model.sdf")
+        with archive.open(file_path) as f:
+            f.write("<sdf/>")
+        archive.add(file_path)
+        with open(file_path) as f:
+            self.assertEqual(f.read(), "<sdf/>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,294 @@
+# #####
+#  This file is part of the RobotDesigner developed in the Neurorobotics
+#  subproject of the Human Brain Project (https://www.humanbrainproject.eu).
+#
+#  The Human Brain Project is a European Commission funded project
+#  in the frame of the Horizon2020 FET Flagship plan.
+#  (http://ec.europa.eu/programmes/horizon2020/en/h2020-section/fet-flagships)
+#
+#  The Robot Designer has initially been forked from the RobotEditor
+#  (https://gitlab.com/h2t/roboteditor) developed at the Karlsruhe Institute
+#  of Technology in the High Performance Humanoid Technologies Laboratory (H2T).
+# #####
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Manifest for incremental package exports.
+
+The manifest (``.robot_designer_manifest.json`` in the package directory) stores for every exported file the hash of
+the inputs it was created from, the hash of its content and its size and modification time. On re-export, a file is
+left untouched if its inputs did not change and the file itself was not modified since it has been written:
+
+- Files are created by generators (e.g., the SDF exporter writing ``model.sdf`` and the meshes) which run in a
+  :meth:`PackageManifest.group`. The inputs of a group are a hash of everything its generator reads (e.g., of the
+  robot IR and the export settings). If they did not change and all files of the group are intact,
+  :meth:`PackageManifest.reuse` keeps the files and the generator is not run at all.
+- Meshes use their content hash (:func:`.mesh_cache.mesh_hash`) as inputs. Unchanged meshes are not even converted.
+- Text files (``model.sdf``, ``model.config``, ``muscles.osim``, rqt configurations) are streamed to a temporary file
+  with :meth:`PackageManifest.open` and their inputs are the digest of the generated text.
+- Files created by blender (the thumbnail) are written to a temporary file and moved with
+  :meth:`PackageManifest.replace`.
+
+Files listed in the manifest which have not been produced by an export (e.g., meshes of removed links) are deleted.
+Outside of a :meth:`PackageManifest.session`, all methods write the files directly.
+"""
+
+# System imports
+import os
+import json
+import hashlib
+import logging
+from contextlib import contextmanager
+
+# RobotDesigner imports
+from .package_archive import package_archive
+
+# the export logger of :mod:`..core.logfile` (this module does not depend on blender)
+export_logger = logging.getLogger("Export")
+
+MANIFEST_NAME = ".robot_designer_manifest.json"
+MANIFEST_VERSION = 2
+PART_SUFFIX = ".part"
+
+
+def _file_digest(file_path):
+    hasher = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+class PackageManifest(object):
+    """
+    Tracks the files written during an incremental export of a package.
+    """
+
+    def __init__(self):
+        self.directory = None
+        self.entries = None
+        self.groups = None
+        self.recorded = None
+        self.recorded_groups = None
+        self.current_group = None
+        self.written = 0
+        self.unchanged = 0
+        self.removed = 0
+
+    @property
+    def active(self):
+        return self.entries is not None
+
+    @contextmanager
+    def session(self, directory, enabled=True):
+        """
+        Loads the manifest of a package directory and saves the updated manifest if the export succeeded.
+
+        :param directory: The package directory
+        :param enabled: If False, the session does nothing and all files are written
+        """
+        if not enabled:
+            yield self
+            return
+
+        self.directory = os.path.abspath(directory)
+        self.entries, self.groups = self._load()
+        self.recorded = {}
+        self.recorded_groups = {}
+        self.written = 0
+        self.unchanged = 0
+        self.removed = 0
+        try:
+            yield self
+            self._save()
+        finally:
+            self.directory = None
+            self.entries = None
+            self.groups = None
+            self.recorded = None
+            self.recorded_groups = None
+            self.current_group = None
+
+    def _load(self):
+        manifest_path = os.path.join(self.directory, MANIFEST_NAME)
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        except (IOError, OSError, ValueError):
+            return {}, {}
+        if manifest.get("version") != MANIFEST_VERSION:
+            return {}, {}
+        return manifest.get("files", {}), manifest.get("groups", {})
+
+    def _save(self):
+        files = {}
+        for key, (inputs, group) in self.recorded.items():
+            entry = self.entries.get(key)
+            file_path = os.path.join(self.directory, key)
+            if entry is None or entry["inputs"] != inputs or not self._intact(file_path, entry):
+                if not os.path.isfile(file_path):
+                    continue
+                stat = os.stat(file_path)
+                entry = {"inputs": inputs, "sha1": _file_digest(file_path), "size": stat.st_size,
+                         "mtime_ns": stat.st_mtime_ns}
+            files[key] = dict(entry, group=group)
+
+        # files of a previous export that have not been produced this time
+        for key in set(self.entries) - set(files):
+            file_path = os.path.join(self.directory, key)
+            if os.path.isfile(file_path):
+                export_logger.debug("Removing {}".format(file_path))
+                os.remove(file_path)
+                self.removed += 1
+
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        with open(os.path.join(self.directory, MANIFEST_NAME), "w") as f:
+            json.dump({"version": MANIFEST_VERSION, "files": files, "groups": self.recorded_groups}, f, indent=1,
+                      sort_keys=True)
+        export_logger.info(self.summary())
+
+    def _key(self, file_path):
+        return os.path.relpath(os.path.abspath(file_path), self.directory).replace(os.sep, "/")
+
+    @staticmethod
+    def _intact(file_path, entry):
+        """
+        :return: Whether the file has not been modified since it was recorded
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False
+        return stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]
+
+    def up_to_date(self, file_path, inputs):
+        """
+        Checks whether a file has been exported from the same inputs before. If so, the file is kept in the
+        manifest and does not need to be written.
+
+        :param file_path: The exported file
+        :param inputs: A string (hash) identifying all inputs the file is derived from
+        :return: True if the file can be left untouched
+        """
+        if not self.active or inputs is None:
+            return False
+        key = self._key(file_path)
+        entry = self.entries.get(key)
+        if entry is None or entry["inputs"] != inputs or not self._intact(file_path, entry):
+            return False
+        self.recorded[key] = (inputs, self.current_group)
+        self.unchanged += 1
+        return True
+
+    def record(self, file_path, inputs):
+        """
+        Registers a file that has been (or will be, before the session ends) written.
+
+        :param file_path: The exported file
+        :param inputs: A string (hash) identifying all inputs the file is derived from
+        """
+        if not self.active or inputs is None:
+            return
+        self.recorded[self._key(file_path)] = (inputs, self.current_group)
+        self.written += 1
+
+    def reuse(self, name, inputs):
+        """
+        Checks whether the files of a group have been exported from the same inputs before. If so, they are kept
+        and the group does not need to be generated.
+
+        :param name: The name of the group
+        :param inputs: A string (hash) identifying all inputs of the group
+        :return: True if the files of the group can be left untouched
+        """
+        if not self.active or inputs is None or self.groups.get(name) != inputs:
+            return False
+        entries = {key: entry for key, entry in self.entries.items() if entry.get("group") == name}
+        if not all(self._intact(os.path.join(self.directory, key), entry) for key, entry in entries.items()):
+            return False
+        for key, entry in entries.items():
+            self.recorded[key] = (entry["inputs"], name)
+        self.recorded_groups[name] = inputs
+        self.unchanged += len(entries)
+        return True
+
+    @contextmanager
+    def group(self, name, inputs):
+        """
+        Assigns the files recorded in the context to a group. The inputs of the group are stored if the context
+        exits without an error.
+
+        :param name: The name of the group
+        :param inputs: A string (hash) identifying all inputs of the group (None if unknown)
+        """
+        previous = self.current_group
+        self.current_group = name
+        try:
+            yield
+        finally:
+            self.current_group = previous
+        if self.active and inputs is not None:
+            self.recorded_groups[name] = inputs
+
+    @contextmanager
+    def open(self, file_path):
+        """
+        Opens a text file for writing. During a session, the text is written to a temporary file which only
+        replaces the file if its content differs from the previous export.
+
+        :param file_path: The exported file
+        """
+        if not self.active:
+            # streamed into the archive when exporting a zipped package
+            with package_archive.open(file_path) as f:
+                yield f
+            return
+
+        part_path = file_path + PART_SUFFIX
+        try:
+            with open(part_path, "w") as f:
+                yield f
+        except BaseException:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+        self.replace(part_path, file_path)
+
+    def replace(self, source, file_path):
+        """
+        Moves a temporary file to its destination unless the destination has the same content.
+
+        :param source: The temporary file
+        :param file_path: The exported file
+        """
+        inputs = _file_digest(source) if self.active else None
+        if self.up_to_date(file_path, inputs):
+            os.remove(source)
+            return
+        os.replace(source, file_path)
+        self.record(file_path, inputs)
+
+    def summary(self):
+        return "Package manifest: {} files written, {} unchanged, {} removed".format(
+            self.written, self.unchanged, self.removed
+        )
+
+
+package_manifest = PackageManifest()
@@ -0,0 +1,162 @@
+# #####
+#  This file is part of the RobotDesigner developed in the Neurorobotics
+#  subproject of the Human Brain Project (https://www.humanbrainproject.eu).
+#
+#  The Human Brain Project is a European Commission funded project
+#  in the frame of the Horizon2020 FET Flagship plan.
+#  (http://ec.europa.eu/programmes/horizon2020/en/h2020-section/fet-flagships)
+#
+#  The Robot Designer has initially been forked from the RobotEditor
+#  (https://gitlab.com/h2t/roboteditor) developed at the Karlsruhe Institute
+#  of Technology in the High Performance Humanoid Technologies Laboratory (H2T).
+# #####
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# System imports
+import os
+import sys
+import json
+import types
+import tempfile
+import unittest
+
+# load the modules of this directory without the blender dependent package
+sys.modules.setdefault("export", types.ModuleType("export")).__path__ = [os.path.dirname(os.path.abspath(__file__))]
+from export.package_manifest import PackageManifest, MANIFEST_NAME
+
+
+class ManifestTestCase(unittest.TestCase):
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.directory = self.temp.name
+        self.manifest = PackageManifest()
+        self.generated = []
+
+    def tearDown(self):
+        self.temp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def export(self, files, group_inputs=None):
+        """
+        Runs an incremental export writing ``files`` (name -> text) in the group "model".
+
+        :return: True if the group has been reused
+        """
+        with self.manifest.session(self.directory):
+            if self.manifest.reuse("model", group_inputs):
+                return True
+            with self.manifest.group("model", group_inputs):
+                for name, text in files.items():
+                    self.generated.append(name)
+                    with self.manifest.open(self.path(name)) as f:
+                        f.write(text)
+        return False
+
+    def read(self, name):
+        with open(self.path(name)) as f:
+            return f.read()
+
+    def mtime(self, name):
+        return os.stat(self.path(name)).st_mtime_ns
+
+
+class UnchangedText(ManifestTestCase):
+    def runTest(self):
+        self.export({"model.sdf": "<sdf/>", "model.config": "<model/>"})
+        mtime = self.mtime("model.sdf")
+        self.export({"model.sdf": "<sdf/>", "model.config": "<model version='2'/>"})
+        self.assertEqual(self.mtime("model.sdf"), mtime)
+        self.assertEqual(self.read("model.config"), "<model version='2'/>")
+        self.assertEqual((self.manifest.written, self.manifest.unchanged), (1, 1))
+        self.assertEqual(sorted(os.listdir(self.directory)), [MANIFEST_NAME, "model.config", "model.sdf"])
+
+
+class ReusedGroup(ManifestTestCase):
+    def runTest(self):
+        self.assertFalse(self.export({"model.sdf": "<sdf/>"}, "inputs"))
+        self.assertTrue(self.export({"model.sdf": "<sdf/>"}, "inputs"))
+        self.assertEqual(self.generated, ["model.sdf"])
+        self.assertEqual(self.manifest.unchanged, 1)
+
+        # the manifest still lists the files of the reused group
+        self.assertTrue(self.export({"model.sdf": "<sdf/>"}, "inputs"))
+        self.assertFalse(self.export({"model.sdf": "<sdf a='1'/>"}, "changed"))
+        self.assertEqual(self.read("model.sdf"), "<sdf a='1'/>")
+
+
+class ModifiedFile(ManifestTestCase):
+    def runTest(self):
+        self.export({"model.sdf": "<sdf/>"}, "inputs")
+        with open(self.path("model.sdf"), "a") as f:
+            f.write("<!-- edited -->")
+        self.assertFalse(self.export({"model.sdf": "<sdf/>"}, "inputs"))
+        self.assertEqual(self.read("model.sdf"), "<sdf/>")
+
+
+class RemovedFiles(ManifestTestCase):
+    def runTest(self):
+        self.export({"model.sdf": "<sdf/>", "mesh_a.dae": "a", "mesh_b.dae": "b"})
+        with open(self.path("readme.txt"), "w") as f:
+            f.write("not exported")
+        self.export({"model.sdf": "<sdf/>", "mesh_a.dae": "a"})
+        self.assertEqual(self.manifest.removed, 1)
+        self.assertEqual(sorted(os.listdir(self.directory)), [MANIFEST_NAME, "mesh_a.dae", "model.sdf", "readme.txt"])
+        with open(self.path(MANIFEST_NAME)) as f:
+            self.assertEqual(sorted(json.load(f)["files"]), ["mesh_a.dae", "model.sdf"])
+
+
+class FailedGeneration(ManifestTestCase):
+    def runTest(self):
+        self.export({"model.sdf": "<sdf/>"}, "inputs")
+        with self.assertRaises(RuntimeError):
+            with self.manifest.session(self.directory):
+                with self.manifest.group("model", "changed"):
+                    with self.manifest.open(self.path("model.sdf")) as f:
+                        f.write("<sdf")
+                        raise RuntimeError()
+        self.assertEqual(self.read("model.sdf"), "<sdf/>")
+        self.assertEqual(sorted(os.listdir(self.directory)), [MANIFEST_NAME, "model.sdf"])
+        self.assertTrue(self.export({"model.sdf": "<sdf/>"}, "inputs"))
+
+
+class RecordedMesh(ManifestTestCase):
+    def runTest(self):
+        for _ in range(2):
+            with self.manifest.session(self.directory):
+                with self.manifest.group("model", "inputs"):
+                    if not self.manifest.up_to_date(self.path("mesh.stl"), "mesh hash"):
+                        self.manifest.record(self.path("mesh.stl"), "mesh hash")
+                        with open(self.path("mesh.stl"), "wb") as f:
+                            f.write(b"binary STL")
+        self.assertEqual((self.manifest.written, self.manifest.unchanged), (0, 1))
+
+
+class Inactive(ManifestTestCase):
+    def runTest(self):
+        with self.manifest.open(self.path("model.sdf")) as f:
+            f.write("<sdf/>")
+        self.assertFalse(self.manifest.reuse("model", "inputs"))
+        self.assertEqual(os.listdir(self.directory), ["model.sdf"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+# #####
+#  This file is part of the RobotDesigner developed in the Neurorobotics
+#  subproject of the Human Brain Project (https://www.humanbrainproject.eu).
+#
+#  The Human Brain Project is a European Commission funded project
+#  in the frame of the Horizon2020 FET Flagship plan.
+#  (http://ec.europa.eu/programmes/horizon2020/en/h2020-section/fet-flagships)
+#
+#  The Robot Designer has initially been forked from the RobotEditor
+#  (https://gitlab.com/h2t/roboteditor) developed at the Karlsruhe Institute
+#  of Technology in the High Performance Humanoid Technologies Laboratory (H2T).
+# #####
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Lazy extraction of zipped packages on import.
+
+Instead of extracting the complete archive, :meth:`PackageReader.session` only indexes its members. The importers
+request the files they actually read with :meth:`PackageReader.extract` (the SDF, ``model.config``, the muscle
+definition and the referenced meshes). Textures referenced by an extracted COLLADA file are extracted along with it.
+Other members (unused meshes, textures of other resolutions, documentation) are never written to disk.
+
+Outside of a session, :meth:`PackageReader.extract` does nothing, i.e., the importers work on plain directories.
+"""
+
+# System imports
+import os
+import zipfile
+from contextlib import contextmanager
+from urllib.parse import unquote
+import xml.etree.ElementTree as ET
+
+# RobotDesigner imports
+from ..core.logfile import export_logger
+
+
+def collada_images(file_path):
+    """
+    :param file_path: A COLLADA file
+    :return: The paths of the image files referenced by the file (absolute or relative to the file's directory)
+    """
+    images = []
+    try:
+        for _, element in ET.iterparse(file_path):
+            if element.tag.rsplit("}", 1)[-1] == "init_from" and element.text and "." in element.text:
+                path = unquote(element.text.strip())
+                if path.startswith("file://"):
+                    path = path[len("file://"):]
+                images.append(path)
+            element.clear()
+    except ET.ParseError as e:
+        export_logger.warning("Could not read the images of {}: {}".format(file_path, e))
+    return images
+
+
+class PackageReader(object):
+    """
+    Extracts members of a zipped package on demand.
+    """
+
+    def __init__(self):
+        self.archive = None
+        self.directory = None
+        self.members = None
+        self.extracted = 0
+
+    @property
+    def active(self):
+        return self.archive is not None
+
+    @contextmanager
+    def session(self, zip_path, directory):
+        """
+        Opens the archive for lazy extraction.
+
+        :param zip_path: The zip file
+        :param directory: The (temporary) directory the requested members are extracted to
+        """
+        self.directory = os.path.abspath(directory)
+        self.archive = zipfile.ZipFile(zip_path, "r")
+        self.members = {info.filename: info for info in self.archive.infolist() if not info.is_dir()}
+        self.extracted = 0
+        try:
+            yield self
+        finally:
+            export_logger.info(
+                "Extracted {} of {} files from {}".format(self.extracted, len(self.members), zip_path)
+            )
+            self.archive.close()
+            self.archive = None
+            self.members = None
+            self.directory = None
+
+    def _name(self, file_path):
+        return os.path.relpath(os.path.abspath(file_path), self.directory).replace(os.sep, "/")
+
+    def find(self, extension):
+        """
+        :param extension: A file extension (e.g., ``".sdf"``)
+        :return: The paths (in the extraction directory) of all members with the extension. The files are not
+            extracted.
+        """
+        return [
+            os.path.join(self.directory, *name.split("/"))
+            for name in self.members
+            if os.path.splitext(name)[1].lower() == extension
+        ]
+
+    def extract(self, file_path):
+        """
+        Makes sure that a file of the package exists on disk. Does nothing outside of a session or if the file is
+        not a member of the archive (or has been extracted before).
+
+        :param file_path: The path of the file in the extraction directory
+        :return: ``file_path``
+        """
+        if not self.active or os.path.exists(file_path):
+            return file_path
+        name = self._name(file_path)
+        if name not in self.members:
+            return file_path
+
+        self.archive.extract(self.members[name], self.directory)
+        self.extracted += 1
+        export_logger.debug("Extracted {}".format(name))
+
+        if os.path.splitext(file_path)[1].lower() == ".dae":
+            base_dir = os.path.dirname(file_path)
+            for image in collada_images(file_path):
+                self.extract(os.path.normpath(os.path.join(base_dir, image)))
+        return file_path
+
+
+package_reader = PackageReader()
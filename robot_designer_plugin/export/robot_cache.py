@@ -0,0 +1,617 @@
+# #####
+#  This file is part of the RobotDesigner developed in the Neurorobotics
+#  subproject of the Human Brain Project (https://www.humanbrainproject.eu).
+#
+#  The Human Brain Project is a European Commission funded project
+#  in the frame of the Horizon2020 FET Flagship plan.
+#  (http://ec.europa.eu/programmes/horizon2020/en/h2020-section/fet-flagships)
+#
+#  The Robot Designer has initially been forked from the RobotEditor
+#  (https://gitlab.com/h2t/roboteditor) developed at the Karlsruhe Institute
+#  of Technology in the High Performance Humanoid Technologies Laboratory (H2T).
+# #####
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Binary snapshots of RobotDesigner models.
+
+A snapshot (an uncompressed ``.npz`` file) contains everything that belongs to a model: the armature with the
+``RobotDesigner`` properties of its segments and the pose, the objects parented to it (geometries, physics frames,
+sensors), its muscles and the worlds it is listed in. Bulk data (vertices, polygons, curve points) is stored as
+numpy arrays named ``"{index}_{field}"`` and everything else as JSON in the entry ``meta``. Property groups are
+serialized generically by walking their RNA definitions (:func:`rna_values`), so new properties are picked up
+without changes to this module.
+
+Loading a snapshot creates the blender data with ``foreach_set`` and does not run the import pipeline (no file
+parsing, no mesh conversion, no kinematic updates). Materials are restored with their diffuse color only.
+
+Every snapshot also contains the intermediate representation of the model for the exporters (see
+:func:`.robot_ir.robot_to_arrays`). If the ``export_robot_cache`` option names a snapshot of the exported model,
+:func:`capture` returns the stored representation instead of reading the scene, provided that the snapshot was saved
+or loaded in this session and the model has not been changed since (changes are tracked by a depsgraph handler).
+"""
+
+# System imports
+import os
+import json
+import numpy as np
+
+# Blender imports
+import bpy
+from bpy.app.handlers import persistent
+from bpy.props import StringProperty
+from mathutils import Matrix
+
+# RobotDesigner imports
+from ..core import config, PluginManager, RDOperator
+from ..core.logfile import export_logger
+from ..core.profiling import profiler
+from ..operators.helpers import ModelSelected, ObjectMode
+from ..operators.model import SelectModel
+from ..operators.segments import UpdateSegments, kinematic_updates_suspended
+from ..properties.globals import global_properties
+from .robot_ir import capture_robot, read_robot, robot_to_arrays, robot_from_arrays, robot_digest
+
+CACHE_VERSION = 2
+ID_KEY = "__object__"
+
+# Snapshots of models that have not been changed since the snapshot was saved or loaded in this session:
+# model name -> (absolute file path, digest of the intermediate representation)
+_unchanged = {}
+
+
+def _plain(value):
+    """
+    Converts blender values (vectors, matrices, property arrays, enum sets) into JSON values.
+    """
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, set):
+        return sorted(value)
+    return [_plain(v) for v in value]
+
+
+def rna_values(struct):
+    """
+    Serializes the properties of a blender struct (e.g., a property group). Nested property groups and collections
+    are serialized recursively, pointers to objects by name. Read-only properties and pointers to other structs are
+    skipped.
+
+    :param struct: The struct
+    :return: dictionary (JSON serializable)
+    """
+    values = {}
+    for prop in struct.bl_rna.properties:
+        key = prop.identifier
+        if key == "rna_type":
+            continue
+        if prop.type == "COLLECTION":
+            values[key] = [rna_values(item) for item in getattr(struct, key)]
+        elif prop.type == "POINTER":
+            value = getattr(struct, key)
+            if isinstance(value, bpy.types.Object):
+                values[key] = {ID_KEY: value.name}
+            elif isinstance(value, bpy.types.PropertyGroup):
+                values[key] = rna_values(value)
+        elif not prop.is_readonly:
+            values[key] = _plain(getattr(struct, key))
+    return values
+
+
+def set_rna_values(struct, values, objects):
+    """
+    Restores properties serialized by :func:`rna_values`. Collections are replaced.
+
+    :param struct: The struct
+    :param values: The serialized properties
+    :param objects: dictionary mapping the stored object names to the loaded objects
+    """
+    for key, value in values.items():
+        prop = struct.bl_rna.properties.get(key)
+        if prop is None:
+            continue
+        try:
+            if prop.type == "COLLECTION":
+                collection = getattr(struct, key)
+                collection.clear()
+                for item in value:
+                    set_rna_values(collection.add(), item, objects)
+            elif prop.type == "POINTER":
+                if ID_KEY in value:
+                    setattr(struct, key, objects.get(value[ID_KEY]))
+                else:
+                    set_rna_values(getattr(struct, key), value, objects)
+            elif prop.type == "ENUM" and prop.is_enum_flag:
+                setattr(struct, key, set(value))
+            else:
+                setattr(struct, key, value)
+        except (AttributeError, TypeError, ValueError) as e:
+            export_logger.debug("Could not restore property {}: {}".format(key, e))
+
+
+def collect_objects(model):
+    """
+    :param model: The armature object of the model
+    :return: The model, its descendants, its muscles and the worlds it is listed in
+    """
+    objects = [model]
+    for obj in objects:
+        objects.extend(obj.children)
+    objects.extend(
+        obj for obj in bpy.data.objects
+        if obj.RobotDesigner.muscles.robotName == model.name and obj not in objects
+    )
+    objects.extend(
+        obj for obj in bpy.data.objects
+        if obj.RobotDesigner.tag == "WORLD" and model.name in obj.RobotDesigner.worlds.robot_list
+        and obj not in objects
+    )
+    return objects
+
+
+def _save_materials(data):
+    return [(m.name, list(m.diffuse_color)) if m else (None, None) for m in data.materials]
+
+
+def _load_materials(data, materials):
+    for name, color in materials:
+        material = None
+        if name is not None:
+            material = bpy.data.materials.get(name)
+            if material is None:
+                material = bpy.data.materials.new(name)
+                material.diffuse_color = color
+        data.materials.append(material)
+
+
+def _get(collection, attribute, count, width, dtype):
+    array = np.empty(count * width, dtype=dtype)
+    collection.foreach_get(attribute, array)
+    return array
+
+
+def _save_mesh(mesh, prefix, arrays):
+    arrays[prefix + "co"] = _get(mesh.vertices, "co", len(mesh.vertices), 3, np.float32)
+    arrays[prefix + "vertex_index"] = _get(mesh.loops, "vertex_index", len(mesh.loops), 1, np.int32)
+    for field, dtype in (("loop_start", np.int32), ("loop_total", np.int32), ("material_index", np.int32),
+                         ("use_smooth", bool)):
+        arrays[prefix + field] = _get(mesh.polygons, field, len(mesh.polygons), 1, dtype)
+    uv_layer = mesh.uv_layers.active
+    if uv_layer is not None:
+        arrays[prefix + "uv"] = _get(uv_layer.data, "uv", len(mesh.loops), 2, np.float32)
+    return {"uv": uv_layer.name if uv_layer is not None else None, "materials": _save_materials(mesh)}
+
+
+def _load_mesh(name, entry, prefix, data):
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(data[prefix + "co"]) // 3)
+    mesh.vertices.foreach_set("co", data[prefix + "co"])
+    mesh.loops.add(len(data[prefix + "vertex_index"]))
+    mesh.loops.foreach_set("vertex_index", data[prefix + "vertex_index"])
+    mesh.polygons.add(len(data[prefix + "loop_start"]))
+    mesh.polygons.foreach_set("loop_start", data[prefix + "loop_start"])
+    try:
+        mesh.polygons.foreach_set("loop_total", data[prefix + "loop_total"])
+    except (AttributeError, TypeError, RuntimeError):
+        # read-only since blender 4.0 (derived from the loop starts)
+        pass
+    mesh.polygons.foreach_set("material_index", data[prefix + "material_index"])
+    mesh.polygons.foreach_set("use_smooth", data[prefix + "use_smooth"])
+    if entry["uv"] is not None:
+        mesh.uv_layers.new(name=entry["uv"]).data.foreach_set("uv", data[prefix + "uv"])
+    _load_materials(mesh, entry["materials"])
+    mesh.update(calc_edges=True)
+    mesh.validate()
+    return mesh
+
+
+def _save_curve(curve, prefix, arrays):
+    splines = []
+    points = []
+    bezier_points = []
+    for spline in curve.splines:
+        if spline.type == "BEZIER":
+            splines.append({"type": spline.type, "count": len(spline.bezier_points),
+                            "use_cyclic_u": spline.use_cyclic_u,
+                            "handle_types": [(p.handle_left_type, p.handle_right_type)
+                                             for p in spline.bezier_points]})
+            for field in ("co", "handle_left", "handle_right"):
+                bezier_points.append(_get(spline.bezier_points, field, len(spline.bezier_points), 3, np.float32))
+        else:
+            splines.append({"type": spline.type, "count": len(spline.points), "use_cyclic_u": spline.use_cyclic_u,
+                            "order_u": spline.order_u})
+            points.append(_get(spline.points, "co", len(spline.points), 4, np.float32))
+    arrays[prefix + "points"] = np.concatenate(points) if points else np.empty(0, np.float32)
+    arrays[prefix + "bezier_points"] = np.concatenate(bezier_points) if bezier_points else np.empty(0, np.float32)
+    return {"dimensions": curve.dimensions, "bevel_depth": curve.bevel_depth,
+            "bevel_resolution": curve.bevel_resolution, "fill_mode": curve.fill_mode, "splines": splines,
+            "materials": _save_materials(curve)}
+
+
+def _load_curve(name, entry, prefix, data):
+    curve = bpy.data.curves.new(name, type="CURVE")
+    for key in ("dimensions", "bevel_depth", "bevel_resolution", "fill_mode"):
+        setattr(curve, key, entry[key])
+    points = data[prefix + "points"]
+    bezier_points = data[prefix + "bezier_points"]
+    point_offset = 0
+    bezier_offset = 0
+    for spline_entry in entry["splines"]:
+        count = spline_entry["count"]
+        spline = curve.splines.new(spline_entry["type"])
+        if spline_entry["type"] == "BEZIER":
+            spline.bezier_points.add(count - 1)
+            for field in ("co", "handle_left", "handle_right"):
+                spline.bezier_points.foreach_set(field, bezier_points[bezier_offset:bezier_offset + 3 * count])
+                bezier_offset += 3 * count
+            for point, (left, right) in zip(spline.bezier_points, spline_entry["handle_types"]):
+                point.handle_left_type = left
+                point.handle_right_type = right
+        else:
+            spline.points.add(count - 1)
+            spline.points.foreach_set("co", points[point_offset:point_offset + 4 * count])
+            point_offset += 4 * count
+            spline.order_u = spline_entry["order_u"]
+        spline.use_cyclic_u = spline_entry["use_cyclic_u"]
+    _load_materials(curve, entry["materials"])
+    return curve
+
+
+def _save_armature(armature):
+    bones = []
+    for bone in armature.bones:
+        bones.append({"name": bone.name, "parent": bone.parent.name if bone.parent else None,
+                      "head": _plain(bone.head_local), "tail": _plain(bone.tail_local),
+                      "matrix": _plain(bone.matrix_local), "use_connect": bone.use_connect,
+                      "use_deform": bone.use_deform, "RobotDesigner": rna_values(bone.RobotDesigner)})
+    return {"display_type": armature.display_type, "bones": bones}
+
+
+def _build_armature(obj, entry, objects):
+    """
+    Creates the bones of a loaded armature. The object has to be in the view layer.
+    """
+    bpy.context.view_layer.objects.active = obj
+    bpy.ops.object.mode_set(mode="EDIT", toggle=False)
+    edit_bones = obj.data.edit_bones
+    for bone in entry["bones"]:
+        edit_bone = edit_bones.new(bone["name"])
+        edit_bone.head = bone["head"]
+        edit_bone.tail = bone["tail"]
+        edit_bone.matrix = Matrix(bone["matrix"])
+        edit_bone.use_deform = bone["use_deform"]
+    for bone in entry["bones"]:
+        if bone["parent"] is not None:
+            edit_bones[bone["name"]].parent = edit_bones[bone["parent"]]
+            edit_bones[bone["name"]].use_connect = bone["use_connect"]
+    bpy.ops.object.mode_set(mode="OBJECT", toggle=False)
+
+    for bone in entry["bones"]:
+        set_rna_values(obj.data.bones[bone["name"]].RobotDesigner, bone["RobotDesigner"], objects)
+
+
+def _save_data(obj, prefix, arrays):
+    """
+    :return: The description of the object data (bulk data is added to ``arrays``)
+    """
+    entry = {"type": obj.type, "name": obj.data.name}
+    if obj.type == "MESH":
+        entry.update(_save_mesh(obj.data, prefix, arrays))
+    elif obj.type == "CURVE":
+        entry.update(_save_curve(obj.data, prefix, arrays))
+    elif obj.type == "ARMATURE":
+        entry.update(_save_armature(obj.data))
+    elif obj.type == "CAMERA":
+        entry["properties"] = rna_values(obj.data)
+    else:
+        export_logger.warning("Data of {} ({}) is not stored in the robot cache".format(obj.name, obj.type))
+        return None
+    return entry
+
+
+def _load_data(entry, prefix, data):
+    if entry["type"] == "MESH":
+        return _load_mesh(entry["name"], entry, prefix, data)
+    if entry["type"] == "CURVE":
+        return _load_curve(entry["name"], entry, prefix, data)
+    if entry["type"] == "ARMATURE":
+        armature = bpy.data.armatures.new(entry["name"])
+        armature.display_type = entry["display_type"]
+        return armature
+    if entry["type"] == "CAMERA":
+        camera = bpy.data.cameras.new(entry["name"])
+        entry["properties"].pop("name", None)
+        set_rna_values(camera, entry["properties"], {})
+        return camera
+
+
+def _save_object(obj, data_index, names):
+    entry = {"name": obj.name, "data": data_index,
+             "parent": obj.parent.name if obj.parent is not None and obj.parent.name in names else None,
+             "parent_type": obj.parent_type, "parent_bone": obj.parent_bone,
+             "matrix_parent_inverse": _plain(obj.matrix_parent_inverse),
+             "matrix_basis": _plain(obj.matrix_basis), "display_type": obj.display_type,
+             "empty_display_type": obj.empty_display_type, "empty_display_size": obj.empty_display_size,
+             "RobotDesigner": rna_values(obj.RobotDesigner), "modifiers": [], "pose": {}}
+    for modifier in obj.modifiers:
+        if modifier.type != "HOOK":
+            export_logger.debug("Modifier {} of {} is not stored in the robot cache".format(modifier.name, obj.name))
+            continue
+        entry["modifiers"].append({
+            "name": modifier.name, "object": modifier.object.name if modifier.object else None,
+            "subtarget": modifier.subtarget, "center": _plain(modifier.center),
+            "matrix_inverse": _plain(modifier.matrix_inverse), "falloff_type": modifier.falloff_type,
+            "strength": modifier.strength, "vertex_indices": _plain(getattr(modifier, "vertex_indices", []))})
+    if obj.type == "ARMATURE":
+        entry["pose"] = {bone.name: _plain(bone.matrix_basis) for bone in obj.pose.bones}
+    return entry
+
+
+def _load_object(obj, entry, objects):
+    if entry["parent"] is not None:
+        obj.parent = objects[entry["parent"]]
+        obj.parent_type = entry["parent_type"]
+        obj.parent_bone = entry["parent_bone"]
+    obj.matrix_parent_inverse = Matrix(entry["matrix_parent_inverse"])
+    obj.matrix_basis = Matrix(entry["matrix_basis"])
+    obj.display_type = entry["display_type"]
+    obj.empty_display_type = entry["empty_display_type"]
+    obj.empty_display_size = entry["empty_display_size"]
+    set_rna_values(obj.RobotDesigner, entry["RobotDesigner"], objects)
+
+    for hook in entry["modifiers"]:
+        modifier = obj.modifiers.new(hook["name"], "HOOK")
+        modifier.object = objects.get(hook["object"])
+        modifier.subtarget = hook["subtarget"]
+        modifier.center = hook["center"]
+        modifier.matrix_inverse = Matrix(hook["matrix_inverse"])
+        modifier.falloff_type = hook["falloff_type"]
+        modifier.strength = hook["strength"]
+        if hasattr(modifier, "vertex_indices_set"):
+            modifier.vertex_indices_set(hook["vertex_indices"])
+        elif hook["vertex_indices"]:
+            export_logger.warning("Cannot assign the vertices of hook {}".format(hook["name"]))
+
+
+def save_robot(file_path, model, context):
+    """
+    Writes a snapshot of a model.
+
+    :param file_path: The ``.npz`` file
+    :param model: The armature object of the model
+    :param context: The current context (for capturing the intermediate representation)
+    """
+    objects = collect_objects(model)
+    names = {obj.name for obj in objects}
+    arrays = {}
+    meta = {"version": CACHE_VERSION, "model": model.name, "data": [], "objects": []}
+    data_indices = {}
+    for obj in objects:
+        data_index = None
+        if obj.data is not None:
+            key = obj.data.as_pointer()
+            if key not in data_indices:
+                entry = _save_data(obj, "{}_".format(len(meta["data"])), arrays)
+                data_indices[key] = len(meta["data"]) if entry is not None else None
+                if entry is not None:
+                    meta["data"].append(entry)
+            data_index = data_indices[key]
+        meta["objects"].append(_save_object(obj, data_index, names))
+
+    with profiler.phase("capture"):
+        robot = capture_robot(context, model)
+        meta["robot"], robot_arrays = robot_to_arrays(robot)
+    arrays.update(robot_arrays)
+
+    arrays["meta"] = np.array(json.dumps(meta))
+    np.savez(file_path, **arrays)
+    _unchanged[model.name] = (_absolute(file_path), robot_digest(robot))
+    export_logger.info("Saved {} objects of {} to {}".format(len(objects), model.name, file_path))
+
+
+def load_robot(file_path):
+    """
+    Creates a model from a snapshot written by :func:`save_robot` in the active collection.
+
+    :param file_path: The ``.npz`` file
+    :return: The armature object of the model
+    """
+    with np.load(file_path) as data:
+        meta = json.loads(str(data["meta"]))
+        if meta.get("version") != CACHE_VERSION:
+            raise ValueError("Unsupported robot cache version: {}".format(meta.get("version")))
+        with profiler.phase("load_data"):
+            datas = [_load_data(entry, "{}_".format(i), data) for i, entry in enumerate(meta["data"])]
+        digest = robot_digest(robot_from_arrays(meta["robot"], data))
+
+    objects = {}
+    for entry in meta["objects"]:
+        data = datas[entry["data"]] if entry["data"] is not None else None
+        obj = bpy.data.objects.new(entry["name"], data)
+        bpy.context.collection.objects.link(obj)
+        objects[entry["name"]] = obj
+
+    with kinematic_updates_suspended(), profiler.phase("load_objects"):
+        built = set()
+        for entry in meta["objects"]:
+            obj = objects[entry["name"]]
+            if obj.type == "ARMATURE" and obj.data.as_pointer() not in built:
+                built.add(obj.data.as_pointer())
+                _build_armature(obj, meta["data"][entry["data"]], objects)
+        for entry in meta["objects"]:
+            _load_object(objects[entry["name"]], entry, objects)
+        for entry in meta["objects"]:
+            obj = objects[entry["name"]]
+            for name, matrix in entry["pose"].items():
+                pose_bone = obj.pose.bones[name]
+                pose_bone.matrix_basis = Matrix(matrix)
+                if pose_bone.bone.RobotDesigner.RD_Bone:
+                    UpdateSegments.update_constraint(pose_bone, pose_bone.bone.RobotDesigner)
+
+    model = objects[meta["model"]]
+    if model.name != meta["model"]:
+        # the name was taken, update the references to the model
+        for obj in objects.values():
+            if obj.RobotDesigner.muscles.robotName == meta["model"]:
+                obj.RobotDesigner.muscles.robotName = model.name
+            robot_list = obj.RobotDesigner.worlds.robot_list
+            if obj.RobotDesigner.tag == "WORLD" and meta["model"] in robot_list:
+                robot_list[meta["model"]].name = model.name
+
+    # evaluate the updates caused by loading before the snapshot is marked as unchanged
+    bpy.context.view_layer.update()
+    _unchanged[model.name] = (_absolute(file_path), digest)
+    export_logger.info("Loaded {} objects of {} from {}".format(len(objects), model.name, file_path))
+    return model
+
+
+def _absolute(file_path):
+    return os.path.normpath(bpy.path.abspath(file_path))
+
+
+def _model_name(obj):
+    """
+    :return: The name of the model an object belongs to (the robot of a muscle or the root of the parents)
+    """
+    if obj.RobotDesigner.muscles.robotName:
+        return obj.RobotDesigner.muscles.robotName
+    while obj.parent is not None:
+        obj = obj.parent
+    return obj.name
+
+
+@persistent
+def track_changes(scene, depsgraph=None):
+    """
+    Handler for ``depsgraph_update_post`` removing changed models from the unchanged snapshots.
+    """
+    if not _unchanged:
+        return
+    if depsgraph is None:
+        # blender 2.80 does not pass the depsgraph to the handlers
+        depsgraph = bpy.context.depsgraph
+    for update in depsgraph.updates:
+        changed = update.id.original
+        if isinstance(changed, bpy.types.Object):
+            _unchanged.pop(_model_name(changed), None)
+        elif isinstance(changed, bpy.types.Armature):
+            # the segment properties are stored with the bones
+            for name in list(_unchanged):
+                model = bpy.data.objects.get(name)
+                if model is None or model.data == changed:
+                    del _unchanged[name]
+
+
+# replaces the handler of a previous version of the module (when reloading the add-on)
+for handler in [i for i in bpy.app.handlers.depsgraph_update_post if i.__name__ == track_changes.__name__]:
+    bpy.app.handlers.depsgraph_update_post.remove(handler)
+bpy.app.handlers.depsgraph_update_post.append(track_changes)
+
+
+def capture(context, armature):
+    """
+    Creates the intermediate representation of a robot for the exporters. It is read from the snapshot named by
+    the ``export_robot_cache`` option if that contains the robot in its current state (the snapshot was saved or
+    loaded in this session and the robot has not been changed since) and captured from the scene otherwise.
+
+    :param context: The current context
+    :param armature: The armature object of the robot
+    :return: :class:`.robot_ir.Robot`
+    """
+    file_path = global_properties.export_robot_cache.get(context.scene)
+    if file_path:
+        file_path = bpy.path.abspath(file_path)
+        try:
+            robot = read_robot(file_path)
+        except (OSError, ValueError, KeyError) as e:
+            export_logger.warning("Could not read robot cache {}: {}".format(file_path, e))
+        else:
+            if robot.name != armature.name:
+                export_logger.warning(
+                    "Robot cache {} contains {} instead of {}".format(file_path, robot.name, armature.name)
+                )
+            elif _unchanged.get(armature.name) != (_absolute(file_path), robot_digest(robot)):
+                export_logger.warning(
+                    "Robot cache {} is not up to date (changed since it was saved or loaded), exporting {} from the "
+                    "scene".format(file_path, armature.name)
+                )
+            else:
+                export_logger.info("Exporting {} from robot cache {}".format(robot.name, file_path))
+                return robot
+    return capture_robot(context, armature)
+
+
+@RDOperator.Preconditions(ObjectMode)
+@PluginManager.register_class
+class LoadRobotCache(RDOperator):
+    """
+    :term:`Operator<operator>` for loading a robot from a snapshot created with :class:`SaveRobotCache`
+    """
+
+    bl_idname = config.OPERATOR_PREFIX + "load_robot_cache"
+    bl_label = "Load Robot Cache"
+    profiling = True
+
+    filter_glob: StringProperty(
+        default="*.npz",
+        options={"HIDDEN"},
+    )
+
+    filepath: StringProperty(name="Filename", subtype="FILE_PATH")
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {"RUNNING_MODAL"}
+
+    @RDOperator.OperatorLogger
+    @RDOperator.Postconditions(ModelSelected, ObjectMode)
+    def execute(self, context):
+        model = load_robot(self.filepath)
+        SelectModel.run(model_name=model.name)
+        return {"FINISHED"}
+
+
+@RDOperator.Preconditions(ModelSelected, ObjectMode)
+@PluginManager.register_class
+class SaveRobotCache(RDOperator):
+    """
+    :term:`Operator<operator>` for saving a snapshot of the selected robot (see :mod:`.robot_cache`)
+    """
+
+    bl_idname = config.OPERATOR_PREFIX + "save_robot_cache"
+    bl_label = "Save Robot Cache"
+    profiling = True
+    exporting = True
+
+    filter_glob: StringProperty(
+        default="*.npz",
+        options={"HIDDEN"},
+    )
+
+    filepath: StringProperty(name="Filename", subtype="FILE_PATH")
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {"RUNNING_MODAL"}
+
+    @RDOperator.OperatorLogger
+    @RDOperator.Postconditions(ModelSelected, ObjectMode)
+    def execute(self, context):
+        save_robot(bpy.path.ensure_ext(self.filepath, ".npz"), context.active_object, context)
+        return {"FINISHED"}
@@ -0,0 +1,559 @@
+# #####
+#  This file is part of the RobotDesigner developed in the Neurorobotics
+#  subproject of the Human Brain Project (https://www.humanbrainproject.eu).
+#
+#  The Human Brain Project is a European Commission funded project
+#  in the frame of the Horizon2020 FET Flagship plan.
+#  (http://ec.europa.eu/programmes/horizon2020/en/h2020-section/fet-flagships)
+#
+#  The Robot Designer has initially been forked from the RobotEditor
+#  (https://gitlab.com/h2t/roboteditor) developed at the Karlsruhe Institute
+#  of Technology in the High Performance Humanoid Technologies Laboratory (H2T).
+# #####
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Intermediate representation (IR) of a robot for the exporters.
+
+:func:`capture_robot` reads everything the exporters need from the armature and the objects attached to it in a
+single pass over the scene. The result is a tree of small slotted records with all transformations stored as
+:mod:`numpy` arrays. The records are plain python objects and this module does not import :mod:`bpy` such that
+exporters consuming the IR can be run (and tested) outside of Blender.
+
+Attribute names of the records mirror the names of the RobotDesigner properties they are copied from.
+
+:func:`robot_to_arrays` and :func:`robot_from_arrays` convert the IR to JSON and numpy arrays. The robot cache
+(:mod:`.robot_cache`) stores it with every snapshot such that :func:`read_robot` can recreate it without the scene.
+"""
+
+# System imports
+import hashlib
+import json
+import math
+import numpy as np
+
+# RobotDesigner imports
+from .muscle_paths import capture_muscle_paths, capture_wrap_obstacles
+
+
+def sanitize_name(name):
+    """
+    Replaces characters that are not allowed in names of exported elements.
+
+    :param name: Blender name
+    :return: name without dots and spaces
+    """
+    return name.replace(".", "_").replace(" ", "_")
+
+
+def matrix_to_array(matrix):
+    """
+    Converts a :class:`mathutils.Matrix` (or any nested sequence) to a numpy array.
+    """
+    return np.array(matrix, dtype=np.float64)
+
+
+def euler_from_matrix(matrix):
+    """
+    Computes XYZ euler angles from the rotational part of a homogeneous matrix. The scale is removed first and from
+    the two possible solutions the one with the smaller sum of absolute angles is chosen (as in
+    :meth:`mathutils.Matrix.to_euler`).
+
+    :param matrix: 4x4 or 3x3 numpy array
+    :return: list with three angles
+    """
+    rotation = np.asarray(matrix, dtype=np.float64)[:3, :3]
+    rotation = rotation / np.linalg.norm(rotation, axis=0)
+
+    cy = math.hypot(rotation[0, 0], rotation[1, 0])
+    if cy > 16.0 * np.finfo(np.float32).eps:
+        euler1 = [math.atan2(rotation[2, 1], rotation[2, 2]),
+                  math.atan2(-rotation[2, 0], cy),
+                  math.atan2(rotation[1, 0], rotation[0, 0])]
+        euler2 = [math.atan2(-rotation[2, 1], -rotation[2, 2]),
+                  math.atan2(-rotation[2, 0], -cy),
+                  math.atan2(-rotation[1, 0], -rotation[0, 0])]
+        if sum(abs(a) for a in euler1) > sum(abs(a) for a in euler2):
+            return euler2
+        return euler1
+
+    return [math.atan2(-rotation[1, 2], rotation[1, 1]), math.atan2(-rotation[2, 0], cy), 0.0]
+
+
+def matrix_to_pose(matrix, scale_factor=(1.0, 1.0, 1.0)):
+    """
+    Splits a homogeneous matrix into a (scaled) translation and XYZ euler angles.
+
+    :param matrix: 4x4 numpy array
+    :param scale_factor: factors applied component-wise to the translation
+    :return: tuple of two python lists (xyz, rpy)
+    """
+    xyz = (np.asarray(matrix)[:3, 3] * np.asarray(scale_factor)).tolist()
+    return xyz, euler_from_matrix(matrix)
+
+
+class Record(object):
+    """
+    Base class of flat records copied from RobotDesigner property groups. Subclasses list the copied property names
+    in ``__slots__``.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_rna(cls, struct):
+        """
+        Copies the values of all slots from a Blender struct.
+
+        :param struct: The property group to copy from
+        :return: new record
+        """
+        record = cls.__new__(cls)
+        for name in cls.__slots__:
+            value = getattr(struct, name)
+            if not isinstance(value, (str, bool, int, float)):
+                value = tuple(value)
+            setattr(record, name, value)
+        return record
+
+    def __repr__(self):
+        return "{}({})".format(
+            type(self).__name__, ", ".join("{}={!r}".format(name, getattr(self, name)) for name in self.__slots__)
+        )
+
+
+class LinkInfo(Record):
+    __slots__ = ("gravity", "link_self_collide")
+
+
+class Ode(Record):
+    __slots__ = ("cfm_damping", "i_s_damper", "cfm", "erp")
+
+
+class JointDynamics(Record):
+    __slots__ = ("damping", "friction", "spring_reference", "spring_stiffness")
+
+
+class DegreeOfFreedom(Record):
+    __slots__ = ("value", "offset", "min", "max", "isActive")
+
+
+class Actuator(Record):
+    __slots__ = ("isActive", "maxVelocity", "maxTorque")
+
+
+class JointController(Record):
+    __slots__ = ("isActive", "controllerType", "P", "I", "D")
+
+
+class Dynamics(Record):
+    __slots__ = ("mass", "inertiaXX", "inertiaXY", "inertiaXZ", "inertiaYY", "inertiaYZ", "inertiaZZ")
+
+
+class SurfaceProperties(Record):
+    __slots__ = (
+        "restitution_coeff", "threshold", "coefficient", "use_patch_radius", "patch_radius", "surface_radius",
+        "slip", "mu", "mu2", "fdir1", "slip1", "slip2", "collide_wo_contact", "collide_wo_contact_bitmask",
+        "collide_bitmask", "category_bitmask", "poissons_ratio", "elastic_modulus", "osim_stiffness",
+        "osim_dissipation", "soft_cfm", "soft_erp", "kp", "kd", "max_vel", "min_depth",
+    )
+
+
+class Joint(object):
+    """
+    The joint connecting a link to its parent.
+    """
+
+    __slots__ = ("name", "jointMode", "axis", "axis_revert", "theta", "d", "dynamic_limits", "ode",
+                 "joint_dynamics", "jointController")
+
+    def __init__(self, segment):
+        """
+        :param segment: The ``RobotDesigner`` property group of a bone
+        """
+        self.name = segment.joint_name
+        self.jointMode = segment.jointMode
+        self.axis = segment.axis
+        self.axis_revert = segment.axis_revert
+        self.theta = DegreeOfFreedom.from_rna(segment.theta)
+        self.d = DegreeOfFreedom.from_rna(segment.d)
+        self.dynamic_limits = Actuator.from_rna(segment.dynamic_limits)
+        self.ode = Ode.from_rna(segment.ode)
+        self.joint_dynamics = JointDynamics.from_rna(segment.joint_dynamics)
+        self.jointController = JointController.from_rna(segment.jointController)
+
+    def axis_vector(self):
+        """
+        :return: The (possibly reverted) joint axis as numpy array
+        """
+        return np.eye(3)["XYZ".index(self.axis)] * (-1.0 if self.axis_revert else 1.0)
+
+
+class Geometry(object):
+    """
+    A mesh attached to a link. ``pose`` is relative to the pose bone of the link.
+    """
+
+    __slots__ = ("name", "tag", "fileName", "vertex_count", "scale", "pose", "sdfCollisionProps")
+
+    def __init__(self, obj, pose):
+        self.name = obj.name
+        self.tag = obj.RobotDesigner.tag
+        self.fileName = obj.RobotDesigner.fileName
+        self.vertex_count = len(obj.data.vertices)
+        self.scale = np.array(obj.scale)
+        self.pose = pose
+        self.sdfCollisionProps = SurfaceProperties.from_rna(obj.RobotDesigner.sdfCollisionProps)
+
+
+class Inertial(object):
+    """
+    A physics frame attached to a link. ``pose`` is relative to the pose bone of the link.
+    """
+
+    __slots__ = ("name", "dynamics", "pose")
+
+    def __init__(self, obj, pose):
+        self.name = obj.name
+        self.dynamics = Dynamics.from_rna(obj.RobotDesigner.dynamics)
+        self.pose = pose
+
+    def inertia_tensor(self):
+        """
+        :return: symmetric 3x3 numpy array
+        """
+        d = self.dynamics
+        return np.array([[d.inertiaXX, d.inertiaXY, d.inertiaXZ],
+                         [d.inertiaXY, d.inertiaYY, d.inertiaYZ],
+                         [d.inertiaXZ, d.inertiaYZ, d.inertiaZZ]])
+
+
+class Sensor(object):
+    __slots__ = ("name", "sensor_type", "pose")
+
+    def __init__(self, obj, pose):
+        self.name = obj.name
+        self.sensor_type = obj.RobotDesigner.sensor_type
+        self.pose = pose
+
+
+class WrappingObject(object):
+    """
+    A muscle wrapping object. ``pose`` is relative to the pose bone of the link it is attached to.
+    """
+
+    __slots__ = ("name", "WrappingType", "parent_bone", "muscle", "scale", "pose")
+
+    def __init__(self, obj, pose):
+        self.name = obj.name
+        self.WrappingType = obj.RobotDesigner.wrap.WrappingType
+        self.parent_bone = obj.parent_bone
+        self.muscle = obj.RobotDesigner.muscles.name
+        self.scale = np.array(obj.scale)
+        self.pose = pose
+
+
+class Muscle(object):
+    """
+    A muscle. ``points`` is a (N, 3) array holding the path points relative to the pose bones listed in
+    ``coord_frames``. ``length`` is the current path length (the stored property if not given).
+    """
+
+    __slots__ = ("name", "muscleType", "length", "max_isometric_force", "coord_frames", "points", "wraps")
+
+    def __init__(self, obj, coord_frames, points, length=None):
+        muscle = obj.RobotDesigner.muscles
+        self.name = obj.name
+        self.muscleType = muscle.muscleType
+        self.length = muscle.length if length is None else float(length)
+        self.max_isometric_force = muscle.max_isometric_force
+        self.coord_frames = coord_frames
+        self.points = points
+        self.wraps = [wrap.wrappingName for wrap in muscle.connectedWraps]
+
+
+class Link(object):
+    """
+    A link (i.e., a RobotDesigner segment). ``transform`` is the transformation returned by
+    :meth:`RDSegment.getTransform` and ``pose_matrix`` the pose bone matrix in world coordinates.
+    """
+
+    __slots__ = ("name", "bone_name", "parent", "children", "world", "linkInfo", "joint", "transform",
+                 "pose_matrix", "geometries", "inertials", "sensors", "wrapping_objects")
+
+    def __init__(self, bone, parent, transform, pose_matrix):
+        segment = bone.RobotDesigner
+        self.name = sanitize_name(bone.name)
+        self.bone_name = bone.name
+        self.parent = parent
+        self.children = []
+        self.world = segment.world
+        self.linkInfo = LinkInfo.from_rna(segment.linkInfo)
+        self.joint = Joint(segment)
+        self.transform = transform
+        self.pose_matrix = pose_matrix
+        self.geometries = []
+        self.inertials = []
+        self.sensors = []
+        self.wrapping_objects = []
+
+    def __repr__(self):
+        return "Link({!r})".format(self.name)
+
+
+class Robot(object):
+    """
+    Snapshot of a complete robot model.
+    """
+
+    __slots__ = ("name", "location", "rotation_euler", "scale", "physics_engine", "roots", "links", "muscles",
+                 "wrapping_objects")
+
+    def __init__(self, armature):
+        self.name = armature.name
+        self.location = np.array(armature.location)
+        self.rotation_euler = np.array(armature.rotation_euler)
+        self.scale = np.array(armature.scale)
+        self.physics_engine = armature.RobotDesigner.physics_engine
+        self.roots = []
+        self.links = {}
+        self.muscles = []
+        self.wrapping_objects = []
+
+    def walk(self):
+        """
+        Iterates over all links in depth-first order.
+        """
+        stack = list(reversed(self.roots))
+        while stack:
+            link = stack.pop()
+            yield link
+            stack.extend(reversed(link.children))
+
+    def sdf_scale_factor(self):
+        """
+        :return: The scale of the armature with y and z axis swapped (as used for the Gazebo coordinate frame).
+        """
+        return self.scale[[0, 2, 1]]
+
+
+def _capture_muscles(muscle_objects, frame_inverse, wrap_objects):
+    """
+    Reads the path points of all muscles at once (with hooks applied, see :func:`.muscle_paths.capture_muscle_paths`).
+    The lengths are computed with the paths wrapped over the connected wrapping objects.
+
+    :return: list of :class:`Muscle`
+    """
+    paths = capture_muscle_paths(muscle_objects)
+    lengths = paths.wrapped_lengths(capture_wrap_obstacles(wrap_objects))
+    muscles = []
+    for index, obj in enumerate(muscle_objects):
+        world = np.c_[paths.muscle_points(index), np.ones(paths.offsets[index + 1] - paths.offsets[index])]
+        coord_frames = paths.coord_frames[paths.offsets[index]:paths.offsets[index + 1]]
+        points = np.empty((len(world), 3))
+        for i, point in enumerate(world):
+            points[i] = (frame_inverse[coord_frames[i]] @ point)[:3]
+        muscles.append(Muscle(obj, coord_frames, points, lengths[index]))
+    return muscles
+
+
+def capture_robot(context, armature):
+    """
+    Creates the intermediate representation of a robot. Every bone and every object of the scene is accessed
+    exactly once.
+
+    :param context: The current context
+    :param armature: The armature object of the robot
+    :return: :class:`Robot`
+    """
+    robot = Robot(armature)
+
+    armature_inverse = np.linalg.inv(matrix_to_array(armature.matrix_world))
+    # maps bone names to the transformation from world coordinates into the pose bone frame
+    frame_inverse = {}
+    links = {}
+
+    for bone in armature.data.bones:
+        transform, _ = bone.RobotDesigner.getTransform()
+        pose_matrix = matrix_to_array(armature.pose.bones[bone.name].matrix)
+        frame_inverse[bone.name] = np.linalg.inv(pose_matrix) @ armature_inverse
+        parent = links[bone.parent.name] if bone.parent else None
+        link = Link(bone, parent, matrix_to_array(transform), pose_matrix)
+        links[bone.name] = link
+        robot.links[link.name] = link
+        if parent is None:
+            robot.roots.append(link)
+        else:
+            parent.children.append(link)
+
+    muscle_objects = []
+    wrap_objects = []
+    for obj in context.scene.objects:
+        rd = obj.RobotDesigner
+        if rd.muscles.robotName == armature.name:
+            muscle_objects.append(obj)
+            continue
+        if obj.parent != armature or obj.parent_bone not in links:
+            continue
+
+        link = links[obj.parent_bone]
+        pose = frame_inverse[obj.parent_bone] @ matrix_to_array(obj.matrix_world)
+        if rd.tag == "WRAPPING":
+            wrap = WrappingObject(obj, pose)
+            wrap_objects.append(obj)
+            link.wrapping_objects.append(wrap)
+            robot.wrapping_objects.append(wrap)
+        elif rd.tag == "PHYSICS_FRAME":
+            link.inertials.append(Inertial(obj, pose))
+        elif rd.tag == "SENSOR":
+            link.sensors.append(Sensor(obj, pose))
+        elif obj.type == "MESH":
+            link.geometries.append(Geometry(obj, pose))
+
+    robot.muscles.extend(_capture_muscles(muscle_objects, frame_inverse, wrap_objects))
+
+    return robot
+
+
+ARRAY_KEY = "__array__"
+TYPE_KEY = "__type__"
+RECORD_TYPES = {
+    cls.__name__: cls
+    for cls in (LinkInfo, Ode, JointDynamics, DegreeOfFreedom, Actuator, JointController, Dynamics,
+                SurfaceProperties, Joint, Geometry, Inertial, Sensor, WrappingObject, Muscle)
+}
+
+
+def _encode_slots(record, arrays, skip=()):
+    return {name: _encode(getattr(record, name), arrays) for name in type(record).__slots__ if name not in skip}
+
+
+def _encode(value, arrays):
+    """
+    Converts a value of the IR into JSON. Numpy arrays are moved to ``arrays`` and referenced by their key.
+    """
+    if isinstance(value, np.ndarray):
+        key = "robot_{}".format(len(arrays))
+        arrays[key] = value
+        return {ARRAY_KEY: key}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return [_encode(v, arrays) for v in value]
+    if type(value).__name__ in RECORD_TYPES:
+        encoded = _encode_slots(value, arrays)
+        encoded[TYPE_KEY] = type(value).__name__
+        return encoded
+    return value
+
+
+def _decode(value, data):
+    if isinstance(value, list):
+        return [_decode(v, data) for v in value]
+    if not isinstance(value, dict):
+        return value
+    if ARRAY_KEY in value:
+        return np.array(data[value[ARRAY_KEY]])
+    cls = RECORD_TYPES[value[TYPE_KEY]]
+    return _decode_slots(cls.__new__(cls), value, data)
+
+
+def _decode_slots(record, values, data, skip=()):
+    for name in type(record).__slots__:
+        if name in skip:
+            continue
+        value = _decode(values[name], data)
+        if isinstance(record, Record) and isinstance(value, list):
+            value = tuple(value)
+        setattr(record, name, value)
+    return record
+
+
+def robot_to_arrays(robot):
+    """
+    Converts the IR of a robot into a JSON serializable dictionary and numpy arrays (keys ``robot_{index}``).
+
+    :param robot: :class:`Robot`
+    :return: tuple (dictionary, dictionary of numpy arrays)
+    """
+    arrays = {}
+    meta = _encode_slots(robot, arrays, ("roots", "links"))
+    meta["links"] = []
+    for link in robot.walk():
+        # the wrapping objects of the links are restored from those of the robot
+        entry = _encode_slots(link, arrays, ("parent", "children", "wrapping_objects"))
+        entry["parent"] = link.parent.bone_name if link.parent is not None else None
+        meta["links"].append(entry)
+    return meta, arrays
+
+
+def robot_from_arrays(meta, data):
+    """
+    Recreates the IR converted with :func:`robot_to_arrays`.
+
+    :param meta: The dictionary
+    :param data: Mapping containing the arrays (e.g., an opened ``.npz`` file)
+    :return: :class:`Robot`
+    """
+    robot = _decode_slots(Robot.__new__(Robot), meta, data, ("roots", "links"))
+    robot.roots = []
+    robot.links = {}
+    bones = {}
+    for entry in meta["links"]:
+        link = _decode_slots(Link.__new__(Link), entry, data, ("parent", "children", "wrapping_objects"))
+        link.parent = bones[entry["parent"]] if entry["parent"] is not None else None
+        link.children = []
+        link.wrapping_objects = []
+        bones[link.bone_name] = link
+        robot.links[link.name] = link
+        if link.parent is None:
+            robot.roots.append(link)
+        else:
+            link.parent.children.append(link)
+    for wrap in robot.wrapping_objects:
+        bones[wrap.parent_bone].wrapping_objects.append(wrap)
+    return robot
+
+
+def robot_digest(robot):
+    """
+    :param robot: :class:`Robot`
+    :return: hex digest of the content of the IR (e.g., to detect changes between exports)
+    """
+    meta, arrays = robot_to_arrays(robot)
+    hasher = hashlib.sha1(json.dumps(meta, sort_keys=True).encode())
+    for key in sorted(arrays):
+        array = np.ascontiguousarray(arrays[key])
+        hasher.update("{}{}{}".format(key, array.dtype.str, array.shape).encode())
+        hasher.update(array.tobytes())
+    return hasher.hexdigest()
+
+
+def read_robot(file_path):
+    """
+    Reads the IR stored in a robot cache snapshot (see :func:`.robot_cache.save_robot`).
+
+    :param file_path: The ``.npz`` file
+    :return: :class:`Robot`
+    """
+    with np.load(file_path) as data:
+        meta = json.loads(str(data["meta"]))
+        if "robot" not in meta:
+            raise ValueError("The robot cache {} does not contain an export snapshot".format(file_path))
+        return robot_from_arrays(meta["robot"], data)
@@ -0,0 +1,175 @@
+# #####
+#  This file is part of the RobotDesigner developed in the Neurorobotics
+#  subproject of the Human Brain Project (https://www.humanbrainproject.eu).
+#
+#  The Human Brain Project is a European Commission funded project
+#  in the frame of the Horizon2020 FET Flagship plan.
+#  (http://ec.europa.eu/programmes/horizon2020/en/h2020-section/fet-flagships)
+#
+#  The Robot Designer has initially been forked from the RobotEditor
+#  (https://gitlab.com/h2t/roboteditor) developed at the Karlsruhe Institute
+#  of Technology in the High Performance Humanoid Technologies Laboratory (H2T).
+# #####
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# System imports
+import os
+import sys
+import json
+import types
+import tempfile
+import unittest
+import numpy as np
+from types import SimpleNamespace
+
+# load the modules of this directory without the blender dependent package
+sys.modules.setdefault("export", types.ModuleType("export")).__path__ = [os.path.dirname(os.path.abspath(__file__))]
+from export import robot_ir
+from export.robot_ir import (Robot, Link, Geometry, Inertial, Sensor, WrappingObject, Muscle, Record,
+                             robot_to_arrays, robot_from_arrays, robot_digest, read_robot)
+
+
+def struct(cls, **values):
+    """
+    :return: stand-in for the property group a record is copied from (slots not given are 0.5)
+    """
+    return SimpleNamespace(**dict({name: 0.5 for name in cls.__slots__}, **values))
+
+
+def segment(name):
+    return SimpleNamespace(
+        joint_name=name + "_joint", jointMode="REVOLUTE", axis="Z", axis_revert=False, world=False,
+        theta=struct(robot_ir.DegreeOfFreedom, isActive=True), d=struct(robot_ir.DegreeOfFreedom, isActive=False),
+        dynamic_limits=struct(robot_ir.Actuator, isActive=True), ode=struct(robot_ir.Ode),
+        joint_dynamics=struct(robot_ir.JointDynamics),
+        jointController=struct(robot_ir.JointController, isActive=False, controllerType="position"),
+        linkInfo=struct(robot_ir.LinkInfo, gravity=True, link_self_collide=False),
+    )
+
+
+def rd_object(name, **properties):
+    defaults = dict(tag="DEFAULT", fileName=name, sensor_type="CAMERA_SENSOR", physics_engine="ODE",
+                    dynamics=struct(robot_ir.Dynamics),
+                    sdfCollisionProps=struct(robot_ir.SurfaceProperties, use_patch_radius=True, fdir1=(1, 0, 0)),
+                    wrap=SimpleNamespace(WrappingType="WRAPPING_SPHERE"),
+                    muscles=SimpleNamespace(name="", muscleType="MILLARD_EQUIL", length=0.3, max_isometric_force=100.0,
+                                            connectedWraps=[]))
+    defaults.update(properties)
+    return SimpleNamespace(name=name, RobotDesigner=SimpleNamespace(**defaults), scale=(1.0, 2.0, 3.0),
+                           data=SimpleNamespace(vertices=[None] * 8), parent_bone="upper bone",
+                           location=(1.0, 2.0, 3.0), rotation_euler=(0.0, 0.0, 0.5))
+
+
+def make_robot():
+    robot = Robot(rd_object("robot"))
+    parent = None
+    for name in ("base", "upper", "lower"):
+        pose = np.identity(4)
+        pose[2, 3] = len(robot.links)
+        link = Link(SimpleNamespace(name=name + " bone", RobotDesigner=segment(name)), parent, np.identity(4), pose)
+        robot.links[link.name] = link
+        if parent is None:
+            robot.roots.append(link)
+        else:
+            parent.children.append(link)
+        link.geometries.append(Geometry(rd_object(name + "_visual"), pose))
+        link.inertials.append(Inertial(rd_object(name + "_frame"), np.identity(4)))
+        parent = link
+    robot.links["upper_bone"].sensors.append(Sensor(rd_object("camera"), np.identity(4)))
+
+    wrap = WrappingObject(rd_object("sphere", muscles=SimpleNamespace(name="biceps")), np.identity(4))
+    robot.links["upper_bone"].wrapping_objects.append(wrap)
+    robot.wrapping_objects.append(wrap)
+    muscle = rd_object("biceps")
+    muscle.RobotDesigner.muscles.connectedWraps = [SimpleNamespace(wrappingName="sphere")]
+    robot.muscles.append(Muscle(muscle, ["base bone", "lower bone"], np.arange(6, dtype=float).reshape(2, 3), 0.7))
+    return robot
+
+
+class IrTestCase(unittest.TestCase):
+    def assertSameValue(self, first, second, path):
+        if isinstance(first, np.ndarray):
+            np.testing.assert_array_equal(first, second, err_msg=path)
+        elif isinstance(first, (Record, Geometry, Inertial, Sensor, WrappingObject, Muscle, robot_ir.Joint)):
+            self.assertIs(type(first), type(second), path)
+            for name in type(first).__slots__:
+                self.assertSameValue(getattr(first, name), getattr(second, name), path + "." + name)
+        elif isinstance(first, (list, tuple)):
+            self.assertEqual(len(first), len(second), path)
+            for i, (a, b) in enumerate(zip(first, second)):
+                self.assertSameValue(a, b, "{}[{}]".format(path, i))
+        else:
+            self.assertEqual(first, second, path)
+
+    def assertSameRobot(self, robot, other):
+        for name in ("name", "location", "rotation_euler", "scale", "physics_engine", "muscles", "wrapping_objects"):
+            self.assertSameValue(getattr(robot, name), getattr(other, name), name)
+        self.assertEqual(list(robot.links), list(other.links))
+        self.assertEqual([link.name for link in robot.walk()], [link.name for link in other.walk()])
+        for link, copy in zip(robot.walk(), other.walk()):
+            self.assertEqual(link.parent.name if link.parent else None, copy.parent.name if copy.parent else None)
+            for name in ("bone_name", "world", "linkInfo", "joint", "transform", "pose_matrix", "geometries",
+                         "inertials", "sensors"):
+                self.assertSameValue(getattr(link, name), getattr(copy, name), link.name + "." + name)
+            self.assertEqual([wrap.name for wrap in link.wrapping_objects],
+                             [wrap.name for wrap in copy.wrapping_objects])
+
+
+class ArraysRoundTrip(IrTestCase):
+    def runTest(self):
+        robot = make_robot()
+        meta, arrays = robot_to_arrays(robot)
+        # the dictionary has to be JSON serializable
+        meta = json.loads(json.dumps(meta))
+        copy = robot_from_arrays(meta, arrays)
+        self.assertSameRobot(robot, copy)
+        # wrapping objects are shared between the robot and the links
+        self.assertIs(copy.links["upper_bone"].wrapping_objects[0], copy.wrapping_objects[0])
+        self.assertEqual(robot_digest(robot), robot_digest(copy))
+
+
+class ReadRobot(IrTestCase):
+    def runTest(self):
+        robot = make_robot()
+        meta, arrays = robot_to_arrays(robot)
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "robot.npz")
+            np.savez(file_path, meta=np.array(json.dumps({"version": 2, "robot": meta})), **arrays)
+            self.assertSameRobot(robot, read_robot(file_path))
+
+            np.savez(file_path, meta=np.array(json.dumps({"version": 2})))
+            with self.assertRaises(ValueError):
+                read_robot(file_path)
+
+
+class Digest(unittest.TestCase):
+    def runTest(self):
+        robot = make_robot()
+        digest = robot_digest(robot)
+        self.assertEqual(digest, robot_digest(make_robot()))
+        robot.links["lower_bone"].joint.theta.max = 2.0
+        self.assertNotEqual(robot_digest(robot), digest)
+        robot = make_robot()
+        robot.muscles[0].points[1, 2] += 1e-6
+        self.assertNotEqual(robot_digest(robot), digest)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -25,6 +25,7 @@
 # ##### END GPL LICENSE BLOCK #####
 
 # System imports
+import logging
 import pyxb
 import os
 
@@ -32,7 +33,12 @@ import os
 from . import sdf_model_dom
 from .helpers import list_to_string, string_to_list
 from pyxb import ContentNondeterminismExceededError
-from ....core.logfile import export_logger
+from ...xml_stream import write_binding
+from ... import fast_parser
+from ...package_manifest import package_manifest
+
+# the logger of core.logfile (not imported such that the module can be used without blender)
+export_logger = logging.getLogger("Export")
 
 def set_value(l):
     """
@@ -71,7 +77,7 @@ class SDFTree(object):
         self.connectedJoints = connected_joints
 
     @staticmethod
-    def parse(file_name):
+    def parse(file_name, validate=False):
         """ Parses a SDF file and builds up a tree representing the kinematic structure of a robot.
         Explanation: The SDF file format stores links (i.e., rigid bodies) and joints (i.e., connection between links)
         in a flat structure (as opposed to a tree data structure). Links have no references while joints refer to the
@@ -79,6 +85,8 @@ class SDFTree(object):
         and calls the recursive SDFTree.build() method to create a tree-like data structure representing the
         kinematic tree(s) of the robot.
         :param file_name: the name of the file to open
+        :param validate: If True, the file is read (and validated) with the pyxb bindings. Otherwise, the faster
+            non-validating :func:`.fast_parser.parse` is used.
         """
 
         # read the file
@@ -86,7 +94,10 @@ class SDFTree(object):
         # to add the root link to the kinematic chain, we create a virtual link on top of the root link. (temporal solution)
 
         try:
-            root = sdf_model_dom.CreateFromDocument(open(file_name).read())
+            if validate:
+                root = sdf_model_dom.CreateFromDocument(open(file_name).read())
+            else:
+                root = fast_parser.parse(file_name, sdf_model_dom)
         except ContentNondeterminismExceededError as e:
             export_logger.error("Error raised {}, {}".format(e, e.instance.name))
             raise e
@@ -119,23 +130,8 @@ class SDFTree(object):
                 export_logger.debug("Built controller cache:")
                 export_logger.debug(controller_cache)
 
-        # create mapping from (parent) links to joints  (a list)
-        connected_joints = {link: [joint for joint in robot.joint if link.name == joint.parent[0]] for link
-                            in robot.link}
-
-        # create mapping from joints to their child links (a dictionary)
-        connected_links = {joint: link for link in robot.link for joint in robot.joint if
-                           link.name == joint.child[0]}
-
-        # find root links (i.e., links that are NOT connected to a joint)
-        child_links = [link.name for link in robot.link for joint in robot.joint if
-                       (link.name == joint.child[0] and joint.parent[0] != 'world')]
-
-        ###  the link, not link name
-        root_links = [link for link in robot.link if link.name not in child_links]
-
-        # look for root links connected to world and create mapping from root link to world joint
-        world_joints = {link: joint for link in root_links for joint in robot.joint if link.name == joint.child[0]}
+        connected_joints, connected_links, root_links, world_joints = SDFTree.resolve_references(
+            robot.link, robot.joint)
 
         export_logger.debug("Root links: {}".format([i.name for i in root_links]))
         export_logger.debug("connected links: {}".format({j.name: l.name for j, l in connected_links.items()}))
@@ -170,25 +166,96 @@ class SDFTree(object):
         export_logger.debug("kinematic chains: {}".format(kinematic_chains))
         return muscles, robot.name, robot_location, robot_rotation, root_links, kinematic_chains, controller_cache # , gazebo_tags
 
+    @staticmethod
+    def resolve_references(links, joints):
+        """
+        Resolves the name references of the joints to their parent and child links. Links and joints are indexed by
+        name once such that the kinematic structure is resolved in O(links + joints). Dangling references (i.e.,
+        names of links that do not exist) and duplicate names are reported to the log. Joints with a dangling child
+        reference are ignored.
+
+        :param links: sdf_model_dom link elements
+        :param joints: sdf_model_dom joint elements
+        :return: tuple of the mappings link -> [joints], joint -> child link, the list of root links and the
+            mapping root link -> joint connecting it to the world.
+        """
+        links_by_name = {}
+        for link in links:
+            if link.name in links_by_name:
+                export_logger.warning("Duplicate link name: {}".format(link.name))
+            # the last link of a name wins
+            links_by_name[link.name] = link
+
+        joint_names = set()
+        joints_by_parent = {}
+        connected_links = {}
+        child_links = set()
+        parent_joints = {}
+        world_joints_by_child = {}
+        for joint in joints:
+            parent_name = joint.parent[0]
+            child_name = joint.child[0]
+
+            if joint.name in joint_names:
+                export_logger.warning("Duplicate joint name: {}".format(joint.name))
+            joint_names.add(joint.name)
+
+            if child_name not in links_by_name:
+                export_logger.warning("Joint {} refers to unknown child link {}".format(joint.name, child_name))
+                continue
+            if parent_name != 'world' and parent_name not in links_by_name:
+                export_logger.warning("Joint {} refers to unknown parent link {}".format(joint.name, parent_name))
+
+            if child_name in parent_joints:
+                export_logger.warning("Link {} is the child of joints {} and {}".format(
+                    child_name, parent_joints[child_name].name, joint.name))
+            parent_joints[child_name] = joint
+
+            joints_by_parent.setdefault(parent_name, []).append(joint)
+            connected_links[joint] = links_by_name[child_name]
+            world_joints_by_child[child_name] = joint
+            if parent_name != 'world':
+                child_links.add(child_name)
+
+        # create mapping from (parent) links to joints  (a list)
+        connected_joints = {link: list(joints_by_parent.get(link.name, [])) for link in links}
+
+        # find root links (i.e., links that are NOT connected to a joint)
+        ###  the link, not link name
+        root_links = [link for link in links if link.name not in child_links]
+
+        # look for root links connected to world and create mapping from root link to world joint
+        world_joints = {link: world_joints_by_child[link.name] for link in root_links
+                        if link.name in world_joints_by_child}
+
+        return connected_joints, connected_links, root_links, world_joints
+
     def build(self, link, joint=None, depth=0):
         """
-        Recursive function that builds up the tree representation of the robot. You do not have to call it manually (
-        Called by parse).
+        Builds up the tree representation of the robot. You do not have to call it manually (Called by parse).
         :param link: The link the kinematics subtree starts with
         :param joint: The joint connecting to the previous link (if any)
         """
-        self.children = []
-        self.joint = joint
-        self.link = link
-        # self.set_defaults() # todo:set defaults
-
-        children = self.connectedJoints[link]
-
-        for joint in children:
-            tree = SDFTree(connected_links=self.connectedLinks, connected_joints=self.connectedJoints,
-                           robot=self.robot)
-            self.children.append(tree)
-            tree.build(self.connectedLinks[joint], joint, depth + 1)
+        # Uses an explicit stack as long kinematic chains would exceed the recursion limit
+        visited = set()
+        stack = [(self, link, joint)]
+        while stack:
+            node, link, joint = stack.pop()
+            node.children = []
+            node.joint = joint
+            node.link = link
+            # node.set_defaults() # todo:set defaults
+
+            if link in visited:
+                export_logger.warning("Closed kinematic loop at link {}".format(link.name))
+                continue
+            visited.add(link)
+
+            for joint in self.connectedJoints[link]:
+                tree = SDFTree(connected_links=self.connectedLinks, connected_joints=self.connectedJoints,
+                               robot=self.robot)
+                node.children.append(tree)
+                stack.append((tree, self.connectedLinks[joint], joint))
 
     @staticmethod
     def create_empty(name):
@@ -255,14 +322,9 @@ class SDFTree(object):
         if not os.path.exists(os.path.dirname(file_name)):
             os.makedirs(os.path.dirname(file_name))
 
-        with open(file_name, "w") as f:
-
-            output = self.sdf.toDOM().toprettyxml()
-
-            # output = self.sdf.toprettyxml()
-            # output = self.sdf.toxml("utf-8", element_name="sdf").decode("utf-8")
-            # output = output.replace(">", ">\n")
-            f.write(output)
+        with package_manifest.open(file_name) as f:
+            # streams the document instead of building the whole minidom tree (same output as toprettyxml())
+            write_binding(self.sdf, f)
 
     def _write(self):
         """
@@ -0,0 +1,115 @@
+# #####
+#  This file is part of the RobotDesigner developed in the Neurorobotics
+#  subproject of the Human Brain Project (https://www.humanbrainproject.eu).
+#
+#  The Human Brain Project is a European Commission funded project
+#  in the frame of the Horizon2020 FET Flagship plan.
+#  (http://ec.europa.eu/programmes/horizon2020/en/h2020-section/fet-flagships)
+#
+#  The Robot Designer has initially been forked from the RobotEditor
+#  (https://gitlab.com/h2t/roboteditor) developed at the Karlsruhe Institute
+#  of Technology in the High Performance Humanoid Technologies Laboratory (H2T).
+# #####
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# System imports
+import os
+import sys
+import types
+import unittest
+
+# load the modules of the export package without the blender dependent package modules
+EXPORT_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..")
+PACKAGES = (("export", ""), ("export.sdf", "sdf"), ("export.sdf.generic", os.path.join("sdf", "generic")))
+for package, directory in PACKAGES:
+    sys.modules.setdefault(package, types.ModuleType(package)).__path__ = [os.path.join(EXPORT_DIRECTORY, directory)]
+from export.sdf.generic.sdf_tree import SDFTree
+
+
+class Element(object):
+    """
+    Stand-in for the link and joint bindings (hashable by identity like those)
+    """
+
+    def __init__(self, **attributes):
+        self.__dict__.update(attributes)
+
+    def __repr__(self):
+        return self.name
+
+
+def link(name):
+    return Element(name=name)
+
+
+def joint(name, parent, child):
+    return Element(name=name, parent=[parent], child=[child])
+
+
+class ResolveReferences(unittest.TestCase):
+    def runTest(self):
+        links = [link("base"), link("upper"), link("lower"), link("hand"), link("camera")]
+        joints = [joint("fixed", "world", "base"), joint("shoulder", "base", "upper"),
+                  joint("elbow", "upper", "lower"), joint("wrist", "lower", "hand")]
+        connected_joints, connected_links, root_links, world_joints = SDFTree.resolve_references(links, joints)
+
+        base, upper, lower, hand, camera = links
+        fixed, shoulder, elbow, wrist = joints
+        self.assertEqual(connected_joints, {base: [shoulder], upper: [elbow], lower: [wrist], hand: [], camera: []})
+        self.assertEqual(connected_links, {fixed: base, shoulder: upper, elbow: lower, wrist: hand})
+        # links without parent joint (except the world) are roots, in the order of the document
+        self.assertEqual(root_links, [base, camera])
+        self.assertEqual(world_joints, {base: fixed})
+
+
+class ResolveBranches(unittest.TestCase):
+    def runTest(self):
+        links = [link("torso")] + [link("arm{}".format(i)) for i in range(3)]
+        joints = [joint("joint{}".format(i), "torso", "arm{}".format(i)) for i in range(3)]
+        connected_joints, connected_links, root_links, world_joints = SDFTree.resolve_references(links, joints)
+        # joints keep the order of the document
+        self.assertEqual(connected_joints[links[0]], joints)
+        self.assertEqual([connected_links[j] for j in joints], links[1:])
+        self.assertEqual(root_links, links[:1])
+        self.assertEqual(world_joints, {})
+
+
+class DanglingReferences(unittest.TestCase):
+    def runTest(self):
+        links = [link("base"), link("upper"), link("upper")]
+        joints = [joint("shoulder", "base", "upper"), joint("elbow", "upper", "missing"),
+                  joint("floating", "missing", "base")]
+        with self.assertLogs("Export", "WARNING") as logs:
+            connected_joints, connected_links, root_links, world_joints = SDFTree.resolve_references(links, joints)
+        messages = "\n".join(logs.output)
+        self.assertIn("Duplicate link name: upper", messages)
+        self.assertIn("Joint elbow refers to unknown child link missing", messages)
+        self.assertIn("Joint floating refers to unknown parent link missing", messages)
+
+        # joints with a dangling child are ignored, the last link of a name is referenced
+        self.assertNotIn(joints[1], connected_links)
+        self.assertIs(connected_links[joints[0]], links[2])
+        self.assertEqual(connected_joints[links[1]], [])
+        # the base is the child of the dangling joint
+        self.assertEqual(root_links, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -43,6 +43,8 @@ Note: modify :meth:`pyxb.binding.basis._TypeBinding_mixin.toxml` to call :meth:`
 
 # System imports
 import os
+import json
+import hashlib
 from math import radians
 import tempfile
 from pathlib import Path
@@ -50,16 +52,16 @@ from pathlib import Path
 # Blender imports
 import bpy
 from bpy.props import StringProperty, BoolProperty
-from mathutils import Vector
 
 # RobotDesigner imports
 from .generic import sdf_tree
 from .generic.helpers import list_to_string, string_to_list, localpose2globalpose
 from ...core import config, PluginManager, RDOperator
 from ...core.logfile import export_logger
+from ...core.profiling import profiler
 from ...operators.helpers import ModelSelected, ObjectMode
 from ...operators.model import SelectModel
-from ..osim.osim_export import create_osim, get_muscles
+from ..osim.osim_export import create_osim
 from ..generic_tools import (
     create_thumbnail,
     export_rqtez_publisher_muscle,
@@ -68,6 +70,13 @@ from ..generic_tools import (
     export_rqt_multiplot_jointcontroller,
 )
 from ...properties.globals import global_properties
+from ..mesh_cache import mesh_export_cache, mesh_hash, geometry_hash
+from ..collada_writer import can_write, write_collada, write_stl_object
+from ..mesh_export_pool import mesh_export_pool
+from ..package_manifest import package_manifest
+from ..package_archive import package_archive, parse_extensions
+from ..robot_cache import capture, rna_values
+from ..robot_ir import robot_digest, matrix_to_pose, sanitize_name
 
 from .generic import config_model_dom
 from .generic import sdf_model_dom
@@ -113,6 +122,51 @@ def indent(elem, level=0):
             elem.tail = i
 
 
+def _collada_operator_export(obj, file_path):
+    """
+    Exports a mesh with the blender COLLADA exporter. Only used for meshes that can not be written by
+    :func:`write_collada` (i.e., that use image textures) or if the direct writer is disabled.
+
+    :param obj: The mesh object
+    :param file_path: the ``.dae`` file
+    """
+    model_name = bpy.context.active_object.name
+    bpy.ops.object.select_all(action="DESELECT")
+    obj.select_set(True)
+    bpy.context.view_layer.objects.active = obj
+
+    hide_flag_backup = obj.hide_get()
+    obj.hide_set(False)  # Blender does not want to export hidden objects.
+
+    # disconnect mesh from armature
+    parent_bone = obj.parent_bone
+    obj.parent = None
+
+    bpy.ops.wm.collada_export(
+        filepath=file_path,
+        apply_modifiers=True,
+        selected=True,
+        use_texture_copies=True,
+    )
+
+    # reconnect mesh to armature
+    obj.parent = bpy.data.objects[model_name]
+    obj.parent_bone = parent_bone
+    obj.hide_set(hide_flag_backup)
+
+    # quick fix for dispersed meshes
+    # todo: find appropriate solution
+    with open(file_path, "r") as file:
+        lines = file.readlines()
+    with open(file_path, "w") as file:
+        for line in lines:
+            if "matrix" not in line:
+                file.write(line)
+
+    SelectModel.run(model_name=model_name)
+
+
+@profiler.profiled()
 def export_mesh(
     operator: RDOperator,
     context,
@@ -135,144 +189,83 @@ def export_mesh(
     :param in_ros_package: Whether to export into a ros package or plain files
     :param abs_file_paths: If not intstalled into a ros package decides whether to use absolute file paths.
     :param export_collision: Exporting a collision mesh or visualization mesh.
-    :return: name of the file the mesh is stored in.
+    :return: name of the file the mesh is stored in or None if it is not exported.
     """
 
     if not export_collision:
-        meshes = [
-            obj.name
-            for obj in context.scene.objects
-            if obj.type == "MESH"
-            and obj.name == name
-            and obj.RobotDesigner.tag == "DEFAULT"
-        ]
+        tag = "DEFAULT"
         directory = os.path.join(directory, "meshes", "visual")
 
     else:
-        meshes = [
-            obj.name
-            for obj in context.scene.objects
-            if obj.type == "MESH"
-            and name == obj.name
-            and obj.RobotDesigner.tag == "COLLISION"
-        ]
+        tag = "COLLISION"
         directory = os.path.join(directory, "meshes", "collisions")
+    obj = context.scene.objects.get(name)
+    meshes = [name] if obj is not None and obj.type == "MESH" and obj.RobotDesigner.tag == tag else []
     if not os.path.exists(directory):
         os.makedirs(directory)
     # There is max. 1 object in the list
     assert len(meshes) <= 1
     for mesh in meshes:
         export_logger.debug("Processing mesh: {}".format(mesh))
-        model_name = bpy.context.active_object.name
-        bpy.ops.object.select_all(action="DESELECT")
-        bpy.data.objects[mesh].select_set(True)
-        bpy.context.view_layer.objects.active = bpy.data.objects[mesh]
-        # bpy.context.active_object.select = True
+        obj = bpy.data.objects[mesh]
         # get the mesh vertices number
-        bm = bpy.context.view_layer.objects.active.data
+        bm = obj.data
+        # binary STL as compact alternative to COLLADA (without materials)
+        stl = global_properties.export_mesh_format.get(context.scene) == "STL"
+        extension = ".stl" if stl else ".dae"
         # export_logger.debug("# of vertices={}".format(len(bm.vertices)))
         if len(bm.vertices) > 1:
             file_path = os.path.join(
                     directory,
-                    bpy.data.objects[mesh].RobotDesigner.fileName.replace(".", "_").replace(" ", "_")
-                    + ".dae")
-
-
-            hide_flag_backup = bpy.context.view_layer.objects.active.hide_get()
-            bpy.context.view_layer.objects.active.hide_set(
-                False
-            )  # Blender does not want to export hidden objects.
-
-            # disconnect mesh from armature
-            parent_bone = bpy.data.objects[mesh].parent_bone
-            bpy.data.objects[mesh].parent = None
-
-            bpy.ops.wm.collada_export(
-                filepath=file_path,
-                apply_modifiers=True,
-                selected=True,
-                use_texture_copies=True,
-            )
+                    obj.RobotDesigner.fileName.replace(".", "_").replace(" ", "_")
+                    + extension)
+
+            direct = stl or (global_properties.export_direct_mesh_writer.get(context.scene) and can_write(obj))
+            geometry = geometry_hash(obj, writer="stl" if stl else "direct" if direct else "")
+
+            # links reusing a mesh (or identical geometry) reference the file written for the first one
+            shared_path = mesh_export_cache.shared_file(directory, geometry)
+            if shared_path is not None:
+                export_logger.debug("Mesh {} shares {}".format(mesh, shared_path))
+                return _uri_for_meshes_and_muscles(
+                    in_ros_package, abs_file_paths, toplevel_dir, shared_path
+                )
+            mesh_export_cache.register_export(directory, geometry, file_path)
 
-            # reconnect mesh to armature
-            bpy.data.objects[mesh].parent = bpy.data.objects[model_name]
-            bpy.data.objects[mesh].parent_bone = parent_bone
-
-            ## collada importer does not import library_visual_scene in blender 2.8
-            # tree = ET.parse(source=file_path)
-            # collada = tree.getroot()
-            # if collada.tag[0] == '{':
-            #     uri, ignore, tag = collada.tag[1:].partition("}")
-            #     xmlns = '{' + uri + '}'
-            #     ET.register_namespace('', uri)
-            #     # ET.register_namespace('xsi', 'http://www.w3.org/2001/XMLSchema-instance')
-            # else:
-            #     xmlns = ''
-            #
-            # lib_geometries = collada.find(xmlns + 'library_geometries')
-            # geometry_id = lib_geometries[0].get('id')
-            # mesh_url = '#' + geometry_id
-            #
-            # node_attr = {'id': mesh, 'name': mesh, 'type': 'NODE'}
-            # inst_geo_attr = {'url': mesh_url, 'name': mesh}
-            #
-            # lib_visual = collada.find(xmlns + 'library_visual_scenes')
-            # visual_scene = lib_visual.find(xmlns + 'visual_scene')
-            # if len(visual_scene) == 0:
-            #     node = visual_scene.makeelement('node', node_attr)
-            #     visual_scene.append(node)
-            #     instance = node.makeelement('instance_geometry', inst_geo_attr)
-            #     node.append(instance)
-            #
-            #     collada.set('xmlns:xsi', 'http://www.w3.org/2001/XMLSchema-instance')
-            #
-            #     indent(collada)
-            #     ET.ElementTree(collada).write(file_path, encoding="utf-8", xml_declaration=True)
-            ## collada importer does not import library_visual_scene in blender 2.8
-
-            # for elem in collada:
-            #     scene = elem.find(xmlns + 'visual_scene')
-            #     try:
-            #         node = scene.makeelement('node', node_attr)
-            #         scene.append(node)
-            #         instance = node.makeelement('instance_geometry', inst_geo_attr)
-            #         instance.text = None
-            #         node.append(instance)
-            #     except:
-            #         pass
-
-            # collada.set('xmlns:xsi', 'http://www.w3.org/2001/XMLSchema-instance')
-
-            # ET.ElementTree(collada).write(file_path, encoding="utf-8", xml_declaration=True)
-
-            bpy.context.view_layer.objects.active.hide_set(hide_flag_backup)
-
-            # quick fix for dispersed meshes
-            # todo: find appropriate solution
-            with open(file_path, "r") as file:
-                lines = file.readlines()
-            with open(file_path, "w") as file:
-                for line in lines:
-                    if "matrix" not in line:
-                        file.write(line)
-        else:
-            if "." in mesh:
-                file_path = os.path.join(
-                    directory,
-                    bpy.data.objects[mesh].RobotDesigner.fileName.replace(".", "_")
-                    + "_vertices"
-                    + str(len(bm.vertices))
-                    + ".dae",
+            # incremental package export: keep the file of the previous export
+            inputs = mesh_hash(obj, geometry=geometry) or geometry
+            if package_manifest.up_to_date(file_path, inputs):
+                return _uri_for_meshes_and_muscles(
+                    in_ros_package, abs_file_paths, toplevel_dir, file_path
                 )
+            package_manifest.record(file_path, inputs)
+
+            cache_key = None
+            if mesh_export_cache.enabled():
+                cache_key = mesh_hash(obj, geometry=geometry)
+                if mesh_export_cache.fetch(cache_key, file_path):
+                    package_archive.add(file_path)
+                    return _uri_for_meshes_and_muscles(
+                        in_ros_package, abs_file_paths, toplevel_dir, file_path
+                    )
+
+            if direct and not stl and mesh_export_pool.active:
+                # written (and cached) by the worker processes at the end of the pool session
+                mesh_export_pool.submit(obj, file_path, cache_key)
             else:
-                file_path = os.path.join(
-                    directory,
-                    bpy.data.objects[mesh].RobotDesigner.fileName
-                    + "_vertices"
-                    + str(len(bm.vertices))
-                    + ".dae",
-                )
-        SelectModel.run(model_name=model_name)
+                if stl:
+                    write_stl_object(obj, file_path)
+                elif direct:
+                    write_collada(obj, file_path)
+                else:
+                    _collada_operator_export(obj, file_path)
+
+                mesh_export_cache.store(cache_key, file_path)
+                package_archive.add(file_path)
+        else:
+            # degenerated meshes are not exported
+            export_logger.info("Skipping mesh {} with {} vertices".format(mesh, len(bm.vertices)))
+            return None
         return _uri_for_meshes_and_muscles(
             in_ros_package, abs_file_paths, toplevel_dir, file_path
         )
@@ -281,6 +274,7 @@ def export_mesh(
         # mesh + ".dae"))
 
 
+@profiler.profiled()
 def create_sdf(
     operator: RDOperator,
     context,
@@ -289,6 +283,7 @@ def create_sdf(
     toplevel_directory: str,
     in_ros_package: bool,
     abs_filepaths=False,
+    robot=None,
 ):
     """
     Creates the SDF XML file and exports the meshes
@@ -300,113 +295,70 @@ def create_sdf(
     :param toplevel_directory: The directory in which to export
     :param in_ros_package: Whether to export into a ros package or plain files
     :param abs_filepaths: If not installed into a ros package decides whether to use absolute file paths.
+    :param robot: Snapshot of the robot (see :func:`.robot_ir.capture_robot`). Captured if not given.
     :return:
     """
 
-    def walk_segments(segment, tree, ref_pose):
+    def walk_segments(link, tree, ref_pose):
         """
         Recursively builds a SDF tree object hierarchy for export
 
-        :param segment: Reference to a blender bone object
+        :param link: Reference to a link of the robot snapshot (Defined in robot_ir.py)
         :param tree: Reference to a SDF Tree object. (Defined in sdf_tree.py)
+        :param ref_pose: Global pose of the parent link
         """
 
-        export_logger.info("walk_segments: {}".format(str(segment)))
+        export_logger.info("walk_segments: {}".format(str(link)))
 
         child = tree.add()
-        trafo, dummy = segment.RobotDesigner.getTransform()
-        # trafo, _ = getTransformFromBlender(segment)
-
-        # child.joint.origin.rpy = list_to_string(trafo.to_euler())
-        # child.joint.origin.xyz = list_to_string([i * j for i, j in zip(trafo.translation, blender_scale_factor)])
+        joint = link.joint
 
         # Link Sdf properties export
-        child.link.gravity.append(segment.RobotDesigner.linkInfo.gravity)
-        child.link.self_collide.append(segment.RobotDesigner.linkInfo.link_self_collide)
+        child.link.gravity.append(link.linkInfo.gravity)
+        child.link.self_collide.append(link.linkInfo.link_self_collide)
         # joint ode properties
         child.joint.physics = [pyxb.BIND()]
         child.joint.physics[0].ode = [pyxb.BIND()]
-        child.joint.physics[0].ode[0].cfm_damping.append(
-            segment.RobotDesigner.ode.cfm_damping
-        )
-        child.joint.physics[0].ode[0].implicit_spring_damper.append(
-            segment.RobotDesigner.ode.i_s_damper
-        )
-        child.joint.physics[0].ode[0].cfm.append(segment.RobotDesigner.ode.cfm)
-        child.joint.physics[0].ode[0].erp.append(segment.RobotDesigner.ode.erp)
+        child.joint.physics[0].ode[0].cfm_damping.append(joint.ode.cfm_damping)
+        child.joint.physics[0].ode[0].implicit_spring_damper.append(joint.ode.i_s_damper)
+        child.joint.physics[0].ode[0].cfm.append(joint.ode.cfm)
+        child.joint.physics[0].ode[0].erp.append(joint.ode.erp)
         child.joint.axis[0].dynamics = [pyxb.BIND()]
-        child.joint.axis[0].dynamics[0].damping.append(
-            segment.RobotDesigner.joint_dynamics.damping
-        )
-        child.joint.axis[0].dynamics[0].friction.append(
-            segment.RobotDesigner.joint_dynamics.friction
-        )
+        child.joint.axis[0].dynamics[0].damping.append(joint.joint_dynamics.damping)
+        child.joint.axis[0].dynamics[0].friction.append(joint.joint_dynamics.friction)
         child.joint.axis[0].dynamics[0].spring_reference.append(
-            segment.RobotDesigner.joint_dynamics.spring_reference
+            joint.joint_dynamics.spring_reference
         )
         child.joint.axis[0].dynamics[0].spring_stiffness.append(
-            segment.RobotDesigner.joint_dynamics.spring_stiffness
+            joint.joint_dynamics.spring_stiffness
         )
 
-        pose_xyz = list_to_string(
-            [i * j for i, j in zip(trafo.translation, blender_scale_factor)]
+        pose_xyz, pose_rpy = matrix_to_pose(link.transform, blender_scale_factor)
+        pose_xyz, pose_rpy = localpose2globalpose(
+            ref_pose, list_to_string(pose_rpy), list_to_string(pose_xyz)
         )
-        pose_rpy = list_to_string(trafo.to_euler())
-        pose_xyz, pose_rpy = localpose2globalpose(ref_pose, pose_rpy, pose_xyz)
 
         export_logger.info(" child link pose'{}'".format(" ".join([pose_xyz, pose_rpy])))
         child.link.pose.append(" ".join([pose_xyz, pose_rpy]))
-        # child.link.pos[0] = ' '.join([pose_xyz, pose_rpy])
-        # if '_joint' in segment.name:
-        #     segment.name = segment.name.replace("_joint", "")
-
-        segment.name = segment.name.replace(".", "_").replace(" ", "_")
 
         # sdf: here the child does not mean the child of the joint!!!!it is different
-        child.joint.name = segment.RobotDesigner.joint_name
-        child.link.name = segment.name.replace("_joint", "_link")
-
-        if segment.parent:
-            parent_link = [
-                l
-                for j, l in tree.connectedLinks.items()
-                if segment.parent.name == l.name
-            ]
-            if parent_link[0] in tree.connectedJoints:
-                tree.connectedJoints[parent_link[0]].append(child.joint)
-            else:
-                tree.connectedJoints[parent_link[0]] = [child.joint]
+        child.joint.name = joint.name
+        child.link.name = link.name.replace("_joint", "_link")
+
+        # tree is the node of the parent link
+        if link.parent:
+            tree.connectedJoints.setdefault(tree.link, []).append(child.joint)
 
         # If root segment is connected to world
-        if segment.RobotDesigner.world is True and segment.parent is None:
+        if link.world is True and link.parent is None:
             tree.connectedJoints[tree.link] = [child.joint]
 
-        if segment.parent:
-            export_logger.info(" segment parent name'{}'".format(segment.parent.name))
+        if link.parent:
+            export_logger.info(" segment parent name'{}'".format(link.parent.name))
         export_logger.info(" segment joint name'{}'".format(child.joint.name))
         export_logger.info(" segment link name'{}'".format(child.link.name))
 
-        export_logger.info(
-            "connected links (joint->link): {}".format(
-            {j.name: l.name for j, l in tree.connectedLinks.items()})
-        )
-        export_logger.info(
-            "connected joints (link->joint): {}".format(
-            {l.name: j[0].name for l, j in tree.connectedJoints.items()})
-        )
-
-        if segment.RobotDesigner.axis_revert:
-            revert = -1
-        else:
-            revert = 1
-
-        if segment.RobotDesigner.axis == "X":
-            joint_axis_xyz = list_to_string(Vector((1, 0, 0)) * revert)
-        elif segment.RobotDesigner.axis == "Y":
-            joint_axis_xyz = list_to_string(Vector((0, 1, 0)) * revert)
-        elif segment.RobotDesigner.axis == "Z":
-            joint_axis_xyz = list_to_string(Vector((0, 0, 1)) * revert)
-
+        joint_axis_xyz = list_to_string(joint.axis_vector().tolist())
         child.joint.axis[0].xyz.append(joint_axis_xyz)
 
         # Settings the following flag is probably wrong. Why? Because RD derives the pose of the
@@ -425,75 +377,52 @@ def create_sdf(
         export_logger.info("Axis xyz: {}".format(child.joint.axis[0].xyz))
 
         # Export individual limits only if set as active in GUI
-        seg = segment.RobotDesigner
-        if seg.jointMode == "REVOLUTE":
-            if seg.theta.isActive or seg.dynamic_limits.isActive:
+        if joint.jointMode == "REVOLUTE":
+            if joint.theta.isActive or joint.dynamic_limits.isActive:
                 # child.joint.axis[0].limit.append(sdf_model_dom.CTD_ANON_59())
                 child.joint.axis[0].limit = [pyxb.BIND()]
-            if seg.theta.isActive:
-                child.joint.axis[0].limit[0].lower.append((radians(seg.theta.min)))
-                child.joint.axis[0].limit[0].upper.append((radians(seg.theta.max)))
-            if seg.dynamic_limits.isActive is True:
-                child.joint.axis[0].limit[0].effort.append(seg.dynamic_limits.maxTorque)
+            if joint.theta.isActive:
+                child.joint.axis[0].limit[0].lower.append((radians(joint.theta.min)))
+                child.joint.axis[0].limit[0].upper.append((radians(joint.theta.max)))
+            if joint.dynamic_limits.isActive is True:
+                child.joint.axis[0].limit[0].effort.append(joint.dynamic_limits.maxTorque)
                 child.joint.axis[0].limit[0].velocity.append(
-                    seg.dynamic_limits.maxVelocity
+                    joint.dynamic_limits.maxVelocity
                 )
             child.joint.type = "revolute"
 
-        if seg.jointMode == "PRISMATIC":
-            if seg.d.isActive or seg.dynamic_limits.isActive:
+        if joint.jointMode == "PRISMATIC":
+            if joint.d.isActive or joint.dynamic_limits.isActive:
                 # child.joint.axis[0].limit.append(sdf_model_dom.CTD_ANON_59())
                 child.joint.axis[0].limit = [pyxb.BIND()]
-            if seg.d.isActive:
-                child.joint.axis[0].limit[0].lower.append(seg.d.min)
-                child.joint.axis[0].limit[0].upper.append(seg.d.max)
-            if seg.dynamic_limits.isActive:
-                child.joint.axis[0].limit[0].effort.append(seg.dynamic_limits.maxTorque)
+            if joint.d.isActive:
+                child.joint.axis[0].limit[0].lower.append(joint.d.min)
+                child.joint.axis[0].limit[0].upper.append(joint.d.max)
+            if joint.dynamic_limits.isActive:
+                child.joint.axis[0].limit[0].effort.append(joint.dynamic_limits.maxTorque)
                 child.joint.axis[0].limit[0].velocity.append(
-                    seg.dynamic_limits.maxVelocity
+                    joint.dynamic_limits.maxVelocity
                 )
             child.joint.type = "prismatic"
 
-        if seg.jointMode == "REVOLUTE2":
+        if joint.jointMode == "REVOLUTE2":
             child.joint.type = "revolute2"
-        if seg.jointMode == "UNIVERSAL":
+        if joint.jointMode == "UNIVERSAL":
             child.joint.type = "universal"
-        if seg.jointMode == "BALL":
+        if joint.jointMode == "BALL":
             child.joint.type = "ball"
-        if seg.jointMode == "FIXED":
+        if joint.jointMode == "FIXED":
             child.joint.type = "fixed"
 
         export_logger.info(" joint type'{}'".format(child.joint.type))
 
         ### Add Meshes
-        armature = context.active_object
-        connected_meshes = [
-            mesh.name
-            for mesh in context.scene.objects
-            if mesh.type == "MESH"
-            and mesh.parent_bone == segment.name
-            and mesh.parent == armature
-        ]
-        # if len(connected_meshes) > 0:
-        #     child.link.name = connected_meshes[0]
-        # else:
-        #     child.link.name = child.joint.name + '_link'
-        #     # todo: the RobotDesigner does not have the concept of
-        #     # links further it is possible to have
-        #     # todo: several meshes assigned to the same bone
-        #     # todo: solutions add another property to a bone or
-        #     # chose the name from the list of connected meshes
-        for mesh in connected_meshes:
+        for geometry in link.geometries:
+            mesh = geometry.name
             export_logger.info("Connected mesh name: {}".format(mesh))
-            pose_bone = context.active_object.pose.bones[segment.name]
-            pose = (
-                pose_bone.matrix.inverted()
-                @ context.active_object.matrix_world.inverted()
-                @ bpy.data.objects[mesh].matrix_world
-            )
+            geometry_xyz, geometry_rpy = matrix_to_pose(geometry.pose, blender_scale_factor)
+            geometry_scale = [i * j for i, j in zip(geometry.scale.tolist(), blender_scale_factor)]
 
-            # bpy.context.active_object.matrix_world = segment_world * trafo_sdf * bpy.context.active_object.matrix_world  # * inverse_matrix(bpy.context.active_object.matrix_world)#* \
-            #  bpy.context.active_object.matrix_world
             visual_path = export_mesh(
                 operator,
                 context,
@@ -505,22 +434,12 @@ def create_sdf(
                 export_collision=False,
             )
             export_logger.info("visual mesh path: {}".format(visual_path))
-            if visual_path and "_vertices1.dae" not in visual_path:
-                visual = child.add_mesh(
-                    visual_path,
-                    [
-                        i * j
-                        for i, j in zip(
-                            bpy.data.objects[mesh].scale, blender_scale_factor
-                        )
-                    ],
-                )
-                visual_pose_xyz = list_to_string(
-                    [i * j for i, j in zip(pose.translation, blender_scale_factor)]
+            if visual_path:
+                visual = child.add_mesh(visual_path, geometry_scale)
+                visual.pose.append(
+                    " ".join([list_to_string(geometry_xyz), list_to_string(geometry_rpy)])
                 )
-                visual_pose_rpy = list_to_string(pose.to_euler())
-                visual.pose.append(" ".join([visual_pose_xyz, visual_pose_rpy]))
-                visual.name = bpy.data.objects[mesh].name.replace(".", "_").replace(" ", "_")  # child.link.name
+                visual.name = sanitize_name(mesh)  # child.link.name
             else:
                 export_logger.info("No visual model for: {}".format(mesh))
 
@@ -536,87 +455,34 @@ def create_sdf(
             )
             export_logger.info("collision mesh path: {}".format(collision_path))
             # this does not include basic collision objects
-            if collision_path and "_vertices1.dae" not in collision_path:
-                collision = child.add_collision(
-                    collision_path,
-                    [
-                        i * j
-                        for i, j in zip(
-                            bpy.data.objects[mesh].scale, blender_scale_factor
-                        )
-                    ],
-                )
-                export_logger.info(
-                    " collision mesh pose translation wo scale'{}'".format(pose.translation)
-                )
-                export_logger.info(
-                    " collision mesh pose scale factor'{}'".format(blender_scale_factor)
-                )
-                export_logger.info(
-                    " collision mesh pose translation wi scale'{}'".format(
-                    [i * j for i, j in zip(pose.translation, blender_scale_factor)])
-                )
-
-                collision_pose_xyz = list_to_string(
-                    [i * j for i, j in zip(pose.translation, blender_scale_factor)]
-                )
-                collision_pose_rpy = list_to_string(pose.to_euler())
+            if collision_path:
+                collision = child.add_collision(collision_path, geometry_scale)
                 collision.pose.append(
-                    " ".join([collision_pose_xyz, collision_pose_rpy])
+                    " ".join([list_to_string(geometry_xyz), list_to_string(geometry_rpy)])
                 )
-                collision.name = bpy.data.objects[
-                    mesh
-                ].name.replace(".", "_").replace(" ", "_")  # child.link.name + '_collision'
+                collision.name = sanitize_name(mesh)  # child.link.name + '_collision'
                 export_logger.info(
                     " collision mesh pose'{}'".format(collision.pose[0].value())
                 )
             else:
                 export_logger.info("No collision model for: {}".format(mesh))
             # add basic collision objects
-            if "BASIC_COLLISION_" in bpy.data.objects[mesh].RobotDesigner.tag:
-                collision = child.add_basic(
-                    bpy.data.objects[mesh].RobotDesigner.tag,
-                    [
-                        i * j
-                        for i, j in zip(
-                            bpy.data.objects[mesh].scale, blender_scale_factor
-                        )
-                    ],
-                )
-                export_logger.info(
-                    " basic collision mesh pose translation wo scale'{}'".format(
-                    pose.translation)
-                )
-                export_logger.info(
-                    " basic collision mesh pose scale factor'{}'".format(blender_scale_factor)
-                )
-                export_logger.info(
-                    " basic collision mesh pose translation wi scale'{}'".format(
-                     [i * j for i, j in zip(pose.translation, blender_scale_factor)])
-                )
-
-                collision_pose_xyz = list_to_string(
-                    [i * j for i, j in zip(pose.translation, blender_scale_factor)]
-                )
-                collision_pose_rpy = list_to_string(pose.to_euler())
+            if "BASIC_COLLISION_" in geometry.tag:
+                collision = child.add_basic(geometry.tag, geometry_scale)
                 collision.pose.append(
-                    " ".join([collision_pose_xyz, collision_pose_rpy])
+                    " ".join([list_to_string(geometry_xyz), list_to_string(geometry_rpy)])
                 )
-                collision.name = bpy.data.objects[
-                    mesh
-                ].name  # child.link.name + '_collision'
+                collision.name = mesh  # child.link.name + '_collision'
                 export_logger.info(
                     " basic collision mesh pose'{}'".format(collision.pose[0].value())
                 )
             else:
                 export_logger.info("No basic collision model for: {}".format(mesh))
             # export surface properties for both collision and basic collision objects
-            if "COLLISION" in bpy.data.objects[mesh].RobotDesigner.tag:
+            if "COLLISION" in geometry.tag:
                 # add surface properties
                 collision.surface.append(sdf_model_dom.surface())
-                surface_property = bpy.data.objects[
-                    mesh
-                ].RobotDesigner.sdfCollisionProps
+                surface_property = geometry.sdfCollisionProps
                 # add bounce properties
                 collision.surface[0].bounce = [pyxb.BIND()]
                 bounce = collision.surface[0].bounce[0]
@@ -661,12 +527,7 @@ def create_sdf(
                 contact.category_bitmask.append(surface_property.category_bitmask)
                 contact.poissons_ratio.append(surface_property.poissons_ratio)
                 contact.elastic_modulus.append(surface_property.elastic_modulus)
-                if (
-                    bpy.data.objects[
-                        global_properties.model_name.get(bpy.context.scene)
-                    ].RobotDesigner.physics_engine
-                    == "OPENSIM"
-                ):
+                if robot.physics_engine == "OPENSIM":
                     contact.opensim = [pyxb.BIND()]
                     contact_opensim = contact.opensim[0]
                     contact_opensim.stiffness.append(surface_property.osim_stiffness)
@@ -684,113 +545,70 @@ def create_sdf(
                 contact_ode.min_depth.append(surface_property.min_depth)
                 # add soft contact properties
                 # todo: not yet implemented dart properties.
-                # if bpy.data.objects[
-                #   global_properties.model_name.get(bpy.context.scene)].RobotDesigner.physics_engine == 'DART':
+                # if robot.physics_engine == 'DART':
 
         ### Add Physics
-        frame_names = [
-
-            frame.name
-            for frame in context.scene.objects
-            if frame.RobotDesigner.tag == "PHYSICS_FRAME"
-            and frame.parent_bone == segment.name
-        ]
-
         # If no frame is connected create a default one. This is required for Gazebo!
-        export_logger.info("frame names: {}".format(frame_names))
+        export_logger.info("frame names: {}".format([frame.name for frame in link.inertials]))
 
-        # if not frame_names:
+        # if not link.inertials:
         #     child.add_inertial()
 
-        for frame in frame_names:
+        for frame in link.inertials:
             # Add inertial definitions (for Gazebo)
             inertial = child.link.inertial[0]
-            export_logger.debug(inertial, inertial.__dict__)
-            if bpy.data.objects[frame].parent_bone == segment.name:
-                pose_bone = context.active_object.pose.bones[segment.name]
 
             # set mass
-            inertial.mass[0] = bpy.data.objects[frame].RobotDesigner.dynamics.mass
+            inertial.mass[0] = frame.dynamics.mass
             if inertial.mass[0] <= 0.0:
                 raise ValueError(
                     "Mass of "
-                    + frame
+                    + frame.name
                     + " is not positive, but "
                     + str(inertial.mass[0])
                 )
             # Ugly, to throw an exception here. But appending info_list did not print the info in the GUI.
 
             # set inertia
-            inertial.inertia[0].ixx[0] = bpy.data.objects[
-                frame
-            ].RobotDesigner.dynamics.inertiaXX
-            inertial.inertia[0].ixy[0] = bpy.data.objects[
-                frame
-            ].RobotDesigner.dynamics.inertiaXY
-            inertial.inertia[0].ixz[0] = bpy.data.objects[
-                frame
-            ].RobotDesigner.dynamics.inertiaXZ
-            inertial.inertia[0].iyy[0] = bpy.data.objects[
-                frame
-            ].RobotDesigner.dynamics.inertiaYY
-            inertial.inertia[0].iyz[0] = bpy.data.objects[
-                frame
-            ].RobotDesigner.dynamics.inertiaYZ
-            inertial.inertia[0].izz[0] = bpy.data.objects[
-                frame
-            ].RobotDesigner.dynamics.inertiaZZ
+            inertial.inertia[0].ixx[0] = frame.dynamics.inertiaXX
+            inertial.inertia[0].ixy[0] = frame.dynamics.inertiaXY
+            inertial.inertia[0].ixz[0] = frame.dynamics.inertiaXZ
+            inertial.inertia[0].iyy[0] = frame.dynamics.inertiaYY
+            inertial.inertia[0].iyz[0] = frame.dynamics.inertiaYZ
+            inertial.inertia[0].izz[0] = frame.dynamics.inertiaZZ
 
             # set inertial pose
-            pose = (
-                pose_bone.matrix.inverted()
-                @ context.active_object.matrix_world.inverted()
-                @ bpy.data.objects[frame].matrix_world
-            )
-
-            frame_pose_xyz = list_to_string(
-                [i * j for i, j in zip(pose.translation, blender_scale_factor)]
-            )
-            frame_pose_rpy = list_to_string(pose.to_euler())
-
-            inertial.pose[0] = " ".join([frame_pose_xyz, frame_pose_rpy])
+            frame_pose_xyz, frame_pose_rpy = matrix_to_pose(frame.pose, blender_scale_factor)
+            inertial.pose[0] = " ".join([list_to_string(frame_pose_xyz), list_to_string(frame_pose_rpy)])
 
         # add joint controllers
-        if operator.gazebo and segment.RobotDesigner.jointController.isActive is True:
-            if segment.parent is None and segment.RobotDesigner.world is False:
+        if operator.gazebo and joint.jointController.isActive is True:
+            if link.parent is None and link.world is False:
                 pass
             else:
 
                 controller_pid = list_to_string(
                     [
-                        segment.RobotDesigner.jointController.P,
-                        segment.RobotDesigner.jointController.I,
-                        segment.RobotDesigner.jointController.D,
+                        joint.jointController.P,
+                        joint.jointController.I,
+                        joint.jointController.D,
                     ]
                 )
 
                 controller = pyxb.BIND(
                     joint_name=child.joint.name,
-                    type=segment.RobotDesigner.jointController.controllerType,
+                    type=joint.jointController.controllerType,
                     pid=controller_pid,
                 )
                 root.control_plugin.controller.append(controller)
 
         ### add link sensors
-        sensor_names = [
-            sensor.name
-            for sensor in context.scene.objects
-            if sensor.RobotDesigner.tag == "SENSOR"
-            and sensor.parent_bone == segment.name
-        ]
-
-        export_logger.info(" sensor name'{}".format(sensor_names))
-
-        for sensor in sensor_names:
-            active_sensor = bpy.data.objects[sensor]
-            type = active_sensor.RobotDesigner.sensor_type
-            if type == "CAMERA_SENSOR":
+        export_logger.info(" sensor name'{}".format([sensor.name for sensor in link.sensors]))
+
+        for sensor in link.sensors:
+            if sensor.sensor_type == "CAMERA_SENSOR":
                 sensor_sdf = child.add_camera_sensor()
-                sensor_sdf.name = sensor
+                sensor_sdf.name = sensor.name
                 # camera
                 sensor_sdf.type = "camera"
                 sensor_sdf.camera.name = "left eze"
@@ -816,28 +634,27 @@ def create_sdf(
         """
 
         # Add geometry
-        for child_segments in segment.children:
-            export_logger.info("Next Segment'{}'".format(child_segments.name))
+        for child_link in link.children:
+            export_logger.info("Next Segment'{}'".format(child_link.name))
             ref_pose = string_to_list(child.link.pose[0].value())
-            walk_segments(child_segments, child, ref_pose)
+            walk_segments(child_link, child, ref_pose)
+
+    if robot is None:
+        robot = capture(context, context.active_object)
 
-    robot_name = context.active_object.name
+    robot_name = robot.name
 
-    blender_scale_factor = context.active_object.scale
-    blender_scale_factor = [
-        blender_scale_factor[0],
-        blender_scale_factor[2],
-        blender_scale_factor[1],
-    ]
+    blender_scale_factor = robot.sdf_scale_factor().tolist()
 
+    mesh_export_cache.reset_statistics()
     root = sdf_tree.SDFTree.create_empty(robot_name)
 
     # add model pose
     root.sdf.model[0].pose.append(
         " ".join(
             [
-                list_to_string(context.active_object.location),
-                list_to_string(context.active_object.rotation_euler),
+                list_to_string(robot.location.tolist()),
+                list_to_string(robot.rotation_euler.tolist()),
             ]
         )
     )
@@ -845,15 +662,9 @@ def create_sdf(
     # A link for world. Used for export of root links connected to world
     root.link.name = "world"
 
-    if (
-        bpy.data.objects[
-            global_properties.model_name.get(bpy.context.scene)
-        ].RobotDesigner.physics_engine
-        == "OPENSIM"
-    ):
+    if robot.physics_engine == "OPENSIM":
         # add root geometries to root.link
-        muscles = get_muscles(robot_name, context)
-        if muscles:
+        if robot.muscles:
             # add muscles path tag
             muscle_uri = _uri_for_meshes_and_muscles(
                 in_ros_package,
@@ -873,12 +684,12 @@ def create_sdf(
 
     # build control plugin element
     # if there is a segment which has a controller attached to it: then create controller plugin
-    for segment in bpy.context.active_object.data.bones:
+    for link in robot.walk():
         # The joint controller might still be active even if the root segment is not connected to world.
         # An if clause to ignore the controller in such a scenario
-        if segment.parent is None and segment.RobotDesigner.world is False:
+        if link.parent is None and link.world is False:
             pass
-        elif segment.RobotDesigner.jointController.isActive is True:
+        elif link.joint.jointController.isActive is True:
             if operator.gazebo:
                 root.sdf.model[0].plugin.append(sdf_model_dom.plugin())
                 root.control_plugin = root.sdf.model[0].plugin[
@@ -889,24 +700,30 @@ def create_sdf(
                 root.control_plugin.controller = []
                 break
 
-    root_segments = [b for b in context.active_object.data.bones if b.parent is None]
-
-    for segments in root_segments:
-        export_logger.info("Root Segment'{}'".format(segments.name))
-        ref_pose = [
-            0.0,
-            0.0,
-            0.0,
-            0.0,
-            0.0,
-            0.0,
-        ]  # transform to gazebo coordinate frame
-        walk_segments(segments, root, ref_pose)
+    # meshes are written by the worker pool (if enabled) before the SDF file
+    with profiler.phase("build_tree"), mesh_export_pool.session(mesh_export_pool.enabled()):
+        for link in robot.roots:
+            export_logger.info("Root Segment'{}'".format(link.name))
+            ref_pose = [
+                0.0,
+                0.0,
+                0.0,
+                0.0,
+                0.0,
+                0.0,
+            ]  # transform to gazebo coordinate frame
+            walk_segments(link, root, ref_pose)
 
     export_logger.info("Writing to '{}'".format(filepath))
-    root.write(filepath)
+    with profiler.phase("write_sdf"):
+        root.write(filepath)
+
+    if mesh_export_cache.enabled():
+        export_logger.info(mesh_export_cache.summary())
+        operator.report({"INFO"}, mesh_export_cache.summary())
 
 
+@profiler.profiled()
 def create_config(
     operator: RDOperator,
     context,
@@ -959,7 +776,7 @@ def create_config(
     )
 
     # export model.config file
-    with open(toplevel_directory + "/model.config", "w") as f:
+    with package_manifest.open(toplevel_directory + "/model.config") as f:
         output = modelI.toDOM()
         output.documentElement.setAttributeNS(
             xsi.uri(),
@@ -983,6 +800,8 @@ class ExportPlain(RDOperator):
 
     bl_idname = config.OPERATOR_PREFIX + "export_to_sdf_plain"
     bl_label = "Export SDF - plain"
+    profiling = True
+    exporting = True
 
     filter_glob: StringProperty(
         default="*.sdf",
@@ -1009,6 +828,8 @@ class ExportPlain(RDOperator):
         toplevel_dir = self.filepath
         self.filepath = os.path.join(self.filepath, "model.sdf")
 
+        robot = capture(context, context.active_object)
+
         create_sdf(
             self,
             context,
@@ -1017,6 +838,7 @@ class ExportPlain(RDOperator):
             toplevel_directory=toplevel_dir,
             in_ros_package=False,
             abs_filepaths=self.abs_file_paths,
+            robot=robot,
         )
         create_config(
             self,
@@ -1035,6 +857,7 @@ class ExportPlain(RDOperator):
             toplevel_directory=toplevel_dir,
             in_ros_package=False,
             abs_filepaths=self.abs_file_paths,
+            robot=robot,
         )
 
         # thumbnail export
@@ -1075,6 +898,56 @@ class ExportPlain(RDOperator):
         return {"RUNNING_MODAL"}
 
 
+# options changing the content of exported packages
+PACKAGE_SETTINGS = (
+    "export_mesh_format",
+    "export_direct_mesh_writer",
+    "export_muscle_tables",
+    "muscle_table_samples",
+    "export_rqt_ez_publisher_muscles",
+    "export_rqt_ez_publisher_jointcontroller",
+    "export_rqt_multiplot_muscles",
+    "export_rqt_multiplot_jointcontroller",
+)
+
+
+def _package_inputs(operator, context, robot, toplevel_dir):
+    """
+    Computes the inputs of the file groups of an incremental package export (see
+    :meth:`.package_manifest.PackageManifest.reuse`).
+
+    :param operator: The export operator
+    :param context: The current context
+    :param robot: The captured robot
+    :param toplevel_dir: The package directory
+    :return: dictionary mapping group names to hex digests
+    """
+
+    def digest(*values):
+        return hashlib.sha1(json.dumps(values, sort_keys=True, default=str).encode()).hexdigest()
+
+    settings = [bpy.app.version, os.path.abspath(toplevel_dir), operator.abs_file_paths, operator.gazebo]
+    settings += [getattr(global_properties, name).get(context.scene) for name in PACKAGE_SETTINGS]
+    model = robot_digest(robot)
+    depsgraph = context.evaluated_depsgraph_get()
+    geometries = []
+    for link in robot.walk():
+        for geometry in link.geometries:
+            obj = context.scene.objects.get(geometry.name)
+            geometries.append(geometry_hash(obj, depsgraph) if obj is not None else None)
+    inputs = {
+        "model": digest(settings, model, geometries),
+        "config": digest(settings, rna_values(context.active_object.RobotDesigner)),
+        "rqt": digest(settings, model),
+    }
+    camera = context.scene.camera
+    if camera is not None:
+        inputs["thumbnail"] = digest(
+            settings, model, geometries, [list(row) for row in camera.matrix_world], rna_values(camera.data)
+        )
+    return inputs
+
+
 @RDOperator.Preconditions(ModelSelected, ObjectMode)
 @PluginManager.register_class
 class ExportPackage(RDOperator):
@@ -1084,6 +957,8 @@ class ExportPackage(RDOperator):
 
     bl_idname = config.OPERATOR_PREFIX + "export_to_sdf_package"
     bl_label = "Export SDF"
+    profiling = True
+    exporting = True
 
     filter_glob: StringProperty(
         default="*.sdf",
@@ -1102,64 +977,84 @@ class ExportPackage(RDOperator):
         toplevel_dir = self.filepath
         self.filepath = os.path.join(self.filepath, "model.sdf")
 
-        create_sdf(
-            self,
-            context,
-            filepath=self.filepath,
-            meshpath=toplevel_dir,
-            toplevel_directory=toplevel_dir,
-            in_ros_package=False,
-            abs_filepaths=self.abs_file_paths,
-        )
-        create_config(
-            self,
-            context,
-            filepath=self.filepath,
-            meshpath=toplevel_dir,
-            toplevel_directory=toplevel_dir,
-            in_ros_package=False,
-            abs_filepaths=self.abs_file_paths,
-        )
-        create_osim(
-            self,
-            context,
-            filepath=self.filepath,
-            meshpath=toplevel_dir,
-            toplevel_directory=toplevel_dir,
-            in_ros_package=False,
-            abs_filepaths=self.abs_file_paths,
-        )
-
-        # thumbnail export
-        create_thumbnail(toplevel_directory=toplevel_dir)
+        # files whose inputs did not change since the last export are left untouched
+        incremental = global_properties.export_incremental.get(context.scene)
+        with package_manifest.session(toplevel_dir, incremental):
+            robot = capture(context, context.active_object)
+            # groups whose inputs did not change are not generated again
+            inputs = _package_inputs(self, context, robot, toplevel_dir) if package_manifest.active else {}
+
+            if not package_manifest.reuse("model", inputs.get("model")):
+                with package_manifest.group("model", inputs.get("model")):
+                    create_sdf(
+                        self,
+                        context,
+                        filepath=self.filepath,
+                        meshpath=toplevel_dir,
+                        toplevel_directory=toplevel_dir,
+                        in_ros_package=False,
+                        abs_filepaths=self.abs_file_paths,
+                        robot=robot,
+                    )
+                    create_osim(
+                        self,
+                        context,
+                        filepath=self.filepath,
+                        meshpath=toplevel_dir,
+                        toplevel_directory=toplevel_dir,
+                        in_ros_package=False,
+                        abs_filepaths=self.abs_file_paths,
+                        robot=robot,
+                    )
+            if not package_manifest.reuse("config", inputs.get("config")):
+                with package_manifest.group("config", inputs.get("config")):
+                    create_config(
+                        self,
+                        context,
+                        filepath=self.filepath,
+                        meshpath=toplevel_dir,
+                        toplevel_directory=toplevel_dir,
+                        in_ros_package=False,
+                        abs_filepaths=self.abs_file_paths,
+                    )
 
-        # rqt_ez_publisher exports
-        if (
-            global_properties.export_rqt_ez_publisher_muscles.get(bpy.context.scene)
-            == True
-        ):
-            export_rqtez_publisher_muscle(toplevel_directory=toplevel_dir)
-        if (
-            global_properties.export_rqt_ez_publisher_jointcontroller.get(
-                bpy.context.scene
-            )
-            == True
-        ):
-            export_rqtez_publisher_controller(toplevel_directory=toplevel_dir)
+            # thumbnail export
+            if not package_manifest.reuse("thumbnail", inputs.get("thumbnail")):
+                with package_manifest.group("thumbnail", inputs.get("thumbnail")):
+                    create_thumbnail(toplevel_directory=toplevel_dir)
+
+            if not package_manifest.reuse("rqt", inputs.get("rqt")):
+                with package_manifest.group("rqt", inputs.get("rqt")):
+                    # rqt_ez_publisher exports
+                    if (
+                        global_properties.export_rqt_ez_publisher_muscles.get(bpy.context.scene)
+                        == True
+                    ):
+                        export_rqtez_publisher_muscle(toplevel_directory=toplevel_dir)
+                    if (
+                        global_properties.export_rqt_ez_publisher_jointcontroller.get(
+                            bpy.context.scene
+                        )
+                        == True
+                    ):
+                        export_rqtez_publisher_controller(toplevel_directory=toplevel_dir)
+
+                    # rqt_multiplot exports
+                    if (
+                        global_properties.export_rqt_multiplot_muscles.get(bpy.context.scene)
+                        == True
+                    ):
+                        export_rqt_multiplot_muscles(toplevel_directory=toplevel_dir)
+                    if (
+                        global_properties.export_rqt_multiplot_jointcontroller.get(
+                            bpy.context.scene
+                        )
+                        == True
+                    ):
+                        export_rqt_multiplot_jointcontroller(toplevel_directory=toplevel_dir)
 
-        # rqt_multiplot exports
-        if (
-            global_properties.export_rqt_multiplot_muscles.get(bpy.context.scene)
-            == True
-        ):
-            export_rqt_multiplot_muscles(toplevel_directory=toplevel_dir)
-        if (
-            global_properties.export_rqt_multiplot_jointcontroller.get(
-                bpy.context.scene
-            )
-            == True
-        ):
-            export_rqt_multiplot_jointcontroller(toplevel_directory=toplevel_dir)
+        if incremental:
+            self.report({"INFO"}, package_manifest.summary())
 
         return {"FINISHED"}
 
@@ -1184,6 +1079,8 @@ class ExportZippedPackage(RDOperator):
 
     bl_idname = config.OPERATOR_PREFIX + "export_to_sdf_package_zipped"
     bl_label = "Export SDF as zipped folder"
+    profiling = True
+    exporting = True
 
     filter_glob: StringProperty(
         default="*.zip",
@@ -1200,30 +1097,28 @@ class ExportZippedPackage(RDOperator):
     @RDOperator.Postconditions(ModelSelected, ObjectMode)
     def execute(self, context):
         """
-        Code snipped from `<http://stackoverflow.com/questions/1855095/how-to-create-a-zip-archive-of-a-directory>`_
+        Exports the package into a temporary directory. The files are moved into the zip archive while they are
+        written (see :mod:`..package_archive`).
         """
-        import zipfile
-
         if os.path.isdir(self.filepath):
             self.logger.debug(self.filepath)
             self.report({"ERROR"}, "No File selected!")
             return {"FINISHED"}
 
-        def zipdir(path, ziph):
-            # ziph is zipfile handle
-            for root, dirs, files in os.walk(path):
-                self.logger.debug("{}, {}, {},".format(root, dirs, files))
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    ziph.write(file_path, os.path.relpath(file_path, path))
-
-        with tempfile.TemporaryDirectory() as target:
+        with tempfile.TemporaryDirectory() as target, package_archive.session(
+            self.filepath,
+            target,
+            compresslevel=global_properties.zip_compression_level.get(context.scene),
+            store_extensions=parse_extensions(global_properties.zip_store_extensions.get(context.scene)),
+            parallel=global_properties.zip_parallel_compression.get(context.scene),
+        ):
 
             dir_name = os.path.splitext(os.path.basename(self.filepath))[0]
             temp_dir = os.path.join(target, dir_name)
             temp_file = os.path.join(temp_dir, "model.sdf")
             if not os.path.exists(temp_dir):
                 os.makedirs(temp_dir)
+            robot = capture(context, context.active_object)
             create_sdf(
                 self,
                 context,
@@ -1232,6 +1127,7 @@ class ExportZippedPackage(RDOperator):
                 toplevel_directory=temp_dir,
                 in_ros_package=False,
                 abs_filepaths=self.abs_file_paths,
+                robot=robot,
             )
             create_config(
                 self,
@@ -1250,42 +1146,41 @@ class ExportZippedPackage(RDOperator):
                 toplevel_directory=temp_dir,
                 in_ros_package=False,
                 abs_filepaths=self.abs_file_paths,
+                robot=robot,
             )
 
             # thumbnail export
-            create_thumbnail(toplevel_directory=toplevel_dir)
+            create_thumbnail(toplevel_directory=temp_dir)
 
             # rqt_ez_publisher exports
             if (
                 global_properties.export_rqt_ez_publisher_muscles.get(bpy.context.scene)
                 == True
             ):
-                export_rqtez_publisher_muscle(toplevel_directory=toplevel_dir)
+                export_rqtez_publisher_muscle(toplevel_directory=temp_dir)
             if (
                 global_properties.export_rqt_ez_publisher_jointcontroller.get(
                     bpy.context.scene
                 )
                 == True
             ):
-                export_rqtez_publisher_controller(toplevel_directory=toplevel_dir)
+                export_rqtez_publisher_controller(toplevel_directory=temp_dir)
 
             # rqt_multiplot exports
             if (
                 global_properties.export_rqt_multiplot_muscles.get(bpy.context.scene)
                 == True
             ):
-                export_rqt_multiplot_muscles(toplevel_directory=toplevel_dir)
+                export_rqt_multiplot_muscles(toplevel_directory=temp_dir)
             if (
                 global_properties.export_rqt_multiplot_jointcontroller.get(
                     bpy.context.scene
                 )
                 == True
             ):
-                export_rqt_multiplot_jointcontroller(toplevel_directory=toplevel_dir)
+                export_rqt_multiplot_jointcontroller(toplevel_directory=temp_dir)
 
             self.logger.debug(temp_file)
-            with zipfile.ZipFile(self.filepath, "w") as zipf:
-                zipdir(target, zipf)
 
         return {"FINISHED"}
 
@@ -47,7 +47,13 @@ from ..osim.osim_import import OsimImporter
 from ...core import config, PluginManager, Condition, RDOperator
 from ...operators.helpers import ModelSelected, ObjectMode
 from ...core.logfile import export_logger
-from ...operators.segments import SelectSegment, CreateNewSegment, UpdateSegments
+from ...core.profiling import profiler
+from ...operators.segments import (
+    SelectSegment,
+    UpdateSegments,
+    create_segments,
+    kinematic_updates_suspended,
+)
 from ...operators.model import SelectModel, CreateNewModel, SelectCoordinateFrame
 from ...operators.rigid_bodies import SelectGeometry, AssignGeometry
 from ...operators.dynamics import AssignPhysical, CreatePhysical, SelectPhysical
@@ -66,6 +72,10 @@ from .generic.helpers import (
 )
 
 from ...properties.globals import global_properties
+from ..mesh_import_cache import mesh_import_cache, apply_transform
+from ..mesh_decode_pool import mesh_decode_pool, build_objects
+from ..mesh_decoder import decode_stl
+from ..package_reader import package_reader
 
 
 from .generic import config_model_dom
@@ -322,6 +332,41 @@ class Importer(object):
             @ Euler(model_poserpy, "XYZ").to_matrix().to_4x4()
         )
 
+    def resolve_mesh_url(self, mesh_url):
+        """
+        :param mesh_url: The uri of a mesh element
+        :return: The path of the mesh file or None if the URL schema is not supported
+        """
+        if mesh_url.startswith(self.FILE_URL_ABSOLUTE):
+            return mesh_url.replace(self.FILE_URL_ABSOLUTE, "")
+        elif mesh_url.startswith(self.FILE_URL_RELATIVE) or mesh_url.startswith(
+            self.PACKAGE_URL
+        ):
+            mesh_path = mesh_url.replace(self.FILE_URL_RELATIVE, "").replace(
+                self.PACKAGE_URL, ""
+            )
+            # extracted on demand when importing a zipped package
+            return package_reader.extract(os.path.join(str(Path(self.base_dir).parent), mesh_path))
+        return None
+
+    def mesh_files(self, kinematic_chains):
+        """
+        :param kinematic_chains: The root nodes of the parsed SDF tree
+        :return: The paths of all mesh files referenced by visuals and collisions
+        """
+        files = []
+        nodes = list(kinematic_chains)
+        while nodes:
+            node = nodes.pop()
+            nodes.extend(node.children)
+            for model in list(node.link.visual) + list(node.link.collision):
+                if model.geometry and len(model.geometry[0].mesh) > 0:
+                    mesh_path = self.resolve_mesh_url(model.geometry[0].mesh[0].uri[0])
+                    if mesh_path is not None:
+                        files.append(mesh_path)
+        return files
+
+    @profiler.profiled()
     def import_geometry(self, model):
         """
         Adds a geometry to the blender scene. Uses the self.file_name variable of the parenting context
@@ -334,22 +379,12 @@ class Importer(object):
         mesh_x = model.geometry[0].mesh[0]
         mesh_url = model.geometry[0].mesh[0].uri[0]
 
-        # check for absolute file path
-        if mesh_url.startswith(self.FILE_URL_ABSOLUTE):
-            mesh_path = mesh_url.replace(self.FILE_URL_ABSOLUTE, "")
-        elif mesh_url.startswith(self.FILE_URL_RELATIVE) or mesh_url.startswith(
-            self.PACKAGE_URL
-        ):
-            mesh_path = mesh_url.replace(self.FILE_URL_RELATIVE, "").replace(
-                self.PACKAGE_URL, ""
-            )
-            mesh_path = os.path.join(str(Path(self.base_dir).parent), mesh_path)
-            export_logger.debug("mesh path {}".format(mesh_path))
-
-        else:
+        mesh_path = self.resolve_mesh_url(mesh_url)
+        if mesh_path is None:
             self.operator.report({"ERROR"}, "Unsupported URL schema")
             export_logger.error("Unsupported URL schema")
             return
+        export_logger.debug("mesh path {}".format(mesh_path))
         # if len(model.geometry[0].cylinder) > 0:
         #     export_logger.debug('Cylinder Existing')
         #     c_radius = model.geometry[0].cylinder[0].radius[0]
@@ -362,16 +397,24 @@ class Importer(object):
             raise Exception("Mesh file {} not found".format(mesh_path))
 
         fn, extension = os.path.splitext(mesh_path)
-        if extension == ".stl" or extension == ".STL":
-            try:
-                bpy.ops.import_mesh.stl(filepath=mesh_path)
-            except:
-                pass
-        elif extension == ".dae" or extension == ".DAE":
-            try:
-                bpy.ops.wm.collada_import(filepath=mesh_path)
-            except:
-                pass
+
+        def load():
+            if mesh_decode_pool.create_objects(mesh_path):
+                # decoded by the worker processes
+                return
+            if extension == ".stl" or extension == ".STL":
+                try:
+                    build_objects(decode_stl(mesh_path))
+                except:
+                    pass
+            elif extension == ".dae" or extension == ".DAE":
+                try:
+                    bpy.ops.wm.collada_import(filepath=mesh_path)
+                except:
+                    pass
+
+        # files referenced several times are only parsed once
+        mesh_import_cache.import_mesh(mesh_path, load)
 
         bpy.context.active_object.RobotDesigner.fileName = os.path.basename(
             os.path.splitext(mesh_path)[0]
@@ -411,55 +454,80 @@ class Importer(object):
             @ scale_matrix
         )
 
-    def parse(self, node: sdf_tree.SDFTree, ref_pose, parent_name=""):
+    @staticmethod
+    def link_pose(node: sdf_tree.SDFTree):
+        """
+        :param node: A segment
+        :return: The pose of the segment's link (x y z roll pitch yaw)
         """
-        Recursively parses the SDF tree elements.
+        if not node.link.pose:
+            return [0, 0, 0, 0, 0, 0]
+        return string_to_list(get_value(node.link.pose[0].value(), "0 0 0 0 0 0"))
 
-        :param node: The actual segment
-        :param parent_name: Name of the parent segment (if None the segment is a root element)
-        :param ref_pose: Reference pose from parent link (SDF, pose referenced to a global coordinate)
+    def collect(self, node: sdf_tree.SDFTree, ref_pose, parent, nodes):
+        """
+        Lists the segments of a kinematic tree parent-first (depth-first, children in order).
 
+        :param node: The actual segment
+        :param ref_pose: Reference pose from parent link
+        :param parent: Index of the parent segment in ``nodes`` (None for the root)
+        :param nodes: list of ``(node, ref_pose, parent)`` the segments are appended to
         """
+        # Uses an explicit stack as long kinematic chains would exceed the recursion limit
+        stack = [(node, ref_pose, parent)]
+        while stack:
+            node, ref_pose, parent = stack.pop()
+            index = len(nodes)
+            nodes.append((node, ref_pose, parent))
+            pose = self.link_pose(node)
+            stack.extend((sub_tree, pose, index) for sub_tree in reversed(node.children))
 
-        C = bpy.context
+    def parse(self, node: sdf_tree.SDFTree, ref_pose, parent_name=""):
+        """
+        Imports a kinematic tree of the SDF file. All segments are created at once (see
+        :func:`~robot_designer_plugin.operators.segments.create_segments`) and their properties are written
+        without kinematic updates. The armature is updated once before the links (physics frames and geometries)
+        are imported.
 
-        export_logger.info("Context mode: {}".format(C.mode))
+        :param node: The root segment
+        :param parent_name: Name of the parent segment (if None the segment is a root element)
+        :param ref_pose: Reference pose from parent link (SDF, pose referenced to a global coordinate)
+        :return: Name of the root segment
+        """
         export_logger.info("parent name: {}".format(parent_name))
 
-        export_logger.debug(
-            "active object name : {}".format(C.active_object.name)
-        )  # the name of the robot
-
-        export_logger.debug("active object type : {}".format(C.active_object.type))
+        nodes = []
+        self.collect(node, ref_pose, None, nodes)
 
-        if bpy.context.active_object:
-            export_logger.debug(
-                "active object type == Armature: {}, {}".format(
-                bpy.context.active_object.type == "ARMATURE",
-                "Model not selected and active.")
-            )
-        else:
-            export_logger.debug(
-                "active object type == Armature: {}, {}".format(False, "No model selected")
+        with profiler.phase("create_segments"):
+            segment_names = create_segments(
+                [(n.link.name, parent) for n, _, parent in nodes], parent_name
             )
+            bones = bpy.context.active_object.data.bones
+            with kinematic_updates_suspended():
+                for (n, pose, _), segment_name in zip(nodes, segment_names):
+                    self.set_segment_properties(n, pose, bones[segment_name].RobotDesigner)
 
-        SelectSegment.run(segment_name=parent_name)
+        with profiler.phase("update_segments"):
+            UpdateSegments.run(segment_name=segment_names[0], recurse=True)
 
-        CreateNewSegment.run(segment_name=node.link.name)
+        for (n, _, _), segment_name in zip(nodes, segment_names):
+            self.import_link(n, segment_name)
+        return segment_names[0]
 
-        segment_name = C.active_bone.name
+    def set_segment_properties(self, node: sdf_tree.SDFTree, ref_pose, segment):
+        """
+        Writes the joint and link properties of a segment.
 
-        export_logger.info("{} -> {}".format(parent_name, segment_name))
+        :param node: The actual segment
+        :param ref_pose: Reference pose from parent link (SDF, pose referenced to a global coordinate)
+        :param segment: The ``RobotDesigner`` properties of the segment's bone
+        """
         export_logger.info("link name -> {}".format(node.link.name))
 
         # to confirm: SDF a joint's pose is given in child link frame, URDF joint frame = child link frame
 
-        if not node.link.pose:
-            child_link_pose = [0, 0, 0, 0, 0, 0]
-        else:
-            child_link_pose = string_to_list(
-                get_value(node.link.pose[0].value(), "0 0 0 0 0 0")
-            )
+        child_link_pose = self.link_pose(node)
 
         parent_pose_homo = pose_float2homogeneous(rounded(ref_pose))
         child_pose_homo = pose_float2homogeneous(rounded(child_link_pose))
@@ -480,13 +548,11 @@ class Importer(object):
                 # import joint controllers
                 controller = self.controllers[node.joint.name]
                 PID = controller.pid.split(" ")
-                bpy.context.active_bone.RobotDesigner.jointController.isActive = True
-                bpy.context.active_bone.RobotDesigner.jointController.controllerType = (
-                    controller.type
-                )
-                bpy.context.active_bone.RobotDesigner.jointController.P = float(PID[0])
-                bpy.context.active_bone.RobotDesigner.jointController.I = float(PID[1])
-                bpy.context.active_bone.RobotDesigner.jointController.D = float(PID[2])
+                segment.jointController.isActive = True
+                segment.jointController.controllerType = controller.type
+                segment.jointController.P = float(PID[0])
+                segment.jointController.I = float(PID[1])
+                segment.jointController.D = float(PID[2])
 
         else:
             axis = string_to_list("1 0 0")
@@ -494,14 +560,14 @@ class Importer(object):
         export_logger.info("axis -> {}".format(axis))
         for i, element in enumerate(axis):
             if element == -1.0:
-                bpy.context.active_bone.RobotDesigner.axis_revert = True
+                segment.axis_revert = True
                 axis[i] = 1.0
         if axis == [1.0, 0.0, 0.0]:
-            bpy.context.active_bone.RobotDesigner.axis = "X"
+            segment.axis = "X"
         elif axis == [0.0, 1.0, 0.0]:
-            bpy.context.active_bone.RobotDesigner.axis = "Y"
+            segment.axis = "Y"
         elif axis == [0.0, 0.0, 1.0]:
-            bpy.context.active_bone.RobotDesigner.axis = "Z"
+            segment.axis = "Z"
         else:
             # todo throw exception -- only main axes are supported. Add a limitations section to documentation
             # (which has to be created as well)!
@@ -510,26 +576,26 @@ class Importer(object):
 
         export_logger.info("axis -> {}".format(axis))
 
-        bpy.context.active_bone.RobotDesigner.Euler.x.value = xyz[0]
-        bpy.context.active_bone.RobotDesigner.Euler.y.value = xyz[1]
-        bpy.context.active_bone.RobotDesigner.Euler.z.value = xyz[2]
+        segment.Euler.x.value = xyz[0]
+        segment.Euler.y.value = xyz[1]
+        segment.Euler.z.value = xyz[2]
 
-        bpy.context.active_bone.RobotDesigner.Euler.alpha.value = round(
+        segment.Euler.alpha.value = round(
             degrees(euler[0]), 0
         )
-        bpy.context.active_bone.RobotDesigner.Euler.beta.value = round(
+        segment.Euler.beta.value = round(
             degrees(euler[1]), 0
         )
-        bpy.context.active_bone.RobotDesigner.Euler.gamma.value = round(
+        segment.Euler.gamma.value = round(
             degrees(euler[2]), 0
         )
 
         # Set joint names
         if node.joint:
-            bpy.context.active_bone.RobotDesigner.joint_name = node.joint.name
+            segment.joint_name = node.joint.name
             # Set attach link to world to true if world joint.
             if node.joint.parent[0] == "world":
-                bpy.context.active_bone.RobotDesigner.world = True
+                segment.world = True
 
             # Set joint dynamic limits
             if node.joint.axis:
@@ -538,52 +604,50 @@ class Importer(object):
                         node.joint.axis[0].limit[0].effort
                         or node.joint.axis[0].limit[0].velocity
                     ):
-                        bpy.context.active_bone.RobotDesigner.dynamic_limits.maxTorque = float(
+                        segment.dynamic_limits.maxTorque = float(
                             get_list_value(node.joint.axis[0].limit[0].effort, 0)
                         )
-                        bpy.context.active_bone.RobotDesigner.dynamic_limits.maxVelocity = float(
+                        segment.dynamic_limits.maxVelocity = float(
                             get_list_value(node.joint.axis[0].limit[0].velocity, 0)
                         )
-                        bpy.context.active_bone.RobotDesigner.dynamic_limits.isActive = (
-                            True
-                        )
+                        segment.dynamic_limits.isActive = True
 
                 # Set joint kinematic limits
                 if node.joint.type == "revolute":
-                    bpy.context.active_bone.RobotDesigner.jointMode = "REVOLUTE"
+                    segment.jointMode = "REVOLUTE"
                     if len(node.joint.axis[0].limit):
-                        bpy.context.active_bone.RobotDesigner.theta.max = degrees(
+                        segment.theta.max = degrees(
                             float(get_list_value(node.joint.axis[0].limit[0].upper, 0))
                         )
-                        bpy.context.active_bone.RobotDesigner.theta.min = degrees(
+                        segment.theta.min = degrees(
                             float(get_list_value(node.joint.axis[0].limit[0].lower, 0))
                         )
                     else:
-                        bpy.context.active_bone.RobotDesigner.theta.isActive = False
+                        segment.theta.isActive = False
                 if node.joint.type == "prismatic":
-                    bpy.context.active_bone.RobotDesigner.jointMode = "PRISMATIC"
+                    segment.jointMode = "PRISMATIC"
                     if len(node.joint.axis[0].limit):
-                        bpy.context.active_bone.RobotDesigner.d.max = float(
+                        segment.d.max = float(
                             get_list_value(node.joint.axis[0].limit[0].upper, 0)
                         )
-                        bpy.context.active_bone.RobotDesigner.d.min = float(
+                        segment.d.min = float(
                             get_list_value(node.joint.axis[0].limit[0].lower, 0)
                         )
                     else:
-                        bpy.context.active_bone.RobotDesigner.d.isActive = False
+                        segment.d.isActive = False
                 if node.joint.type == "revolute2":
-                    bpy.context.active_bone.RobotDesigner.jointMode = "REVOLUTE2"
+                    segment.jointMode = "REVOLUTE2"
                 if node.joint.type == "universal":
-                    bpy.context.active_bone.RobotDesigner.jointMode = "UNIVERSAL"
+                    segment.jointMode = "UNIVERSAL"
                 if node.joint.type == "ball":
-                    bpy.context.active_bone.RobotDesigner.jointMode = "BALL"
+                    segment.jointMode = "BALL"
                 if node.joint.type == "fixed":
-                    bpy.context.active_bone.RobotDesigner.jointMode = "FIXED"
+                    segment.jointMode = "FIXED"
 
                 # import joint physics if they exist
                 if node.joint.physics:
                     if node.joint.physics[0].ode:
-                        rd_physcis_ode = bpy.context.active_bone.RobotDesigner.ode
+                        rd_physcis_ode = segment.ode
                         if node.joint.physics[0].ode[0].cfm_damping:
                             rd_physcis_ode.cfm_damping = (
                                 node.joint.physics[0].ode[0].cfm_damping[0]
@@ -598,7 +662,7 @@ class Importer(object):
                             rd_physcis_ode.erp = node.joint.physics[0].ode[0].erp[0]
 
                 if node.joint.axis[0].dynamics:
-                    rd_dynamics = bpy.context.active_bone.RobotDesigner.joint_dynamics
+                    rd_dynamics = segment.joint_dynamics
                     if node.joint.axis[0].dynamics[0].damping:
                         rd_dynamics.damping = node.joint.axis[0].dynamics[0].damping[0]
                     if node.joint.axis[0].dynamics[0].friction:
@@ -616,36 +680,36 @@ class Importer(object):
 
             # Set joint kinematic limits
             if node.joint.type == 'revolute':
-                bpy.context.active_bone.RobotDesigner.jointMode = 'REVOLUTE'
+                segment.jointMode = 'REVOLUTE'
                 if len(node.joint.axis[0].limit):
-                    bpy.context.active_bone.RobotDesigner.theta.max = degrees(
+                    segment.theta.max = degrees(
                         float(get_list_value(node.joint.axis[0].limit[0].upper, 0)))
-                    bpy.context.active_bone.RobotDesigner.theta.min = degrees(
+                    segment.theta.min = degrees(
                         float(get_list_value(node.joint.axis[0].limit[0].lower, 0)))
                 else:
-                    bpy.context.active_bone.RobotDesigner.theta.isActive = False
+                    segment.theta.isActive = False
             if node.joint.type == 'prismatic':
-                bpy.context.active_bone.RobotDesigner.jointMode = 'PRISMATIC'
+                segment.jointMode = 'PRISMATIC'
                 if len(node.joint.axis[0].limit):
-                    bpy.context.active_bone.RobotDesigner.d.max = \
+                    segment.d.max = \
                         float(get_list_value(node.joint.axis[0].limit[0].upper, 0))
-                    bpy.context.active_bone.RobotDesigner.d.min = \
+                    segment.d.min = \
                         float(get_list_value(node.joint.axis[0].limit[0].lower, 0))
                 else:
-                    bpy.context.active_bone.RobotDesigner.d.isActive = False
+                    segment.d.isActive = False
             if node.joint.type == 'revolute2':
-                bpy.context.active_bone.RobotDesigner.jointMode = 'REVOLUTE2'
+                segment.jointMode = 'REVOLUTE2'
             if node.joint.type == 'universal':
-                bpy.context.active_bone.RobotDesigner.jointMode = 'UNIVERSAL'
+                segment.jointMode = 'UNIVERSAL'
             if node.joint.type == 'ball':
-                bpy.context.active_bone.RobotDesigner.jointMode = 'BALL'
+                segment.jointMode = 'BALL'
             if node.joint.type == 'fixed':
-                bpy.context.active_bone.RobotDesigner.jointMode = 'FIXED'
+                segment.jointMode = 'FIXED'
 
             # import joint physics if they exist
             if node.joint.physics:
                 if node.joint.physics[0].ode:
-                    rd_physcis_ode = bpy.context.active_bone.RobotDesigner.ode
+                    rd_physcis_ode = segment.ode
                     if node.joint.physics[0].ode[0].cfm_damping:
                         rd_physcis_ode.cfm_damping = node.joint.physics[0].ode[0].cfm_damping[0]
                     if node.joint.physics[0].ode[0].implicit_spring_damper:
@@ -655,33 +719,21 @@ class Importer(object):
                     if node.joint.physics[0].ode[0].erp:
                         rd_physcis_ode.erp = node.joint.physics[0].ode[0].erp[0]
 
+        # import segment physics properties
+        if len(node.link.gravity) > 0:
+            segment.linkInfo.gravity = node.link.gravity[0]
+            segment.linkInfo.link_self_collide = node.link.self_collide[0]
 
-        model = bpy.context.active_object
-        model_name = model.name
-
-        pose_bone = bpy.context.active_object.pose.bones[segment_name]
-        export_logger.debug(
-            "bpy.context.active_object name (before iterating over visual): {}".format(
-            bpy.context.active_object.name)
-        )
-        export_logger.debug(
-            "active object pose bone matrix: {}".format(homo2origin(pose_bone.matrix))
-        )
-        export_logger.debug(
-            "active object matrix world: {}".format(homo2origin(model.matrix_world))
-        )
+    @profiler.profiled()
+    def import_link(self, node: sdf_tree.SDFTree, segment_name):
+        """
+        Imports the physics frame and the geometries of a link. The armature has to be up to date.
 
-        segment_world = model.matrix_world @ pose_bone.matrix
-        # segment_world = pose_float2homogeneous(rounded(string_to_list("0 0 0.6 0 0 -1.570796")))*pose_bone.matrix
+        :param node: The actual segment
+        :param segment_name: Name of the segment the link belongs to
+        """
+        SelectSegment.run(segment_name=segment_name)
 
-        # import segment physics properties
-        if len(node.link.gravity) > 0:
-            bpy.context.active_bone.RobotDesigner.linkInfo.gravity = node.link.gravity[
-                0
-            ]
-            bpy.context.active_bone.RobotDesigner.linkInfo.link_self_collide = (
-                node.link.self_collide[0]
-            )
         if len(node.link.inertial) > 0:
             i = node.link.inertial[0].inertia[0]
             SelectSegment.run(segment_name=segment_name)
@@ -886,9 +938,7 @@ class Importer(object):
                             homo2origin(bpy.context.active_object.matrix_world))
                         )
                         # if len(model.geometry[0].mesh) > 0:
-                        bpy.ops.object.transform_apply(
-                            location=True, rotation=True, scale=True
-                        )
+                        apply_transform(location=True, rotation=True, scale=True)
                         # after applying transform, matrix world becomes zero again
                         bpy.context.active_object.matrix_world = (
                             segment_world
@@ -929,9 +979,7 @@ class Importer(object):
                         # The name might be altered by blender
                         assigned_name = bpy.context.active_object.name
 
-                        bpy.ops.object.transform_apply(
-                            location=False, rotation=False, scale=True
-                        )
+                        apply_transform(location=False, rotation=False, scale=True)
                         SelectModel.run(model_name=model_name)
                         SelectSegment.run(segment_name=segment_name)
                         SelectGeometry.run(geometry_name=assigned_name)
@@ -1072,22 +1120,21 @@ class Importer(object):
                 else:
                     export_logger.error("Mesh file not found")
                     pass
-        # update ref_pose
-        for sub_tree in node.children:
-            ref_pose = child_link_pose
-            self.parse(sub_tree, ref_pose, segment_name)
-        return segment_name
 
+    @profiler.profiled()
     def import_file(self):
-        (
-            muscles,
-            robot_name,
-            robot_location,
-            robot_rotation,
-            root_links,
-            kinematic_chains,
-            self.controllers,
-        ) = sdf_tree.SDFTree.parse(self.file_path)
+        with profiler.phase("parse_sdf"):
+            (
+                muscles,
+                robot_name,
+                robot_location,
+                robot_rotation,
+                root_links,
+                kinematic_chains,
+                self.controllers,
+            ) = sdf_tree.SDFTree.parse(
+                self.file_path, global_properties.import_validate_schema.get(bpy.context.scene)
+            )
 
         self.MUSCLE_PATH = muscles
 
@@ -1124,11 +1171,14 @@ class Importer(object):
         #             scale = Matrix([[s1[0] * s2[0], 0, 0, 0], [0, s1[1] * s2[1], 0, 0],
         #                             [0, 0, s1[2] * s2[2], 0], [0, 0, 0, 1]])
         #             bpy.context.active_object.matrix_world = trafo * scale
-        for chain in kinematic_chains:
-            ref_pose = [0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
-            export_logger.debug("new chain: {}  {}".format(chain, ref_pose))
-            root_name = self.parse(chain, ref_pose)
-            UpdateSegments.run(segment_name=root_name, recurse=True)
+        with mesh_import_cache.session(mesh_import_cache.enabled()), mesh_decode_pool.session(
+            self.mesh_files(kinematic_chains), mesh_decode_pool.enabled()
+        ):
+            for chain in kinematic_chains:
+                ref_pose = [0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+                export_logger.debug("new chain: {}  {}".format(chain, ref_pose))
+                with profiler.phase("build_chain"):
+                    self.parse(chain, ref_pose)
 
         # set robot location and rotation
         bpy.context.active_object.location = robot_location
@@ -1136,13 +1186,14 @@ class Importer(object):
 
         bpy.context.active_object.show_in_front = True
 
+    @profiler.profiled()
     def import_config(self):
         """
         imports the model.config file and sets the RDObject variables
         :param self:
         :return:
         """
-        model_config_xml = open(self.base_dir + "/model.config").read()
+        model_config_xml = open(package_reader.extract(self.base_dir + "/model.config")).read()
         model = config_model_dom.CreateFromDocument(model_config_xml)
 
         # read model data
@@ -1172,6 +1223,7 @@ class ImportPlain(RDOperator):
     # Obligatory class attributes
     bl_idname = config.OPERATOR_PREFIX + "import_sdf_plain"
     bl_label = "Import SDF - plain"
+    profiling = True
 
     filepath: StringProperty(name="Filename", subtype="FILE_PATH")
 
@@ -1214,6 +1266,7 @@ class ImportPackage(RDOperator):
     # Obligatory class attributes
     bl_idname = config.OPERATOR_PREFIX + "import_sdf_package"
     bl_label = "Import SDF"
+    profiling = True
 
     filepath: StringProperty(name="Filename", subtype="FILE_PATH")
 
@@ -1249,6 +1302,7 @@ class ImportZippedPackage(RDOperator):
     # Obligatory class attributes
     bl_idname = config.OPERATOR_PREFIX + "import_sdf_zipped_package"
     bl_label = "Import SDF from zipped folder"
+    profiling = True
 
     filepath: StringProperty(name="Filename", subtype="FILE_PATH")
 
@@ -1259,29 +1313,17 @@ class ImportZippedPackage(RDOperator):
     @RDOperator.OperatorLogger
     @RDOperator.Postconditions(ModelSelected, ObjectMode)
     def execute(self, context):
-        import zipfile
         import tempfile
 
-        with tempfile.TemporaryDirectory() as target:
-            with zipfile.ZipFile(self.filepath, "r") as z:
-                z.extractall(target)
-
+        with tempfile.TemporaryDirectory() as target, package_reader.session(self.filepath, target):
+            # only the files read by the importer are extracted
             file_path = ""
-            for root, subFolders, files in os.walk(target):
-                export_logger.debug(
-                    "root: {}, subfolders: {}, files: {}, splitfiles: {}".format(
-                    root,
-                    subFolders,
-                    files,
-                    [os.path.splitext(i) for i in files])
-                )
-                for i in files:
-                    if ".sdf" == os.path.splitext(i)[1]:
-                        if file_path:
-                            self.report(
-                                {"INFO"}, "Multiple SDF in zip. Choosing: " + str(i)
-                            )
-                        file_path = os.path.join(root, i)
+            for i in package_reader.find(".sdf"):
+                if file_path:
+                    self.report(
+                        {"INFO"}, "Multiple SDF in zip. Choosing: " + os.path.basename(i)
+                    )
+                file_path = package_reader.extract(i)
 
             if file_path:
                 export_logger.debug("Importing: {}".format(file_path))
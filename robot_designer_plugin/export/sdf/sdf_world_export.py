@@ -195,6 +195,8 @@ class ExportPlainWorld(RDOperator):
 
     bl_idname = config.OPERATOR_PREFIX + "export_world_to_sdf_plain"
     bl_label = "Export World SDF - plain"
+    profiling = True
+    exporting = True
 
     filter_glob: StringProperty(
         default="*.world",
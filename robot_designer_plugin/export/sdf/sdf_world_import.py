@@ -31,17 +31,111 @@
 
 # System imports
 import os
+import xml.etree.ElementTree as ET
+import pyxb
 
 # Blender imports
+import bpy
 from bpy.props import StringProperty, BoolProperty
+from mathutils import Euler, Matrix, Vector
 
 # RobotDesigner imports
 from ...core import config, PluginManager, RDOperator
+from ...core.logfile import export_logger
 from .generic import sdf_world_dom
+from .. import fast_parser
+from ...properties.globals import global_properties
 from .generic.helpers import string_to_list
 from ...operators import world
 from ...operators.helpers import ObjectMode, WorldSelected
 from . import sdf_import
+from ..mesh_import_cache import mesh_import_cache
+
+
+def duplicate_model(model, matrix_world=None):
+    """
+    Creates a duplicate of an imported model. The armature, the objects parented to it (geometries, physics frames,
+    sensors) and its muscles are copied. Only the meshes are shared with the original, the armature (which holds the
+    segment properties) and the muscle curves are copied such that the instances can be edited independently.
+    References between the copies (parents, hook modifiers, constraints, muscle and wrapping object names) are
+    redirected to the copies.
+
+    :param model: The armature object of the model
+    :param matrix_world: The pose of the duplicate (the pose of the original if None)
+    :return: The armature object of the duplicate
+    """
+    originals = [model]
+    for obj in originals:
+        originals.extend(obj.children)
+    originals.extend(
+        obj for obj in bpy.data.objects
+        if obj.RobotDesigner.muscles.robotName == model.name and obj not in originals
+    )
+
+    copies = {}
+    for obj in originals:
+        copy = obj.copy()
+        if obj.type in ("ARMATURE", "CURVE"):
+            copy.data = obj.data.copy()
+        for collection in obj.users_collection:
+            collection.objects.link(copy)
+        copies[obj] = copy
+    names = {obj.name: copy.name for obj, copy in copies.items()}
+
+    def redirect(constraints):
+        for constraint in constraints:
+            if getattr(constraint, "target", None) in copies:
+                constraint.target = copies[constraint.target]
+
+    for obj, copy in copies.items():
+        if obj.parent in copies:
+            copy.parent = copies[obj.parent]
+        for modifier in copy.modifiers:
+            if getattr(modifier, "object", None) in copies:
+                modifier.object = copies[modifier.object]
+        redirect(copy.constraints)
+        if copy.pose is not None:
+            for pose_bone in copy.pose.bones:
+                redirect(pose_bone.constraints)
+
+        rd = copy.RobotDesigner
+        if obj is not model and rd.muscles.robotName == model.name:
+            rd.muscles.robotName = names[model.name]
+        if rd.muscles.name in names:
+            rd.muscles.name = names[rd.muscles.name]
+        for wrap in rd.muscles.connectedWraps:
+            wrap.wrappingName = names.get(wrap.wrappingName, wrap.wrappingName)
+        for muscle in rd.wrap.muscleNames:
+            muscle.name = names.get(muscle.name, muscle.name)
+        if obj.type == "CURVE":
+            # muscle materials are looked up by the name of the muscle
+            material = copy.data.materials.get(obj.name + "_vis")
+            if material is not None:
+                index = copy.data.materials.find(material.name)
+                copy.data.materials[index] = material.copy()
+                copy.data.materials[index].name = copy.name + "_vis"
+
+    if matrix_world is not None:
+        copies[model].matrix_world = matrix_world
+    return copies[model]
+
+
+def include_pose(include):
+    """
+    Reads the pose of an ``<include>`` element (the world schema does not define it, so it is read from the source
+    of the element).
+
+    :param include: The include element (parsed with ``keep=("include",)``)
+    :return: The pose as matrix or None if the include has no pose
+    """
+    try:
+        pose = ET.fromstring(include.toxml("utf-8")).find("pose")
+    except pyxb.PyXBException:
+        return None
+    if pose is None or not pose.text:
+        return None
+    values = string_to_list(pose.text)
+    return Matrix.Translation(Vector(values[0:3])) @ Euler(values[3:6], "XYZ").to_matrix().to_4x4()
 
 
 def import_sdf(context, filepath: str):
@@ -52,8 +146,11 @@ def import_sdf(context, filepath: str):
     base_dir = os.path.dirname(filepath)
     FILE_URL_RELATIVE = "model://"
 
-    root_xml = open(filepath).read()
-    sdf = sdf_world_dom.CreateFromDocument(root_xml)
+    if global_properties.import_validate_schema.get(context.scene):
+        root_xml = open(filepath).read()
+        sdf = sdf_world_dom.CreateFromDocument(root_xml)
+    else:
+        sdf = fast_parser.parse(filepath, sdf_world_dom, keep=("include",))
 
     for sdf_world in sdf.world:
         world.CreateNewWorld.run(sdf_world.name)
@@ -165,16 +262,31 @@ def import_sdf(context, filepath: str):
                         for val in sdf_contact.override_stiction_transition_velocity:
                             opensim_obj.override_stiction_transition_velocity = val
 
-        for incl in sdf_world.include:
-            uri = incl.uri[0]
-            if uri.startswith(FILE_URL_RELATIVE):
-                robot_name = uri.replace(FILE_URL_RELATIVE, "")
-                sdf_import.ImportPlain.run(
-                    filepath=base_dir + "/" + robot_name + "/model.sdf"
-                )
-                name = context.active_object.name
-                context.view_layer.objects.active = obj
-                world.AddRobot.run(robot_name=name)
+        # every model is imported once, further includes of the same model become linked duplicates
+        imported_models = {}
+        with mesh_import_cache.session(mesh_import_cache.enabled()):
+            for incl in sdf_world.include:
+                uri = incl.uri[0]
+                if uri.startswith(FILE_URL_RELATIVE):
+                    # the pose of the include replaces the pose of the model
+                    matrix_world = include_pose(incl)
+                    name, model_matrix = imported_models.get(uri, ("", None))
+                    model = bpy.data.objects.get(name)
+                    if model is None:
+                        robot_name = uri.replace(FILE_URL_RELATIVE, "")
+                        sdf_import.ImportPlain.run(
+                            filepath=base_dir + "/" + robot_name + "/model.sdf"
+                        )
+                        model = context.active_object
+                        name = model.name
+                        imported_models[uri] = (name, model.matrix_world.copy())
+                        if matrix_world is not None:
+                            model.matrix_world = matrix_world
+                    else:
+                        name = duplicate_model(model, matrix_world or model_matrix).name
+                        export_logger.info("Instantiated {} as {}".format(model.name, name))
+                    context.view_layer.objects.active = obj
+                    world.AddRobot.run(robot_name=name)
 
 
 @RDOperator.Preconditions(ObjectMode)
@@ -186,6 +298,7 @@ class ImportPlainWorld(RDOperator):
 
     bl_idname = config.OPERATOR_PREFIX + "import_world_from_sdf_plain"
     bl_label = "Import World SDF - plain"
+    profiling = True
 
     filter_glob: StringProperty(
         default="*.world",
@@ -0,0 +1,141 @@
+# #####
+#  This file is part of the RobotDesigner developed in the Neurorobotics
+#  subproject of the Human Brain Project (https://www.humanbrainproject.eu).
+#
+#  The Human Brain Project is a European Commission funded project
+#  in the frame of the Horizon2020 FET Flagship plan.
+#  (http://ec.europa.eu/programmes/horizon2020/en/h2020-section/fet-flagships)
+#
+#  The Robot Designer has initially been forked from the RobotEditor
+#  (https://gitlab.com/h2t/roboteditor) developed at the Karlsruhe Institute
+#  of Technology in the High Performance Humanoid Technologies Laboratory (H2T).
+# #####
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Reading and writing of STL files with numpy.
+
+Binary files are mapped onto a structured dtype with :func:`numpy.frombuffer`; ASCII files are tokenized once and the
+coordinates following the ``vertex`` keywords are converted in a single call. STL stores every triangle corner
+separately, so :func:`read_stl` merges coincident corners into shared vertices (``np.unique``) by default.
+
+The module only depends on numpy such that it can be used by the mesh import workers (see :mod:`.mesh_decoder`).
+"""
+
+# System imports
+import os
+import numpy as np
+
+STL_RECORD = np.dtype([("normal", "<f4", (3,)), ("vertices", "<f4", (3, 3)), ("attribute", "<u2")])
+"""Triangle record of binary STL files (50 bytes)."""
+
+STL_HEADER_SIZE = 80
+
+STL_BINARY_PREFIX = "binary STL"
+"""Start of the header of written binary files (readers detect ASCII files by a leading ``solid``)."""
+
+
+def _read_corners(data):
+    """
+    :param data: content of a binary or ASCII STL file
+    :return: (3 T, 3) float32 corner coordinates and the solid name
+    """
+    if len(data) >= STL_HEADER_SIZE + 4:
+        count = int(np.frombuffer(data, dtype="<u4", count=1, offset=STL_HEADER_SIZE)[0])
+        # Some writers append data after the triangles. ASCII files do not pass this check since their text gives a
+        # count of at least 0x09090909 triangles.
+        if len(data) >= STL_HEADER_SIZE + 4 + count * STL_RECORD.itemsize:
+            records = np.frombuffer(data, dtype=STL_RECORD, count=count, offset=STL_HEADER_SIZE + 4)
+            name = data[:STL_HEADER_SIZE].split(b"\0", 1)[0].decode("ascii", "replace").strip()
+            for prefix in (STL_BINARY_PREFIX, "solid"):
+                if name.startswith(prefix):
+                    name = name[len(prefix):].strip()
+            return records["vertices"].reshape(-1, 3), name
+
+    tokens = np.array(data.split())
+    if len(tokens) == 0 or tokens[0].lower() != b"solid":
+        raise ValueError("Not a STL file")
+    name = tokens[1].decode("ascii", "replace") if len(tokens) > 1 and tokens[1].lower() != b"facet" else ""
+    positions = np.flatnonzero(np.char.lower(tokens) == b"vertex")
+    coordinates = tokens[positions[:, None] + np.arange(1, 4)]
+    return coordinates.astype(np.float32), name
+
+
+def read_stl(file_path, weld=True):
+    """
+    Reads a binary or ASCII STL file.
+
+    :param file_path: The STL file
+    :param weld: Merge corners with identical coordinates into one vertex
+    :return: (V, 3) float32 vertex coordinates, (T, 3) int32 vertex indices and the name of the solid (or the file
+        name if the solid has no name)
+    """
+    with open(file_path, "rb") as f:
+        corners, name = _read_corners(f.read())
+
+    if weld:
+        positions, indices = np.unique(corners, axis=0, return_inverse=True)
+    else:
+        positions, indices = corners, np.arange(len(corners))
+    triangles = indices.reshape(-1, 3).astype(np.int32)
+    return positions.astype(np.float32), triangles, name or os.path.splitext(os.path.basename(file_path))[0]
+
+
+def facet_normals(positions, triangles):
+    """
+    :return: (T, 3) unit normals of the triangles (zero for degenerated triangles)
+    """
+    corners = positions[triangles]
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    return np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+
+
+def write_stl(file_path, positions, triangles, name="", binary=True):
+    """
+    Writes a triangle mesh to a STL file.
+
+    :param file_path: The STL file
+    :param positions: (V, 3) vertex coordinates
+    :param triangles: (T, 3) vertex indices
+    :param name: Name of the solid
+    :param binary: Write a binary (default) or an ASCII file
+    """
+    positions = np.asarray(positions, dtype=np.float32).reshape(-1, 3)
+    triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+    normals = facet_normals(positions, triangles)
+
+    if binary:
+        records = np.zeros(len(triangles), dtype=STL_RECORD)
+        records["normal"] = normals
+        records["vertices"] = positions[triangles]
+        header = "{} {}".format(STL_BINARY_PREFIX, name).encode("ascii", "replace")[:STL_HEADER_SIZE]
+        with open(file_path, "wb") as f:
+            f.write(header.ljust(STL_HEADER_SIZE, b"\0"))
+            f.write(np.uint32(len(triangles)).astype("<u4").tobytes())
+            f.write(records.tobytes())
+        return
+
+    values = np.concatenate([normals[:, None, :], positions[triangles]], axis=1).reshape(-1, 12)
+    facet = ("facet normal {:e} {:e} {:e}\n outer loop\n" + "  vertex {:e} {:e} {:e}\n" * 3 +
+             " endloop\nendfacet\n")
+    with open(file_path, "w") as f:
+        f.write("solid {}\n".format(name))
+        f.write("".join(facet.format(*row) for row in values.tolist()))
+        f.write("endsolid {}\n".format(name))
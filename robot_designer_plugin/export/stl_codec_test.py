@@ -0,0 +1,122 @@
+# #####
+#  This file is part of the RobotDesigner developed in the Neurorobotics
+#  subproject of the Human Brain Project (https://www.humanbrainproject.eu).
+#
+#  The Human Brain Project is a European Commission funded project
+#  in the frame of the Horizon2020 FET Flagship plan.
+#  (http://ec.europa.eu/programmes/horizon2020/en/h2020-section/fet-flagships)
+#
+#  The Robot Designer has initially been forked from the RobotEditor
+#  (https://gitlab.com/h2t/roboteditor) developed at the Karlsruhe Institute
+#  of Technology in the High Performance Humanoid Technologies Laboratory (H2T).
+# #####
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# System imports
+import os
+import tempfile
+import unittest
+import numpy as np
+
+import stl_codec
+
+POSITIONS = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1]], dtype=np.float32)
+TRIANGLES = np.array([[0, 2, 1], [0, 1, 3], [0, 3, 2], [1, 2, 3]], dtype=np.int32)
+
+
+def canonical(positions, triangles):
+    """
+    :return: sorted corner coordinates of all triangles (independent of the vertex order)
+    """
+    corners = np.asarray(positions)[np.asarray(triangles)].reshape(-1, 9)
+    return corners[np.lexsort(corners.T[::-1])]
+
+
+class StlTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.directory.name, "mesh.stl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assertSameMesh(self, positions, triangles):
+        np.testing.assert_allclose(canonical(positions, triangles), canonical(POSITIONS, TRIANGLES))
+
+
+class BinaryRoundTrip(StlTestCase):
+    def runTest(self):
+        stl_codec.write_stl(self.file_path, POSITIONS, TRIANGLES, name="tetra")
+        with open(self.file_path, "rb") as f:
+            data = f.read()
+        self.assertFalse(data.startswith(b"solid"))
+        self.assertTrue(data.startswith(b"binary STL tetra"))
+        self.assertEqual(len(data), 84 + 50 * len(TRIANGLES))
+
+        positions, triangles, name = stl_codec.read_stl(self.file_path)
+        self.assertEqual(name, "tetra")
+        self.assertEqual(len(positions), len(POSITIONS))
+        self.assertSameMesh(positions, triangles)
+
+
+class BinaryTrailingBytes(StlTestCase):
+    def runTest(self):
+        stl_codec.write_stl(self.file_path, POSITIONS, TRIANGLES, name="tetra")
+        with open(self.file_path, "ab") as f:
+            f.write(b"\0" * 7)
+        positions, triangles, name = stl_codec.read_stl(self.file_path)
+        self.assertEqual(name, "tetra")
+        self.assertSameMesh(positions, triangles)
+
+
+class BinarySolidHeader(StlTestCase):
+    def runTest(self):
+        # binary files of other writers starting with "solid"
+        stl_codec.write_stl(self.file_path, POSITIONS, TRIANGLES)
+        with open(self.file_path, "r+b") as f:
+            f.write(b"solid legacy".ljust(80, b" "))
+        positions, triangles, name = stl_codec.read_stl(self.file_path)
+        self.assertEqual(name, "legacy")
+        self.assertSameMesh(positions, triangles)
+
+
+class AsciiRoundTrip(StlTestCase):
+    def runTest(self):
+        stl_codec.write_stl(self.file_path, POSITIONS, TRIANGLES, name="tetra", binary=False)
+        with open(self.file_path, "rb") as f:
+            self.assertTrue(f.read().startswith(b"solid tetra\n"))
+        positions, triangles, name = stl_codec.read_stl(self.file_path)
+        self.assertEqual(name, "tetra")
+        self.assertSameMesh(positions, triangles)
+
+        corners, _, _ = stl_codec.read_stl(self.file_path, weld=False)
+        self.assertEqual(len(corners), 3 * len(TRIANGLES))
+
+
+class FacetNormals(unittest.TestCase):
+    def runTest(self):
+        normals = stl_codec.facet_normals(POSITIONS, np.vstack([TRIANGLES, [[0, 0, 1]]]))
+        np.testing.assert_allclose(normals[0], [0, 0, -1])
+        np.testing.assert_allclose(np.linalg.norm(normals[:4], axis=1), 1, rtol=1e-6)
+        np.testing.assert_array_equal(normals[4], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -45,6 +45,9 @@ import logging
 from . import urdf_dom
 from .helpers import list_to_string
 from pyxb import ContentNondeterminismExceededError
+from ...xml_stream import write_binding
+from ... import fast_parser
+from ...package_manifest import package_manifest
 import os
 
 logger = logging.getLogger('URFD')
@@ -89,7 +92,7 @@ class URDFTree(object):
         self.connectedJoints = connected_joints
 
     @staticmethod
-    def parse(file_name):
+    def parse(file_name, validate=False):
         """ Parses a URDF file and builds up a tree representing the kinematic structure of a robot.
         Explanation: The URDF file format stores links (i.e., rigid bodies) and joints (i.e., connection between links)
         in a flat structure (as opposed to a tree data structure). Links have no references while joints refer to the
@@ -97,12 +100,17 @@ class URDFTree(object):
         and calls the recursive URDFTree.build() method to create a tree-like data structure representing the
         kinematic tree(s) of the robot.
         :param file_name: the name of the file to open
+        :param validate: If True, the file is read (and validated) with the pyxb bindings. Otherwise, the faster
+            non-validating :func:`.fast_parser.parse` is used (gazebo tags are kept for serialization).
         """
 
         # read the file
         # robot = urdf_dom.parse(file_name, silence=True)
         try:
-            robot = urdf_dom.CreateFromDocument(open(file_name).read())
+            if validate:
+                robot = urdf_dom.CreateFromDocument(open(file_name).read())
+            else:
+                robot = fast_parser.parse(file_name, urdf_dom, keep=("gazebo",))
         except ContentNondeterminismExceededError as e:
             logger.error("Error raised {}, {}".format(e, e.instance.name))
             raise e
@@ -125,18 +133,7 @@ class URDFTree(object):
         logger.debug("Built controller cache:")
         logger.debug(controller_cache)
 
-        # create mapping from (parent) links to joints
-        connected_joints = {link: [joint for joint in robot.joint if link.name == joint.parent.link] for link
-                            in robot.link}
-
-        # create mapping from joints to their child links
-        connected_links = {joint: link for link in robot.link for joint in robot.joint if
-                           link.name == joint.child.link}
-
-        # find root links (i.e., links that are NOT connected to a joint)
-        child_links = [link.name for link in robot.link for joint in robot.joint if
-                       link.name == joint.child.link]
-        root_links = [link for link in robot.link if link.name not in child_links]
+        connected_joints, connected_links, root_links = URDFTree.resolve_references(robot.link, robot.joint)
 
         logger.debug("Root links: {}".format([i.name for i in root_links]))
         logger.debug("connected links: {}".format({j.name: l.name for j, l in connected_links.items()}))
@@ -155,25 +152,80 @@ class URDFTree(object):
         logger.debug("kinematic chains: {}".format(kinematic_chains))
         return robot.name, root_links, kinematic_chains, controller_cache, gazebo_tags
 
+    @staticmethod
+    def resolve_references(links, joints):
+        """
+        Resolves the name references of the joints to their parent and child links in O(links + joints).
+        Dangling references and duplicate names are reported to the log. Joints with a dangling child reference are
+        ignored.
+
+        :param links: urdf_dom link elements
+        :param joints: urdf_dom joint elements
+        :return: tuple of the mappings link -> [joints], joint -> child link and the list of root links.
+        """
+        links_by_name = {}
+        for link in links:
+            if link.name in links_by_name:
+                logger.warning("Duplicate link name: {}".format(link.name))
+            links_by_name[link.name] = link
+
+        joint_names = set()
+        joints_by_parent = {}
+        connected_links = {}
+        parent_joints = {}
+        for joint in joints:
+            if joint.name in joint_names:
+                logger.warning("Duplicate joint name: {}".format(joint.name))
+            joint_names.add(joint.name)
+
+            if joint.child.link not in links_by_name:
+                logger.warning("Joint {} refers to unknown child link {}".format(joint.name, joint.child.link))
+                continue
+            if joint.parent.link not in links_by_name:
+                logger.warning("Joint {} refers to unknown parent link {}".format(joint.name, joint.parent.link))
+
+            if joint.child.link in parent_joints:
+                logger.warning("Link {} is the child of joints {} and {}".format(
+                    joint.child.link, parent_joints[joint.child.link].name, joint.name))
+            parent_joints[joint.child.link] = joint
+
+            joints_by_parent.setdefault(joint.parent.link, []).append(joint)
+            connected_links[joint] = links_by_name[joint.child.link]
+
+        # create mapping from (parent) links to joints
+        connected_joints = {link: list(joints_by_parent.get(link.name, [])) for link in links}
+
+        # find root links (i.e., links that are NOT connected to a joint)
+        root_links = [link for link in links if link.name not in parent_joints]
+
+        return connected_joints, connected_links, root_links
+
     def build(self, link, joint=None, depth=0):
         """
-        Recursive function that builds up the tree representation of the robot. You do not have to call it manually (
-        Called by parse).
+        Builds up the tree representation of the robot. You do not have to call it manually (Called by parse).
         :param link: The link the kinematics subtree starts with
         :param joint: The joint connecting to the previous link (if any)
         """
-        self.children = []
-        self.joint = joint
-        self.link = link
-        self.set_defaults()
-
-        children = self.connectedJoints[link]
-
-        for joint in children:
-            tree = URDFTree(connected_links=self.connectedLinks, connected_joints=self.connectedJoints,
-                            robot=self.robot)
-            self.children.append(tree)
-            tree.build(self.connectedLinks[joint], joint, depth + 1)
+        # Uses an explicit stack as long kinematic chains would exceed the recursion limit
+        visited = set()
+        stack = [(self, link, joint)]
+        while stack:
+            node, link, joint = stack.pop()
+            node.children = []
+            node.joint = joint
+            node.link = link
+            node.set_defaults()
+
+            if link in visited:
+                logger.warning("Closed kinematic loop at link {}".format(link.name))
+                continue
+            visited.add(link)
+
+            for joint in self.connectedJoints[link]:
+                tree = URDFTree(connected_links=self.connectedLinks, connected_joints=self.connectedJoints,
+                                robot=self.robot)
+                node.children.append(tree)
+                stack.append((tree, self.connectedLinks[joint], joint))
 
     @staticmethod
     def create_empty(name, base_link_name="base_link"):
@@ -222,12 +274,8 @@ class URDFTree(object):
         if not os.path.exists(os.path.dirname(file_name)):
             os.makedirs(os.path.dirname(file_name))
 
-        with open(file_name, "w") as f:
-            # f.write('<?xml version="1.0" ?>')
-            output = self.robot.toxml("utf-8", element_name="robot").decode("utf-8")
-            # output = output.replace(">", ">\n")
-            f.write(output)
-            # self.robot.export(f,0)
+        with package_manifest.open(file_name) as f:
+            write_binding(self.robot, f, element_name="robot", encoding="utf-8", indent="", newline="")
 
     def _write(self):
         """
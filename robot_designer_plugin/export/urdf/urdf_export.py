@@ -59,13 +59,18 @@ from .generic import urdf_tree
 from .generic.helpers import list_to_string
 from ...core import config, PluginManager, RDOperator
 from ...core.logfile import export_logger
+from ...core.profiling import profiler
 from ...operators.helpers import ModelSelected, ObjectMode
 from ...operators.model import SelectModel
 
 from ...properties.segments import getTransformFromBlender
 from ...properties.globals import global_properties
+from ..mesh_cache import mesh_export_cache, mesh_hash, geometry_hash
+from ..collada_writer import can_write, write_collada, write_stl_object
+from ..package_archive import package_archive, parse_extensions
 
 
+@profiler.profiled()
 def export_mesh(operator: RDOperator, context, name: str, directory: str, toplevel_dir: str, in_ros_package: bool,
                                                           abs_file_paths = False, export_collision = False):
     """
@@ -80,7 +85,7 @@ def export_mesh(operator: RDOperator, context, name: str, directory: str, toplev
     :param in_ros_package: Whether to export into a ros package or plain files
     :param abs_file_paths: If not intstalled into a ros package decides whether to use absolute file paths.
     :param export_collision: Exporting a collision mesh or visualization mesh.
-    :return: name of the file the mesh is stored in.
+    :return: name of the file the mesh is stored in or None if it is not exported.
     """
 
     if not export_collision:
@@ -102,41 +107,63 @@ def export_mesh(operator: RDOperator, context, name: str, directory: str, toplev
     assert len(meshes) <= 1
     for mesh in meshes:
         export_logger.debug("Processing mesh: {}".format(mesh))
-
-        model_name = bpy.context.active_object.name
-        bpy.ops.object.select_all(action='DESELECT')
-        bpy.data.objects[mesh].select = True
-        bpy.context.scene.objects.active = bpy.data.objects[mesh]
-        # bpy.context.active_object.select = True
+        obj = bpy.data.objects[mesh]
 
         # get the mesh vertices number
-        bm = bpy.context.scene.objects.active.data
+        bm = obj.data
+        # binary STL as compact alternative to COLLADA (without materials)
+        stl = global_properties.export_mesh_format.get(context.scene) == "STL"
+        extension = '.stl' if stl else '.dae'
         # export_logger.debug("# of vertices={}".format(len(bm.vertices)))
 
         if len(bm.vertices) > 1:
             if '.' in mesh:
-                file_path = os.path.join(directory, mesh.replace('.', '_') + '.dae')
+                file_path = os.path.join(directory, mesh.replace('.', '_') + extension)
+            else:
+               file_path = os.path.join(directory, mesh + extension)
+
+            direct = stl or (global_properties.export_direct_mesh_writer.get(context.scene) and can_write(obj))
+            geometry = geometry_hash(obj, writer="stl" if stl else "direct" if direct else "")
+            shared_path = mesh_export_cache.shared_file(directory, geometry)
+            if shared_path is not None:
+                # identical geometry has already been written for another link
+                file_path = shared_path
             else:
-               file_path = os.path.join(directory, mesh + '.dae')
-
-            bpy.ops.wm.collada_export(
-                filepath=file_path, apply_modifiers=True, selected=True, use_texture_copies=True)
-
-            # quick fix for dispersed meshes
-            # todo: find appropriate solution
-            with open(file_path, "r") as file:
-                lines = file.readlines()
-            with open(file_path, "w") as file:
-               for line in lines:
-                    if "matrix" not in line:
-                        file.write(line)
+                mesh_export_cache.register_export(directory, geometry, file_path)
+            cache_key = mesh_hash(obj, geometry=geometry) if mesh_export_cache.enabled() else None
+            if shared_path is None and not mesh_export_cache.fetch(cache_key, file_path):
+                if stl:
+                    write_stl_object(obj, file_path)
+                elif direct:
+                    write_collada(obj, file_path)
+                else:
+                    model_name = bpy.context.active_object.name
+                    bpy.ops.object.select_all(action='DESELECT')
+                    obj.select = True
+                    bpy.context.scene.objects.active = obj
+
+                    bpy.ops.wm.collada_export(
+                        filepath=file_path, apply_modifiers=True, selected=True, use_texture_copies=True)
+
+                    # quick fix for dispersed meshes
+                    # todo: find appropriate solution
+                    with open(file_path, "r") as file:
+                        lines = file.readlines()
+                    with open(file_path, "w") as file:
+                       for line in lines:
+                            if "matrix" not in line:
+                                file.write(line)
+
+                    SelectModel.run(model_name=model_name)
+
+                mesh_export_cache.store(cache_key, file_path)
+            if shared_path is None:
+                package_archive.add(file_path)
         else:
-           if '.' in mesh:
-               file_path = os.path.join(directory, mesh.replace('.', '_') + '_vertices' + str(len(bm.vertices)) + '.dae')
-           else:
-              file_path = os.path.join(directory, mesh + '_vertices' + str(len(bm.vertices)) + '.dae')
+            # degenerated meshes are not exported
+            export_logger.info("Skipping mesh {} with {} vertices".format(mesh, len(bm.vertices)))
+            return None
 
-        SelectModel.run(model_name=model_name)
         if in_ros_package:
             return "package://" + os.path.relpath(file_path, toplevel_dir)
         elif not abs_file_paths:
@@ -148,6 +175,7 @@ def export_mesh(operator: RDOperator, context, name: str, directory: str, toplev
             # mesh + ".dae"))
 
 
+@profiler.profiled()
 def create_urdf(operator: RDOperator, context, base_link_name,
                           filepath: str, meshpath: str, toplevel_directory: str, in_ros_package: bool, abs_filepaths = False):
     """
@@ -232,7 +260,7 @@ def walk_segments(segment, tree):
 
         visual_path = export_mesh(operator, context, mesh, meshpath, toplevel_directory,
                                   in_ros_package, abs_filepaths, export_collision=False)
-        if visual_path and "_vertices1.dae" not in visual_path:
+        if visual_path:
             visual = child.add_mesh(visual_path,
                                     [i * j for i, j in zip(bpy.data.objects[mesh].scale, blender_scale_factor)])
             visual.origin.xyz = list_to_string([i * j for i, j in zip(pose.translation, blender_scale_factor)])
@@ -242,7 +270,7 @@ def walk_segments(segment, tree):
 
         collision_path = export_mesh(operator, context, mesh, meshpath, toplevel_directory,
                                      in_ros_package, abs_filepaths, export_collision=True)
-        if collision_path and "_vertices1.dae" not in collision_path:
+        if collision_path:
             collision = child.add_collisionmodel(collision_path,
                                                  [i * j for i, j in
                                                   zip(bpy.data.objects[mesh].scale, blender_scale_factor)])
@@ -302,6 +330,7 @@ def walk_segments(segment, tree):
 
     blender_scale_factor = context.active_object.scale
 
+    mesh_export_cache.reset_statistics()
     root = urdf_tree.URDFTree.create_empty(robot_name, base_link_name)
 
     # build control plugin element
@@ -318,6 +347,9 @@ def walk_segments(segment, tree):
 
     export_logger.info("Writing to {}".format(filepath))
     root.write(filepath)
+    if mesh_export_cache.enabled():
+        export_logger.info(mesh_export_cache.summary())
+        operator.report({'INFO'}, mesh_export_cache.summary())
 
     # insert gazebo tags before "</robot>" tag
     if operator.gazebo:
@@ -389,6 +421,8 @@ class ExportZippedPackage(RDOperator):
 
     bl_idname = config.OPERATOR_PREFIX + 'export_to_urdf_package_zipped'
     bl_label = "Export URDF - ROS zipped Package"
+    profiling = True
+    exporting = True
 
     filter_glob: StringProperty(
         default="*.zip",
@@ -407,29 +441,21 @@ class ExportZippedPackage(RDOperator):
     @RDOperator.Postconditions(ModelSelected, ObjectMode)
     def execute(self, context):
         """
-        Code snipped from `<http://stackoverflow.com/questions/1855095/how-to-create-a-zip-archive-of-a-directory>`_
+        Exports the package into a temporary directory. The files are moved into the zip archive while they are
+        written (see :mod:`..package_archive`).
         """
-        import zipfile
-
         if os.path.isdir(self.filepath):
             self.logger.debug(self.filepath)
             self.report({'ERROR'}, "No File selected!")
             return {'FINISHED'}
 
-        def zipdir(path, ziph):
-            # ziph is zipfile handle
-            for root, dirs, files in os.walk(path):
-                self.logger.debug("{}, {} ,{}".format(root, dirs, files))
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    ziph.write(file_path, os.path.relpath(file_path, path))
-
-        with tempfile.TemporaryDirectory() as target:
+        with tempfile.TemporaryDirectory() as target, package_archive.session(
+                self.filepath, target,
+                compresslevel=global_properties.zip_compression_level.get(context.scene),
+                store_extensions=parse_extensions(global_properties.zip_store_extensions.get(context.scene)),
+                parallel=global_properties.zip_parallel_compression.get(context.scene)):
             create_package(self, context, target, self.base_link_name)
 
-            with zipfile.ZipFile(self.filepath, 'w') as zipf:
-                zipdir(target, zipf)
-
         return {'FINISHED'}
 
     def invoke(self, context, event):
@@ -451,6 +477,8 @@ class ExportPackage(RDOperator):
     # Obligatory class attributes
     bl_idname = config.OPERATOR_PREFIX + "export_to_urdf_package"
     bl_label = "Export URDF - ROS package"
+    profiling = True
+    exporting = True
 
     directory: StringProperty(
         name="Mesh directory", subtype='DIR_PATH', default="")
@@ -480,6 +508,8 @@ class ExportPlain(RDOperator):
 
     bl_idname = config.OPERATOR_PREFIX + 'export_to_urdf_plain'
     bl_label = "Export URDF - plain"
+    profiling = True
+    exporting = True
 
     filter_glob: StringProperty(
         default="*.urdf",
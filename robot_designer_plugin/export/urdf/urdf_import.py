@@ -52,6 +52,7 @@ from bpy.props import StringProperty
 # RobotDesigner imports
 from ...core import config, PluginManager, Condition, RDOperator
 from ...core.logfile import export_logger
+from ...core.profiling import profiler
 from ...operators.helpers import ModelSelected, ObjectMode
 from ...operators.segments import SelectSegment, CreateNewSegment, UpdateSegments
 from ...operators.model import SelectModel, CreateNewModel, SelectCoordinateFrame
@@ -64,6 +65,10 @@ from .generic import urdf_tree
 from .generic.helpers import string_to_list, get_value
 
 from ...properties.globals import global_properties
+from ..mesh_import_cache import mesh_import_cache, apply_transform
+from ..mesh_decode_pool import build_objects
+from ..mesh_decoder import decode_stl
+from ..package_reader import package_reader
 
 
 __author__ = 'Stefan Ulbrich(FZI), Igor Peric (FZI), Maximillian Stauss (FZI)'
@@ -85,6 +90,7 @@ class Importer(object):
         self.controllers = None
 
 
+@profiler.profiled()
 def import_geometry(self, model):
     """
     Adds a geometry to the blender scene. Uses the self.file_name variable of the parenting context
@@ -104,7 +110,8 @@ def import_geometry(self, model):
         mesh_path = mesh_url.replace(self.FILE_URL_ABSOLUTE, '')
     elif mesh_url.startswith(self.FILE_URL_RELATIVE) or mesh_url.startswith(self.PACKAGE_URL):
         mesh_path = mesh_url.replace(self.FILE_URL_RELATIVE, '').replace(self.PACKAGE_URL, '')
-        mesh_path = os.path.join(str(Path(self.base_dir).parent), mesh_path)
+        # extracted on demand when importing a zipped package
+        mesh_path = package_reader.extract(os.path.join(str(Path(self.base_dir).parent), mesh_path))
     else:
         self.operator.report({'ERROR'}, "Unsupported URL schema")
         export_logger.error("Unsupported URL schema")
@@ -118,17 +125,22 @@ def import_geometry(self, model):
     export_logger.debug('model_type (geometry): {}'.format(model_type))
 
     fn, extension = os.path.splitext(mesh_path)
-    if extension == ".stl" or extension == ".STL":
-        try:
-            bpy.ops.import_mesh.stl(filepath=mesh_path)
-        except:
-            pass
-    elif extension == ".dae" or extension == ".DAE":
-        try:
-            export_logger.info("mesh file: {}".format(mesh_path))
-            bpy.ops.wm.collada_import(filepath=mesh_path, import_units=True)
-        except:
-            pass
+
+    def load():
+        if extension == ".stl" or extension == ".STL":
+            try:
+                build_objects(decode_stl(mesh_path))
+            except:
+                pass
+        elif extension == ".dae" or extension == ".DAE":
+            try:
+                export_logger.info("mesh file: {}".format(mesh_path))
+                bpy.ops.wm.collada_import(filepath=mesh_path, import_units=True)
+            except:
+                pass
+
+    # files referenced several times are only parsed once
+    mesh_import_cache.import_mesh(mesh_path, load)
 
     bpy.context.active_object.RobotDesigner.fileName = os.path.basename(os.path.splitext(mesh_path)[0])
 
@@ -292,7 +304,7 @@ def parse(self, node: urdf_tree.URDFTree, parent_name = ""):
                     bpy.ops.object.select_all(False)
                     bpy.context.scene.objects.active = object  # bpy.data.objects[object]
                     bpy.context.active_object.select = True
-                    bpy.ops.object.transform_apply(location=True, rotation=True, scale=True)
+                    apply_transform(location=True, rotation=True, scale=True)
                     bpy.context.active_object.matrix_world = segment_world * trafo_urdf * \
                                                          bpy.context.active_object.matrix_world
 
@@ -331,9 +343,7 @@ def parse(self, node: urdf_tree.URDFTree, parent_name = ""):
                     # The name might be altered by blender
                     assigned_name = bpy.context.active_object.name
 
-                    bpy.ops.object.transform_apply(location=False,
-                                               rotation=False,
-                                               scale=True)
+                    apply_transform(location=False, rotation=False, scale=True)
                     SelectModel.run(model_name=model_name)
                     SelectSegment.run(segment_name=segment_name)
                     SelectGeometry.run(geometry_name=assigned_name)
@@ -356,9 +366,12 @@ def parse(self, node: urdf_tree.URDFTree, parent_name = ""):
     return segment_name
 
 
+@profiler.profiled()
 def import_file(self):
-    robot_name, root_links, kinematic_chains, self.controllers, gazebo_tags = \
-        urdf_tree.URDFTree.parse(self.file_path)
+    with profiler.phase("parse_urdf"):
+        robot_name, root_links, kinematic_chains, self.controllers, gazebo_tags = \
+            urdf_tree.URDFTree.parse(self.file_path,
+                                     global_properties.import_validate_schema.get(bpy.context.scene))
 
     export_logger.debug("{} ,{}".format(self.base_dir, self.file_path))
     # store gazebo tags
@@ -376,19 +389,22 @@ def import_file(self):
     model_name = bpy.context.active_object.name
 
     SelectModel.run(model_name=model_name)
-    for link in root_links:
-        for visual in link.visual:
-            if visual.geometry.mesh is not None:
-                trafo = self.import_geometry(visual)
-                s1 = string_to_list(visual.geometry.mesh.scale)
-                s2 = bpy.context.active_object.scale
-                scale = Matrix([[s1[0] * s2[0], 0, 0, 0], [0, s1[1] * s2[1], 0, 0],
-                                [0, 0, s1[2] * s2[2], 0], [0, 0, 0, 1]])
-                bpy.context.active_object.matrix_world = trafo * scale
-
-    for chain in kinematic_chains:
-        root_name = self.parse(chain)
-        UpdateSegments.run(segment_name=root_name, recurse=True)
+    with mesh_import_cache.session(mesh_import_cache.enabled()):
+        for link in root_links:
+            for visual in link.visual:
+                if visual.geometry.mesh is not None:
+                    trafo = self.import_geometry(visual)
+                    s1 = string_to_list(visual.geometry.mesh.scale)
+                    s2 = bpy.context.active_object.scale
+                    scale = Matrix([[s1[0] * s2[0], 0, 0, 0], [0, s1[1] * s2[1], 0, 0],
+                                    [0, 0, s1[2] * s2[2], 0], [0, 0, 0, 1]])
+                    bpy.context.active_object.matrix_world = trafo * scale
+
+        for chain in kinematic_chains:
+            with profiler.phase("build_chain"):
+                root_name = self.parse(chain)
+            with profiler.phase("update_segments"):
+                UpdateSegments.run(segment_name=root_name, recurse=True)
 
     try:
         SelectCoordinateFrame.run(mesh_name='CoordinateFrame')
@@ -429,6 +445,7 @@ class ImportPackage(RDOperator):
     # Obligatory class attributes
     bl_idname = config.OPERATOR_PREFIX + "import_urdf_package"
     bl_label = "Import URDF - ROS package"
+    profiling = True
 
     filepath: StringProperty(name="Filename", subtype='FILE_PATH')
 
@@ -457,6 +474,7 @@ class ImportZippedPackage(RDOperator):
     # Obligatory class attributes
     bl_idname = config.OPERATOR_PREFIX + "import_urdf_zipped_package"
     bl_label = "Import URDF - ROS zipped package"
+    profiling = True
 
     filepath: StringProperty(name="Filename", subtype='FILE_PATH')
 
@@ -467,21 +485,19 @@ class ImportZippedPackage(RDOperator):
     @RDOperator.OperatorLogger
     @RDOperator.Postconditions(ModelSelected, ObjectMode)
     def execute(self, context):
-        import zipfile
         import tempfile
 
-        with tempfile.TemporaryDirectory() as target:
-            with zipfile.ZipFile(self.filepath, "r") as z:
-                z.extractall(target)
+        with tempfile.TemporaryDirectory() as target, package_reader.session(self.filepath, target):
+            # only the files read by the importer are extracted (package.xml files are needed to find the package)
+            for i in package_reader.find(".xml"):
+                if os.path.basename(i) == "package.xml":
+                    package_reader.extract(i)
 
             file_path = ""
-            for root, subFolders, files in os.walk(target):
-                export_logger.debug("{}, {}, {}, {}".format(root, subFolders, files, [os.path.splitext(i) for i in files]))
-                for i in files:
-                    if '.urdf' == os.path.splitext(i)[1]:
-                        if file_path:
-                            self.report({"INFO"}, "Multiple URDF in zip. Choosing: {}".format(i))
-                        file_path = os.path.join(root, i)
+            for i in package_reader.find(".urdf"):
+                if file_path:
+                    self.report({"INFO"}, "Multiple URDF in zip. Choosing: {}".format(os.path.basename(i)))
+                file_path = package_reader.extract(i)
 
             if file_path:
                 export_logger.debug("Importing: {}".format(file_path))
@@ -504,6 +520,7 @@ class ImportPlain(RDOperator):
     # Obligatory class attributes
     bl_idname = config.OPERATOR_PREFIX + "import_urdf_plain"
     bl_label = "Import URDF - plain"
+    profiling = True
 
     filepath: StringProperty(name="Filename", subtype='FILE_PATH')
 
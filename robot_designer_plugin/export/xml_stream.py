@@ -0,0 +1,202 @@
+# #####
+#  This file is part of the RobotDesigner developed in the Neurorobotics
+#  subproject of the Human Brain Project (https://www.humanbrainproject.eu).
+#
+#  The Human Brain Project is a European Commission funded project
+#  in the frame of the Horizon2020 FET Flagship plan.
+#  (http://ec.europa.eu/programmes/horizon2020/en/h2020-section/fet-flagships)
+#
+#  The Robot Designer has initially been forked from the RobotEditor
+#  (https://gitlab.com/h2t/roboteditor) developed at the Karlsruhe Institute
+#  of Technology in the High Performance Humanoid Technologies Laboratory (H2T).
+# #####
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Streaming serialization of pyxb bindings.
+
+:func:`write_binding` replaces ``binding.toDOM().toprettyxml()``. Instead of the :mod:`xml.dom.minidom`
+implementation, pyxb is handed a minimal DOM implementation that writes every node to the file as soon as it is
+complete. Since pyxb itself still traverses the binding, element order and value literals are identical to the DOM
+based output. Only the whitespace between the elements may differ.
+
+Pyxb adds the namespace declarations of the document (e.g., of a default namespace or of the prefixes referenced
+by ``xsi:type`` attributes) to the document element after the content has been created. Therefore, the content of
+the document element is spooled to a temporary file and written after the start tag has been completed.
+"""
+
+# System imports
+import shutil
+import tempfile
+import pyxb.utils.domutils
+
+# size up to which the content of the document element is kept in memory
+SPOOL_SIZE = 16 * 1024 * 1024
+
+
+def _escape(data):
+    """
+    Escapes text and attribute values the same way as :mod:`xml.dom.minidom` does.
+    """
+    return data.replace("&", "&amp;").replace("<", "&lt;").replace('"', "&quot;").replace(">", "&gt;")
+
+
+class _Text(object):
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        self.data = data
+
+
+class _Element(object):
+    """
+    An element whose start tag is written as soon as its first child arrives (attributes are set by pyxb after
+    the element has been appended to its parent). The start tag of the document element is written last.
+    """
+
+    __slots__ = ("document", "tagName", "attributes", "depth", "opened", "has_elements")
+
+    def __init__(self, document, name):
+        self.document = document
+        self.tagName = name
+        self.attributes = []
+        self.depth = 0
+        self.opened = False
+        self.has_elements = False
+
+    def setAttributeNS(self, namespace_uri, name, value):
+        if self.opened and self is not self.document.documentElement:
+            raise pyxb.LogicError("Attribute {} added to {} after its content was written".format(name, self.tagName))
+        self.attributes.append((name, value))
+
+    def appendChild(self, node):
+        return self.document.append(node, self)
+
+
+class _StreamingDocument(object):
+    """
+    Document that writes its elements to a file handle while pyxb builds the tree. Pyxb creates the tree in
+    document order such that all elements below the parent of a newly appended node are complete.
+    """
+
+    def __init__(self, stream, indent, newline):
+        self.target = stream
+        # content of the document element
+        self.stream = tempfile.SpooledTemporaryFile(SPOOL_SIZE, mode="w+", encoding="utf-8", newline="")
+        self.indent = indent
+        self.newline = newline
+        self.documentElement = None
+        self.open_elements = []
+
+    def createElementNS(self, namespace_uri, name):
+        return _Element(self, name)
+
+    def createTextNode(self, data):
+        return _Text(data)
+
+    def appendChild(self, node):
+        if self.documentElement is not None:
+            raise pyxb.LogicError("Document already has a document element")
+        self.documentElement = node
+        self.open_elements.append(node)
+        return node
+
+    def _start_tag(self, element):
+        attributes = "".join(' {}="{}"'.format(name, _escape(value)) for name, value in element.attributes)
+        return "<{}{}".format(element.tagName, attributes)
+
+    def _open(self, element):
+        if not element.opened:
+            if element is not self.documentElement:
+                self.stream.write(self.indent * element.depth + self._start_tag(element) + ">")
+            element.opened = True
+
+    def _close(self, element):
+        if not element.opened:
+            self.stream.write(self.indent * element.depth + self._start_tag(element) + "/>" + self.newline)
+            return
+        if element.has_elements:
+            self.stream.write(self.indent * element.depth)
+        self.stream.write("</{}>{}".format(element.tagName, self.newline))
+
+    def _close_below(self, parent):
+        while self.open_elements[-1] is not parent:
+            self._close(self.open_elements.pop())
+
+    def append(self, node, parent):
+        self._close_below(parent)
+        self._open(parent)
+
+        if isinstance(node, _Text):
+            self.stream.write(_escape(node.data))
+            return node
+
+        if not parent.has_elements:
+            parent.has_elements = True
+            self.stream.write(self.newline)
+        node.depth = parent.depth + 1
+        self.open_elements.append(node)
+        return node
+
+    def close(self):
+        """
+        Closes all elements and writes the document element with its (complete) namespace declarations.
+        """
+        while len(self.open_elements) > 1:
+            self._close(self.open_elements.pop())
+        root = self.documentElement
+        if not root.opened:
+            self.target.write(self._start_tag(root) + "/>" + self.newline)
+        else:
+            self.target.write(self._start_tag(root) + ">")
+            self.stream.seek(0)
+            shutil.copyfileobj(self.stream, self.target)
+            self.target.write("</{}>{}".format(root.tagName, self.newline))
+        self.stream.close()
+
+
+class _StreamingImplementation(object):
+    def __init__(self, stream, indent, newline):
+        self.stream = stream
+        self.indent = indent
+        self.newline = newline
+
+    def createDocument(self, namespace_uri, qualified_name, doctype):
+        return _StreamingDocument(self.stream, self.indent, self.newline)
+
+
+def write_binding(binding, stream, element_name=None, encoding=None, indent="\t", newline="\n"):
+    """
+    Writes a pyxb binding instance as XML document.
+
+    :param binding: The pyxb binding (e.g., the root of a SDF model)
+    :param stream: A file handle opened for writing text
+    :param element_name: The name of the document element if the binding is not bound to an element
+    :param encoding: Encoding stated in the XML declaration (if any)
+    :param indent: string used for indentation
+    :param newline: string used for line breaks
+    """
+    if encoding is None:
+        stream.write('<?xml version="1.0" ?>' + newline)
+    else:
+        stream.write('<?xml version="1.0" encoding="{}"?>'.format(encoding) + newline)
+
+    bds = pyxb.utils.domutils.BindingDOMSupport(implementation=_StreamingImplementation(stream, indent, newline))
+    document = binding.toDOM(bds, element_name=element_name)
+    document.close()
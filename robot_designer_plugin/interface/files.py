@@ -46,6 +46,7 @@ from ..operators import file_tools
 from .helpers import DebugBox
 from . import menus
 from ..core.logfile import LogFunction
+from ..core.profiling import profiler
 
 
 @LogFunction
@@ -124,11 +125,37 @@ def draw(layout, context):
     # elif storage_mode == 'temporary':
     #      global_properties.git_url.prop(context.scene, layout)
 
+    # import options
+    import_options_box = file_box.box()
+    import_options_box.label(text="Import Options")
+    row = import_options_box.row()
+    global_properties.import_mesh_cache.prop(context.scene, row, text="Mesh Cache")
+    global_properties.import_mesh_cache_persistent.prop(context.scene, row, text="Keep Cache")
+    global_properties.import_parallel_meshes.prop(context.scene, row, text="Parallel")
+    global_properties.import_validate_schema.prop(context.scene, row, text="Validate")
+
     # export options
     file_options_box = file_box.box()
     file_options_box.label(text="Export Options")
     row = file_options_box.row()
     global_properties.export_thumbnail.prop(context.scene, row, text="Thumbnail")
+    global_properties.export_mesh_cache.prop(context.scene, row, text="Mesh Cache")
+    global_properties.export_direct_mesh_writer.prop(context.scene, row, text="Direct Mesh Writer")
+    row = file_options_box.row()
+    global_properties.export_mesh_format.prop(context.scene, row, expand=True)
+    row = file_options_box.row()
+    global_properties.export_parallel_meshes.prop(context.scene, row, text="Parallel Mesh Export")
+    global_properties.export_incremental.prop(context.scene, row, text="Incremental")
+    row = file_options_box.row()
+    global_properties.export_robot_cache.prop(context.scene, row, text="Robot Cache")
+    row = file_options_box.row()
+    global_properties.zip_compression_level.prop(context.scene, row, text="Zip Level")
+    global_properties.zip_parallel_compression.prop(context.scene, row, text="Parallel Zip")
+    row = file_options_box.row()
+    global_properties.zip_store_extensions.prop(context.scene, row, text="Store")
+    row = file_options_box.row()
+    global_properties.export_muscle_tables.prop(context.scene, row, text="Muscle Tables")
+    global_properties.muscle_table_samples.prop(context.scene, row, text="Samples")
     row = file_options_box.row()
 
     row.label(text="Rqt Multiplot")
@@ -200,3 +227,14 @@ def draw(layout, context):
         row = debug_box.column(align=False)
         row.operator(file_tools.PrintTransformations.bl_idname)
         row.operator("script.reload", text="Reload Addon Scripts")
+
+        row = debug_box.row()
+        global_properties.profile_operators.prop(bpy.context.scene, row, text="Profile Import/Export")
+        if global_properties.profile_operators.get(bpy.context.scene):
+            row = debug_box.row()
+            global_properties.profile_directory.prop(bpy.context.scene, row, text="Reports")
+        if global_properties.profile_operators.get(bpy.context.scene) and profiler.last_report:
+            report_box = debug_box.box()
+            column = report_box.column(align=True)
+            for line in profiler.format_report(profiler.last_report):
+                column.label(text=line)
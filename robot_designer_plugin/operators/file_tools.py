@@ -228,6 +228,10 @@ class FileToDaeConverter(RDOperator):
 
     @RDOperator.OperatorLogger
     def execute(self, context):
+        # imported here, the export package depends on the operators
+        from ..export.mesh_decoder import decode_stl
+        from ..export.mesh_decode_pool import build_objects
+
         operator_logger.info("Files input folder is: {}".format(self.directory))
 
         # Analyze file types to process
@@ -259,7 +263,7 @@ class FileToDaeConverter(RDOperator):
                 if file_type == 'obj':
                     bpy.ops.import_scene.obj(filepath=os.path.join(self.directory, file))
                 elif file_type == 'stl':
-                    bpy.ops.import_mesh.stl(filepath=os.path.join(self.directory, file))
+                    build_objects(decode_stl(os.path.join(self.directory, file)))
                 elif file_type == 'fdx':
                     bpy.ops.import_scene.fbx(filepath=os.path.join(self.directory, file))
                 elif file_type == '3ds':
@@ -35,7 +35,6 @@ Sphinx-autodoc tag
 
 # Blender imports
 import bpy
-import math
 from bpy.props import StringProperty, BoolProperty, IntProperty
 
 # RobotDesigner imports
@@ -519,7 +518,8 @@ class SelectSegmentMuscle(RDOperator):
 @PluginManager.register_class
 class CalculateMuscleLength(RDOperator):
     """
-    :term:`operator` for calculating the length of the active muscle
+    :term:`operator` for calculating the length of the active muscle (or of all muscles of the model if no muscle
+    is given)
 
 
     """
@@ -531,20 +531,22 @@ class CalculateMuscleLength(RDOperator):
 
     @RDOperator.OperatorLogger
     def execute(self, context):
-        leng = 0.0
+        from ..export.muscle_paths import update_muscle_lengths
 
-        if len(bpy.data.objects[self.muscle].data.splines) == 0:
+        if self.muscle:
+            muscles = [bpy.data.objects[self.muscle]]
+        else:
+            model_name = global_properties.model_name.get(context.scene)
+            muscles = [
+                obj for obj in context.scene.objects
+                if obj.RobotDesigner.muscles.robotName == model_name
+            ]
+
+        muscles = [obj for obj in muscles if obj.type == "CURVE" and len(obj.data.splines)]
+        if not muscles:
             return {"CANCELLED"}
 
-        spline = bpy.data.objects[self.muscle].data.splines[0]
-
-        for i in range(0, len(spline.points) - 1):
-            x = spline.points[i].co[0] - spline.points[i + 1].co[0]
-            y = spline.points[i].co[1] - spline.points[i + 1].co[1]
-            z = spline.points[i].co[2] - spline.points[i + 1].co[2]
-
-            leng += math.sqrt((x ** 2) + (y ** 2) + (z ** 2))
-
-        bpy.data.objects[self.muscle].RobotDesigner.muscles.length = leng
+        wrap_objects = [obj for obj in context.scene.objects if obj.RobotDesigner.tag == "WRAPPING"]
+        update_muscle_lengths(muscles, wrap_objects)
 
         return {"FINISHED"}
@@ -41,6 +41,8 @@ Sphinx-autodoc tag
 
 # System imports
 from math import degrees, radians
+from collections import deque
+from contextlib import contextmanager
 
 # Blender imports
 import bpy
@@ -56,6 +58,8 @@ from .helpers import (
     AtLeastOneSegmentSelected,
     NotEditMode,
 )
+from ..core.operators import get_registered_operator
+from ..properties.globals import global_properties
 
 
 @RDOperator.Preconditions(ModelSelected)
@@ -512,11 +516,231 @@ class CreateNewSegment(RDOperator):
         return context.window_manager.invoke_props_dialog(self)
 
 
+@contextmanager
+def kinematic_updates_suspended():
+    """
+    Context manager in which changes of segment properties do not trigger :class:`UpdateSegments` (the global
+    property ``do_kinematic_update`` is switched off). The armature has to be updated explicitly afterwards.
+    """
+    scene = bpy.context.scene
+    previous = global_properties.do_kinematic_update.get(scene)
+    global_properties.do_kinematic_update.set(scene, False)
+    try:
+        yield
+    finally:
+        global_properties.do_kinematic_update.set(scene, previous)
+
+
+class KinematicUpdateQueue(object):
+    """
+    Dispatches the kinematic updates requested by changes of segment properties (see
+    :meth:`.properties.segments.RDSegment.callbackSegments`).
+
+    By default, the segment is updated with :class:`UpdateSegments` right away such that the pose bones are up to
+    date when the property has been set. Updates are only postponed
+
+    - within :meth:`deferred`: changed segments are marked dirty and updated when the outermost context is left,
+    - while a slider of a panel is dragged (see :meth:`interactive`): the dirty segments are updated on the next tick
+      of a :mod:`bpy.app.timers` timer, i.e., once per redraw, in the window and area the slider belongs to.
+
+    A dirty segment whose ancestor is dirty as well is covered by the update of the ancestor.
+    """
+
+    def __init__(self):
+        # armature object name -> names of dirty segments
+        self.dirty = {}
+        self.depth = 0
+        self.scheduled = False
+        # context of the last interactive change (used by the timer)
+        self.override = None
+
+    @property
+    def deferred_active(self):
+        return self.depth > 0
+
+    @staticmethod
+    def interactive(context):
+        """
+        :param context: The context of the property update callback
+        :return: Whether the property is changed in a panel of the plugin (e.g., a slider is dragged), not by an
+            operator or a script
+        """
+        return (not RDOperator.executing and context.window is not None and context.region is not None and
+                context.region.type == "UI")
+
+    def request(self, context, segment_name):
+        """
+        Updates a changed segment of the active model (or marks it for update, see above).
+
+        :param context: The context of the property update callback
+        :param segment_name: Name of the changed segment
+        """
+        model = context.active_object
+        if not model.data.bones[segment_name].RobotDesigner.RD_Bone:
+            # would not be updated anyway (e.g., while it is taken control of by ImportBlenderArmature)
+            return
+
+        if self.depth:
+            self.dirty.setdefault(model.name, set()).add(segment_name)
+        elif self.interactive(context):
+            self.dirty.setdefault(model.name, set()).add(segment_name)
+            self.override = {"window": context.window, "screen": context.screen, "area": context.area,
+                             "region": context.region}
+            if not self.scheduled:
+                self.scheduled = True
+                bpy.app.timers.register(self._tick, first_interval=0.0)
+        else:
+            # We should not have to recurse when updating a local property.
+            UpdateSegments.run(segment_name=segment_name, recurse=False)
+
+    def _tick(self):
+        if self.depth:
+            # flushed when the deferred context is left; keep the timer for requests left over on errors
+            return 0.1
+        self.scheduled = False
+        override, self.override = self.override, None
+        if override is not None and override["window"] in bpy.context.window_manager.windows[:]:
+            self.flush(override)
+        else:
+            self.flush()
+        # do not repeat the timer
+        return None
+
+    @staticmethod
+    def subtree_roots(bones, segment_names):
+        """
+        :param bones: The bones of the armature
+        :param segment_names: Names of dirty segments
+        :return: The dirty segments without dirty ancestor (sorted by depth and name)
+        """
+        roots = [
+            name for name in segment_names
+            if name in bones and not any(parent.name in segment_names for parent in bones[name].parent_recursive)
+        ]
+        return sorted(roots, key=lambda name: (len(bones[name].parent_recursive), name))
+
+    def flush(self, override=None):
+        """
+        Updates all dirty segments now.
+
+        :param override: Context override (window, screen, area and region) the operators are run with. Required if
+            called from a timer, in which the context has no window.
+        """
+
+        def run(operator, **kwargs):
+            if override is None:
+                return operator.run(**kwargs)
+            return get_registered_operator(operator)(override, **kwargs)
+
+        dirty, self.dirty = self.dirty, {}
+        view_layer = override["window"].view_layer if override is not None else bpy.context.view_layer
+        for model_name, segment_names in dirty.items():
+            model = bpy.data.objects.get(model_name)
+            if model is None or model.type != "ARMATURE":
+                continue
+
+            previous_object = view_layer.objects.active
+            active_bone = model.data.bones.active
+            active_bone_name = active_bone.name if active_bone is not None else ""
+            view_layer.objects.active = model
+            try:
+                for root in self.subtree_roots(model.data.bones, segment_names):
+                    run(UpdateSegments, segment_name=root, recurse=True)
+                # UpdateSegments selects the segment it started with
+                run(SelectSegment, segment_name=active_bone_name)
+            finally:
+                view_layer.objects.active = previous_object
+
+    @contextmanager
+    def deferred(self):
+        """
+        Context manager for scripts that change many segment properties: the kinematic updates are collected and
+        done once when the (outermost) context is left. On errors, the updates requested within the context are
+        discarded (but not the ones that were pending before).
+        """
+        pending = {model_name: set(segment_names) for model_name, segment_names in self.dirty.items()}
+        self.depth += 1
+        try:
+            yield self
+        except BaseException:
+            self.dirty = pending
+            raise
+        finally:
+            self.depth -= 1
+        if not self.depth:
+            self.flush()
+
+
+kinematic_update_queue = KinematicUpdateQueue()
+
+
+def deferred_kinematics():
+    """
+    Batches the kinematic updates of segment property changes (see :meth:`KinematicUpdateQueue.deferred`)::
+
+        with deferred_kinematics():
+            for bone in model.data.bones:
+                bone.RobotDesigner.theta.value = 0.0
+    """
+    return kinematic_update_queue.deferred()
+
+
+def create_segments(segments, parent_name=""):
+    """
+    Bulk version of :class:`CreateNewSegment` for importers: creates the bones of several segments in a single edit
+    mode session and initializes them like :class:`CreateNewSegment` without updating the armature. Call
+    :class:`UpdateSegments` once the segment properties are set.
+
+    :param segments: list of ``(segment_name, parent)`` in which ``parent`` is the index of the parent segment in
+        the list (parents have to precede their children) or None
+    :param parent_name: Name of an existing segment segments without parent in the list are attached to (empty for
+        root segments)
+    :return: The names of the created segments (blender might have changed them)
+    """
+    model = bpy.context.active_object
+    current_mode = model.mode
+
+    bpy.ops.object.mode_set(mode="EDIT", toggle=False)
+    edit_bones = model.data.edit_bones
+    created = []
+    for segment_name, parent in segments:
+        bone = edit_bones.new(segment_name)
+        bone.head = (0, 0, 0)  # Dummy
+        bone.tail = (0, 0, 1)  # Dummy
+        bone.lock = True
+        if parent is not None:
+            bone.parent = created[parent]
+        elif parent_name:
+            bone.parent = edit_bones[parent_name]
+        created.append(bone)
+    segment_names = [bone.name for bone in created]
+
+    bpy.ops.object.mode_set(mode="POSE", toggle=False)
+    with kinematic_updates_suspended():
+        for segment_name, (_, parent) in zip(segment_names, segments):
+            segment = model.data.bones[segment_name].RobotDesigner
+            segment.RD_Bone = True
+            # default parent joint name of link
+            segment.joint_name = segment_name + "_joint"
+            if parent is None and not parent_name:
+                segment.Euler.alpha.value = 90.0
+                segment.DH.alpha.value = 90.0
+
+            constraint = model.pose.bones[segment_name].constraints.new("LIMIT_ROTATION")
+            constraint.name = "RobotDesignerConstraint"
+    bpy.ops.object.mode_set(mode=current_mode, toggle=False)
+
+    return segment_names
+
+
 @PluginManager.register_class
 class UpdateSegments(RDOperator):
     """
     :term:`operator` for updating the :term:`robot models` after parameters changed.
     If a :term:`segment` name is given it will proceed recursively.
+
+    The transforms of all affected segments are computed first. Then, all edit bones are placed in a single edit
+    mode session and all pose bones (joint transform and limit constraint) are set in a single pose mode session.
     """
 
     bl_idname = config.OPERATOR_PREFIX + "udpate_model"
@@ -526,6 +750,63 @@ class UpdateSegments(RDOperator):
     segment_name: StringProperty(default="")
     recurse: BoolProperty(default=True)
 
+    @staticmethod
+    def collect_segments(bones, segment_name):
+        """
+        :param bones: The bones of the armature
+        :param segment_name: The segment to start with
+        :return: Names of the segment and its descendants (parents precede their children). The subtrees of bones
+            that have not been created by the RobotDesigner are skipped.
+        """
+        segment_names = []
+        pending = deque([segment_name])
+        while pending:
+            name = pending.popleft()
+            if not bones[name].RobotDesigner.RD_Bone:
+                continue
+            segment_names.append(name)
+            pending.extend(child.name for child in bones[name].children)
+        return segment_names
+
+    @staticmethod
+    def update_constraint(pose_bone, segment):
+        """
+        Sets the limit constraint of a pose bone according to the joint of a segment.
+
+        :param pose_bone: The pose bone
+        :param segment: The ``RobotDesigner`` properties of the bone
+        """
+        if segment.jointMode == "REVOLUTE":
+            if "RobotDesignerConstraint" not in pose_bone.constraints:
+                pose_bone.constraints.new("LIMIT_ROTATION").name = "RobotDesignerConstraint"
+            constraint = [
+                i for i in pose_bone.constraints if i.type == "LIMIT_ROTATION"
+            ][0]
+            constraint.name = "RobotDesignerConstraint"
+            constraint.owner_space = "LOCAL"
+            constraint.use_limit_x = True
+            constraint.use_limit_y = True
+            constraint.use_limit_z = True
+            constraint.min_x = 0.0
+            constraint.min_y = 0.0
+            constraint.min_z = 0.0
+            constraint.max_x = 0.0
+            constraint.max_y = 0.0
+            constraint.max_z = 0.0
+            if segment.axis == "X":
+                constraint.min_x = radians(segment.theta.min)
+                constraint.max_x = radians(segment.theta.max)
+            elif segment.axis == "Y":
+                constraint.min_y = radians(segment.theta.min)
+                constraint.max_y = radians(segment.theta.max)
+            elif segment.axis == "Z":
+                constraint.min_z = radians(segment.theta.min)
+                constraint.max_z = radians(segment.theta.max)
+        elif "RobotDesignerConstraint" in pose_bone.constraints:
+            pose_bone.constraints.remove(
+                pose_bone.constraints["RobotDesignerConstraint"]
+            )
+
     @RDOperator.Postconditions(ModelSelected)
     @RDOperator.OperatorLogger
     #    @RDOperator.Postconditions(ModelSelected)
@@ -538,129 +819,52 @@ class UpdateSegments(RDOperator):
             str(self.segment_name))
         )
 
-        armature_data_name = context.active_object.data.name
+        model = context.active_object
+        armature = model.data
 
         if self.segment_name:
-            segment_name = (
-                bpy.data.armatures[armature_data_name].bones[self.segment_name].name
-            )  # Isn't this the identity operation??
+            segment_name = armature.bones[self.segment_name].name
         else:
-            segment_name = bpy.data.armatures[armature_data_name].bones[0].name
+            segment_name = armature.bones[0].name
 
         SelectSegment.run(segment_name=self.segment_name)
 
-        if (
-            not bpy.data.armatures[armature_data_name]
-            .bones[segment_name]
-            .RobotDesigner.RD_Bone
-        ):
+        # edit bones do not follow their parents, hence the children have to be placed again in any case
+        segment_names = self.collect_segments(armature.bones, segment_name)
+        if not segment_names:
             self.logger.info("Not updated (not a RD segment): {}".format(segment_name))
             return {"FINISHED"}
 
-        bone = bpy.data.armatures[armature_data_name].bones[segment_name]
-
         # Transforms as per RD spec.
-        matrix, joint_matrix = bone.RobotDesigner.getTransform()
+        transforms = [armature.bones[name].RobotDesigner.getTransform() for name in segment_names]
 
         bpy.ops.object.mode_set(mode="EDIT", toggle=False)
-
-        editbone = bpy.data.armatures[armature_data_name].edit_bones[
-            bpy.data.armatures[armature_data_name].bones[segment_name].name
-        ]
-        editbone.use_inherit_rotation = True
-
-        # Express desired matrix in frame of the Armature
-        if editbone.parent is not None:
-            transform = editbone.parent.matrix.copy()
-            matrix = transform @ matrix
-
-        # Adjust bone properties to match RD transform specs.
-        # Try to move it around rigidly. Keep length.
-        pos = matrix.to_translation()
-        axis, roll = _mat3_to_vec_roll(matrix.to_3x3())
-        length = editbone.length
-        editbone.head = pos  # Changes length.
-        editbone.tail = pos + length * axis
-        editbone.roll = roll
-
-        bpy.ops.object.mode_set(mode=current_mode, toggle=False)
+        for name, (matrix, _) in zip(segment_names, transforms):
+            editbone = armature.edit_bones[name]
+            editbone.use_inherit_rotation = True
+
+            # Express desired matrix in frame of the Armature (parents have been placed before)
+            if editbone.parent is not None:
+                matrix = editbone.parent.matrix @ matrix
+
+            # Adjust bone properties to match RD transform specs.
+            # Try to move it around rigidly. Keep length.
+            pos = matrix.to_translation()
+            axis, roll = _mat3_to_vec_roll(matrix.to_3x3())
+            length = editbone.length
+            editbone.head = pos  # Changes length.
+            editbone.tail = pos + length * axis
+            editbone.roll = roll
 
         # update pose
         bpy.ops.object.mode_set(mode="POSE", toggle=False)
-        pose_bone = bpy.context.object.pose.bones[segment_name]
-        pose_bone.matrix_basis = joint_matrix
-
-        # Local variables for updating the constraints
-        # These refer to the settings pertaining to the RD.
-        joint_axis = (
-            bpy.data.armatures[armature_data_name]
-            .bones[segment_name]
-            .RobotDesigner.axis
-        )
-        min_rot = (
-            bpy.data.armatures[armature_data_name]
-            .bones[segment_name]
-            .RobotDesigner.theta.min
-        )
-        max_rot = (
-            bpy.data.armatures[armature_data_name]
-            .bones[segment_name]
-            .RobotDesigner.theta.max
-        )
-        jointMode = (
-            bpy.data.armatures[armature_data_name]
-            .bones[segment_name]
-            .RobotDesigner.jointMode
-        )
-        jointValue = (
-            bpy.data.armatures[armature_data_name]
-            .bones[segment_name]
-            .RobotDesigner.theta.value
-        )
-        if jointMode == "REVOLUTE":
-            if "RobotDesignerConstraint" not in pose_bone.constraints:
-                bpy.ops.pose.constraint_add(type="LIMIT_ROTATION")
-                bpy.context.object.pose.bones[segment_name].constraints[
-                    0
-                ].name = "RobotDesignerConstraint"
-            constraint = [
-                i for i in pose_bone.constraints if i.type == "LIMIT_ROTATION"
-            ][0]
-            constraint.name = "RobotDesignerConstraint"
-            constraint.owner_space = "LOCAL"
-            constraint.use_limit_x = True
-            constraint.use_limit_y = True
-            constraint.use_limit_z = True
-            constraint.min_x = 0.0
-            constraint.min_y = 0.0
-            constraint.min_z = 0.0
-            constraint.max_x = 0.0
-            constraint.max_y = 0.0
-            constraint.max_z = 0.0
-            if joint_axis == "X":
-                constraint.min_x = radians(min_rot)
-                constraint.max_x = radians(max_rot)
-            elif joint_axis == "Y":
-                constraint.min_y = radians(min_rot)
-                constraint.max_y = radians(max_rot)
-            elif joint_axis == "Z":
-                constraint.min_z = radians(min_rot)
-                constraint.max_z = radians(max_rot)
-        elif "RobotDesignerConstraint" in pose_bone.constraints:
-            pose_bone.constraints.remove(
-                pose_bone.constraints["RobotDesignerConstraint"]
-            )
+        for name, (_, joint_matrix) in zip(segment_names, transforms):
+            pose_bone = model.pose.bones[name]
+            pose_bone.matrix_basis = joint_matrix
+            self.update_constraint(pose_bone, armature.bones[name].RobotDesigner)
 
-        # -------------------------------------------------------
         bpy.ops.object.mode_set(mode=current_mode, toggle=False)
 
-        children_names = [
-            i.name
-            for i in bpy.data.armatures[armature_data_name].bones[segment_name].children
-        ]
-        for child_name in children_names:
-            UpdateSegments.run(segment_name=child_name, recurse=self.recurse)
-
         SelectSegment.run(segment_name=segment_name)
 
         return {"FINISHED"}
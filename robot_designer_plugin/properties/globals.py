@@ -684,6 +684,152 @@ class RDGlobals(PropertyGroupHandlerBase):
                 default=False,
             )
         )
+        self.export_mesh_cache = PropertyHandler(
+            BoolProperty(
+                name="Use mesh export cache",
+                description="Reuses previously exported mesh files \
+                                if geometry, modifiers and materials did not change",
+                default=True,
+            )
+        )
+        self.export_direct_mesh_writer = PropertyHandler(
+            BoolProperty(
+                name="Direct mesh writer",
+                description="Writes COLLADA meshes directly from the mesh data instead of calling the blender \
+                                exporter (meshes with image textures always use the blender exporter)",
+                default=True,
+            )
+        )
+        self.export_mesh_format = PropertyHandler(
+            EnumProperty(
+                name="Mesh format",
+                items=[
+                    ("DAE", "COLLADA", "Export meshes as COLLADA files (with materials)"),
+                    ("STL", "STL", "Export meshes as binary STL files (compact, without materials)"),
+                ],
+                default="DAE",
+            )
+        )
+        self.export_parallel_meshes = PropertyHandler(
+            BoolProperty(
+                name="Parallel mesh export",
+                description="Writes the meshes with one background blender process per core",
+                default=False,
+            )
+        )
+        self.export_incremental = PropertyHandler(
+            BoolProperty(
+                name="Incremental package export",
+                description="Keeps package files whose inputs did not change since the last export \
+                                (stored in a manifest in the package directory)",
+                default=True,
+            )
+        )
+        self.export_robot_cache = PropertyHandler(
+            StringProperty(
+                name="Export from robot cache",
+                description="Snapshot (see Save Robot Cache) from which the exported model is read instead of the \
+                                scene if the model has not been changed since the snapshot was saved or loaded. \
+                                Meshes are still exported from the scene",
+                default="",
+                subtype="FILE_PATH",
+            )
+        )
+        self.zip_compression_level = PropertyHandler(
+            IntProperty(
+                name="Zip compression level",
+                description="Deflate level of zipped package exports (0: fastest, 9: smallest)",
+                default=6,
+                min=0,
+                max=9,
+            )
+        )
+        self.zip_store_extensions = PropertyHandler(
+            StringProperty(
+                name="Store without compression",
+                description="File extensions which are stored uncompressed in zipped packages",
+                default=".png .jpg .jpeg .stl",
+            )
+        )
+        self.zip_parallel_compression = PropertyHandler(
+            BoolProperty(
+                name="Parallel zip compression",
+                description="Compresses the files of zipped packages in a background thread while exporting",
+                default=False,
+            )
+        )
+        self.export_muscle_tables = PropertyHandler(
+            BoolProperty(
+                name="Export muscle tables",
+                description="Samples the muscle lengths and moment arms over the joint limits and writes them \
+                                next to muscles.osim (muscle_tables.npz/.csv)",
+                default=False,
+            )
+        )
+        self.muscle_table_samples = PropertyHandler(
+            IntProperty(
+                name="Muscle table samples",
+                description="Number of samples per degree of freedom of the muscle tables",
+                default=21,
+                min=2,
+                max=1000,
+            )
+        )
+        self.import_mesh_cache = PropertyHandler(
+            BoolProperty(
+                name="Mesh import cache",
+                description="Parses mesh files referenced several times only once and creates linked duplicates",
+                default=True,
+            )
+        )
+        self.import_mesh_cache_persistent = PropertyHandler(
+            BoolProperty(
+                name="Keep mesh import cache",
+                description="Keeps the mesh import cache for subsequent imports \
+                                (files are reloaded when they have been modified)",
+                default=False,
+            )
+        )
+        self.import_parallel_meshes = PropertyHandler(
+            BoolProperty(
+                name="Parallel mesh import",
+                description="Decodes the mesh files of an imported model in worker processes (one per core)",
+                default=False,
+            )
+        )
+        self.import_validate_schema = PropertyHandler(
+            BoolProperty(
+                name="Validate imported files",
+                description="Reads imported SDF/URDF files with the schema bindings, which validates them but is \
+                                considerably slower",
+                default=False,
+            )
+        )
+        self.profile_operators = PropertyHandler(
+            BoolProperty(
+                name="Profile import/export",
+                description="Records time, calls and memory of the import/export phases and writes a report \
+                                (JSON lines) to the profile directory",
+                default=False,
+            )
+        )
+        self.profile_directory = PropertyHandler(
+            StringProperty(
+                name="Profile Directory",
+                description="Directory the profiling reports are written to (empty: next to the exported file, \
+                                temporary directory for imports)",
+                default="",
+                subtype="DIR_PATH",
+            )
+        )
+        self.mesh_cache_directory = PropertyHandler(
+            StringProperty(
+                name="Mesh Cache Directory",
+                description="Directory of the mesh export cache (empty: blender user data files)",
+                default="",
+                subtype="DIR_PATH",
+            )
+        )
 
 
 
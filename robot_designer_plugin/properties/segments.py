@@ -50,7 +50,7 @@ from bpy.props import (
 )
 
 # RobotDesigner imports
-from ..operators.segments import UpdateSegments
+from ..operators.segments import kinematic_update_queue
 from ..core import PluginManager
 from .globals import global_properties
 
@@ -111,8 +111,7 @@ class RDDegreeOfFreedom(bpy.types.PropertyGroup):
 
     def updateDoF(self: memoryview, context):
         if global_properties.do_kinematic_update.get(context.scene):
-            segment_name = context.active_bone.name
-            UpdateSegments.run(segment_name=segment_name, recurse=False)
+            kinematic_update_queue.request(context, context.active_bone.name)
 
     value: FloatProperty(name="Value", update=updateDoF, precision=4, step=100)
     offset: FloatProperty(name="Offset", update=updateDoF, precision=4, step=100)
@@ -200,9 +199,9 @@ class RDSegment(bpy.types.PropertyGroup):
     """
 
     def callbackSegments(self, context):
-        segment_name = context.active_bone.name
-        # We should not have to recurse when updating a local property.
-        UpdateSegments.run(segment_name=segment_name, recurse=False)
+        if not global_properties.do_kinematic_update.get(context.scene):
+            return
+        kinematic_update_queue.request(context, context.active_bone.name)
 
     def getTransform(self):
         """